@@ -0,0 +1,84 @@
+# pylint: disable-msg=C0111,C0103
+
+import os
+import shutil
+import tempfile
+from time import time
+
+import numpy as np
+
+from openmdao.main.api import Component
+from openmdao.main.datatypes.api import Array
+from openmdao.util.namelist_util import Namelist, _floatfmt, _format_array
+
+# The pyparsing grammar takes a few minutes for 10^5 values.
+N = 20000
+PER_LINE = 8
+
+
+class Legacy(Component):
+
+    x = Array(iotype='in')
+    y = Array(iotype='in', dtype=np.int64)
+    z = Array(iotype='in')
+
+np.random.seed(12345)
+comp = Legacy()
+comp.x = np.random.random(N)*1000.0
+comp.y = np.arange(N)
+comp.z = np.random.random((N/10, 10))
+
+startdir = os.getcwd()
+tempdir = tempfile.mkdtemp(prefix='namelist_arrays-')
+os.chdir(tempdir)
+try:
+    nml = Namelist(comp)
+    nml.set_filename('arrays.nml')
+    nml.add_group('ARRAYS')
+    nml.add_var('x')
+    nml.add_var('y')
+    nml.add_var('z')
+
+    t0 = time()
+    nml.generate()
+    print 'generate (%d values): %.3f s' % (2*N + comp.z.size, time() - t0)
+
+    # Formatting x all at once, and one value at a time as generate()
+    # used to.
+    t0 = time()
+    _format_array(comp.x, ', ')
+    print 'format x: %.3f s' % (time() - t0)
+    t0 = time()
+    line = ''
+    sep = ''
+    for val in comp.x:
+        line += sep + _floatfmt(val) % val
+        sep = ', '
+    print 'format x by value: %.3f s' % (time() - t0)
+
+    # Legacy codes often write arrays continued on many lines.
+    out = open('continued.nml', 'w')
+    out.write('&ARRAYS\n  x = ')
+    for i in range(0, N, PER_LINE):
+        out.write(', '.join(['%.16g' % val
+                             for val in comp.x[i:i+PER_LINE]]) + '\n')
+    out.write('/\n')
+    out.close()
+
+    for filename in ('arrays.nml', 'continued.nml'):
+        for fast_scan in (False, True):
+            nml = Namelist(comp)
+            nml._fast_scan = fast_scan
+            nml.set_filename(filename)
+            t0 = time()
+            nml.parse_file()
+            print 'parse %s (%s): %.3f s' \
+                  % (filename, 'scanner' if fast_scan else 'pyparsing',
+                     time() - t0)
+
+    t0 = time()
+    nml.load_model()
+    print 'load_model: %.3f s' % (time() - t0)
+finally:
+    os.chdir(startdir)
+    shutil.rmtree(tempdir)
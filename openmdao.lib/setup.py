@@ -76,6 +76,7 @@ Component, Driver, Variable and other plugins for OpenMDAO
       [openmdao.component]
       openmdao.lib.components.expected_improvement.ExpectedImprovement = openmdao.lib.components.expected_improvement:ExpectedImprovement
       openmdao.lib.components.expected_improvement_multiobj.MultiObjExpectedImprovement = openmdao.lib.components.expected_improvement_multiobj:MultiObjExpectedImprovement
+      openmdao.lib.components.expected_improvement_multiobj.MultiObjExpectedImprovementBatch = openmdao.lib.components.expected_improvement_multiobj:MultiObjExpectedImprovementBatch
       openmdao.lib.components.external_code.ExternalCode = openmdao.lib.components.external_code:ExternalCode
       openmdao.lib.components.metamodel.MetaModel = openmdao.lib.components.metamodel:MetaModel
       openmdao.lib.components.mux.Mux = openmdao.lib.components.mux:Mux
@@ -125,6 +126,8 @@ Component, Driver, Variable and other plugins for OpenMDAO
       openmdao.lib.doegenerators.optlh.OptLatinHypercube = openmdao.lib.doegenerators.optlh:OptLatinHypercube
       openmdao.lib.doegenerators.uniform.Uniform = openmdao.lib.doegenerators.uniform:Uniform
       openmdao.lib.doegenerators.csvfile.CSVFile = openmdao.lib.doegenerators.csvfile:CSVFile
+      openmdao.lib.doegenerators.quasirandom.Sobol = openmdao.lib.doegenerators.quasirandom:Sobol
+      openmdao.lib.doegenerators.quasirandom.Halton = openmdao.lib.doegenerators.quasirandom:Halton
 
       [openmdao.architecture]
       openmdao.lib.architectures.bliss.BLISS = openmdao.lib.architectures.bliss:BLISS
@@ -5,7 +5,8 @@ from openmdao.lib.components.external_code import ExternalCode
 from openmdao.lib.components.metamodel import MetaModel
 from openmdao.lib.components.pareto_filter import ParetoFilter
 from openmdao.lib.components.expected_improvement import ExpectedImprovement
-from openmdao.lib.components.expected_improvement_multiobj import MultiObjExpectedImprovement
+from openmdao.lib.components.expected_improvement_multiobj import MultiObjExpectedImprovement, \
+     MultiObjExpectedImprovementBatch
 from openmdao.lib.components.mux import Mux, DeMux
 from openmdao.lib.components.broadcaster import Broadcaster
 from openmdao.lib.components.linear_distribution import LinearDistribution
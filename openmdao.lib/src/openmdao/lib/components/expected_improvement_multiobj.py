@@ -3,22 +3,21 @@
 import logging
 
 try:
-    from numpy import exp, pi, array, isnan, diag, random
+    from numpy import exp, pi, array, isnan, asarray, empty, \
+                      errstate, inf, maximum, ones, searchsorted, sqrt, \
+                      tensordot, unique, where, zeros
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 _check = ['numpy']
 
 try:
-    from math import erf
+    from scipy.special import ndtr, ndtri
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
-    try:
-        from scipy.special import erf
-    except ImportError as err:
-        logging.warn("In %s: %r" % (__file__, err))
-        _check.append('scipy')
+    _check.append('scipy')
 
 from openmdao.main.datatypes.api import Enum, Float, Array, Int
+from openmdao.lib.doegenerators.quasirandom import Sobol
 
 from openmdao.main.component import Component
 from openmdao.util.decorators import stub_if_missing_deps
@@ -38,8 +37,9 @@ class MultiObjExpectedImprovement(Component):
                         desc="The NormalDistributions for each response " + \
                         "at a location where you wish to calculate EI.")
 
-    n = Int(1000, iotype="in", desc="Number of Monte Carlo Samples with \
-                        which to calculate probability of improvement.")
+    n = Int(1000, iotype="in", desc="Number of quasi-Monte Carlo samples \
+                        used when there are too many objectives and \
+                        Pareto-optimal cases for an exact calculation.")
 
     calc_switch = Enum("PI", ["PI", "EI"], iotype="in", desc="Switch to use either \
                         probability (PI) or expected (EI) improvement.")
@@ -54,96 +54,6 @@ class MultiObjExpectedImprovement(Component):
         super(MultiObjExpectedImprovement, self).__init__()
         self.y_star = None
 
-    def _2obj_PI(self, mu, sigma):
-        """Calculates the multi-objective probability of improvement
-        for a new point with two responses. Takes as input a
-        pareto frontier, mean and sigma of new point."""
-
-        y_star = self.y_star
-
-        PI1 = (0.5+0.5*erf((1/(2**0.5))*((y_star[0][0]-mu[0])/sigma[0])))
-        PI3 = (1-(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0]))))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))
-
-        PI2 = 0
-        if len(y_star) > 1:
-            for i in range(len(y_star) - 1):
-                PI2 = PI2+((0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))\
-                -(0.5+0.5*erf((1/(2**0.5))*((y_star[i][0]-mu[0])/sigma[0]))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))
-        mcpi = PI1 + PI2 + PI3
-        return mcpi
-
-    def _2obj_EI(self, mu, sigma):
-        """Calculates the multi-criteria expected improvement
-        for a new point with two responses. Takes as input a
-        pareto frontier, mean and sigma of new point."""
-
-        y_star = self.y_star
-        ybar11 = mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[0][0]-mu[0])/sigma[0])))\
-        -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[0][0]-mu[0])**2/sigma[0]**2))
-        ybar13 = (mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0])))\
-        -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[-1][0]-mu[0])**2/sigma[0]**2)))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))
-
-        ybar12 = 0
-        if len(y_star) > 1:
-            for i in range(len(y_star) - 1):
-                ybar12 = ybar12+((mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))\
-                -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i+1][0]-mu[0])**2/sigma[0]**2)))\
-                -(mu[0]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i][0]-mu[0])/sigma[0])))\
-                -sigma[0]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i][0]-mu[0])**2/sigma[0]**2))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))
-
-        ybar1 = (ybar11+ybar12+ybar13)/self.PI
-
-        ybar21 = mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[0][1]-mu[1])/sigma[1])))\
-        -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[0][1]-mu[1])**2/sigma[1]**2))
-        ybar23 = (mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][1]-mu[1])/sigma[1])))\
-        -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[-1][1]-mu[1])**2/sigma[1]**2)))\
-        *(0.5+0.5*erf((1/(2**0.5))*((y_star[-1][0]-mu[0])/sigma[0])))
-
-        ybar22 = 0
-        if len(y_star) > 1:
-            for i in range(len(y_star) - 1):
-                ybar22 = ybar22+((mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][1]-mu[1])/sigma[1])))\
-                -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i+1][1]-mu[1])**2/sigma[1]**2)))\
-                -(mu[1]*(0.5+0.5*erf((1/(2**0.5))*((y_star[i][1]-mu[1])/sigma[1])))\
-                -sigma[1]*(1/((2*pi)**0.5))*exp(-0.5*((y_star[i][1]-mu[1])**2/sigma[1]**2))))\
-                *(0.5+0.5*erf((1/(2**0.5))*((y_star[i+1][0]-mu[0])/sigma[0])))
-
-        ybar2 = (ybar21+ybar22+ybar23)/self.PI
-        dists = [((ybar1-point[0])**2+(ybar2-point[1])**2)**0.5 for point in y_star]
-        mcei = self.PI*min(dists)
-        if isnan(mcei):
-            mcei = 0
-        return mcei
-
-    def _dom(self, a, b):
-        """determines if a completely dominates b
-       returns True is if does
-    """
-        comp = [c1 < c2 for c1, c2 in zip(a, b)]
-        if sum(comp) == self.target.shape[1]:
-            return True
-        return False
-
-    def _nobj_PI(self, mu, sigma):
-        ''' n-objective probability of improvement.'''
-
-        cov = diag(array(sigma)**2)
-        rands = random.multivariate_normal(mu, cov, self.n)
-        num = 0  # number of cases that dominate the current Pareto set
-
-        for random_sample in rands:
-            for par_point in self.y_star:
-                #par_point = [p[2] for p in par_point.outputs]
-                if self._dom(par_point, random_sample):
-                    num = num + 1
-                    break
-        pi = (self.n - num)/float(self.n)
-        return pi
-
     def execute(self):
         """ Calculates the expected improvement or probability of improvement
         of a candidate point given by a normal distribution.
@@ -154,19 +64,225 @@ class MultiObjExpectedImprovement(Component):
         target = self.target
         self.y_star = target[array([i[0] for i in target]).argsort()]
 
-        n_objs = target.shape[1]
-
-        if n_objs == 2:
-            # biobjective optimization
-            self.PI = self._2obj_PI(mu, sig)
-            if self.calc_switch == 'EI':
-                # execute EI calculations
-                self.EI = self._2obj_EI(mu, sig)
-
-        if n_objs > 2:
-            # n objective optimization
-            self.PI = self._nobj_PI(mu, sig)
-            if self.calc_switch == 'EI':
-                # execute EI calculations
-                self.raise_exception("EI calculations not supported"
-                                        " for more than 2 objectives", ValueError)
+        calc_ei = self.calc_switch == 'EI'
+        pi, ei = multiobj_improvement(self.y_star, array([mu]), array([sig]),
+                                      calc_ei, num_samples=self.n)
+        self.PI = pi[0]
+        if calc_ei:
+            self.EI = ei[0]
+
+
+# Maximum number of cells in the grid used for the exact calculation.
+_MAX_CELLS = 2**21
+
+# Maximum number of elements in temporary arrays for the QMC calculation.
+_BLOCK_SIZE = 2**22
+
+
+def _dominated_cells(front, breaks):
+    """Returns a boolean array with one entry per cell of the grid defined by
+    the sorted unique front values in each dimension, `breaks`. Cell
+    ``(i_1, ..., i_k)`` covers ``[breaks[d][i_d-1], breaks[d][i_d])`` in each
+    dimension `d` and is True if it is dominated by some front point.
+    """
+    shape = tuple(len(b)+1 for b in breaks)
+    cells = zeros(shape, dtype=bool)
+    ranks = [searchsorted(b, front[:, d])+1 for d, b in enumerate(breaks)]
+    cells[tuple(ranks)] = True
+    # A cell is dominated if any marked cell is at or below it in every
+    # dimension.
+    for axis in range(len(shape)):
+        maximum.accumulate(cells, axis=axis, out=cells)
+    return cells
+
+
+def _interval_moments(breaks, mu, sigma):
+    """Returns the probability and first moment of a normal variable over
+    each interval between `breaks`, for each of the `mu`, `sigma` pairs.
+    Both are (len(mu), len(breaks)+1) arrays.
+    """
+    m = len(mu)
+    mu = mu[:, None]
+    sigma = sigma[:, None]
+    with errstate(divide='ignore', invalid='ignore'):
+        z = where(sigma > 0, (breaks[None, :]-mu)/sigma,
+                  where(breaks[None, :] > mu, inf, -inf))
+    cdf = ones((m, len(breaks)+2))
+    cdf[:, 0] = 0.
+    cdf[:, 1:-1] = ndtr(z)
+    pdf = zeros((m, len(breaks)+2))
+    pdf[:, 1:-1] = exp(-0.5*z*z)/sqrt(2.*pi)
+    prob = cdf[:, 1:]-cdf[:, :-1]
+    moment = mu*prob - sigma*(pdf[:, 1:]-pdf[:, :-1])
+    return prob, moment
+
+
+def _contract(cells, factors):
+    """Returns, for each candidate, the sum over all cells of ``cells`` times
+    the product of the per-dimension ``factors``, each of which is a
+    (num_candidates, num_intervals) array."""
+    result = tensordot(factors[-1], cells, axes=([1], [cells.ndim-1]))
+    for factor in factors[:-1]:
+        result = (result*factor.reshape(factor.shape +
+                                        (1,)*(result.ndim-2))).sum(axis=1)
+    return result
+
+
+def _exact_improvement(front, mu, sigma, calc_ei):
+    """Grid decomposition of the region dominated by `front`. Returns
+    (PI, mean of the improving region times PI) for each candidate."""
+    nobj = front.shape[1]
+    breaks = [unique(front[:, d]) for d in range(nobj)]
+    cells = _dominated_cells(front, breaks).astype(float)
+    moments = [_interval_moments(breaks[d], mu[:, d], sigma[:, d])
+               for d in range(nobj)]
+    probs = [prob for prob, moment in moments]
+
+    pi = 1.-_contract(cells, probs)
+    ybar_pi = None
+    if calc_ei:
+        ybar_pi = empty(mu.shape)
+        for d in range(nobj):
+            factors = list(probs)
+            factors[d] = moments[d][1]
+            ybar_pi[:, d] = mu[:, d]-_contract(cells, factors)
+    return pi, ybar_pi
+
+
+def _qmc_improvement(front, mu, sigma, calc_ei, num_samples):
+    """Quasi-Monte Carlo estimate using the same normal samples for every
+    candidate. Returns (PI, mean of the improving region times PI) for each
+    candidate."""
+    m, nobj = mu.shape
+    sobol = Sobol(num_samples)
+    sobol.num_parameters = nobj
+    sobol.skip = 1  # Skip the origin, which maps to -inf.
+    normal = ndtri(sobol.get_all_points())
+
+    pi = empty(m)
+    ybar_pi = empty(mu.shape) if calc_ei else None
+    block = max(1, _BLOCK_SIZE // (num_samples*len(front)*nobj))
+    for start in xrange(0, m, block):
+        stop = min(start+block, m)
+        samples = mu[start:stop, None, :] + \
+                  sigma[start:stop, None, :]*normal[None, :, :]
+        dominated = (front[None, None, :, :] <
+                     samples[:, :, None, :]).all(axis=3).any(axis=2)
+        improved = ~dominated
+        pi[start:stop] = improved.mean(axis=1)
+        if calc_ei:
+            ybar_pi[start:stop] = (samples*improved[:, :, None]).mean(axis=1)
+    return pi, ybar_pi
+
+
+def multiobj_improvement(front, mu, sigma, calc_ei=True, method='auto',
+                         num_samples=1000):
+    """Returns (PI, EI) arrays for a batch of candidate points whose
+    objectives are independent normal distributions.
+
+    front: array
+        Pareto-optimal points, one row per point.
+
+    mu, sigma: array
+        Mean and standard deviation of each objective, one row per
+        candidate.
+
+    calc_ei: bool
+        If False, EI is returned as None.
+
+    method: str
+        'exact' decomposes the region dominated by `front` into the cells of
+        a grid, which is exact but grows as (len(front)+1)**num_objectives.
+        'qmc' uses `num_samples` quasi-random samples shared by all the
+        candidates. 'auto' uses 'exact' unless the grid would be too large.
+
+    The probability of improvement is the probability that a candidate is not
+    dominated by any point in `front`. The expected improvement is PI times
+    the distance from the mean of the improving region to the nearest point
+    in `front`.
+    """
+    front = asarray(front, dtype=float)
+    mu = asarray(mu, dtype=float)
+    sigma = asarray(sigma, dtype=float)
+    nobj = front.shape[1]
+
+    if method == 'auto':
+        cells = 1
+        for d in range(nobj):
+            cells *= len(unique(front[:, d]))+1
+        method = 'exact' if cells <= _MAX_CELLS else 'qmc'
+
+    if method == 'exact':
+        pi, ybar_pi = _exact_improvement(front, mu, sigma, calc_ei)
+    elif method == 'qmc':
+        pi, ybar_pi = _qmc_improvement(front, mu, sigma, calc_ei, num_samples)
+    else:
+        raise ValueError("method must be 'auto', 'exact', or 'qmc', not %r"
+                         % method)
+    pi = pi.clip(0., 1.)
+
+    ei = None
+    if calc_ei:
+        with errstate(divide='ignore', invalid='ignore'):
+            ybar = ybar_pi/pi[:, None]
+        dists = sqrt(((ybar[:, None, :]-front[None, :, :])**2).sum(axis=2))
+        ei = pi*dists.min(axis=1)
+        ei[isnan(ei)] = 0.
+    return pi, ei
+
+
+@stub_if_missing_deps(*_check)
+class MultiObjExpectedImprovementBatch(Component):
+    """Multi-objective expected improvement and probability of improvement
+    for a batch of candidate points, computed in one vectorized pass.
+    For each candidate, the objectives are independent normal distributions
+    given by rows of `mu` and `sigma`.
+    """
+
+    target = Array(iotype="in", desc="Array of Pareto-optimal cases.")
+
+    mu = Array(iotype="in", desc="Mean of each objective, one row per "
+                                 "candidate.")
+
+    sigma = Array(iotype="in", desc="Standard deviation of each objective, "
+                                    "one row per candidate.")
+
+    calc_switch = Enum("PI", ["PI", "EI"], iotype="in",
+                       desc="Switch to use either probability (PI) or "
+                            "expected (EI) improvement.")
+
+    method = Enum("auto", ["auto", "exact", "qmc"], iotype="in",
+                  desc="Use an exact decomposition of the dominated region "
+                       "(exact), a quasi-Monte Carlo estimate (qmc), or "
+                       "exact unless that is too expensive (auto).")
+
+    n = Int(1000, low=1, iotype="in",
+            desc="Number of quasi-Monte Carlo samples shared by all "
+                 "candidates.")
+
+    PI = Array(iotype="out", desc="The probability of improvement of each "
+                                  "candidate.")
+
+    EI = Array(iotype="out", desc="The expected improvement of each "
+                                  "candidate.")
+
+    def execute(self):
+        """ Calculates the probability of improvement, and optionally the
+        expected improvement, of each candidate.
+        """
+        if self.mu.shape != self.sigma.shape:
+            self.raise_exception("mu and sigma must have the same shape, got"
+                                 " %s and %s" % (self.mu.shape,
+                                                 self.sigma.shape),
+                                 ValueError)
+        if len(self.target.shape) != 2 or \
+           self.target.shape[1] != self.mu.shape[1]:
+            self.raise_exception("target must have one column per "
+                                 "objective", ValueError)
+
+        calc_ei = self.calc_switch == 'EI'
+        pi, ei = multiobj_improvement(self.target, self.mu, self.sigma,
+                                      calc_ei, self.method, self.n)
+        self.PI = pi
+        if calc_ei:
+            self.EI = ei
@@ -1,12 +1,22 @@
 """ Pareto Filter -- finds non-dominated cases. """
 
+from bisect import bisect_right
+
 # pylint: disable-msg=E0611,F0401
-from numpy import array, zeros
+from numpy import arange, array, asarray, concatenate, empty, inf, \
+                  lexsort, maximum, minimum, newaxis, ones, sort, where, zeros
 
 from openmdao.main.datatypes.api import Array, List, VarTree
 from openmdao.main.api import Component
 from openmdao.main.vartree import VariableTree
 
+# Maximum number of elements in the temporary arrays used to compare blocks
+# of points against each other.
+_BLOCK_SIZE = 2**20
+
+# Size below which Kung's algorithm does a direct pairwise comparison.
+_KUNG_LEAF = 64
+
 class ParetoFilter(Component):
     """Takes a set of cases and filters out the subset of cases which are
     pareto optimal. Assumes that smaller values for model responses are
@@ -63,72 +73,184 @@ class ParetoFilter(Component):
         self.pareto_inputs = zeros((1, len(params)))
         self.pareto_outputs = zeros((1, len(responses)))
 
-    def _is_dominated(self, y1, y2):
-        """Tests to see if the point y1 is dominated by the point y2.
-        True if y1 is dominated by y2, False otherwise.
-        """
-        if y1 == y2:
-            return False
-        for a, b in zip(y1, y2):
-            if a < b:
-                return False
-
-        return True
+        self._front = None   # ParetoFront of all responses seen.
+        self._points = None  # Responses from the last execution.
 
     def execute(self):
         """Returns an araray of pareto optimal points and their response values.
         """
+        points = self._get_data('responses', self._response_names)
+
+        # Response lists usually just grow between executions (when they
+        # are a driver's accumulated cases), so try to just insert the
+        # new points.
+        front = self._front
+        if front is None or len(points) < front.num_seen or \
+           (points[:front.num_seen] != self._points[:front.num_seen]).any():
+            front = self._front = ParetoFront(points)
+        elif len(points) > front.num_seen:
+            front.insert(points[front.num_seen:])
+        self._points = points
+
+        indices = front.indices
+        self.pareto_outputs = points[indices]
+
+        if self._param_names:
+            inputs = self._get_data('params', self._param_names)
+            self.pareto_inputs = inputs[indices]
+
+    def _get_data(self, tree, names):
+        """Returns an array of the values of `names` in `tree`, with one
+        row per case."""
+        return array([self.get('%s.%s' % (tree, name)) for name in names]).T
+
+
+def _dominated_by(points, front):
+    """Returns a boolean array which is True for each point in `points` which
+    is dominated by some point in `front`. A point is dominated by any other
+    distinct point which is less than or equal to it in every objective.
+    Comparisons are done in blocks to limit memory use.
+    """
+    result = zeros(len(points), dtype=bool)
+    if len(front) == 0:
+        return result
+    block = max(1, _BLOCK_SIZE // (len(front)*points.shape[1]))
+    for start in xrange(0, len(points), block):
+        pts = points[start:start+block, newaxis, :]
+        less_equal = (front[newaxis, :, :] <= pts).all(axis=2)
+        distinct = (front[newaxis, :, :] != pts).any(axis=2)
+        result[start:start+block] = (less_equal & distinct).any(axis=1)
+    return result
+
+
+def _nondominated_2d(points):
+    """Sort-based sweep for two objectives. Returns a boolean mask."""
+    order = lexsort((points[:, 1], points[:, 0]))
+    f1 = points[order, 0]
+    f2 = points[order, 1]
+    n = len(order)
+
+    # Compare each point with the lowest f2 among all points before it in
+    # sorted order, excluding any identical points immediately before it.
+    new_group = ones(n, dtype=bool)
+    new_group[1:] = (f1[1:] != f1[:-1]) | (f2[1:] != f2[:-1])
+    group_start = maximum.accumulate(where(new_group, arange(n), 0))
+    prev_min = empty(n)
+    prev_min[0] = inf
+    prev_min[1:] = minimum.accumulate(f2)[:-1]
+
+    mask = empty(n, dtype=bool)
+    mask[order] = f2 < prev_min[group_start]
+    return mask
+
+
+def _nondominated_3d(points):
+    """Sort-based sweep for three objectives, maintaining the staircase of
+    the (f2, f3) projection of the nondominated points seen so far.
+    Returns a boolean mask."""
+    order = lexsort((points[:, 2], points[:, 1], points[:, 0]))
+    mask = zeros(len(order), dtype=bool)
+    stair_f2 = []  # increasing
+    stair_f3 = []  # decreasing
+    prev = None
+    for i in order:
+        point = tuple(points[i])
+        if point == prev:
+            # Identical points don't dominate each other.
+            mask[i] = prev_nondominated
+            continue
+        f2, f3 = point[1], point[2]
+        pos = bisect_right(stair_f2, f2)
+        nondominated = pos == 0 or stair_f3[pos-1] > f3
+        if nondominated:
+            if pos > 0 and stair_f2[pos-1] == f2:
+                pos -= 1
+            end = pos
+            while end < len(stair_f3) and stair_f3[end] >= f3:
+                end += 1
+            stair_f2[pos:end] = [f2]
+            stair_f3[pos:end] = [f3]
+        mask[i] = nondominated
+        prev = point
+        prev_nondominated = nondominated
+    return mask
+
+
+def _nondominated_kung(points, indices):
+    """Kung's divide and conquer. `indices` must be in lexicographic order,
+    so no point can be dominated by one which follows it. Returns the
+    nondominated subset of `indices`."""
+    if len(indices) <= _KUNG_LEAF:
+        pts = points[indices]
+        return indices[~_dominated_by(pts, pts)]
+    half = len(indices) // 2
+    top = _nondominated_kung(points, indices[:half])
+    bottom = _nondominated_kung(points, indices[half:])
+    bottom = bottom[~_dominated_by(points[bottom], points[top])]
+    return concatenate((top, bottom))
+
+
+def nondominated_indices(points):
+    """Returns the sorted indices of the rows of `points` (one row per point,
+    one column per objective) which are not dominated by any other distinct
+    row, assuming smaller values are better. Identical points do not
+    dominate each other, so duplicates of a nondominated point are all
+    retained.
+    """
+    points = asarray(points)
+    if points.ndim != 2 or len(points) == 0:
+        return arange(0)
+    nobj = points.shape[1]
+    if nobj == 1:
+        mask = points[:, 0] == points[:, 0].min()
+    elif nobj == 2:
+        mask = _nondominated_2d(points)
+    elif nobj == 3:
+        mask = _nondominated_3d(points)
+    else:
+        order = lexsort(points.T[::-1])
+        return sort(_nondominated_kung(points, order))
+    return arange(len(points))[mask]
+
+
+class ParetoFront(object):
+    """Maintains the nondominated subset of a growing set of points.
+    Points are identified by the order in which they were seen, starting
+    from 0. Smaller values are assumed to be better.
+
+    points: array
+        Initial points, one row per point, one column per objective.
+    """
+
+    def __init__(self, points):
+        points = asarray(points, dtype=float)
+        indices = nondominated_indices(points)
+        self._points = points[indices]
+        self._indices = indices
+        self.num_seen = len(points)
+
+    @property
+    def indices(self):
+        """Sorted indices of the nondominated points seen so far."""
+        return self._indices
 
-        first_name = "responses.%s" % self._response_names[0]
-        n_param = len(self._param_names)
-        n_response = len(self._response_names)
-        n_points = len(self.get(first_name))
-
-        # Get our output data once, then rearrange it after.
-        data = []
-        for varname in self._response_names:
-            name = "responses.%s" % varname
-            val = self.get(name)
-            data.append(val)
-
-        all_points = []
-        for j in xrange(0, n_points):
-            point = []
-            for i in xrange(0, n_response):
-                point.append(data[i][j])
-            all_points.append(point)
-
-        nondominated_output = list(all_points)
-
-        # Optionally, get our inputs data once, then rearrange it after.
-        if n_param > 0:
-
-            data = []
-            for varname in self._param_names:
-                name = "params.%s" % varname
-                val = self.get(name)
-                data.append(val)
-
-            nondominated_input = []
-            for j in xrange(0, n_points):
-                point = []
-                for i in xrange(0, n_param):
-                    point.append(data[i][j])
-                nondominated_input.append(point)
-
-        # Find non-dominated points
-        nd_input_list = []
-        for j, point1 in enumerate(all_points):
-            for point2 in nondominated_output:
-                if self._is_dominated(point1, point2):
-                    nondominated_output.remove(point1)
-                    nd_input_list.append(j)
-                    break
-
-        self.pareto_outputs = array(nondominated_output)
-
-        if n_param > 0:
-            data = [nondominated_input[j] for j in xrange(0, n_points) \
-                    if j not in nd_input_list]
-            self.pareto_inputs = array(data)
+    @property
+    def points(self):
+        """Nondominated points seen so far, in the order they were seen."""
+        return self._points
 
+    def insert(self, points):
+        """Add `points` to the set and update the front. Returns a boolean
+        array which is True for each new point that joined the front."""
+        points = asarray(points, dtype=float)
+        accepted = zeros(len(points), dtype=bool)
+        if len(points) == 0:
+            return accepted
+        new = nondominated_indices(points)
+        new = new[~_dominated_by(points[new], self._points)]
+        keep = ~_dominated_by(self._points, points[new])
+        self._points = concatenate((self._points[keep], points[new]))
+        self._indices = concatenate((self._indices[keep], new+self.num_seen))
+        self.num_seen += len(points)
+        accepted[new] = True
+        return accepted
@@ -1,8 +1,10 @@
 # pylint: disable-msg=C0111,C0103
 
 import unittest
-from numpy import array
-from openmdao.lib.components.expected_improvement_multiobj import MultiObjExpectedImprovement
+from numpy import array, random
+from openmdao.lib.components.expected_improvement_multiobj import MultiObjExpectedImprovement, \
+                                                                  MultiObjExpectedImprovementBatch, \
+                                                                  multiobj_improvement
 from openmdao.lib.casehandlers.api import CaseSet, ListCaseIterator
 from openmdao.main.uncertain_distributions import NormalDistribution
 from openmdao.main.case import Case
@@ -30,18 +32,16 @@ class MultiObjExpectedImprovementTests(unittest.TestCase):
         ei.execute()
         self.assertAlmostEqual(0.875,ei.PI,1)
 
-    def test_ei_calc_switch(self):
+    def test_ei_nobj_ei(self):
         ei = MultiObjExpectedImprovement()
         ei.target = array([[1, 1, 1]])
         ei.current = [NormalDistribution(mu=1, sigma=1),
                       NormalDistribution(mu=1, sigma=1),
                       NormalDistribution(mu=1, sigma=1)]
         ei.calc_switch = 'EI'
-        try:
-            ei.execute()
-        except ValueError,err:
-            self.assertEqual(str(err),': EI calculations not supported'
-                             ' for more than 2 objectives')
+        ei.execute()
+        self.assertAlmostEqual(0.875, ei.PI, 10)
+        self.assertTrue(ei.EI > 0.)
 
     def test_reset_y_star_event(self):
         ei = MultiObjExpectedImprovement()
@@ -55,6 +55,62 @@ class MultiObjExpectedImprovementTests(unittest.TestCase):
         self.assertEqual(ei.y_star.all(), array([2, 2, 2]).all())
 
 
+class MultiObjExpectedImprovementBatchTests(unittest.TestCase):
+
+    def test_2obj(self):
+        random.seed(3)
+        front = array([[0., 4.], [1., 2.], [2., 1.5], [4., 0.]])
+        mu = random.uniform(-1., 5., (20, 2))
+        sigma = random.uniform(.1, 2., (20, 2))
+
+        batch = MultiObjExpectedImprovementBatch()
+        batch.target = front
+        batch.mu = mu
+        batch.sigma = sigma
+        batch.calc_switch = 'EI'
+        batch.execute()
+
+        single = MultiObjExpectedImprovement()
+        single.target = front
+        single.calc_switch = 'EI'
+        for i in range(len(mu)):
+            single.current = [NormalDistribution(mu=m, sigma=s)
+                              for m, s in zip(mu[i], sigma[i])]
+            single.execute()
+            self.assertAlmostEqual(batch.PI[i], single.PI, 10)
+            self.assertAlmostEqual(batch.EI[i], single.EI, 10)
+
+            # Brute force Monte Carlo.
+            samples = random.normal(mu[i], sigma[i], (20000, 2))
+            dominated = (front[None, :, :] < samples[:, None, :]).all(axis=2).any(axis=1)
+            self.assertTrue(abs(batch.PI[i] - (1.-dominated.mean())) < .015)
+
+    def test_3obj(self):
+        random.seed(4)
+        front = random.uniform(size=(15, 3))
+        mu = random.uniform(size=(6, 3))
+        sigma = random.uniform(.1, .5, (6, 3))
+
+        pi, ei = multiobj_improvement(front, mu, sigma, method='exact')
+        qmc_pi, qmc_ei = multiobj_improvement(front, mu, sigma, method='qmc',
+                                              num_samples=4096)
+        for i in range(len(mu)):
+            self.assertAlmostEqual(pi[i], qmc_pi[i], 2)
+            self.assertAlmostEqual(ei[i], qmc_ei[i], 2)
+
+            # Brute force Monte Carlo.
+            samples = random.normal(mu[i], sigma[i], (20000, 3))
+            dominated = (front[None, :, :] < samples[:, None, :]).all(axis=2).any(axis=1)
+            self.assertTrue(abs(pi[i] - (1.-dominated.mean())) < .015)
+
+    def test_bad_shapes(self):
+        batch = MultiObjExpectedImprovementBatch()
+        batch.target = array([[1., 2.]])
+        batch.mu = array([[1., 2.]])
+        batch.sigma = array([[1., 2., 3.]])
+        self.assertRaises(ValueError, batch.execute)
+
+
 if __name__ == "__main__":
     unittest.main()
 
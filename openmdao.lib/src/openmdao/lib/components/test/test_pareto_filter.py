@@ -2,7 +2,22 @@
 
 import unittest
 
-from openmdao.lib.components.pareto_filter import ParetoFilter
+from numpy import array, random
+
+from openmdao.lib.components.pareto_filter import ParetoFilter, ParetoFront, \
+                                                 nondominated_indices
+
+
+def brute_force(points):
+    """ Indices of nondominated points by pairwise comparison. """
+    result = []
+    for i, p1 in enumerate(points):
+        for p2 in points:
+            if (p2 <= p1).all() and (p2 != p1).any():
+                break
+        else:
+            result.append(i)
+    return result
 
 
 class ParetoFilterTests(unittest.TestCase):
@@ -38,6 +53,59 @@ class ParetoFilterTests(unittest.TestCase):
         self.assertEqual(1, pf.pareto_outputs[1, 1])
         self.assertTrue(pf.pareto_outputs.shape == (2, 2))
 
+    def test_incremental(self):
+        pf = ParetoFilter(params=('xin',), responses=('x', 'y'))
+        pf.params.xin = [0, 1, 2]
+        pf.responses.x = [3, 1, 2]
+        pf.responses.y = [1, 3, 2]
+        pf.execute()
+        self.assertEqual(pf.pareto_outputs.shape, (3, 2))
+
+        pf.params.xin = [0, 1, 2, 3, 4]
+        pf.responses.x = [3, 1, 2, 1, 5]
+        pf.responses.y = [1, 3, 2, 2, 5]
+        pf.execute()
+        self.assertEqual(pf.pareto_outputs.tolist(), [[3, 1], [1, 2]])
+        self.assertEqual(pf.pareto_inputs.tolist(), [[0], [3]])
+
+        # Changed history, so start over.
+        pf.params.xin = [0, 1]
+        pf.responses.x = [3, 4]
+        pf.responses.y = [1, 0]
+        pf.execute()
+        self.assertEqual(pf.pareto_outputs.tolist(), [[3, 1], [4, 0]])
+
+
+class NondominatedTests(unittest.TestCase):
+
+    def test_random(self):
+        random.seed(1)
+        for nobj in range(1, 6):
+            for trial in range(5):
+                # Small integer values give lots of ties and duplicates.
+                points = random.randint(0, 6, (300, nobj))
+                expected = brute_force(points)
+                self.assertEqual(list(nondominated_indices(points)), expected)
+
+                front = ParetoFront(points[:100])
+                for start in range(100, 300, 37):
+                    front.insert(points[start:start+37])
+                self.assertEqual(list(sorted(front.indices)), expected)
+                self.assertTrue((front.points ==
+                                 points[front.indices]).all())
+
+    def test_continuous(self):
+        random.seed(2)
+        for nobj in range(2, 6):
+            points = random.uniform(size=(500, nobj))
+            self.assertEqual(list(nondominated_indices(points)),
+                             brute_force(points))
+
+    def test_empty(self):
+        self.assertEqual(len(nondominated_indices(array([]))), 0)
+        front = ParetoFront(random.uniform(size=(10, 2)))
+        self.assertEqual(len(front.insert(array([]).reshape((0, 2)))), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,14 +1,62 @@
+import collections
 import copy
+from itertools import izip
+from multiprocessing.pool import ThreadPool
 
 from openmdao.util.log import NullLogger
 
 
+def map_zones(func, items, max_threads=1):
+    """
+    Generates ``func(item)`` for each of `items`, in order. If `max_threads`
+    is greater than one, then up to that many items are processed
+    concurrently by a pool of threads, with results computed at most
+    `max_threads` items ahead of the consumer. Since :mod:`numpy` releases
+    the GIL during array operations, this is effective for per-zone work on
+    large arrays.
+
+    func: callable
+        Called with each item.
+
+    items: sequence
+        Typically zones, or argument tuples referring to zones.
+
+    max_threads: int
+        Maximum number of items processed concurrently.
+    """
+    items = list(items)
+    if max_threads <= 1 or len(items) < 2:
+        for item in items:
+            yield func(item)
+        return
+
+    pool = ThreadPool(min(max_threads, len(items)))
+    try:
+        pending = collections.deque()
+        for item in items:
+            pending.append(pool.apply_async(func, (item,)))
+            if len(pending) > max_threads:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.close()
+        pool.join()
+
+
 class DomainObj(object):
     """
     A :class:`DomainObj` represents a (possibly multi-zoned) mesh and
     data related to that mesh.
+
+    Setting :attr:`max_threads` greater than one causes operations which
+    apply to each zone independently (coordinate transformations,
+    :meth:`extract`, :meth:`extend`, and :meth:`is_equivalent`) to process
+    up to that many zones concurrently.
     """
 
+    max_threads = 1
+
     def __init__(self):
         self.reference_state = None
         # Zones are kept in an explicit list to retain the order
@@ -151,6 +199,7 @@ class DomainObj(object):
             logger.debug('zone count mismatch.')
             return False
 
+        pairs = []
         for zone in self.zones:
             name = self.zone_name(zone)
             try:
@@ -158,7 +207,12 @@ class DomainObj(object):
             except AttributeError:
                 logger.debug('other is missing zone %r.', name)
                 return False
-            if not zone.is_equivalent(other_zone, logger, tolerance):
+            pairs.append((name, zone, other_zone))
+
+        compare = lambda pair: pair[1].is_equivalent(pair[2], logger, tolerance)
+        results = map_zones(compare, pairs, self.max_threads)
+        for (name, zone, other_zone), equivalent in izip(pairs, results):
+            if not equivalent:
                 logger.debug('zone %r equivalence failed.', name)
                 return False
         return True
@@ -175,11 +229,13 @@ class DomainObj(object):
             is skipped.
         """
         domain = DomainObj()
-        for i, args in enumerate(zone_args):
-            if args:
-                zone = self.zones[i]
-                name = self.zone_name(zone)
-                domain.add_zone(name, zone.extract(*args))
+        domain.max_threads = self.max_threads
+        selected = [(self.zones[i], args)
+                    for i, args in enumerate(zone_args) if args]
+        extract = lambda item: item[0].extract(*item[1])
+        results = map_zones(extract, selected, self.max_threads)
+        for (zone, args), new_zone in izip(selected, results):
+            domain.add_zone(self.zone_name(zone), new_zone)
         if self.reference_state is not None:
             domain.reference_state = self.reference_state.copy()
         return domain
@@ -195,13 +251,20 @@ class DomainObj(object):
             is skipped.
         """
         domain = DomainObj()
-        for i, args in enumerate(zone_args):
-            if args:
-                zone = self.zones[i]
-                name = self.zone_name(zone)
-                domain.add_zone(name, zone.extend(*args))
+        domain.max_threads = self.max_threads
+        selected = [(self.zones[i], args)
+                    for i, args in enumerate(zone_args) if args]
+        extend = lambda item: item[0].extend(*item[1])
+        results = map_zones(extend, selected, self.max_threads)
+        for (zone, args), new_zone in izip(selected, results):
+            domain.add_zone(self.zone_name(zone), new_zone)
         return domain
 
+    def _apply(self, func):
+        """ Apply `func` to each zone, possibly concurrently. """
+        for zone in map_zones(func, self.zones, self.max_threads):
+            pass
+
     def make_cartesian(self, axis='z'):
         """
         Convert to Cartesian coordinate system.
@@ -209,8 +272,7 @@ class DomainObj(object):
         axis: string
             Specifies which is the cylinder axis ('z' or 'x').
         """
-        for zone in self.zones:
-            zone.make_cartesian(axis)
+        self._apply(lambda zone: zone.make_cartesian(axis))
 
     def make_cylindrical(self, axis='z'):
         """
@@ -219,18 +281,15 @@ class DomainObj(object):
         axis: string
             Specifies which is the cylinder axis ('z' or 'x').
         """
-        for zone in self.zones:
-            zone.make_cylindrical(axis)
+        self._apply(lambda zone: zone.make_cylindrical(axis))
 
     def make_left_handed(self):
         """ Convert to left-handed coordinate system. """
-        for zone in self.zones:
-            zone.make_left_handed()
+        self._apply(lambda zone: zone.make_left_handed())
 
     def make_right_handed(self):
         """ Convert to right-handed coordinate system. """
-        for zone in self.zones:
-            zone.make_right_handed()
+        self._apply(lambda zone: zone.make_right_handed())
 
     def translate(self, delta_x, delta_y, delta_z):
         """
@@ -239,8 +298,7 @@ class DomainObj(object):
         delta_x, delta_y, delta_z: float
             Amount of translation along the corresponding axis.
         """
-        for zone in self.zones:
-            zone.translate(delta_x, delta_y, delta_z)
+        self._apply(lambda zone: zone.translate(delta_x, delta_y, delta_z))
 
     def rotate_about_x(self, deg):
         """
@@ -249,8 +307,7 @@ class DomainObj(object):
         deg: float (degrees)
             Amount of rotation.
         """
-        for zone in self.zones:
-            zone.rotate_about_x(deg)
+        self._apply(lambda zone: zone.rotate_about_x(deg))
 
     def rotate_about_y(self, deg):
         """
@@ -259,8 +316,7 @@ class DomainObj(object):
         deg: float (degrees)
             Amount of rotation.
         """
-        for zone in self.zones:
-            zone.rotate_about_y(deg)
+        self._apply(lambda zone: zone.rotate_about_y(deg))
 
     def rotate_about_z(self, deg):
         """
@@ -269,16 +325,13 @@ class DomainObj(object):
         deg: float (degrees)
             Amount of rotation.
         """
-        for zone in self.zones:
-            zone.rotate_about_z(deg)
+        self._apply(lambda zone: zone.rotate_about_z(deg))
 
     def promote(self):
         """ Promote from N-dimensional to N+1 dimensional index space. """
-        for zone in self.zones:
-            zone.promote()
+        self._apply(lambda zone: zone.promote())
 
     def demote(self):
         """ Demote from N-dimensional to N-1 dimensional index space. """
-        for zone in self.zones:
-            zone.demote()
+        self._apply(lambda zone: zone.demote())
 
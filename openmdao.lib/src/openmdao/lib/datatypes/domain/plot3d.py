@@ -32,24 +32,43 @@ unformatted: bool
 logger: Logger or None
     Used to record progress.
 
+memory_map: bool
+    If True, coordinate and variable arrays are returned as copy-on-write
+    :class:`numpy.memmap` views of the file rather than being read into
+    memory.  Only the parts of the file actually referenced are paged in,
+    and modifications are never written back to the file.
+    Only meaningful if `binary`.
+
+max_threads: int
+    Maximum number of zones processed concurrently.  When reading binary
+    data, each zone is read through its own file handle at an offset
+    computed from the zone dimensions.  When writing, zone records are
+    formatted concurrently and written in order.  The domain returned by a
+    reader has its :attr:`max_threads` set to this value, and writers use
+    the :attr:`max_threads` of the domain being written.
+
 Default argument values are set for a typical 3D multiblock single-precision
 Fortran unformatted file.  When writing, zones are assumed in Cartesian
 coordinates with data located at the vertices.
 """
 
+import cStringIO
+import os.path
+
 import numpy
 
 from openmdao.util.log import NullLogger
 from openmdao.util.stream import Stream
 
-from openmdao.lib.datatypes.domain.domain import DomainObj
+from openmdao.lib.datatypes.domain.domain import DomainObj, map_zones
 from openmdao.lib.datatypes.domain.zone import Zone
 from openmdao.lib.datatypes.domain.vector import Vector
 
 
 def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
                   planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  memory_map=False, max_threads=1):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `q_file`.  Q variables are assigned to 'density', 'momentum', and
@@ -66,7 +85,7 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
 
     domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
                               binary, big_endian, single_precision,
-                              unformatted, logger)
+                              unformatted, logger, memory_map, max_threads)
 
     mode = 'rb' if binary else 'r'
     with open(q_file, mode) as inp:
@@ -89,9 +108,13 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
             if reclen != expected:
                 logger.warning('unexpected dimensions recordlength'
                                ' %d vs. %d', reclen, expected)
+        sizes = []
         for zone in domain.zones:
             name = domain.zone_name(zone)
             imax, jmax, kmax = _read_plot3d_dims(stream, dim)
+            npoints = imax * jmax * max(kmax, 1)
+            sizes.append(_record_size(stream, 4) +
+                         _record_size(stream, (dim+2) * npoints))
             if dim > 2:
                 logger.debug('    %s: %dx%dx%d', name, imax, jmax, kmax)
                 zone_i, zone_j, zone_k = zone.shape
@@ -112,18 +135,21 @@ def read_plot3d_q(grid_file, q_file, multiblock=True, dim=3, blanking=False,
                                ' %d vs. %d', reclen2, reclen)
 
         # Read zone scalars and variables.
-        for zone in domain.zones:
-            name = domain.zone_name(zone)
-            logger.debug('reading data for %s', name)
+        def read_zone(i, stream):
+            zone = domain.zones[i]
+            logger.debug('reading data for %s', domain.zone_name(zone))
             _read_plot3d_qscalars(zone, stream, logger)
-            _read_plot3d_qvars(zone, stream, planes, logger)
+            _read_plot3d_qvars(zone, stream, planes, logger, memory_map)
+
+        _read_zones(stream, q_file, sizes, read_zone, max_threads)
 
     return domain
 
 
 def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
                   blanking=False, planes=False, binary=True, big_endian=False,
-                  single_precision=True, unformatted=True, logger=None):
+                  single_precision=True, unformatted=True, logger=None,
+                  memory_map=False, max_threads=1):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file` and
     `f_file`.  Variables are assigned to names of the form `f_N`.
@@ -138,7 +164,7 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
 
     domain = read_plot3d_grid(grid_file, multiblock, dim, blanking, planes,
                               binary, big_endian, single_precision,
-                              unformatted, logger)
+                              unformatted, logger, memory_map, max_threads)
 
     mode = 'rb' if binary else 'r'
     with open(f_file, mode) as inp:
@@ -161,9 +187,14 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
             if reclen != expected:
                 logger.warning('unexpected dimensions recordlength'
                                ' %d vs. %d', reclen, expected)
+        sizes = []
+        zone_nvars = []
         for zone in domain.zones:
             name = domain.zone_name(zone)
             imax, jmax, kmax, nvars = _read_plot3d_dims(stream, dim, True)
+            npoints = imax * jmax * max(kmax, 1)
+            sizes.append(_record_size(stream, nvars * npoints))
+            zone_nvars.append(nvars)
             if dim > 2:
                 logger.debug('    %s: %dx%dx%d %d',
                              name, imax, jmax, kmax, nvars)
@@ -185,17 +216,20 @@ def read_plot3d_f(grid_file, f_file, varnames=None, multiblock=True, dim=3,
                                ' %d vs. %d', reclen2, reclen)
 
         # Read zone variables.
-        for zone in domain.zones:
-            name = domain.zone_name(zone)
-            logger.debug('reading data for %s', name)
-            _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes,
-                               logger)
+        def read_zone(i, stream):
+            zone = domain.zones[i]
+            logger.debug('reading data for %s', domain.zone_name(zone))
+            _read_plot3d_fvars(zone, stream, dim, zone_nvars[i], varnames,
+                               planes, logger, memory_map)
+
+        _read_zones(stream, f_file, sizes, read_zone, max_threads)
     return domain
 
 
 def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
                      planes=False, binary=True, big_endian=False,
-                     single_precision=True, unformatted=True, logger=None):
+                     single_precision=True, unformatted=True, logger=None,
+                     memory_map=False, max_threads=1):
     """
     Returns a :class:`DomainObj` initialized from Plot3D `grid_file`.
 
@@ -203,7 +237,10 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
         Grid filename.
     """
     logger = logger or NullLogger()
+    if memory_map and not binary:
+        raise ValueError('memory_map requires binary data')
     domain = DomainObj()
+    domain.max_threads = max_threads
 
     mode = 'rb' if binary else 'r'
     with open(grid_file, mode) as inp:
@@ -215,12 +252,19 @@ def read_plot3d_grid(grid_file, multiblock=True, dim=3, blanking=False,
         shape = _read_plot3d_shape(stream, multiblock, dim, logger)
 
         # Read zone coordinates.
-        for i in range(len(shape)):
-            zone = domain.add_zone('', Zone())
-            name = domain.zone_name(zone)
-            logger.debug('reading coordinates for %s', name)
+        sizes = []
+        for zone_shape in shape:
+            domain.add_zone('', Zone())
+            npoints = int(numpy.prod(zone_shape))
+            sizes.append(_record_size(stream, len(zone_shape) * npoints))
+
+        def read_zone(i, stream):
+            zone = domain.zones[i]
+            logger.debug('reading coordinates for %s', domain.zone_name(zone))
             _read_plot3d_coords(zone, stream, shape[i], blanking, planes,
-                                logger)
+                                logger, memory_map)
+
+        _read_zones(stream, grid_file, sizes, read_zone, max_threads)
     return domain
 
 
@@ -311,7 +355,8 @@ def _read_plot3d_dims(stream, dim, f_file=False):
         return (imax, jmax, kmax)
 
 
-def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
+def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger,
+                        memory_map=False):
     """ Reads coordinates (& blanking) from given Plot3D stream. """
     if blanking:
         raise NotImplementedError('blanking not supported yet')
@@ -332,18 +377,13 @@ def _read_plot3d_coords(zone, stream, shape, blanking, planes, logger):
             logger.warning('unexpected coords recordlength'
                            ' %d vs. %d', reclen, expected)
 
-    zone.grid_coordinates.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    x min %g, max %g',
-                 zone.grid_coordinates.x.min(), zone.grid_coordinates.x.max())
-
-    zone.grid_coordinates.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    y min %g, max %g',
-                 zone.grid_coordinates.y.min(), zone.grid_coordinates.y.max())
-
+    zone.grid_coordinates.x = _read_array(stream, shape, 'x', memory_map,
+                                          logger)
+    zone.grid_coordinates.y = _read_array(stream, shape, 'y', memory_map,
+                                          logger)
     if dim > 2:
-        zone.grid_coordinates.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    z min %g, max %g',
-                     zone.grid_coordinates.z.min(), zone.grid_coordinates.z.max())
+        zone.grid_coordinates.z = _read_array(stream, shape, 'z', memory_map,
+                                              logger)
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -363,7 +403,7 @@ def _read_plot3d_qscalars(zone, stream, logger):
     zone.flow_solution.time = time
 
 
-def _read_plot3d_qvars(zone, stream, planes, logger):
+def _read_plot3d_qvars(zone, stream, planes, logger, memory_map=False):
     """ Reads 'density', 'momentum' and 'energy_stagnation_density'. """
     if planes:
         raise NotImplementedError('planar format not supported yet')
@@ -384,27 +424,18 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
             logger.warning('unexpected Q variables recordlength'
                            ' %d vs. %d', reclen, expected)
     name = 'density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    arr = _read_array(stream, shape, name, memory_map, logger)
     zone.flow_solution.add_array(name, arr)
 
     vec = Vector()
-
-    vec.x = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.x min %g, max %g', vec.x.min(), vec.x.max())
-
-    vec.y = stream.read_floats(shape, order='Fortran')
-    logger.debug('    momentum.y min %g, max %g', vec.y.min(), vec.y.max())
-
+    vec.x = _read_array(stream, shape, 'momentum.x', memory_map, logger)
+    vec.y = _read_array(stream, shape, 'momentum.y', memory_map, logger)
     if dim > 2:
-        vec.z = stream.read_floats(shape, order='Fortran')
-        logger.debug('    momentum.z min %g, max %g', vec.z.min(), vec.z.max())
-
+        vec.z = _read_array(stream, shape, 'momentum.z', memory_map, logger)
     zone.flow_solution.add_vector('momentum', vec)
 
     name = 'energy_stagnation_density'
-    arr = stream.read_floats(shape, order='Fortran')
-    logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    arr = _read_array(stream, shape, name, memory_map, logger)
     zone.flow_solution.add_array(name, arr)
 
     if stream.unformatted:
@@ -414,7 +445,8 @@ def _read_plot3d_qvars(zone, stream, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
-def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
+def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger,
+                       memory_map=False):
     """ Reads 'function' variables. """
     if planes:
         raise NotImplementedError('planar format not supported yet')
@@ -439,9 +471,8 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
             name = varnames[i]
         else:
             name = 'f_%d' % (i+1)
-        arr = stream.read_floats(shape, order='Fortran')
+        arr = _read_array(stream, shape, name, memory_map, logger)
         zone.flow_solution.add_array(name, arr)
-        logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
 
     if stream.unformatted:
         reclen2 = stream.read_recordmark()
@@ -450,6 +481,84 @@ def _read_plot3d_fvars(zone, stream, dim, nvars, varnames, planes, logger):
                            ' %d vs. %d', reclen2, reclen)
 
 
+def _read_array(stream, shape, name, memory_map, logger):
+    """
+    Returns the next Fortran-order array of `shape` from Plot3D `stream`.
+    If `memory_map`, the array is mapped rather than read, and its range is
+    not logged since that would page in the data.
+    """
+    if memory_map:
+        arr = stream.map_floats(shape, order='Fortran')
+        logger.debug('    %s mapped at offset %d', name, arr.offset)
+    else:
+        arr = stream.read_floats(shape, order='Fortran')
+        logger.debug('    %s min %g, max %g', name, arr.min(), arr.max())
+    return arr
+
+
+def _record_size(stream, count):
+    """
+    Returns number of bytes occupied in binary `stream` by a record of
+    `count` floats.
+    """
+    size = stream.reclen_floats(count)
+    if stream.unformatted:
+        size += 16 if stream.recordmark_8 else 8
+    return size
+
+
+def _copy_stream(stream, file_obj):
+    """ Returns a :class:`Stream` like `stream` but using `file_obj`. """
+    return Stream(file_obj, stream.binary, stream.big_endian,
+                  stream.single_precision, stream.integer_8,
+                  stream.unformatted, stream.recordmark_8)
+
+
+def _read_zones(stream, filename, sizes, func, max_threads):
+    """
+    Calls ``func(i, stream)`` to read each zone's data from Plot3D `stream`.
+    If `max_threads` > 1 and the data is binary, zones are read
+    concurrently through separate handles on `filename`, located using
+    `sizes` (the bytes occupied by each zone's data).
+    """
+    if max_threads <= 1 or not stream.binary or len(sizes) < 2:
+        for i in range(len(sizes)):
+            func(i, stream)
+        return
+
+    offsets = [stream.file.tell()]
+    for size in sizes[:-1]:
+        offsets.append(offsets[-1] + size)
+
+    def read_zone(i):
+        with open(filename, 'rb') as inp:
+            inp.seek(offsets[i])
+            func(i, _copy_stream(stream, inp))
+
+    for i in map_zones(read_zone, range(len(sizes)), max_threads):
+        pass
+
+
+def _write_zones(stream, items, func, max_threads):
+    """
+    Calls ``func(item, stream)`` to write each zone's data to Plot3D
+    `stream`.  If `max_threads` > 1, zone records are formatted
+    concurrently into memory buffers, which are then written in order.
+    """
+    if max_threads <= 1:
+        for item in items:
+            func(item, stream)
+        return
+
+    def format_zone(item):
+        buf = cStringIO.StringIO()
+        func(item, _copy_stream(stream, buf))
+        return buf.getvalue()
+
+    for data in map_zones(format_zone, items, max_threads):
+        stream.file.write(data)
+
+
 def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
                    big_endian=False, single_precision=True, unformatted=True,
                    logger=None):
@@ -473,9 +582,11 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
     if isinstance(domain, DomainObj):
         writing_domain = True
         zones = domain.zones
+        max_threads = domain.max_threads
     elif isinstance(domain, Zone):
         writing_domain = False
         zones = [domain]
+        max_threads = 1
     else:
         raise TypeError("'domain' argument must be a DomainObj or Zone")
 
@@ -494,6 +605,8 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
                 name = ''
             raise AttributeError('zone %s flow_solution is missing %s'
                                  % (name, missing))
+    _check_mapped(zones, q_file)
+
     # Write grid file.
     write_plot3d_grid(domain, grid_file, planes, binary, big_endian,
                       single_precision, unformatted, logger)
@@ -512,7 +625,8 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
 
         # Write zone scalars and variables.
         varnames = ('density', 'momentum', 'energy_stagnation_density')
-        for zone in zones:
+
+        def write_zone(zone, stream):
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
@@ -521,6 +635,8 @@ def write_plot3d_q(domain, grid_file, q_file, planes=False, binary=True,
             _write_plot3d_qscalars(zone, stream, logger)
             _write_plot3d_vars(zone, stream, varnames, planes, logger)
 
+        _write_zones(stream, zones, write_zone, max_threads)
+
 
 def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
                    binary=True, big_endian=False, single_precision=True,
@@ -544,9 +660,11 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
     if isinstance(domain, DomainObj):
         writing_domain = True
         zones = domain.zones
+        max_threads = domain.max_threads
     elif isinstance(domain, Zone):
         writing_domain = False
         zones = [domain]
+        max_threads = 1
     else:
         raise TypeError("'domain' argument must be a DomainObj or Zone")
 
@@ -569,6 +687,8 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
                 name = ''
             raise AttributeError('zone %s flow_solution is missing %s'
                                  % (name, missing))
+    _check_mapped(zones, f_file)
+
     # Write grid file.
     write_plot3d_grid(domain, grid_file, planes, binary, big_endian,
                       single_precision, unformatted, logger)
@@ -586,7 +706,7 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
         _write_plot3d_dims(domain, stream, logger, varnames)
 
         # Write zone variables.
-        for zone in zones:
+        def write_zone(zone, stream):
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
@@ -594,6 +714,8 @@ def write_plot3d_f(domain, grid_file, f_file, varnames=None, planes=False,
             logger.debug('writing data for %s', name)
             _write_plot3d_vars(zone, stream, varnames, planes, logger)
 
+        _write_zones(stream, zones, write_zone, max_threads)
+
 
 def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
                       big_endian=False, single_precision=True,
@@ -613,12 +735,16 @@ def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
     if isinstance(domain, DomainObj):
         writing_domain = True
         zones = domain.zones
+        max_threads = domain.max_threads
     elif isinstance(domain, Zone):
         writing_domain = False
         zones = [domain]
+        max_threads = 1
     else:
         raise TypeError("'domain' argument must be a DomainObj or Zone")
 
+    _check_mapped(zones, grid_file)
+
     mode = 'wb' if binary else 'w'
     with open(grid_file, mode) as out:
         logger.info('writing grid file %r', grid_file)
@@ -632,7 +758,7 @@ def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
         _write_plot3d_dims(domain, stream, logger)
 
         # Write zone coordinates.
-        for zone in zones:
+        def write_zone(zone, stream):
             if writing_domain:
                 name = domain.zone_name(zone)
             else:
@@ -640,6 +766,26 @@ def write_plot3d_grid(domain, grid_file, planes=False, binary=True,
             logger.debug('writing coords for %s', name)
             _write_plot3d_coords(zone, stream, planes, logger)
 
+        _write_zones(stream, zones, write_zone, max_threads)
+
+
+def _check_mapped(zones, filename):
+    """
+    Raises ValueError if any data in `zones` is memory mapped from
+    `filename`, since overwriting the file would invalidate that data.
+    """
+    path = os.path.abspath(filename)
+    for zone in zones:
+        vectors = [zone.grid_coordinates]
+        vectors.extend(zone.flow_solution.vectors)
+        arrays = list(zone.flow_solution.arrays)
+        for vec in vectors:
+            arrays.extend([vec.x, vec.y, vec.z, vec.r, vec.t])
+        for arr in arrays:
+            if getattr(arr, 'filename', None) == path:  # numpy.memmap
+                raise ValueError('%r is memory mapped by the data to be'
+                                 ' written' % filename)
+
 
 def _write_plot3d_dims(domain, stream, logger, varnames=None):
     """ Write dimensions of each zone to Plot3D stream. """
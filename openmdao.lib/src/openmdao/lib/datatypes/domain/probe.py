@@ -3,7 +3,10 @@ Support for calculating one or more scalar averages across one or more
 regions in a domain.
 """
 
-from math import cos, sin, sqrt
+import weakref
+from math import sqrt
+
+import numpy
 
 from openmdao.lib.datatypes.domain.flow import CELL_CENTER
 from openmdao.lib.datatypes.domain.zone import CYLINDRICAL
@@ -11,6 +14,16 @@ from openmdao.lib.datatypes.domain.metrics import get_metric, list_metrics, \
                                                   create_scalar_metric
 _SCHEMES = ('area', 'mass')
 
+# Gauss-Legendre points on [0, 1]. Two points per direction integrate the
+# (at most cubic) volume Jacobian of a trilinear cell exactly.
+_GAUSS_POINTS = (0.5 - 0.5/sqrt(3.), 0.5 + 0.5/sqrt(3.))
+
+# Approximate number of cells processed at a time when computing volumes.
+_VOLUME_CHUNK = 2**16
+
+# Cell volumes by GridCoordinates, with the arrays they were computed from.
+_VOLUME_CACHE = weakref.WeakKeyDictionary()
+
 # TODO: account for ghost cells in index calculations.
 
 
@@ -37,10 +50,19 @@ def mesh_probe(domain, regions, variables, weighting_scheme='area'):
 
     weighting_scheme: string
         Specifies how individual values are weighted. Legal values are
-        'area' for area averaging and 'mass' for mass averaging.
+        'area' for area averaging (volume averaging for volume regions)
+        and 'mass' for mass averaging.
 
     Returns a list of metric values in the order of the `variables` list.
 
+    Metrics which support :meth:`calculate_array` are evaluated on each
+    region as a whole using numpy array operations. Other metrics are
+    evaluated one location at a time via :meth:`calculate`.
+
+    Cell volumes are cached per zone. They are recomputed if the zone's
+    coordinate arrays or coordinate system are replaced, but not if the
+    coordinate arrays are modified in place.
+
     .. note::
 
         The per-item averaging scheme is simplistic. For instance, all four
@@ -226,1005 +248,530 @@ def _get_dimension(region):
     return dim
 
 
-def _calc_weights(scheme, domain, regions):
+def _item_range(region):
     """
-    Calculate averaging weights, updating `weights` and returning total value.
+    Return ``(start, shape)`` of the block of faces, edges, or points
+    in `region`.
     """
-    weights = {}
-    weight_total = 0.
-    for region in regions:
-        dim = _get_dimension(region)
+    limits = region[1:]
+    start = limits[0::2]
+    shape = tuple(max(hi-lo, 1) for lo, hi in zip(limits[0::2], limits[1::2]))
+    return (start, shape)
 
-        if dim == 3:
-            zone_weights = _volume_weights(scheme, domain, region)
-        elif dim == 2:
-            if len(region) == 7:
-                zone_weights = _surface_weights_3d(scheme, domain, region)
-            else:
-                zone_weights = _surface_weights_2d(scheme, domain, region)
-        elif dim == 1:
-            if len(region) == 7:
-                zone_weights = _curve_weights_3d(scheme, domain, region)
-            elif len(region) == 5:
-                zone_weights = _curve_weights_2d(scheme, domain, region)
-            else:
-                zone_weights = _curve_weights_1d(scheme, domain, region)
-        else:
-            zone_weights = [1.]
 
-        zone_name = region[0]
-        zone = getattr(domain, zone_name)
-        zone_weights *= zone.symmetry_instances  # Adjust for symmetry.
-        if zone_name in weights:
-            raise RuntimeError('Zone %r used more than once' % zone_name)
-        else:
-            weights[zone_name] = zone_weights
-        weight_total += sum(zone_weights)
+def _index(start, shape, offset):
+    """
+    Return index selecting the block at `start` + `offset` of size `shape`.
+    """
+    return tuple(slice(lo+delta, lo+delta+size)
+                 for lo, size, delta in zip(start, shape, offset))
 
-    return (weights, weight_total)
 
+def _block(arr, start, shape, offset):
+    """ Return double precision block of `arr` at `start` + `offset`. """
+    return numpy.asarray(arr[_index(start, shape, offset)],
+                         dtype=numpy.float64)
 
-def _volume_weights(scheme, domain, region):
-    """ Returns weights for a mesh volume. """
-    raise NotImplementedError('_volume_weights')
 
+def _unit(ndim, axis):
+    """ Return offset of one along `axis`. """
+    return tuple(1 if n == axis else 0 for n in range(ndim))
 
-def _surface_weights_3d(scheme, domain, region):
-    """ Returns 3D (index space) weights for a mesh surface. """
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical:
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
-    if scheme == 'mass':
-        try:
-            if cylindrical:
-                mom_c1 = flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
-            else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = flow.momentum.z.item
-        except AttributeError:
-            raise AttributeError("For mass averaging zone %s is missing"
-                                 " 'momentum'." % zone_name)
-    if imin == imax:
-        imax += 1
-        face_normal = _iface_normal
-        face_value = _iface_cell_value if cell_center else _iface_node_value
-    elif jmin == jmax:
-        jmax += 1
-        face_normal = _jface_normal
-        face_value = _jface_cell_value if cell_center else _jface_node_value
-    else:
-        kmax += 1
-        face_normal = _kface_normal
-        face_value = _kface_cell_value if cell_center else _kface_node_value
-
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                sc1, sc2, sc3 = face_normal(c1, c2, c3, i, j, k, cylindrical)
-                if scheme == 'mass':
-                    loc = (i, j, k)
-                    rvu = face_value(mom_c1, loc)
-                    rvv = face_value(mom_c2, loc)
-                    rvw = face_value(mom_c3, loc)
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
+def _add(offset1, offset2):
+    """ Return sum of offsets. """
+    return tuple(a+b for a, b in zip(offset1, offset2))
 
 
-def _surface_weights_2d(scheme, domain, region):
-    """ Returns 2D (index space) weights for a mesh surface. """
-    zone_name, imin, imax, jmin, jmax = region
-    zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
+def _sub(offset1, offset2):
+    """ Return difference of offsets. """
+    return tuple(a-b for a, b in zip(offset1, offset2))
 
-    if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
 
-    if scheme == 'mass':
-        try:
-            if cylindrical:
-                mom_c1 = None if flow.momentum.z is None else flow.momentum.z.item
-                mom_c2 = flow.momentum.r.item
-                mom_c3 = flow.momentum.t.item
-            else:
-                mom_c1 = flow.momentum.x.item
-                mom_c2 = flow.momentum.y.item
-                mom_c3 = None if flow.momentum.z is None else flow.momentum.z.item
-        except AttributeError:
-            raise AttributeError("For mass averaging zone %s is missing"
-                                 " 'momentum'." % zone_name)
-
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                sc1, sc2, sc3 = _cell_normal(c1, c2, c3, i, j, cylindrical)
-                if scheme == 'mass':
-                    ip1 = i + 1
-                    jp1 = j + 1
-                    if cell_center:
-                        # Cell value is value.
+def _stencil(region, cell_center):
+    """
+    Return ``(offsets, scale)`` where `offsets` are the locations (relative
+    to an item's first vertex) which are averaged to get the value at the
+    item, and `scale` is the averaging factor.
+    """
 # FIXME: built-in ghosts
-                        rvu = 0. if mom_c1 is None else mom_c1(ip1, jp1)
-                        rvv = mom_c2(ip1, jp1)
-                        rvw = 0. if mom_c1 is None else mom_c3(ip1, jp1)
-                    else:
-                        # Average across vertices.
-                        if mom_c1 is None:
-                            rvu = 0.
-                        else:
-                            rvu = 0.25 * (mom_c1(i, j) + mom_c1(ip1, j) + \
-                                          mom_c1(i, jp1) + mom_c1(ip1, jp1))
-                        rvv = 0.25 * (mom_c2(i, j) + mom_c2(ip1, j) + \
-                                      mom_c2(i, jp1) + mom_c2(ip1, jp1))
-                        if mom_c3 is None:
-                            rvw = 0.
-                        else:
-                            rvw = 0.25 * (mom_c3(i, j) + mom_c3(ip1, j) + \
-                                          mom_c3(i, jp1) + mom_c3(ip1, jp1))
-                    weights.append(rvu*sc1 + rvv*sc2 + rvw*sc3)
-                else:
-                    weights.append(sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3))
-    return weights
-
+    limits = region[1:]
+    ndim = len(limits) // 2
+    along = [axis for axis in range(ndim)
+                  if limits[2*axis] != limits[2*axis+1]]
+    zero = (0,) * ndim
+    ones = (1,) * ndim
+
+    if not along:  # Point.
+        if cell_center:
+            # Average across cells sharing point.
+            offsets = _POINT_CELLS[ndim]
+        else:
+            # Vertex value is value.
+            offsets = (zero,)
 
-def _curve_weights_3d(scheme, domain, region):
-    """ Returns 3D (index space) weights for a mesh curve. """
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
-    cylindrical = zone.coordinate_system == CYLINDRICAL
+    elif len(along) == ndim:  # Cell of volume, 2D surface, or 1D curve.
+        if cell_center:
+            # Cell value is value.
+            offsets = (ones,)
+        elif ndim == 3:
+            # Average across vertices.
+            offsets = ((0, 0, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1),
+                       (1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1))
+        elif ndim == 2:
+            # Average across vertices.
+            offsets = ((0, 0), (0, 1), (1, 1), (1, 0))
+        else:
+            offsets = (zero, ones)
 
-    if cylindrical:
-        raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = grid.y.item
-        z = grid.z.item
+    elif len(along) == 2:  # Face of 3D surface.
+        axis1, axis2 = along
+        unit1, unit2 = _unit(ndim, axis1), _unit(ndim, axis2)
+        if cell_center:
+            # Average across cells sharing surface.
+            normal = [axis for axis in range(ndim) if axis not in along][0]
+            offsets = (ones, _sub(ones, _unit(ndim, normal)))
+        else:
+            # Average across vertices.
+            offsets = (zero, unit1, _add(unit1, unit2), unit2)
 
-    if scheme == 'mass':
-        raise NotImplementedError('curve mass averaging')
+    else:  # Edge of 2D or 3D curve.
+        edge = _unit(ndim, along[0])
+        if cell_center:
+            # Average across cells sharing edge.
+            others = [_unit(ndim, axis) for axis in range(ndim)
+                                        if axis != along[0]]
+            offsets = [ones] + [_sub(ones, other) for other in others]
+            if len(others) > 1:
+                offsets.append(_sub(_sub(ones, others[0]), others[1]))
+        else:
+            # Average across vertices.
+            offsets = (zero, edge)
 
-    along_i, along_j = False, False
-    if imin != imax:
-        along_i = True
-        jmax += 1
-        kmax += 1
-    elif jmin != jmax:
-        along_j = True
-        imax += 1
-        kmax += 1
-    else:
-        imax += 1
-        jmax += 1
-
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-                if along_i:
-                    dx = x(i+1, j, k) - x(i, j, k)
-                    dy = y(i+1, j, k) - y(i, j, k)
-                    dz = z(i+1, j, k) - z(i, j, k)
-                elif along_j:
-                    dx = x(i, j+1, k) - x(i, j, k)
-                    dy = y(i, j+1, k) - y(i, j, k)
-                    dz = z(i, j+1, k) - z(i, j, k)
-                else:
-                    dx = x(i, j, k+1) - x(i, j, k)
-                    dy = y(i, j, k+1) - y(i, j, k)
-                    dz = z(i, j, k+1) - z(i, j, k)
-                weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+    return (tuple(offsets), 1. / len(offsets))
 
 
-def _curve_weights_2d(scheme, domain, region):
-    """ Returns 2D (index space) weights for a mesh curve. """
-    zone_name, imin, imax, jmin, jmax = region
-    zone = getattr(domain, zone_name)
-    grid = zone.grid_coordinates
-    cylindrical = zone.coordinate_system == CYLINDRICAL
+# Cells sharing a point, in 1D, 2D and 3D index space.
+_POINT_CELLS = {
+    1: ((1,), (0,)),
+    2: ((1, 1), (0, 1), (0, 0), (1, 0)),
+    3: ((1, 1, 1), (1, 1, 0), (1, 0, 0), (1, 0, 1),
+        (0, 1, 1), (0, 1, 0), (0, 0, 0), (0, 0, 1)),
+}
 
-    if cylindrical:
-        raise NotImplementedError('curve weights for cylindrical coordinates')
-    else:
-        x = grid.x.item
-        y = grid.y.item
-        z = None if grid.z is None else grid.z.item
+# Face diagonal corners ``(upper-left, lower-right, sign)`` for normals
+# to faces of 3D surfaces (by face direction) and cells of 2D surfaces.
+_FACE_CORNERS = {
+    0: ((0, 1, 0), (0, 0, 1), -0.5),
+    1: ((1, 0, 0), (0, 0, 1),  0.5),
+    2: ((0, 1, 0), (1, 0, 0),  0.5),
+    None: ((0, 1), (1, 0), 0.5),
+}
 
-    if scheme == 'mass':
-        raise NotImplementedError('curve mass averaging')
 
-    if imin != imax:
-        along_i = True
-        jmax += 1
-    else:
-        along_i = False
-        imax += 1
-
-    weights = []
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-                if along_i:
-                    dx = x(i+1, j) - x(i, j)
-                    dy = y(i+1, j) - y(i, j)
-                    dz = 0. if z is None else z(i+1, j) - z(i, j)
-                else:
-                    dx = x(i, j+1) - x(i, j)
-                    dy = y(i, j+1) - y(i, j)
-                    dz = 0. if z is None else z(i, j+1) - z(i, j)
-                weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
-
-
-def _curve_weights_1d(scheme, domain, region):
-    """ Returns 1D (index space) weights for a mesh curve. """
-    zone_name, imin, imax = region
-    zone = getattr(domain, zone_name)
+def _coordinates(zone):
+    """
+    Return ``(c1, c2, c3)`` coordinate arrays for `zone`, missing coordinates
+    are None.
+    """
     grid = zone.grid_coordinates
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-
-    if cylindrical:
-        raise NotImplementedError('curve weights for cylindrical coordinates')
+    if zone.coordinate_system == CYLINDRICAL:
+        return (grid.z, grid.r, grid.t)
     else:
-        x = grid.x.item
-        y = None if grid.y is None else grid.y.item
-        z = None if grid.z is None else grid.z.item
+        return (grid.x, grid.y, grid.z)
 
-    if scheme == 'mass':
-        raise NotImplementedError('curve mass averaging')
 
-    weights = []
-    for i in range(imin, imax):
-        dx = x(i+1) - x(i)
-        dy = 0. if y is None else y(i+1) - y(i)
-        dz = 0. if z is None else z(i+1) - z(i)
-        weights.append(sqrt(dx*dx + dy*dy + dz*dz))
-    return weights
+def _momentum(zone, zone_name):
+    """
+    Return ``(c1, c2, c3)`` momentum arrays for `zone`, missing components
+    are None.
+    """
+    try:
+        momentum = zone.flow_solution.momentum
+    except AttributeError:
+        raise AttributeError("For mass averaging zone %s is missing"
+                             " 'momentum'." % zone_name)
+    if zone.coordinate_system == CYLINDRICAL:
+        return (momentum.z, momentum.r, momentum.t)
+    else:
+        return (momentum.x, momentum.y, momentum.z)
 
 
-def _calc_metric(name, domain, region, weights, reference_state):
+def _geometry(zone, region, start, shape):
     """
-    Calculate metric `name` on `region` using `weights` and `reference_state`.
+    Return geometry values for each item of `region`: an array of cell
+    volumes for volumes, a tuple of face normal arrays for surfaces, an array
+    of edge lengths for curves, or None for points.
     """
-    zone_name = region[0]
-    zone = getattr(domain, zone_name)
-    cls, integrate, geometry = get_metric(name)
-    metric = cls(zone, zone_name, reference_state)
-    weights = weights.get(zone_name)
-
-    # Could be volume, surface, curve, or point.
     dim = _get_dimension(region)
     if dim == 3:
-        if geometry not in ('volume', 'any'):
-            raise RuntimeError('metric %r not applicable to volumes')
-        total = _volume(metric, integrate, zone, region, weights)
+        return _cell_volumes(zone)[_index(start, shape, (0, 0, 0))]
     elif dim == 2:
-        if geometry not in ('surface', 'any'):
-            raise RuntimeError('metric %r not applicable to surfaces')
-        if len(region) == 7:
-            total = _surface_3d(metric, integrate, zone, region, weights)
-        else:
-            total = _surface_2d(metric, integrate, zone, region, weights)
+        return _face_normals(zone, region, start, shape)
     elif dim == 1:
-        if geometry not in ('curve', 'any'):
-            raise RuntimeError('metric %r not applicable to curves')
-        if len(region) == 7:
-            total = _curve_3d(metric, integrate, zone, region, weights)
-        elif len(region) == 5:
-            total = _curve_2d(metric, integrate, zone, region, weights)
-        else:
-            total = _curve_1d(metric, integrate, zone, region, weights)
-    else:
-        if geometry != 'any':
-            raise RuntimeError('metric %r not applicable to points')
-        total = _point(metric, zone, region)
+        return _edge_lengths(zone, region, start, shape)
+    return None
 
-    if reference_state is None:
-        return total
-    else:
-        return metric.dimensionalize(total)
-
-
-def _volume(metric, integrate, zone, region, weights):
-    """ Calculate metric on a volume. """
-    raise NotImplementedError('metric calculation on volume')
-''' Not implemented yet
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
-    vol = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-
-# TODO: calculate volume for integrating.
-
-                if cell_center:
-# FIXME: built-in ghosts
-                    # Cell value is value.
-                    val = metric.calculate((i+1, j+1, k+1), vol)
-                else:
-                    # Average across vertices.
-                    val  = metric.calculate((i, j, k), vol)
-                    val += metric.calculate((i, j+1, k), vol)
-                    val += metric.calculate((i, j+1, k+1), vol)
-                    val += metric.calculate((i, j, k+1), vol)
-                    val += metric.calculate((i+1, j, k), vol)
-                    val += metric.calculate((i+1, j+1, k), vol)
-                    val += metric.calculate((i+1, j+1, k+1), vol)
-                    val += metric.calculate((i+1, j, k+1), vol)
-                    val *= 0.125
-
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
-'''
-
-
-def _surface_3d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 3D (index space) surface. """
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
-
-    if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
-
-    if imin == imax: 
-        face = 'i'
-        imax += 1
-        get_normal = _iface_normal
-    elif jmin == jmax:
-        face = 'j'
-        jmax += 1 
-        get_normal = _jface_normal
-    else:
-        face = 'k'
-        kmax += 1
-        get_normal = _kface_normal
-
-    normal = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-
-                if integrate:
-                    normal = get_normal(c1, c2, c3, i, j, k, cylindrical)
-    
-                if cell_center:
+def _face_normals(zone, region, start, shape):
+    """
+    Return non-dimensional vectors normal to the faces of a 2D or 3D
+    (index space) surface with magnitude equal to area, as a tuple of
+    component arrays. If there is no 'z' coordinate, `c1` will be None in
+    cylindrical coordinates, otherwise `c3` will be None.
+    """
 # FIXME: built-in ghosts
-                    # Average across cells sharing surface.
-                    val = metric.calculate((i+1, j+1, k+1), normal)
-                    if face == 'i':
-                        val += metric.calculate((i, j+1, k+1), normal)
-                    elif face == 'j':
-                        val += metric.calculate((i+1, j, k+1), normal)
-                    else:
-                        val += metric.calculate((i+1, j+1, k), normal)
-                    val *= 0.5
-                else:
-                    # Average across vertices.
-                    val = metric.calculate((i, j, k), normal)
-                    if face == 'i':
-                        val += metric.calculate((i, j+1, k), normal)
-                        val += metric.calculate((i, j+1, k+1), normal)
-                        val += metric.calculate((i, j, k+1), normal)
-                    elif face == 'j':
-                        val += metric.calculate((i+1, j, k), normal)
-                        val += metric.calculate((i+1, j, k+1), normal)
-                        val += metric.calculate((i, j, k+1), normal)
-                    else:
-                        val += metric.calculate((i+1, j, k), normal)
-                        val += metric.calculate((i+1, j+1, k), normal)
-                        val += metric.calculate((i, j+1, k), normal)
-                    val *= 0.25
-
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
-
-
-def _surface_2d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 2D (index space) surface. """
-    zone_name, imin, imax, jmin, jmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
+    c1, c2, c3 = _coordinates(zone)
     cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
 
-    if cylindrical: 
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
+    if len(region) == 7:
+        limits = region[1:]
+        face = [axis for axis in range(3)
+                     if limits[2*axis] == limits[2*axis+1]][0]
+        upper_left, lower_right, sign = _FACE_CORNERS[face]
     else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
+        upper_left, lower_right, sign = _FACE_CORNERS[None]
+    lower_left = (0,) * len(upper_left)
+    upper_right = _add(upper_left, lower_right)
 
-    normal = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
+    def diagonal(arr, head, tail):
+        """ Return difference in `arr` between corners. """
+        if arr is None:
+            return 0.
+        return _block(arr, start, shape, head) - _block(arr, start, shape, tail)
 
-            if integrate:
-                normal = _cell_normal(c1, c2, c3, i, j, cylindrical)
-    
-            if cell_center:
-# FIXME: built-in ghosts
-                # Cell value is value.
-                val = metric.calculate((i+1, j+1), normal)
-            else:
-                # Average across vertices.
-                val  = metric.calculate((i, j), normal)
-                val += metric.calculate((i, j+1), normal)
-                val += metric.calculate((i+1, j+1), normal)
-                val += metric.calculate((i+1, j), normal)
-                val *= 0.25
-
-            if integrate:
-                total += val
-            else:
-                weight = weights[weight_index]
-                weight_index += 1
-                total += val * weight
-    return total
-
-
-def _curve_3d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 3D (index space) curve. """
-    zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
+    # upper-left - lower-right.
+    diag_c11 = diagonal(c1, upper_left, lower_right)
+    diag_c21 = diagonal(c2, upper_left, lower_right)
+    diag_c31 = diagonal(c3, upper_left, lower_right)
 
-    if cylindrical: 
-        c1 = grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = grid.z.item
+    # upper-right - lower-left.
+    diag_c12 = diagonal(c1, upper_right, lower_left)
+    diag_c22 = diagonal(c2, upper_right, lower_left)
+    diag_c32 = diagonal(c3, upper_right, lower_left)
 
-    if imin != imax:
-        edge = 'i'
-        jmax += 1
-        kmax += 1
-        get_length = _iedge_length
-    elif jmin != jmax:
-        edge = 'j'
-        imax += 1
-        kmax += 1
-        get_length = _jedge_length
+    if cylindrical:
+        r1 = (_block(c2, start, shape, lower_right) +
+              _block(c2, start, shape, upper_left)) / 2.
+        r2 = (_block(c2, start, shape, lower_left) +
+              _block(c2, start, shape, upper_right)) / 2.
     else:
-        edge = 'k'
-        imax += 1
-        jmax += 1
-        get_length = _kedge_length
-
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-            for k in range(kmin, kmax):
-
-                if integrate:
-                    length = get_length(c1, c2, c3, (i, j, k), cylindrical)
-
-                if cell_center:
-# FIXME: built-in ghosts
-                    # Average across cells sharing edge.
-                    val = metric.calculate((i+1, j+1, k+1), length)
-                    if edge == 'i':
-                        val += metric.calculate((i+1, j, k+1), length)
-                        val += metric.calculate((i+1, j+1, k), length)
-                        val += metric.calculate((i+1, j, k), length)
-                    elif edge == 'j':
-                        val += metric.calculate((i, j+1, k+1), length)
-                        val += metric.calculate((i+1, j+1, k), length)
-                        val += metric.calculate((i, j+1, k), length)
-                    else:
-                        val += metric.calculate((i, j+1, k+1), length)
-                        val += metric.calculate((i+1, j, k+1), length)
-                        val += metric.calculate((i, j, k+1), length)
-                    val *= 0.25
-                else:
-                    # Average across vertices.
-                    val = metric.calculate((i, j, k), length)
-                    if edge == 'i':
-                        val += metric.calculate((i+1, j, k), length)
-                    elif edge == 'j':
-                         val +=metric.calculate((i, j+1, k), length)
-                    else:
-                         val +=metric.calculate((i, j, k+1), length)
-                    val *= 0.5
-
-                if integrate:
-                    total += val
-                else:
-                    weight = weights[weight_index]
-                    weight_index += 1
-                    total += val * weight
-    return total
+        r1 = 1.
+        r2 = 1.
 
+    sc1 = sign * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
+    sc2 = sign * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
+    sc3 = sign * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
 
-def _curve_2d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 2D (index space) curve. """
-    zone_name, imin, imax, jmin, jmax = region
-    grid = zone.grid_coordinates
-    flow = zone.flow_solution
-    cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
+    return (sc1, sc2, sc3)
 
-    if cylindrical: 
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = grid.y.item
-        c3 = None if grid.z is None else grid.z.item
 
-    if imin != imax:
-        edge = 'i'
-        jmax += 1
-        get_length = _iedge_length
+def _edge_lengths(zone, region, start, shape):
+    """ Return lengths of the edges of a 1D, 2D, or 3D (index space) curve. """
+    c1, c2, c3 = _coordinates(zone)
+    limits = region[1:]
+    ndim = len(limits) // 2
+    axis = [axis for axis in range(ndim)
+                 if limits[2*axis] != limits[2*axis+1]][0]
+    head = _unit(ndim, axis)
+    tail = (0,) * ndim
+
+    def delta(arr):
+        """ Return difference in `arr` along edge. """
+        if arr is None:
+            return 0.
+        return _block(arr, start, shape, head) - _block(arr, start, shape, tail)
+
+    if zone.coordinate_system == CYLINDRICAL:
+        theta = delta(c3)
+        radius = _block(c2, start, shape, head)
+        dx = radius * numpy.cos(theta) - _block(c2, start, shape, tail)
+        dy = radius * numpy.sin(theta)
+        dz = delta(c1)
     else:
-        edge = 'j'
-        imax += 1
-        get_length = _jedge_length
+        dx = delta(c1)
+        dy = delta(c2)
+        dz = delta(c3)
 
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
-        for j in range(jmin, jmax):
-
-            if integrate:
-                length = get_length(c1, c2, c3, (i, j), cylindrical)
+    return numpy.sqrt(dx*dx + dy*dy + dz*dz)
 
-            if cell_center:
-# FIXME: built-in ghosts
-                # Average across cells sharing edge.
-                val = metric.calculate((i+1, j+1), length)
-                if edge == 'i':
-                    val += metric.calculate((i+1, j), length)
-                else:
-                    val += metric.calculate((i, j+1), length)
-                val *= 0.5
-            else:
-                # Average across vertices.
-                val = metric.calculate((i, j), length)
-                if edge == 'i':
-                    val += metric.calculate((i+1, j), length)
-                else:
-                    val += metric.calculate((i, j+1), length)
-                val *= 0.5
 
-            if integrate:
-                total += val
-            else:
-                weight = weights[weight_index]
-                weight_index += 1
-                total += val * weight
-    return total
-
-
-def _curve_1d(metric, integrate, zone, region, weights):
-    """ Calculate metric on a 1D (index space) curve. """
-    zone_name, imin, imax = region
+def _cell_volumes(zone):
+    """
+    Return array of cell volumes for 3D (index space) `zone`. Volumes are
+    cached, and only recomputed if the coordinate system or coordinate
+    arrays have been replaced.
+    """
     grid = zone.grid_coordinates
-    flow = zone.flow_solution
     cylindrical = zone.coordinate_system == CYLINDRICAL
-    cell_center = flow.grid_location == CELL_CENTER
+    coords = _coordinates(zone)
+
+    cached = _VOLUME_CACHE.get(grid)
+    if cached is not None:
+        refs, was_cylindrical, volumes = cached
+        if was_cylindrical == cylindrical and \
+           all(ref() is arr for ref, arr in zip(refs, coords)):
+            return volumes
+
+    if any(arr is None for arr in coords) or len(grid.real_shape) != 3:
+        raise ValueError('Cell volumes require 3D coordinates')
+
+    c1, c2, c3 = coords
+    imax, jmax, kmax = grid.real_shape
+    volumes = numpy.empty((imax-1, jmax-1, kmax-1))
+    step = max(_VOLUME_CHUNK // max((jmax-1) * (kmax-1), 1), 1)
+    for i in range(0, imax-1, step):
+        slab = slice(i, min(i+step, imax-1) + 1)
+        volumes[slab.start:slab.stop-1] = \
+            _hex_volumes([numpy.asarray(arr[slab], dtype=numpy.float64)
+                          for arr in coords], cylindrical)
+
+    _VOLUME_CACHE[grid] = (tuple(weakref.ref(arr) for arr in coords),
+                           cylindrical, volumes)
+    return volumes
+
+
+def _hex_volumes(coords, cylindrical):
+    """
+    Return volumes of the trilinear cells defined by the `coords` arrays.
+    In cylindrical coordinates the cells are trilinear in (z, r, t), and the
+    Jacobian is weighted by r.
+    """
+    imax, jmax, kmax = coords[0].shape
+    size = (imax-1, jmax-1, kmax-1)
+
+    def corner(arr, offset):
+        """ Return `arr` at cell corner `offset`. """
+        return arr[_index((0, 0, 0), size, offset)]
+
+    def lerp(arr0, arr1, frac):
+        """ Return linear interpolation between arrays. """
+        return arr0 + frac * (arr1 - arr0)
+
+    # Jacobian columns at the Gauss points. columns[axis][pos1, pos2] holds
+    # the coordinate derivatives along `axis` at Gauss positions `pos1` and
+    # `pos2` along the other two axes.
+    columns = []
+    for axis in range(3):
+        axis1, axis2 = [other for other in range(3) if other != axis]
+        edges = {}
+        for pos1 in (0, 1):
+            for pos2 in (0, 1):
+                tail = [0, 0, 0]
+                tail[axis1] = pos1
+                tail[axis2] = pos2
+                head = list(tail)
+                head[axis] = 1
+                edges[pos1, pos2] = [corner(arr, head) - corner(arr, tail)
+                                     for arr in coords]
+        column = {}
+        for pos1, frac1 in enumerate(_GAUSS_POINTS):
+            low = [lerp(edge0, edge1, frac1)
+                   for edge0, edge1 in zip(edges[0, 0], edges[1, 0])]
+            high = [lerp(edge0, edge1, frac1)
+                    for edge0, edge1 in zip(edges[0, 1], edges[1, 1])]
+            for pos2, frac2 in enumerate(_GAUSS_POINTS):
+                column[pos1, pos2] = [lerp(val0, val1, frac2)
+                                      for val0, val1 in zip(low, high)]
+        columns.append(column)
 
     if cylindrical:
-        c1 = None if grid.z is None else grid.z.item
-        c2 = grid.r.item
-        c3 = grid.t.item
-    else:
-        c1 = grid.x.item
-        c2 = None if grid.y is None else grid.y.item
-        c3 = None if grid.z is None else grid.z.item
-
-    get_length = _iedge_length
+        # Radius at the Gauss points.
+        c2 = coords[1]
+        radius = {}
+        for pos_i, frac_i in enumerate(_GAUSS_POINTS):
+            along_i = dict(((pos_j, pos_k),
+                            lerp(corner(c2, (0, pos_j, pos_k)),
+                                 corner(c2, (1, pos_j, pos_k)), frac_i))
+                           for pos_j in (0, 1) for pos_k in (0, 1))
+            for pos_j, frac_j in enumerate(_GAUSS_POINTS):
+                low = lerp(along_i[0, 0], along_i[1, 0], frac_j)
+                high = lerp(along_i[0, 1], along_i[1, 1], frac_j)
+                for pos_k, frac_k in enumerate(_GAUSS_POINTS):
+                    radius[pos_i, pos_j, pos_k] = lerp(low, high, frac_k)
+
+    total = numpy.zeros(size)
+    for pos_i in (0, 1):
+        for pos_j in (0, 1):
+            for pos_k in (0, 1):
+                di1, di2, di3 = columns[0][pos_j, pos_k]
+                dj1, dj2, dj3 = columns[1][pos_i, pos_k]
+                dk1, dk2, dk3 = columns[2][pos_i, pos_j]
+                jacobian = di1 * (dj2*dk3 - dj3*dk2)
+                jacobian += di2 * (dj3*dk1 - dj1*dk3)
+                jacobian += di3 * (dj1*dk2 - dj2*dk1)
+                if cylindrical:
+                    jacobian *= radius[pos_i, pos_j, pos_k]
+                total += jacobian
+
+    # Left-handed index ordering yields negative Jacobians.
+    return numpy.abs(total) / 8.
+
+
+def _average(arr, start, shape, offsets, scale):
+    """ Return average of `arr` over `offsets`, 0. if `arr` is None. """
+    if arr is None:
+        return 0.
+    total = _block(arr, start, shape, offsets[0])
+    for offset in offsets[1:]:
+        total = total + _block(arr, start, shape, offset)
+    return total * scale
 
-    length = None
-    weight_index = 0
-    total = 0.
-    for i in range(imin, imax):
 
-        if integrate:
-            length = get_length(c1, c2, c3, (i,), cylindrical)
+def _calc_weights(scheme, domain, regions):
+    """
+    Calculate averaging weights, returning ``(weights, weight_total)``.
+    `weights` is a dictionary of weight arrays (not adjusted for symmetry)
+    indexed by zone name.
+    """
+    weights = {}
+    weight_total = 0.
+    for region in regions:
+        zone_name = region[0]
+        zone = getattr(domain, zone_name)
+        dim = _get_dimension(region)
 
-        if cell_center:
-# FIXME: built-in ghosts
-            # Cell value is value.
-            val = metric.calculate((i+1,), length)
+        if dim == 3:
+            zone_weights = _volume_weights(scheme, zone, region)
+        elif dim == 2:
+            zone_weights = _surface_weights(scheme, zone, region)
+        elif dim == 1:
+            zone_weights = _curve_weights(scheme, zone, region)
         else:
-            # Average across vertices.
-            val  = metric.calculate((i,), length)
-            val += metric.calculate((i+1,), length)
-            val *= 0.5
+            zone_weights = numpy.ones(_item_range(region)[1])
 
-        if integrate:
-            total += val
+        if zone_name in weights:
+            raise RuntimeError('Zone %r used more than once' % zone_name)
         else:
-            weight = weights[weight_index]
-            weight_index += 1
-            total += val * weight
-    return total
+            weights[zone_name] = zone_weights
+        # Adjust for symmetry.
+        weight_total += zone_weights.sum() * zone.symmetry_instances
 
+    return (weights, weight_total)
 
-def _point(metric, zone, region):
-    """ Calculate metric at a point. """
-    zone_name = region[0]
-    flow = zone.flow_solution
-    cell_center = flow.grid_location == CELL_CENTER
 
-    if cell_center:
-        # Average across cells sharing point.
-# FIXME: built-in ghosts
-        if len(region) == 7:
-            zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-            val  = metric.calculate((imin+1, jmin+1, kmin+1), None)
-            val += metric.calculate((imin+1, jmin+1, kmin), None)
-            val += metric.calculate((imin+1, jmin, kmin), None)
-            val += metric.calculate((imin+1, jmin, kmin+1), None)
-            val += metric.calculate((imin, jmin+1, kmin+1), None)
-            val += metric.calculate((imin, jmin+1, kmin), None)
-            val += metric.calculate((imin, jmin, kmin), None)
-            val += metric.calculate((imin, jmin, kmin+1), None)
-            return 0.125 * val
-        elif len(region) == 5:
-            zone_name, imin, imax, jmin, jmax = region
-            val  = metric.calculate((imin+1, jmin+1), None)
-            val += metric.calculate((imin, jmin+1), None)
-            val += metric.calculate((imin, jmin), None)
-            val += metric.calculate((imin+1, jmin), None)
-            return 0.25 * val
-        else:
-            zone_name, imin, imax = region
-            val  = metric.calculate((imin+1,), None)
-            val += metric.calculate((imin,), None)
-            return 0.5 * val
+def _volume_weights(scheme, zone, region):
+    """ Returns weights for a mesh volume. """
+    start, shape = _item_range(region)
+    volumes = _geometry(zone, region, start, shape)
+    if scheme == 'mass':
+        try:
+            density = zone.flow_solution.density
+        except AttributeError:
+            raise AttributeError("For mass averaging zone %s is missing"
+                                 " 'density'." % region[0])
+        cell_center = zone.flow_solution.grid_location == CELL_CENTER
+        offsets, scale = _stencil(region, cell_center)
+        return _average(density, start, shape, offsets, scale) * volumes
     else:
-        # Vertex value is value.
-        if len(region) == 7:
-            zone_name, imin, imax, jmin, jmax, kmin, kmax = region
-            return metric.calculate((imin, jmin, kmin), None)
-        elif len(region) == 5:
-            zone_name, imin, imax, jmin, jmax = region
-            return metric.calculate((imin, jmin), None)
-        else:
-            zone_name, imin, imax = region
-            return metric.calculate((imin,), None)
-
+        return volumes
 
-def _iface_normal(c1, c2, c3, i, j, k, cylindrical):
-    """
-    Return non-dimensional vector normal to I face with magnitude equal to area.
-    """
-# FIXME: built-in ghosts
-    jp1 = j + 1
-    kp1 = k + 1
 
-    # upper-left - lower-right.
-    diag_c11 = c1(i, jp1, k) - c1(i, j, kp1)
-    diag_c21 = c2(i, jp1, k) - c2(i, j, kp1)
-    diag_c31 = c3(i, jp1, k) - c3(i, j, kp1)
-
-    # upper-right - lower-left.
-    diag_c12 = c1(i, jp1, kp1) - c1(i, j, k)
-    diag_c22 = c2(i, jp1, kp1) - c2(i, j, k)
-    diag_c32 = c3(i, jp1, kp1) - c3(i, j, k)
-
-    if cylindrical:
-        r1 = (c2(i, j, kp1) + c2(i, jp1, k  )) / 2.
-        r2 = (c2(i, j, k  ) + c2(i, jp1, kp1)) / 2.
+def _surface_weights(scheme, zone, region):
+    """ Returns weights for a 2D or 3D (index space) mesh surface. """
+    start, shape = _item_range(region)
+    sc1, sc2, sc3 = _face_normals(zone, region, start, shape)
+    if scheme == 'mass':
+        cell_center = zone.flow_solution.grid_location == CELL_CENTER
+        offsets, scale = _stencil(region, cell_center)
+        rvu, rvv, rvw = [_average(arr, start, shape, offsets, scale)
+                         for arr in _momentum(zone, region[0])]
+        return rvu*sc1 + rvv*sc2 + rvw*sc3
     else:
-        r1 = 1.
-        r2 = 1.
+        return numpy.sqrt(sc1*sc1 + sc2*sc2 + sc3*sc3)
 
-    sc1 = -0.5 * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
-    sc2 = -0.5 * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
-    sc3 = -0.5 * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
 
-    return (sc1, sc2, sc3)
+def _curve_weights(scheme, zone, region):
+    """ Returns weights for a 1D, 2D, or 3D (index space) mesh curve. """
+    if scheme == 'mass':
+        raise NotImplementedError('curve mass averaging')
+    start, shape = _item_range(region)
+    return _edge_lengths(zone, region, start, shape)
 
 
-def _jface_normal(c1, c2, c3, i, j, k, cylindrical):
+def _calc_metric(name, domain, region, weights, reference_state):
     """
-    Return non-dimensional vector normal to J face with magnitude equal to area.
+    Calculate metric `name` on `region` using `weights` and `reference_state`.
     """
-# FIXME: built-in ghosts
-    ip1 = i + 1
-    kp1 = k + 1
+    zone_name = region[0]
+    zone = getattr(domain, zone_name)
+    cls, integrate, geometry = get_metric(name)
 
-    # upper-left - lower-right.
-    diag_c11 = c1(ip1, j, k) - c1(i, j, kp1)
-    diag_c21 = c2(ip1, j, k) - c2(i, j, kp1)
-    diag_c31 = c3(ip1, j, k) - c3(i, j, kp1)
+    # Could be volume, surface, curve, or point.
+    dim = _get_dimension(region)
+    if dim == 3:
+        if geometry not in ('volume', 'any'):
+            raise RuntimeError('metric %r not applicable to volumes' % name)
+    elif dim == 2:
+        if geometry not in ('surface', 'any'):
+            raise RuntimeError('metric %r not applicable to surfaces' % name)
+    elif dim == 1:
+        if geometry not in ('curve', 'any'):
+            raise RuntimeError('metric %r not applicable to curves' % name)
+    elif geometry != 'any':
+        raise RuntimeError('metric %r not applicable to points' % name)
 
-    # upper-right - lower-left.
-    diag_c12 = c1(ip1, j, kp1) - c1(i, j, k)
-    diag_c22 = c2(ip1, j, kp1) - c2(i, j, k)
-    diag_c32 = c3(ip1, j, kp1) - c3(i, j, k)
+    metric = cls(zone, zone_name, reference_state)
+    weights = weights.get(zone_name)
 
-    if cylindrical:
-        r1 = (c2(i, j, kp1) + c2(ip1, j, k  )) / 2.
-        r2 = (c2(i, j, k  ) + c2(ip1, j, kp1)) / 2.
+    if hasattr(metric, 'calculate_array'):
+        total = _accumulate_arrays(metric, integrate, zone, region, weights)
     else:
-        r1 = 1.
-        r2 = 1.
+        total = _accumulate_items(metric, integrate, zone, region, weights)
 
-    sc1 = 0.5 * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
-    sc2 = 0.5 * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
-    sc3 = 0.5 * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
-
-    return (sc1, sc2, sc3)
+    if reference_state is None:
+        return total
+    else:
+        return metric.dimensionalize(total)
 
 
-def _kface_normal(c1, c2, c3, i, j, k, cylindrical):
+def _accumulate_arrays(metric, integrate, zone, region, weights):
     """
-    Return non-dimensional vector normal to K face with magnitude equal to area.
+    Calculate metric on a volume, surface, curve, or point using
+    :meth:`calculate_array` on the whole region at once.
     """
-# FIXME: built-in ghosts
-    ip1 = i + 1
-    jp1 = j + 1
-
-    # upper-left - lower-right.
-    diag_c11 = c1(i, jp1, k) - c1(ip1, j, k)
-    diag_c21 = c2(i, jp1, k) - c2(ip1, j, k)
-    diag_c31 = c3(i, jp1, k) - c3(ip1, j, k)
-
-    # upper-right - lower-left.
-    diag_c12 = c1(ip1, jp1, k) - c1(i, j, k)
-    diag_c22 = c2(ip1, jp1, k) - c2(i, j, k)
-    diag_c32 = c3(ip1, jp1, k) - c3(i, j, k)
-
-    if cylindrical:
-        r1 = (c2(i, jp1, k) + c2(ip1, j,   k)) / 2.
-        r2 = (c2(i, j,   k) + c2(ip1, jp1, k)) / 2.
+    start, shape = _item_range(region)
+    cell_center = zone.flow_solution.grid_location == CELL_CENTER
+    offsets, scale = _stencil(region, cell_center)
+    geom = _geometry(zone, region, start, shape) if integrate else None
+
+    val = metric.calculate_array(_index(start, shape, offsets[0]), geom)
+    for offset in offsets[1:]:
+        val = val + metric.calculate_array(_index(start, shape, offset), geom)
+    val = val * scale
+
+    if integrate:
+        return float(numpy.sum(val))
     else:
-        r1 = 1.
-        r2 = 1.
-
-    sc1 = 0.5 * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
-    sc2 = 0.5 * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
-    sc3 = 0.5 * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
-
-    return (sc1, sc2, sc3)
+        return float(numpy.sum(val * weights))
 
 
-def _cell_normal(c1, c2, c3, i, j, cylindrical):
+def _accumulate_items(metric, integrate, zone, region, weights):
     """
-    Return non-dimensional vector normal with magnitude equal to area.
-    If there is no 'z' coordinate, `c1` will be None in cylindrical
-    coordinates, otherwise `c3` will be None.
+    Calculate metric on a volume, surface, curve, or point using
+    :meth:`calculate` on one location at a time.
     """
-# FIXME: built-in ghosts
-    ip1 = i + 1
-    jp1 = j + 1
-
-    # upper-left - lower-right.
-    diag_c11 = 0. if c1 is None else c1(i, jp1) - c1(ip1, j)
-    diag_c21 = c2(i, jp1) - c2(ip1, j)
-    diag_c31 = 0. if c3 is None else c3(i, jp1) - c3(ip1, j)
-
-    # upper-right - lower-left.
-    diag_c12 = 0. if c1 is None else c1(ip1, jp1) - c1(i, j)
-    diag_c22 = c2(ip1, jp1) - c2(i, j)
-    diag_c32 = 0. if c3 is None else c3(ip1, jp1) - c3(i, j)
-
-    if cylindrical:
-        r1 = (c2(i, jp1) + c2(ip1, j)) / 2.
-        r2 = (c2(i, j) + c2(ip1, jp1)) / 2.
-    else:
-        r1 = 1.
-        r2 = 1.
-
-    sc1 = 0.5 * ( r2 * diag_c21 * diag_c32 - r1 * diag_c22 * diag_c31)
-    sc2 = 0.5 * (-r2 * diag_c11 * diag_c32 + r1 * diag_c12 * diag_c31)
-    sc3 = 0.5 * (      diag_c11 * diag_c22 -      diag_c12 * diag_c21)
-
-    return (sc1, sc2, sc3)
-
-
-def _iedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'i'. """
-    if cylindrical:
-        if len(loc) > 2:
-            i, j, k = loc
-            ip1 = i + 1
-            theta = c3(ip1, j, k) - c3(i, j, k)
-            dx = c2(ip1, j, k) * cos(theta) - c2(i, j, k)
-            dy = c2(ip1, j, k) * sin(theta)
-            dz = c1(ip1, j, k) - c1(i, j, k)
-        elif len(loc) > 1:
-            i, j = loc
-            ip1 = i + 1
-            theta = c3(ip1, j) - c3(i, j)
-            dx = c2(ip1, j) * cos(theta) - c2(i, j)
-            dy = c2(ip1, j) * sin(theta)
-            dz = 0. if c1 is None else c1(ip1, j) - c1(i, j)
-        else:
-            i, = loc
-            ip1 = i + 1
-            theta = c3(ip1) - c3(i)
-            dx = c2(ip1) * cos(theta) - c2(i)
-            dy = c2(ip1) * sin(theta)
-            dz = 0. if c1 is None else c1(ip1) - c1(i)
-    else:
-        if len(loc) > 2:
-            i, j, k = loc
-            ip1 = i + 1
-            dx = c1(ip1, j, k) - c1(i, j, k)
-            dy = c2(ip1, j, k) - c2(i, j, k)
-            dz = c3(ip1, j, k) - c3(i, j, k)
-        elif len(loc) > 1:
-            i, j = loc
-            ip1 = i + 1
-            dx = c1(ip1, j) - c1(i, j)
-            dy = c2(ip1, j) - c2(i, j)
-            dz = 0. if c3 is None else c3(ip1, j) - c3(i, j)
-        else:
-            i, = loc
-            ip1 = i + 1
-            dx = c1(ip1) - c1(i)
-            dy = 0. if c2 is None else c2(ip1) - c2(i)
-            dz = 0. if c3 is None else c3(ip1) - c3(i)
-
-    return sqrt(dx*dx + dy*dy + dz*dz)
+    start, shape = _item_range(region)
+    cell_center = zone.flow_solution.grid_location == CELL_CENTER
+    offsets, scale = _stencil(region, cell_center)
+    geom = _geometry(zone, region, start, shape) if integrate else None
 
+    item_geom = None
+    total = 0.
+    for item in numpy.ndindex(*shape):
+        if isinstance(geom, tuple):
+            item_geom = tuple(component[item] for component in geom)
+        elif geom is not None:
+            item_geom = geom[item]
+
+        base = _add(start, item)
+        val = 0.
+        for offset in offsets:
+            val += metric.calculate(_add(base, offset), item_geom)
+        val *= scale
 
-def _jedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'j'. """
-    if cylindrical:
-        if len(loc) > 2:
-            i, j, k = loc
-            jp1 = j + 1
-            theta = c3(i, jp1, k) - c3(i, j, k)
-            dx = c2(i, jp1, k) * cos(theta) - c2(i, j, k)
-            dy = c2(i, jp1, k) * sin(theta)
-            dz = c1(i, jp1, k) - c1(i, j, k)
-        else:
-            i, j = loc
-            jp1 = j + 1
-            theta = c3(i, jp1) - c3(i, j)
-            dx = c2(i, jp1) * cos(theta) - c2(i, j)
-            dy = c2(i, jp1) * sin(theta)
-            dz = 0. if c1 is None else c1(i, jp1) - c1(i, j)
-    else:
-        if len(loc) > 2:
-            i, j, k = loc
-            jp1 = j + 1
-            dx = c1(i, jp1, k) - c1(i, j, k)
-            dy = c2(i, jp1, k) - c2(i, j, k)
-            dz = c3(i, jp1, k) - c3(i, j, k)
+        if integrate:
+            total += val
         else:
-            i, j = loc
-            jp1 = j + 1
-            dx = c1(i, jp1) - c1(i, j)
-            dy = c2(i, jp1) - c2(i, j)
-            dz = 0. if c3 is None else c3(i, jp1) - c3(i, j)
-
-    return sqrt(dx*dx + dy*dy + dz*dz)
-
-
-def _kedge_length(c1, c2, c3, loc, cylindrical):
-    """ Return length of edge along 'k'. """
-    i, j, k = loc
-    kp1 = k + 1
-    if cylindrical:
-        theta = c3(i, j, kp1) - c3(i, j, k)
-        dx = c2(i, j, kp1) * cos(theta) - c2(i, j, k)
-        dy = c2(i, j, kp1) * sin(theta)
-        dz = c1(i, j, kp1) - c1(i, j, k)
-    else:
-        dx = c1(i, j, kp1) - c1(i, j, k)
-        dy = c2(i, j, kp1) - c2(i, j, k)
-        dz = c3(i, j, kp1) - c3(i, j, k)
-
-    return sqrt(dx*dx + dy*dy + dz*dz)
-
-
-def _iface_cell_value(arr, loc):
-    """ Returns I face value for cell-centered data. """
-    i, j, k = loc
-# FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i, j+1, k+1))
-
-def _jface_cell_value(arr, loc):
-    """ Returns J face value for cell-centered data. """
-    i, j, k = loc
-# FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i+1, j, k+1))
-
-def _kface_cell_value(arr, loc):
-    """ Returns K face value for cell-centered data. """
-    i, j, k = loc
-# FIXME: built-in ghosts
-    return 0.5 * (arr(i+1, j+1, k+1) + arr(i+1, j+1, k))
-
-
-def _iface_node_value(arr, loc):
-    """ Returns I face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i, j+1, k+1) + arr(i, j, k+1) +
-                   arr(i, j+1, k) + arr(i, j, k))
-
-def _jface_node_value(arr, loc):
-    """ Returns J face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i+1, j, k+1) + arr(i, j, k+1) +
-                   arr(i+1, j, k) + arr(i, j, k))
-
-def _kface_node_value(arr, loc):
-    """ Returns K face value for vertex data. """
-    i, j, k = loc
-    return 0.25 * (arr(i+1, j+1, k) + arr(i, j+1, k) +
-                   arr(i+1, j, k) + arr(i, j, k))
-
+            total += val * weights[item]
+    return total
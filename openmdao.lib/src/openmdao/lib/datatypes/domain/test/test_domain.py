@@ -95,6 +95,54 @@ class TestCase(unittest.TestCase):
                       globals(), locals(), ValueError,
                       "name 'xyzzy' is already bound")
 
+    def test_threads(self):
+        logging.debug('')
+        logging.debug('test_threads')
+
+        logger = logging.getLogger()
+        serial = DomainObj()
+        for i in range(5):
+            serial.add_domain(create_wedge_3d((30, 20, 10), 5., 0.5+i, 2.+i,
+                                              30.), make_copy=True)
+        threaded = serial.copy()
+        threaded.max_threads = 3
+        self.assertTrue(threaded.is_equivalent(serial, logger))
+
+        for domain in (serial, threaded):
+            domain.translate(0.5, 1., 2.)
+            domain.rotate_about_x(10.)
+            domain.rotate_about_y(20.)
+            domain.rotate_about_z(30.)
+            domain.make_cylindrical()
+        self.assertTrue(threaded.is_equivalent(serial, logger))
+        threaded.zone_4.grid_coordinates.z += 1.
+        self.assertFalse(threaded.is_equivalent(serial, logger))
+        threaded.zone_4.grid_coordinates.z -= 1.
+
+        zone_args = [(0, -1, 2, 5, 0, -1), None, (1, 1, 0, -1, 0, -1),
+                     (), (3, -3, 3, -3, 3, -3)]
+        extracted = threaded.extract(zone_args)
+        self.assertEqual(extracted.max_threads, 3)
+        self.assertEqual([extracted.zone_name(zone)
+                          for zone in extracted.zones],
+                         ['xyzzy', 'zone_3', 'zone_5'])
+        self.assertTrue(extracted.is_equivalent(serial.extract(zone_args),
+                                                logger))
+
+        zone_args = [None, ('i', +1., 2, 1), ('j', -1., 3, 1), None,
+                     ('k', +1., 2, 1)]
+        extended = threaded.extend(zone_args)
+        self.assertEqual(extended.shape,
+                         [(32, 20, 10), (30, 23, 10), (30, 20, 12)])
+        self.assertTrue(extended.is_equivalent(serial.extend(zone_args),
+                                               logger))
+
+        # Errors in worker threads are propagated.
+        zone_args = [None, ('q', +1., 2, 1), None, None, None]
+        assert_raises(self, 'threaded.extend(zone_args)',
+                      globals(), locals(), ValueError,
+                      'axis must be i, j, or k')
+
     def test_coordinate_systems(self):
         logging.debug('')
         logging.debug('test_coordinate_systems')
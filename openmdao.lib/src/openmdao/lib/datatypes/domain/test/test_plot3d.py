@@ -6,6 +6,8 @@ import logging
 import os.path
 import unittest
 
+import numpy
+
 from openmdao.lib.datatypes.domain import read_plot3d_q, write_plot3d_q, \
                                           read_plot3d_f, write_plot3d_f, \
                                           read_plot3d_shape, write_plot3d_grid
@@ -22,7 +24,8 @@ class TestCase(unittest.TestCase):
     def tearDown(self):
         """ Clean up generated files. """
         for path in ('be-binary.xyz', 'be-binary.q', 'be-binary.f',
-                     'unformatted.xyz', 'unformatted.q', 'unformatted.f'):
+                     'unformatted.xyz', 'unformatted.q', 'unformatted.f',
+                     'copy.xyz', 'copy.q'):
             if os.path.exists(path):
                 os.remove(path)
 
@@ -196,6 +199,136 @@ class TestCase(unittest.TestCase):
         self.assertTrue((test_flow.f_3 == wedge_flow.momentum.y).all())
         self.assertTrue((test_flow.f_4 == wedge_flow.energy_stagnation_density).all())
 
+    def test_memory_map(self):
+        logging.debug('')
+        logging.debug('test_memory_map')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        wedge2 = create_wedge_3d((29, 19, 9), 5., 2.5, 4., 30.)
+        wedge.add_domain(wedge2)
+
+        # Big-endian binary.
+        write_plot3d_q(wedge, 'be-binary.xyz', 'be-binary.q', logger=logger,
+                       big_endian=True, unformatted=False)
+        domain = read_plot3d_q('be-binary.xyz', 'be-binary.q', logger=logger,
+                               big_endian=True, unformatted=False,
+                               memory_map=True)
+        x = domain.zone_2.grid_coordinates.x
+        self.assertTrue(isinstance(x, numpy.memmap))
+        self.assertEqual(x.dtype, numpy.dtype('>f4'))
+        self.assertEqual(x.shape, (29, 19, 9))
+        self.assertTrue(x.flags.f_contiguous)
+        domain.rename_zone('xyzzy', domain.zone_1)
+        self.assertTrue(domain.is_equivalent(wedge, logger=logger))
+
+        # Little-endian unformatted, written from mapped data.
+        write_plot3d_q(domain, 'unformatted.xyz', 'unformatted.q',
+                       logger=logger)
+        domain = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                               logger=logger, memory_map=True)
+        density = domain.zone_2.flow_solution.density
+        self.assertTrue(isinstance(density, numpy.memmap))
+        self.assertEqual(density.dtype, numpy.dtype('<f4'))
+        self.assertEqual(domain.zone_2.flow_solution.mach,
+                         wedge.zone_2.flow_solution.mach)
+        domain.rename_zone('xyzzy', domain.zone_1)
+        self.assertTrue(domain.is_equivalent(wedge, logger=logger))
+
+        # Modifications are not written to the file.
+        domain.translate(1., 2., 3.)
+        self.assertFalse(domain.is_equivalent(wedge, logger=logger))
+        write_plot3d_q(domain, 'copy.xyz', 'copy.q', logger=logger)
+        copy = read_plot3d_q('copy.xyz', 'copy.q', logger=logger)
+        copy.rename_zone('xyzzy', copy.zone_1)
+        self.assertTrue(copy.is_equivalent(domain, logger=logger))
+        check = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                              logger=logger, memory_map=True)
+        check.rename_zone('xyzzy', check.zone_1)
+        self.assertTrue(check.is_equivalent(wedge, logger=logger))
+
+        # F file.
+        varnames = ('density', 'momentum', 'energy_stagnation_density')
+        write_plot3d_f(wedge, 'unformatted.xyz', 'unformatted.f', varnames,
+                       logger=logger)
+        domain = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                               logger=logger, memory_map=True)
+        test_flow = domain.zone_2.flow_solution
+        wedge_flow = wedge.zone_2.flow_solution
+        self.assertTrue(isinstance(test_flow.f_1, numpy.memmap))
+        self.assertTrue((test_flow.f_1 == wedge_flow.density).all())
+        self.assertTrue((test_flow.f_4 == wedge_flow.momentum.z).all())
+        self.assertTrue((test_flow.f_5 == wedge_flow.energy_stagnation_density).all())
+
+        # Errors.
+        assert_raises(self, "write_plot3d_f(domain, 'copy.xyz', 'unformatted.f')",
+                      globals(), locals(), ValueError,
+                      "'unformatted.f' is memory mapped by the data to be"
+                      " written")
+
+        assert_raises(self, "write_plot3d_grid(domain, 'unformatted.xyz')",
+                      globals(), locals(), ValueError,
+                      "'unformatted.xyz' is memory mapped by the data to be"
+                      " written")
+
+        assert_raises(self, "read_plot3d_q('be-binary.xyz', 'be-binary.q',"
+                            " binary=False, memory_map=True)",
+                      globals(), locals(), ValueError,
+                      'memory_map requires binary data')
+
+    def test_threads(self):
+        logging.debug('')
+        logging.debug('test_threads')
+
+        logger = logging.getLogger()
+        wedge = create_wedge_3d((30, 20, 10), 5., 0.5, 2., 30.)
+        for i in range(4):
+            wedge.add_domain(create_wedge_3d((29-i, 19, 9+i), 5., 2.5+i,
+                                             4.+i, 30.))
+        wedge.max_threads = 3
+        varnames = ('density', 'momentum', 'energy_stagnation_density')
+
+        # Binary, text, and unformatted.
+        for big_endian, unformatted, binary in ((True, False, True),
+                                                (False, False, False),
+                                                (False, True, True)):
+            write_plot3d_q(wedge, 'unformatted.xyz', 'unformatted.q',
+                           logger=logger, binary=binary,
+                           big_endian=big_endian, unformatted=unformatted)
+            for max_threads in (1, 3):
+                domain = read_plot3d_q('unformatted.xyz', 'unformatted.q',
+                                       logger=logger, binary=binary,
+                                       big_endian=big_endian,
+                                       unformatted=unformatted,
+                                       max_threads=max_threads)
+                self.assertEqual(domain.max_threads, max_threads)
+                domain.rename_zone('xyzzy', domain.zone_1)
+                if binary:
+                    self.assertTrue(domain.is_equivalent(wedge, logger))
+                else:
+                    self.assertTrue(domain.is_equivalent(wedge, logger,
+                                                         tolerance=1e-6))
+
+        write_plot3d_f(wedge, 'unformatted.xyz', 'unformatted.f', varnames,
+                       logger=logger)
+        domain = read_plot3d_f('unformatted.xyz', 'unformatted.f',
+                               logger=logger, max_threads=3, memory_map=True)
+        test_flow = domain.zone_4.flow_solution
+        wedge_flow = wedge.zone_4.flow_solution
+        self.assertTrue((test_flow.f_1 == wedge_flow.density).all())
+        self.assertTrue((test_flow.f_4 == wedge_flow.momentum.z).all())
+        self.assertTrue((test_flow.f_5 == wedge_flow.energy_stagnation_density).all())
+        del domain, test_flow
+
+        # Errors in worker threads are propagated.
+        try:
+            read_plot3d_q('unformatted.xyz', 'unformatted.q', blanking=True,
+                          logger=logger, max_threads=3)
+        except NotImplementedError as exc:
+            self.assertEqual(str(exc), 'blanking not supported yet')
+        else:
+            self.fail('Expected NotImplementedError')
+
 
 if __name__ == '__main__':
     import nose
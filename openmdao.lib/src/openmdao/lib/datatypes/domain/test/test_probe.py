@@ -10,6 +10,8 @@ import unittest
 from math import pi
 
 from openmdao.lib.datatypes.domain import mesh_probe
+from openmdao.lib.datatypes.domain.probe import _cell_volumes
+from openmdao.lib.datatypes.domain.metrics import get_metric, register_metric
 from openmdao.lib.datatypes.domain.test import restart, overflow
 from openmdao.lib.datatypes.domain.test.cube import create_cube
 from openmdao.lib.datatypes.domain.test.wedge import create_wedge_3d
@@ -122,6 +124,59 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, length, 3. * 12., 0.00000001)
         self.assertEqual(density, 0.625)
 
+    def test_volume(self):
+        logging.debug('')
+        logging.debug('test_volume')
+
+        cube = create_cube((41, 17, 9), 5., 4., 3.)
+        regions = (('xyzzy', 0, -1, 0, -1, 0, -1),)
+        variables = (('volume', 'inch**3'), ('density', None))
+        volume, density = mesh_probe(cube, regions, variables)
+        assert_rel_error(self, volume, 5. * 4. * 3. * 1728., 1e-12)
+        assert_rel_error(self, density, 2.5, 1e-12)
+
+        # Mass average of density (x) over cells with midpoint density.
+        density, = mesh_probe(cube, regions, (('density', None),), 'mass')
+        midpoints = [(i+0.5) * 5. / 40. for i in range(40)]
+        expected = sum(m*m for m in midpoints) / sum(midpoints)
+        assert_rel_error(self, density, expected, 1e-6)
+
+        # Sub-volume, with cell-centered data.
+        regions = (('xyzzy', 10, 20, 0, -1, 2, 6),)
+        volume, density = mesh_probe(cube, regions, variables)
+        assert_rel_error(self, volume, (10./40.*5.) * 4. * (4./8.*3.) * 1728.,
+                         1e-12)
+        self.assertAlmostEqual(density, 1.875, 12)
+        cube.xyzzy.flow_solution.grid_location = 'CellCenter'
+        volume, density = mesh_probe(cube, regions, variables)
+        self.assertAlmostEqual(density, 15.5 * 5. / 40., 12)
+        cube.xyzzy.flow_solution.grid_location = 'Vertex'
+
+        # Wedge, in both Cartesian and cylindrical coordinates.
+        wedge = create_wedge_3d((30, 20, 100), 5., 0.5, 2., 30.)
+        regions = (('xyzzy', 0, -1, 0, -1, 0, -1),)
+        variables = (('volume', 'inch**3'),)
+        expected = (pi * (2.**2 - 0.5**2)) * 30./360. * 5. * 1728.
+        volume, = mesh_probe(wedge, regions, variables)
+        assert_rel_error(self, volume, expected, 0.00001)
+        wedge.make_cylindrical()
+        volume, = mesh_probe(wedge, regions, variables)
+        assert_rel_error(self, volume, expected, 0.000001)
+
+        # Volumes are cached until the coordinates are replaced.
+        zone = wedge.xyzzy
+        volumes = _cell_volumes(zone)
+        self.assertTrue(_cell_volumes(zone) is volumes)
+        zone.grid_coordinates.z = zone.grid_coordinates.z * 2.
+        new_volumes = _cell_volumes(zone)
+        self.assertFalse(new_volumes is volumes)
+        assert_rel_error(self, new_volumes.sum(), 2. * volumes.sum(), 1e-6)
+
+        variables = (('mass_flow', 'lbm/s'),)
+        assert_raises(self, 'mesh_probe(wedge, regions, variables)',
+                      globals(), locals(), RuntimeError,
+                      "metric 'mass_flow' not applicable to volumes")
+
     def test_wedge(self):
         logging.debug('')
         logging.debug('test_wedge')
@@ -237,6 +292,47 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, metrics[5], -149.525, 0.00001)
         assert_rel_error(self, metrics[6], -262.976, 0.00001)
 
+    def test_item_metrics(self):
+        # Verify metrics supporting only calculate() get the same values
+        # as those using calculate_array().
+        logging.debug('')
+        logging.debug('test_item_metrics')
+
+        for name in ('mass_flow', 'pressure_stagnation', 'length',
+                     'volume'):
+            cls, integrate, geometry = get_metric(name)
+            register_metric('item_'+name, _item_metric(cls), integrate,
+                            geometry)
+
+        domain = restart.read('lpc-test', logging.getLogger())
+        variables = [('mass_flow', 'lbm/s'),
+                     ('item_mass_flow', 'lbm/s'),
+                     ('pressure_stagnation', 'psi'),
+                     ('item_pressure_stagnation', 'psi')]
+        regions = [('zone_1', 2, 2, 0, -1, 0, -1),
+                   ('zone_2', 2, 2, 0, -1, 0, -1)]
+        metrics = mesh_probe(domain, regions, variables, 'mass')
+        assert_rel_error(self, metrics[1], metrics[0], 1e-12)
+        assert_rel_error(self, metrics[3], metrics[2], 1e-12)
+
+        surface = domain.extract([(0, -1, 0, -1, 2, 2)])
+        surface.demote()
+        regions = [('zone_1', 0, -1, 0, -1)]
+        metrics = mesh_probe(surface, regions, variables, 'area')
+        assert_rel_error(self, metrics[1], metrics[0], 1e-12)
+        assert_rel_error(self, metrics[3], metrics[2], 1e-12)
+
+        cube = create_cube((41, 17, 9), 5., 4., 3.)
+        variables = [('length', 'inch'), ('item_length', 'inch')]
+        regions = [('xyzzy', 5, 5, 0, -1, 5, 5)]
+        metrics = mesh_probe(cube, regions, variables)
+        assert_rel_error(self, metrics[1], metrics[0], 1e-12)
+
+        variables = [('volume', 'inch**3'), ('item_volume', 'inch**3')]
+        regions = [('xyzzy', 0, -1, 2, 5, 0, -1)]
+        metrics = mesh_probe(cube, regions, variables)
+        assert_rel_error(self, metrics[1], metrics[0], 1e-12)
+
     def test_errors(self):
         logging.debug('')
         logging.debug('test_errors')
@@ -426,6 +522,22 @@ class TestCase(unittest.TestCase):
         self.assertEqual(pt_area_1d, pt_area_3d)
 
 
+def _item_metric(cls):
+    """ Return metric class wrapping `cls` which only has calculate(). """
+
+    class ItemMetric(object):
+        def __init__(self, zone, zone_name, reference_state):
+            self._metric = cls(zone, zone_name, reference_state)
+
+        def calculate(self, loc, geom):
+            return self._metric.calculate(loc, geom)
+
+        def dimensionalize(self, value):
+            return self._metric.dimensionalize(value)
+
+    return ItemMetric
+
+
 if __name__ == '__main__':
     import nose
     import sys
@@ -9,3 +9,4 @@ from openmdao.lib.doegenerators.optlh import OptLatinHypercube, LatinHypercube
 from openmdao.lib.doegenerators.uniform import Uniform
 from openmdao.lib.doegenerators.central_composite import CentralComposite
 from openmdao.lib.doegenerators.csvfile import CSVFile
+from openmdao.lib.doegenerators.quasirandom import Sobol, Halton
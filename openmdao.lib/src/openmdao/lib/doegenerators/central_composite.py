@@ -1,20 +1,26 @@
 """ DOEgenerator that performs a central composite Design of Experiments. Plugs
 into the DOEgenerator socket on a DOEdriver."""
 
-from itertools import product, permutations, chain
+from itertools import product, chain
 
 # pylint: disable-msg=E0611,F0401
+from numpy import arange, empty
+
 from openmdao.main.datatypes.api import Int, Float, Enum
 
 from openmdao.main.api import implements, Container
-from openmdao.main.interfaces import IDOEgenerator
+from openmdao.main.interfaces import IChunkedDOEgenerator
+from openmdao.lib.doegenerators.chunked import ChunkedDOEgenerator
+
+
+_NUM_CENTER_POINTS = 1
 
 
-class CentralComposite(Container):
+class CentralComposite(ChunkedDOEgenerator, Container):
     """ DOEgenerator that performs a central composite Design of Experiments. Plugs
     into the DOEgenerator socket on a DOEdriver."""
     
-    implements(IDOEgenerator)
+    implements(IChunkedDOEgenerator)
     
     # pylint: disable-msg=E1101
     num_parameters = Int(0, iotype="in", desc="Number of independent parameters in the DOE.")
@@ -29,25 +35,70 @@ class CentralComposite(Container):
     def __iter__(self):
         """Return an iterator over our sets of input values."""
 
-        # Set the number of center points and the alpha parameter based on the type of central composite design
-        num_center_points = 1
-        if self.type == "Face-Centered":
-            alpha = 1.0
-        if self.type == "Inscribed":
-            alpha = self.num_parameters**0.5  # Based on recommendation from "Response Surface Methodology" by R.H. Myers and D.C. Montgomery
-            
         # Form the iterator for the corner points using a 2 level full factorial
-        low_corner_val = 0.5-0.5/alpha
-        high_corner_val = 0.5+0.5/alpha
+        low_corner_val, high_corner_val = self._corner_values()
         corner_points = product(*[[low_corner_val,high_corner_val] for i in range(self.num_parameters)])
         
         # Form iterators for the face centered points (one for low value faces, one for high value faces)
-        center_list = (self.num_parameters-1)*[0.5]
-        low_face_points = set(permutations([0.0]+center_list))
-        high_face_points = set(permutations([1.0]+center_list))
+        # Each is in sorted order, as from get_points().
+        nparams = self.num_parameters
+        low_face_points = [self._face_point(i, 0.0) for i in range(nparams)]
+        high_face_points = [self._face_point(i, 1.0)
+                            for i in range(nparams-1, -1, -1)]
         
         # Form iterator for center point(s)
-        center_points = num_center_points*[self.num_parameters*[0.5]]
+        center_points = _NUM_CENTER_POINTS*[self.num_parameters*[0.5]]
         
         # Chain case lists together to get complete iterator
-        return chain(corner_points,low_face_points,high_face_points,center_points)
\ No newline at end of file
+        return chain(corner_points,low_face_points,high_face_points,center_points)
+
+    def _face_point(self, i, value):
+        """Return face point with `value` at position `i`."""
+        point = self.num_parameters*[0.5]
+        point[i] = value
+        return tuple(point)
+
+    def _corner_values(self):
+        """Return the low and high values used for the corner points."""
+        # Set the alpha parameter based on the type of central composite design
+        if self.type == "Face-Centered":
+            alpha = 1.0
+        if self.type == "Inscribed":
+            alpha = self.num_parameters**0.5  # Based on recommendation from "Response Surface Methodology" by R.H. Myers and D.C. Montgomery
+        return (0.5-0.5/alpha, 0.5+0.5/alpha)
+
+    def num_points(self):
+        """Return the total number of points in the DOE."""
+        return 2**self.num_parameters + 2*self.num_parameters + \
+               _NUM_CENTER_POINTS
+
+    def get_points(self, start, stop):
+        """Return points `start` through `stop`-1. Points are ordered as
+        corners (in full factorial order), low faces, high faces, then
+        center points, the same order as :meth:`__iter__`. Face points are
+        sorted, so low faces are in increasing and high faces in decreasing
+        order of the position of their off-center value."""
+        nparams = self.num_parameters
+        num_corners = 2**nparams
+        low_corner_val, high_corner_val = self._corner_values()
+
+        index = arange(start, stop)
+        points = empty((len(index), nparams))
+        points.fill(0.5)
+
+        corners = index < num_corners
+        bits = index[corners]
+        for i in range(nparams-1, -1, -1):
+            points[corners, i] = low_corner_val + \
+                                 (high_corner_val-low_corner_val)*(bits & 1)
+            bits = bits >> 1
+
+        face = index - num_corners
+        rows = arange(len(index))
+        low = (face >= 0) & (face < nparams)
+        points[rows[low], face[low]] = 0.0
+        face -= nparams
+        high = (face >= 0) & (face < nparams)
+        points[rows[high], nparams-1-face[high]] = 1.0
+
+        return points
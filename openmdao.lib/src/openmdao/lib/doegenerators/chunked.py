@@ -0,0 +1,69 @@
+"""
+Support for DOEgenerators that generate their points in blocks rather than
+one at a time. Blocks can be requested for any contiguous range of points,
+which allows a DOE to be split into shards for distributed evaluation
+without generating the whole sample set on each node.
+"""
+
+
+class ChunkedDOEgenerator(object):
+    """Mixin for DOEgenerators which implement
+    :class:`IChunkedDOEgenerator`. Subclasses must provide
+    :meth:`num_points` and :meth:`get_points`.
+    """
+
+    default_chunk_size = 4096
+
+    def num_points(self):
+        """Return the total number of points in the DOE."""
+        raise NotImplementedError('num_points')
+
+    def get_points(self, start, stop):
+        """Return a (stop-start, num_parameters) array containing points
+        `start` through `stop`-1."""
+        raise NotImplementedError('get_points')
+
+    def get_point(self, index):
+        """Return point `index` without generating the points before it."""
+        total = self.num_points()
+        if index < 0:
+            index += total
+        if index < 0 or index >= total:
+            raise IndexError('point index %d out of range (0 - %d)'
+                             % (index, total-1))
+        return self.get_points(index, index+1)[0]
+
+    def shard_range(self, shard, num_shards):
+        """Return the (start, stop) range of points belonging to `shard`
+        when the DOE is split into `num_shards` contiguous pieces. Shard
+        sizes differ by at most one point.
+        """
+        if num_shards < 1:
+            raise ValueError('num_shards must be >= 1, got %d' % num_shards)
+        if shard < 0 or shard >= num_shards:
+            raise ValueError('shard must be in the range 0 - %d, got %d'
+                             % (num_shards-1, shard))
+        total = self.num_points()
+        return (total*shard // num_shards, total*(shard+1) // num_shards)
+
+    def iter_chunks(self, chunk_size=None, shard=0, num_shards=1):
+        """Return an iterator over the points of `shard` in blocks of at
+        most `chunk_size` points. Each block is a
+        (block_size, num_parameters) array.
+        """
+        if chunk_size is None:
+            chunk_size = self.default_chunk_size
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be >= 1, got %d' % chunk_size)
+        start, stop = self.shard_range(shard, num_shards)
+        return self._next_chunk(start, stop, chunk_size)
+
+    def _next_chunk(self, start, stop, chunk_size):
+        """Generate blocks of points in [start, stop)."""
+        for i in xrange(start, stop, chunk_size):
+            yield self.get_points(i, min(i+chunk_size, stop))
+
+    def get_all_points(self, shard=0, num_shards=1):
+        """Return all points of `shard` as a single array."""
+        start, stop = self.shard_range(shard, num_shards)
+        return self.get_points(start, stop)
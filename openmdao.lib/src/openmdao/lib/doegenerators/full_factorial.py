@@ -10,17 +10,18 @@ import logging
 from itertools import product
 
 # pylint: disable-msg=E0611,F0401
-from openmdao.main.numpy_fallback import linspace
+from numpy import arange, empty, linspace
 
-from openmdao.main.interfaces import implements, IDOEgenerator
+from openmdao.main.interfaces import implements, IChunkedDOEgenerator
 from openmdao.main.datatypes.api import Int
 from openmdao.main.api import Container
+from openmdao.lib.doegenerators.chunked import ChunkedDOEgenerator
 
-class FullFactorial(Container):
+class FullFactorial(ChunkedDOEgenerator, Container):
     """ DOEgenerator that performs a full-factorial Design of Experiments. Plugs
     into the DOEgenerator socket on a DOEdriver."""
     
-    implements(IDOEgenerator)
+    implements(IChunkedDOEgenerator)
     
     # pylint: disable-msg=E1101
     num_parameters = Int(0, iotype="in", desc="Number of independent "
@@ -38,4 +39,19 @@ class FullFactorial(Container):
         
         return product(*[linspace(0., 1., self.num_levels)
                          for i in range(self.num_parameters)])
-        
+
+    def num_points(self):
+        """Return the total number of points in the DOE."""
+        return self.num_levels**self.num_parameters
+
+    def get_points(self, start, stop):
+        """Return points `start` through `stop`-1, in the same order as
+        :meth:`__iter__`. Each point index is decoded as a mixed-radix
+        number whose last digit is the level of the last parameter."""
+        levels = linspace(0., 1., self.num_levels)
+        index = arange(start, stop)
+        points = empty((len(index), self.num_parameters))
+        for i in range(self.num_parameters-1, -1, -1):
+            index, digit = divmod(index, self.num_levels)
+            points[:, i] = levels[digit]
+        return points
@@ -18,19 +18,27 @@
 # <http://www.gnu.org/licenses/>.
 
 import logging
+from multiprocessing import Pool
 from random import randint, shuffle, seed
 
 # pylint: disable-msg=E0611,F0401
 try:
-    from numpy import array, size, sum, floor, zeros
-    from numpy.linalg import norm
+    from numpy import array, size, sum, floor, zeros, ones, abs, sqrt, \
+                      triu_indices
+    from scipy.spatial.distance import pdist, squareform
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
-from openmdao.main.datatypes.api import Int, Enum
-from openmdao.main.interfaces import implements, IDOEgenerator
+from openmdao.main.datatypes.api import Int, Enum, Bool
+from openmdao.main.interfaces import implements, IChunkedDOEgenerator
 from openmdao.main.api import Container
 from openmdao.util.decorators import stub_if_missing_deps
+from openmdao.lib.doegenerators.chunked import ChunkedDOEgenerator
+
+
+# Best designs found so far, keyed on
+# (num_samples, num_parameters, population, generations, q, p).
+_design_cache = {}
 
 
 @stub_if_missing_deps('numpy')
@@ -76,6 +84,74 @@ def is_latin_hypercube(lh):
     return True
 
 
+def _pairwise_distances(doe, p):
+    """Returns the square matrix of `p`-norm distances between each pair
+    of rows in `doe`."""
+    return squareform(pdist(doe, 'cityblock' if p == 1 else 'euclidean'))
+
+
+def _row_distances(doe, rows, p):
+    """Returns the `p`-norm distances from each of the given rows of `doe`
+    to every row of `doe` as a len(rows) by n array."""
+    diff = abs(doe[rows][:, None, :] - doe[None, :, :])
+    if p == 1:
+        return diff.sum(axis=2)
+    return sqrt((diff*diff).sum(axis=2))
+
+
+def _phi_sum(dist, q):
+    """Returns the sum of d**-q over all distinct pairs in the square
+    distance matrix `dist`."""
+    return sum(dist[triu_indices(dist.shape[0], 1)]**(-q))
+
+
+def _touching_sum(rows_dist, rows, q):
+    """Returns the sum of d**-q over every pair of points that involves at
+    least one of `rows`, given the distances from `rows` to all points."""
+    others = ones(rows_dist.shape[1], dtype=bool)
+    others[rows] = False
+    inner = rows_dist[:, rows]
+    return sum(rows_dist[:, others]**(-q)) + \
+           sum(inner[triu_indices(len(rows), 1)]**(-q))
+
+
+def _swapped_rows(swaps):
+    """Returns the sorted list of rows changed by the given swaps."""
+    rows = set()
+    for col, el1, el2 in swaps:
+        rows.update((el1, el2))
+    return sorted(rows)
+
+
+def _apply_swaps(doe, swaps):
+    """Returns a copy of `doe` with each (col, el1, el2) swap applied in
+    turn."""
+    new_doe = doe.copy()
+    for col, el1, el2 in swaps:
+        new_doe[el1, col], new_doe[el2, col] = new_doe[el2, col], \
+                                               new_doe[el1, col]
+    return new_doe
+
+
+def _swapped_phi_sum(doe, dist, phi_sum, q, p, swaps):
+    """Returns the Morris-Mitchell sum for `doe` after applying `swaps`.
+    Only the distances involving the changed rows are recomputed, so the
+    cost is linear rather than quadratic in the number of points.
+    """
+    new_doe = _apply_swaps(doe, swaps)
+    rows = _swapped_rows(swaps)
+    return phi_sum - _touching_sum(dist[rows], rows, q) \
+                   + _touching_sum(_row_distances(new_doe, rows, p), rows, q)
+
+
+def _offspring_phi_sums(args):
+    """Evaluates a batch of offspring of a single parent. Used as the
+    :class:`multiprocessing.Pool` work function by :func:`_mmlhs`."""
+    doe, dist, phi_sum, q, p, offspring = args
+    return [_swapped_phi_sum(doe, dist, phi_sum, q, p, swaps)
+            for swaps in offspring]
+
+
 @stub_if_missing_deps('numpy')
 class LHC_indivudal(object):
 
@@ -84,44 +160,55 @@ class LHC_indivudal(object):
         self.p = p
         self.doe = doe
         self.phi = None # Morris-Mitchell sampling criterion
+        self._dist = None # pairwise distances between points
+        self._phi_sum = None # sum(d**-q) over all pairs of points
+        self._parent = None # (individual, swaps) this one was derived from
 
     @property
     def shape(self):
         """Size of the LatinHypercube DOE (rows,cols)."""
         return self.doe.shape
 
+    @property
+    def dist(self):
+        """Square matrix of the distances between each pair of points."""
+        if self._dist is None:
+            if self._parent is None:
+                self._dist = _pairwise_distances(self.doe, self.p)
+            else:
+                # Only the rows and columns of swapped points change.
+                parent, swaps = self._parent
+                rows = _swapped_rows(swaps)
+                new_rows = _row_distances(self.doe, rows, self.p)
+                self._dist = parent.dist.copy()
+                self._dist[rows, :] = new_rows
+                self._dist[:, rows] = new_rows.T
+                self._parent = None
+            # Recompute the full sum here so that incremental updates
+            # don't accumulate roundoff from generation to generation.
+            self._phi_sum = _phi_sum(self._dist, self.q)
+            self.phi = self._phi_sum**(1.0/self.q)
+        return self._dist
+
     def mmphi(self):
         """Returns the Morris-Mitchell sampling criterion for this Latin hypercube."""
 
         if self.phi is None:
-            n,m = self.doe.shape
-            distdict = {}
-
-            #calculate the norm between each pair of points in the DOE
-            # TODO: This norm takes up the majority of the computation time. It
-            # should be converted to C or ShedSkin.
-            arr = self.doe
-            for i in range(n):
-                for j in range(i+1, n):
-                    nrm = norm(arr[i]-arr[j], ord=self.p)
-                    distdict[nrm] = distdict.get(nrm, 0) + 1
-
-            distinct_d = array(distdict.keys())
-
-            #mutltiplicity array with a count of how many pairs of points have a given distance
-            J = array(distdict.values())
-
-            self.phi = sum(J*(distinct_d**(-self.q)))**(1.0/self.q)
+            if self._parent is None:
+                self.dist  # computes phi
+            else:
+                parent, swaps = self._parent
+                self._phi_sum = parent.swapped_phi_sum(swaps)
+                self.phi = self._phi_sum**(1.0/self.q)
 
         return self.phi
 
-    def perturb(self, mutation_count):
-        """ Interchanges pairs of randomly chosen elements within randomly chosen
-        columns of a DOE a number of times. The result of this operation will also
-        be a Latin hypercube.
+    def random_swaps(self, mutation_count):
+        """Returns a list of `mutation_count` random (col, el1, el2) element
+        interchanges, suitable for :meth:`swapped` or :meth:`swapped_phi_sum`.
         """
-        new_doe = self.doe.copy()
         n,k = self.doe.shape
+        swaps = []
         for count in range(mutation_count):
             col = randint(0, k-1)
 
@@ -131,10 +218,29 @@ class LHC_indivudal(object):
             while el1==el2:
                 el2 = randint(0, n-1)
 
-            new_doe[el1, col] = self.doe[el2, col]
-            new_doe[el2, col] = self.doe[el1, col]
+            swaps.append((col, el1, el2))
+        return swaps
+
+    def swapped_phi_sum(self, swaps):
+        """Returns the Morris-Mitchell sum, sum(d**-q), of the DOE that
+        results from applying `swaps` to this one, without building it."""
+        self.mmphi()
+        return _swapped_phi_sum(self.doe, self.dist, self._phi_sum,
+                                self.q, self.p, swaps)
 
-        return LHC_indivudal(new_doe, self.q, self.p)
+    def swapped(self, swaps):
+        """Returns a new individual with `swaps` applied to this DOE.
+        Its criterion is evaluated incrementally from this one."""
+        child = LHC_indivudal(_apply_swaps(self.doe, swaps), self.q, self.p)
+        child._parent = (self, swaps)
+        return child
+
+    def perturb(self, mutation_count):
+        """ Interchanges pairs of randomly chosen elements within randomly chosen
+        columns of a DOE a number of times. The result of this operation will also
+        be a Latin hypercube.
+        """
+        return self.swapped(self.random_swaps(mutation_count))
 
     def __iter__(self):
         return self._get_rows()
@@ -156,11 +262,58 @@ class LHC_indivudal(object):
 _norm_map = {"1-norm":1,"2-norm":2}
 
 
+class _WholeDesignMixin(ChunkedDOEgenerator):
+    """Chunked access for Latin hypercube generators. Since a Latin
+    hypercube is only defined as a whole, the design is generated once and
+    then sliced. It is kept for random access only if `seed` is set;
+    otherwise each call to :meth:`iter_chunks` or :meth:`get_points`
+    generates a new design, as does :meth:`__iter__`.
+    """
+
+    _design = None
+    _design_key = None
+
+    def num_points(self):
+        """Return the total number of points in the DOE."""
+        return self.num_samples
+
+    def get_points(self, start, stop):
+        """Return points `start` through `stop`-1 of the design."""
+        return self._get_design()[start:stop]
+
+    def iter_chunks(self, chunk_size=None, shard=0, num_shards=1):
+        """Return an iterator over the points of `shard` in blocks of at
+        most `chunk_size` points, all taken from a single design."""
+        if chunk_size is None:
+            chunk_size = self.default_chunk_size
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be >= 1, got %d' % chunk_size)
+        start, stop = self.shard_range(shard, num_shards)
+        design = self._get_design()
+        return (design[i:min(i+chunk_size, stop)]
+                for i in xrange(start, stop, chunk_size))
+
+    def _get_design(self):
+        """Return the design, regenerating it if necessary."""
+        key = self._get_design_key()
+        if self.seed is None or key != self._design_key:
+            design = array(list(self))
+            if self.seed is None:
+                return design
+            self._design = design
+            self._design_key = key
+        return self._design
+
+    def _get_design_key(self):
+        """Return a tuple of everything the design depends on."""
+        return (self.num_samples, self.num_parameters, self.seed)
+
+
 @stub_if_missing_deps('numpy')
-class LatinHypercube(Container):
+class LatinHypercube(_WholeDesignMixin, Container):
     """IDOEgenerator which provides a Latin hypercube DOE sample set.
     """
-    implements(IDOEgenerator)
+    implements(IChunkedDOEgenerator)
 
     num_samples = Int(20, desc="Number of sample points in the DOE sample set.")
 
@@ -193,12 +346,12 @@ class LatinHypercube(Container):
             yield row
 
 @stub_if_missing_deps('numpy')
-class OptLatinHypercube(Container):
+class OptLatinHypercube(_WholeDesignMixin, Container):
     """IDOEgenerator which provides a Latin hypercube DOE sample set.
     The Morris-Mitchell sampling criterion of the DOE is optimzied
     using an evolutionary algorithm.
     """
-    implements(IDOEgenerator)
+    implements(IChunkedDOEgenerator)
 
     num_samples = Int(20, desc="Number of sample points in the DOE sample set.")
 
@@ -216,6 +369,15 @@ class OptLatinHypercube(Container):
                     "for repeatable results; otherwise leave as None for truly "
                     "random seeding.")
 
+    num_workers = Int(1, low=1,
+        desc="Number of processes used to evaluate the offspring of each "
+             "generation.")
+
+    use_cache = Bool(False,
+        desc="If True, reuse the best design previously found for the same "
+             "number of samples, parameters, population, generations, and "
+             "norm rather than repeating the optimization.")
+
 
     def __init__(self, num_samples=None, population=None,generations=None):
         super(OptLatinHypercube,self).__init__()
@@ -234,24 +396,51 @@ class OptLatinHypercube(Container):
             seed(self.seed)
         return self._get_input_values()
 
+    def _get_design_key(self):
+        """Return a tuple of everything the design depends on."""
+        return (self.num_samples, self.num_parameters, self.seed,
+                self.population, self.generations, self.norm_method,
+                tuple(self.qs))
+
     def _get_input_values(self):
+        p = _norm_map[self.norm_method]
         rand_doe = rand_latin_hypercube(self.num_samples, self.num_parameters)
-        best_lhc = LHC_indivudal(rand_doe, q=1, p=_norm_map[self.norm_method])
-
-        for q in self.qs:
-            lh = LHC_indivudal(rand_doe, q, _norm_map[self.norm_method])
-            lh_opt = _mmlhs(lh, self.population, self.generations)
-            if lh_opt.mmphi() < best_lhc.mmphi():
-                best_lhc = lh_opt
+        best_lhc = LHC_indivudal(rand_doe, q=1, p=p)
+
+        pool = Pool(self.num_workers) if self.num_workers > 1 else None
+        try:
+            for q in self.qs:
+                key = (self.num_samples, self.num_parameters,
+                       self.population, self.generations, q, p)
+                if self.use_cache and key in _design_cache:
+                    lh_opt = LHC_indivudal(_design_cache[key].copy(), q, p)
+                else:
+                    lh = LHC_indivudal(rand_doe, q, p)
+                    lh_opt = _mmlhs(lh, self.population, self.generations,
+                                    pool, self.num_workers)
+                    if self.use_cache:
+                        _design_cache[key] = lh_opt.doe.copy()
+                if lh_opt.mmphi() < best_lhc.mmphi():
+                    best_lhc = lh_opt
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
         for row in best_lhc:
             yield row
 
 
 @stub_if_missing_deps('numpy')
-def _mmlhs(x_start, population, generations):
+def _mmlhs(x_start, population, generations, pool=None, num_workers=1):
     """Evolutionary search for most space filling Latin-Hypercube.
     Returns a new LatinHypercube instance with an optimized set of points.
+
+    If `pool` is given, it should be a :class:`multiprocessing.Pool` of
+    `num_workers` processes which is used to evaluate the offspring of each
+    generation in parallel.
+    The offspring themselves are always generated here, so results for a
+    given random seed don't depend on the number of workers.
     """
     x_best = x_start
     phi_best = x_start.mmphi()
@@ -265,20 +454,33 @@ def _mmlhs(x_start, population, generations):
         else:
             mutations = 1
 
-        x_improved = x_best
+        offspring = [x_best.random_swaps(mutations)
+                     for i in range(population)]
+
+        if pool is None:
+            phi_sums = [x_best.swapped_phi_sum(swaps) for swaps in offspring]
+        else:
+            chunk = -(-population // num_workers)
+            args = [(x_best.doe, x_best.dist, x_best._phi_sum, x_best.q,
+                     x_best.p, offspring[i:i+chunk])
+                    for i in range(0, population, chunk)]
+            phi_sums = []
+            for sums in pool.map(_offspring_phi_sums, args):
+                phi_sums.extend(sums)
+
+        swaps_improved = None
         phi_improved = phi_best
 
-        for offspring in range(population):
-            x_try = x_best.perturb(mutations)
-            phi_try = x_try.mmphi()
+        for swaps, phi_sum in zip(offspring, phi_sums):
+            phi_try = phi_sum**(1.0/x_best.q)
 
             if phi_try < phi_improved:
-                x_improved = x_try
+                swaps_improved = swaps
                 phi_improved = phi_try
 
         if phi_improved < phi_best:
             phi_best = phi_improved
-            x_best = x_improved
+            x_best = x_best.swapped(swaps_improved)
 
     return x_best
 
@@ -0,0 +1,223 @@
+"""
+DOEgenerators that produce low-discrepancy (quasi-random) sequences. These
+fill the unit hypercube more evenly than independent uniform samples, so
+averages over them converge faster. Any point can be computed directly from
+its index, and the `skip` and `leap` settings allow independent workers to
+draw disjoint subsequences. Plugs into the DOEgenerator socket on a
+DOEdriver."""
+
+# pylint: disable-msg=E0611,F0401
+from numpy import arange, array, empty, zeros, int64, uint64, random
+
+from openmdao.main.datatypes.api import Bool, Int
+from openmdao.main.interfaces import implements, IChunkedDOEgenerator
+from openmdao.main.api import Container
+from openmdao.lib.doegenerators.chunked import ChunkedDOEgenerator
+from openmdao.lib.doegenerators.sobol_directions import DIRECTIONS
+
+_SOBOL_BITS = 32
+
+
+class _QuasiRandom(ChunkedDOEgenerator, Container):
+    """Base class for quasi-random DOEgenerators. Point `i` of the DOE is
+    element ``skip + i*leap`` of the underlying sequence."""
+
+    implements(IChunkedDOEgenerator)
+
+    # pylint: disable-msg=E1101
+    num_parameters = Int(0, iotype="in", desc="Number of independent "
+                                              "parameters in the DOE.")
+    num_samples = Int(0, iotype="in", desc="Number of total samples in "
+                                           "the DOE.")
+    skip = Int(0, low=0, iotype="in",
+               desc="Index of the first element of the sequence to use.")
+    leap = Int(1, low=1, iotype="in",
+               desc="Stride between successive elements of the sequence "
+                    "to use.")
+    scramble = Bool(False, iotype="in",
+                    desc="If True, randomize the sequence while preserving "
+                         "its low discrepancy.")
+    seed = Int(None, iotype="in",
+               desc="Random seed for scrambling. Set to a specific value "
+                    "for repeatable results; otherwise leave as None for "
+                    "truly random seeding.")
+
+    def __init__(self, num_samples=None, *args, **kwargs):
+        super(_QuasiRandom, self).__init__(*args, **kwargs)
+        self._auto_seed = None
+        if num_samples is not None:
+            self.num_samples = num_samples
+
+    def __iter__(self):
+        """Return an iterator over our sets of input values."""
+        return (row for chunk in self.iter_chunks() for row in chunk)
+
+    def num_points(self):
+        """Return the total number of points in the DOE."""
+        return self.num_samples
+
+    def get_points(self, start, stop):
+        """Return points `start` through `stop`-1."""
+        index = self.skip + arange(start, stop, dtype=int64)*self.leap
+        return self._generate(index)
+
+    def _generate(self, index):
+        """Return the elements of the sequence at the given indices."""
+        raise NotImplementedError('_generate')
+
+    def _random_state(self):
+        """Return a :class:`RandomState` for the scrambling. If no `seed`
+        has been set, one is chosen once so that all points of this DOE
+        are scrambled consistently."""
+        seed = self.seed
+        if seed is None:
+            if self._auto_seed is None:
+                self._auto_seed = random.randint(0, 2**31-1)
+            seed = self._auto_seed
+        return random.RandomState(seed)
+
+
+def _parity(x):
+    """Return the parity of the bits in each 32-bit element of `x`."""
+    x = x ^ (x >> 16)
+    x ^= x >> 8
+    x ^= x >> 4
+    x ^= x >> 2
+    x ^= x >> 1
+    return x & 1
+
+
+def sobol_directions(ndims):
+    """Return a (32, `ndims`) array of Sobol direction integers. Bit 31 of
+    each integer is the first binary digit."""
+    if ndims > len(DIRECTIONS)+1:
+        raise ValueError("Sobol sequences are only available for up to %d "
+                         "dimensions, %d requested"
+                         % (len(DIRECTIONS)+1, ndims))
+    bits = _SOBOL_BITS
+    V = zeros((bits, ndims), dtype=uint64)
+    V[:, 0] = [1 << (bits-1-k) for k in range(bits)]
+    for dim in range(1, ndims):
+        s, a, m = DIRECTIONS[dim-1]
+        col = [0]*bits
+        for k in range(bits):
+            if k < s:
+                col[k] = m[k] << (bits-1-k)
+            else:
+                col[k] = col[k-s] ^ (col[k-s] >> s)
+                for j in range(1, s):
+                    if (a >> (s-1-j)) & 1:
+                        col[k] ^= col[k-j]
+        V[:, dim] = col
+    return V
+
+
+class Sobol(_QuasiRandom):
+    """ DOEgenerator that produces points from a Sobol sequence (in Gray
+    code order). Scrambling applies a random linear matrix scramble and
+    digital shift to each dimension. Plugs into the DOEgenerator socket on
+    a DOEdriver."""
+
+    def _generate(self, index):
+        """Return the elements of the sequence at the given indices."""
+        if len(index) and index.max() >= 2**_SOBOL_BITS:
+            raise ValueError("Sobol sequence index exceeds 2**%d"
+                             % _SOBOL_BITS)
+        V, shift = self._get_directions()
+
+        gray = (index ^ (index >> 1)).astype(uint64)
+        points = empty((len(index), self.num_parameters), dtype=uint64)
+        points[:] = shift
+        for bit in range(_SOBOL_BITS):
+            selected = ((gray >> uint64(bit)) & uint64(1)).astype(bool)
+            points[selected] ^= V[bit]
+        return points / float(2**_SOBOL_BITS)
+
+    def _get_directions(self):
+        """Return (direction integers, digital shift), reusing the last
+        ones computed if nothing they depend on has changed."""
+        key = (self.num_parameters, self.scramble, self.seed,
+               self._auto_seed)
+        if getattr(self, '_directions_key', None) != key:
+            V = sobol_directions(self.num_parameters)
+            shift = zeros(self.num_parameters, dtype=uint64)
+            if self.scramble:
+                V, shift = self._scrambled(V)
+            # Scrambling may have picked the automatic seed.
+            self._directions_key = (self.num_parameters, self.scramble,
+                                    self.seed, self._auto_seed)
+            self._directions = (V, shift)
+        return self._directions
+
+    def _scrambled(self, V):
+        """Return (scrambled directions, digital shift)."""
+        rand = self._random_state()
+        bits, ndims = V.shape
+        # Row k of each random lower triangular matrix, with unit
+        # diagonal, as a mask over the digits of a direction integer.
+        lower = rand.randint(0, 2, (bits, bits, ndims)).astype(uint64)
+        scrambled = zeros(V.shape, dtype=uint64)
+        for k in range(bits):
+            mask = zeros(ndims, dtype=uint64)
+            for l in range(k+1):
+                digit = uint64(1) if l == k else lower[k, l]
+                mask |= digit << uint64(bits-1-l)
+            scrambled |= _parity(V & mask) << uint64(bits-1-k)
+        shift = rand.randint(0, 2**16, (2, ndims)).astype(uint64)
+        return scrambled, (shift[0] << uint64(16)) | shift[1]
+
+
+def first_primes(count):
+    """Return a list of the first `count` prime numbers."""
+    primes = []
+    candidate = 2
+    while len(primes) < count:
+        for prime in primes:
+            if prime*prime > candidate:
+                primes.append(candidate)
+                break
+            if candidate % prime == 0:
+                break
+        else:
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+class Halton(_QuasiRandom):
+    """ DOEgenerator that produces points from a Halton sequence, using the
+    i'th prime as the base for the i'th parameter. Scrambling applies a
+    random permutation (fixing zero) to the digits of each dimension.
+    Plugs into the DOEgenerator socket on a DOEdriver."""
+
+    def _generate(self, index):
+        """Return the elements of the sequence at the given indices."""
+        bases = first_primes(self.num_parameters)
+        if self.scramble:
+            rand = self._random_state()
+            perms = [[0]+list(rand.permutation(arange(1, base)))
+                     for base in bases]
+        else:
+            perms = [None]*len(bases)
+
+        points = empty((len(index), self.num_parameters))
+        for dim, base in enumerate(bases):
+            points[:, dim] = _radical_inverse(index, base, perms[dim])
+        return points
+
+
+def _radical_inverse(index, base, perm=None):
+    """Return the van der Corput radical inverse of each of the integers in
+    `index` in the given base, optionally permuting each digit."""
+    result = zeros(len(index))
+    if perm is not None:
+        perm = array(perm)
+    factor = 1.0/base
+    index = index.copy()
+    while index.any():
+        index, digit = divmod(index, base)
+        if perm is not None:
+            digit = perm[digit]
+        result += digit*factor
+        factor /= base
+    return result
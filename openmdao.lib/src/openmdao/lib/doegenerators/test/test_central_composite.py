@@ -6,6 +6,8 @@ Test CentralComposite.
 
 import unittest
 
+from numpy import vstack
+
 from openmdao.lib.doegenerators.central_composite import CentralComposite
 
 class TestCase(unittest.TestCase):
@@ -35,5 +37,18 @@ class TestCase(unittest.TestCase):
             self.assertAlmostEquals(case[0],expected[0],8)
             self.assertAlmostEquals(case[1],expected[1],8)
 
+    def test_chunks(self):
+        for doe_type in ("Face-Centered", "Inscribed"):
+            ccd = CentralComposite(type=doe_type)
+            ccd.num_parameters = 3
+            expected = sorted(tuple(case) for case in ccd)
+            self.assertEqual(ccd.num_points(), len(expected))
+            points = vstack(list(ccd.iter_chunks(4)))
+            self.assertEqual(sorted(map(tuple, points.tolist())), expected)
+            self.assertEqual(map(list, points.tolist()),
+                             [list(case) for case in ccd])
+            for i in range(len(expected)):
+                self.assertEqual(list(ccd.get_point(i)), list(points[i]))
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,6 +6,8 @@ Test FullFactorial.
 
 import unittest
 
+from numpy import vstack
+
 from openmdao.lib.doegenerators.full_factorial import FullFactorial
 
 class TestCase(unittest.TestCase):
@@ -25,6 +27,26 @@ class TestCase(unittest.TestCase):
         
         self.assertEqual([(0,0),(0,1),(1,0),(1,1)],cases)
 
+    def test_chunks(self):
+        ff = FullFactorial(num_levels=3)
+        ff.num_parameters = 3
+        expected = [list(case) for case in ff]
+        self.assertEqual(ff.num_points(), 27)
+        self.assertEqual(ff.get_points(0, 27).tolist(), expected)
+        self.assertEqual(list(ff.get_point(14)), expected[14])
+        self.assertEqual(list(ff.get_point(-1)), expected[-1])
+
+        chunks = list(ff.iter_chunks(chunk_size=5))
+        self.assertEqual([len(chunk) for chunk in chunks], [5,5,5,5,5,2])
+        self.assertEqual(vstack(chunks).tolist(), expected)
+
+        shards = [ff.get_all_points(shard, 4).tolist() for shard in range(4)]
+        self.assertEqual([len(shard) for shard in shards], [6,7,7,7])
+        self.assertEqual(sum(shards, []), expected)
+
+        self.assertRaises(IndexError, ff.get_point, 27)
+        self.assertRaises(ValueError, ff.shard_range, 4, 4)
+
         
 if __name__ == "__main__":
     unittest.main()
@@ -7,10 +7,12 @@ import unittest
 import random
 
 from numpy import array, zeros
+from numpy.linalg import norm
 
 from openmdao.main.api import Assembly, Component, Case, set_as_top
 from openmdao.lib.doegenerators.optlh import LHC_indivudal, OptLatinHypercube, _mmlhs, \
-                                             rand_latin_hypercube, is_latin_hypercube
+                                             rand_latin_hypercube, is_latin_hypercube, \
+                                             _design_cache
 
 class TestCase(unittest.TestCase):
     def setUp(self):
@@ -32,7 +34,65 @@ class TestCase(unittest.TestCase):
         for i,row in enumerate(olh):
             z[i,:] = row
         self.assertTrue(is_latin_hypercube(z))
-    
+
+    def test_mmphi(self):
+        doe = rand_latin_hypercube(15, 3)
+        for p in (1, 2):
+            for q in (1, 2, 5):
+                total = 0.
+                for i in range(15):
+                    for j in range(i+1, 15):
+                        total += norm(doe[i]-doe[j], ord=p)**(-q)
+                lh = LHC_indivudal(doe, q, p)
+                self.assertAlmostEqual(lh.mmphi(), total**(1.0/q), places=10)
+
+    def test_incremental_mmphi(self):
+        lh = LHC_indivudal(rand_latin_hypercube(20, 4), 5, 2)
+        for i in range(10):
+            child = lh.perturb(3)
+            self.assertTrue(is_latin_hypercube(child.doe))
+            phi = child.mmphi()
+            full = LHC_indivudal(child.doe.copy(), 5, 2)
+            self.assertAlmostEqual(phi/full.mmphi(), 1.0, places=10)
+            self.assertTrue(abs(child.dist-full.dist).max() < 1e-12)
+            lh = child
+
+    def test_parallel(self):
+        olh = OptLatinHypercube(num_samples=12, population=8, generations=4)
+        olh.num_parameters = 3
+        olh.seed = 42
+        serial = array(list(olh))
+        olh.num_workers = 2
+        parallel = array(list(olh))
+        self.assertTrue((serial == parallel).all())
+
+    def test_cache(self):
+        _design_cache.clear()
+        olh = OptLatinHypercube(num_samples=10)
+        olh.seed = 3
+        olh.use_cache = True
+        first = array(list(olh))
+        self.assertEqual(len(_design_cache), len(olh.qs))
+        second = array(list(olh))
+        self.assertTrue((first == second).all())
+
+        # A longer optimization isn't satisfied by the cached designs.
+        olh.generations = 4
+        list(olh)
+        self.assertEqual(len(_design_cache), 2*len(olh.qs))
+        _design_cache.clear()
+
+    def test_chunks(self):
+        olh = OptLatinHypercube(num_samples=10)
+        olh.seed = 5
+        design = olh.get_all_points()
+        self.assertTrue(is_latin_hypercube(design))
+        self.assertTrue((array(list(olh)) == design).all())
+        chunks = list(olh.iter_chunks(3, shard=1, num_shards=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 2])
+        self.assertTrue((chunks[1] == design[8:]).all())
+        self.assertTrue((olh.get_point(7) == design[7]).all())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,86 @@
+"""
+Test Sobol and Halton.
+"""
+
+import unittest
+
+from numpy import array, floor, sort, arange, vstack
+
+from openmdao.lib.doegenerators.quasirandom import Sobol, Halton, \
+                                                   first_primes
+
+
+class TestCase(unittest.TestCase):
+
+    def test_sobol(self):
+        sob = Sobol(8)
+        sob.num_parameters = 3
+        expected = array([[0., 0., 0.],
+                          [.5, .5, .5],
+                          [.75, .25, .25],
+                          [.25, .75, .75],
+                          [.375, .375, .625],
+                          [.875, .875, .125],
+                          [.625, .125, .875],
+                          [.125, .625, .375]])
+        self.assertTrue((sob.get_all_points() == expected).all())
+        self.assertTrue((array(list(sob)) == expected).all())
+
+    def test_halton(self):
+        hal = Halton(4)
+        hal.num_parameters = 2
+        expected = array([[0., 0.],
+                          [.5, 1./3.],
+                          [.25, 2./3.],
+                          [.75, 1./9.]])
+        self.assertTrue(abs(hal.get_all_points() - expected).max() < 1e-15)
+        self.assertEqual(first_primes(6), [2, 3, 5, 7, 11, 13])
+
+    def test_skip_leap(self):
+        for cls in (Sobol, Halton):
+            gen = cls(40)
+            gen.num_parameters = 4
+            full = gen.get_all_points()
+
+            gen.num_samples = 10
+            parts = []
+            for worker in range(4):
+                gen.skip = worker
+                gen.leap = 4
+                parts.append(gen.get_all_points())
+                self.assertTrue((parts[-1] == full[worker::4]).all())
+
+            gen.skip = 30
+            gen.leap = 1
+            self.assertTrue((gen.get_point(5) == full[35]).all())
+
+    def test_scramble(self):
+        for cls in (Sobol, Halton):
+            gen = cls(256)
+            gen.num_parameters = 5
+            gen.scramble = True
+            gen.seed = 7
+            points = gen.get_all_points()
+            self.assertTrue((points >= 0.).all() and (points < 1.).all())
+            self.assertTrue((vstack(list(gen.iter_chunks(100))) == points).all())
+
+            gen.seed = 8
+            self.assertFalse((gen.get_all_points() == points).all())
+
+        # Scrambling preserves the stratification of the Sobol net.
+        sob = Sobol(256)
+        sob.num_parameters = 5
+        sob.scramble = True
+        points = sob.get_all_points()
+        for dim in range(5):
+            cells = sort(floor(points[:, dim]*256))
+            self.assertTrue((cells == arange(256)).all())
+
+    def test_too_many_dimensions(self):
+        sob = Sobol(2)
+        sob.num_parameters = 1001
+        self.assertRaises(ValueError, sob.get_all_points)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ import sys
 import unittest
 import random
 
+from numpy import array, vstack
+
 from openmdao.lib.doegenerators.uniform import Uniform
 
 
@@ -53,5 +55,19 @@ class TestCase(unittest.TestCase):
                              "must have at least 2 samples. "
                              "num_samples is set to less than 2.")
 
+    def test_seeded_chunks(self):
+        uni = Uniform(3000)
+        uni.num_parameters = 2
+        uni.seed = 11
+        points = uni.get_all_points()
+        self.assertEqual(points.shape, (3000, 2))
+        self.assertTrue((vstack(list(uni.iter_chunks(700))) == points).all())
+        self.assertTrue((uni.get_points(1000, 2100) == points[1000:2100]).all())
+        self.assertTrue((uni.get_point(2047) == points[2047]).all())
+        self.assertTrue((array(list(uni)) == points).all())
+
+        shards = [uni.get_all_points(shard, 7) for shard in range(7)]
+        self.assertTrue((vstack(shards) == points).all())
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,24 +2,34 @@
 into the DOEgenerator socket on a DOEdriver."""
 
 # pylint: disable-msg=E0611,F0401
-from numpy import linspace,random
+from numpy import empty,linspace,random,vstack
 from openmdao.main.datatypes.api import Int
 from openmdao.lib.casehandlers.api import ListCaseIterator
-from openmdao.main.interfaces import implements, IDOEgenerator
+from openmdao.main.interfaces import implements, IChunkedDOEgenerator
 from openmdao.main.api import Container
+from openmdao.lib.doegenerators.chunked import ChunkedDOEgenerator
 
-class Uniform(Container):
+# Points are drawn from an independently seeded stream for each block of
+# this many points, so any range can be regenerated without the others.
+_SEED_BLOCK = 1024
+
+class Uniform(ChunkedDOEgenerator, Container):
     """ DOEgenerator that performs a space-filling Design of Experiments with uniform
     distributions on all design variables. Plugs into the DOEgenerator socket on a 
     DOEdriver."""
     
-    implements(IDOEgenerator)
+    implements(IChunkedDOEgenerator)
     
     # pylint: disable-msg=E1101
     num_parameters = Int(0, iotype="in", desc="Number of independent "
                                               "parameters in the DOE.")
     num_samples = Int(0, iotype="in", desc="Number of total samples in "
                                               "the DOE.")
+    seed = Int(None, iotype="in",
+               desc="Random seed. Set to a specific value for repeatable "
+                    "results (required for consistent random access and "
+                    "sharding); otherwise leave as None for truly random "
+                    "seeding.")
     
     def __init__(self, num_samples=None, *args, **kwargs):
     
@@ -31,10 +41,29 @@ class Uniform(Container):
     def __iter__(self):
         """Return an iterator over our sets of input values"""
         
+        return (row for chunk in self.iter_chunks() for row in chunk)
+
+    def num_points(self):
+        """Return the total number of points in the DOE."""
         if self.num_samples < 2: 
             raise ValueError("Uniform distributions must have "
                              "at least 2 samples. num_samples "
                              "is set to less than 2.")
+        return self.num_samples
+
+    def get_points(self, start, stop):
+        """Return points `start` through `stop`-1. If `seed` is None these
+        are simply fresh random values."""
+        if stop <= start:
+            return empty((0, self.num_parameters))
+        if self.seed is None:
+            return random.uniform(0, 1, (stop-start, self.num_parameters))
 
-        return (random.uniform(0,1,self.num_parameters) for i in range(self.num_samples))
+        first = start // _SEED_BLOCK
+        last = (stop-1) // _SEED_BLOCK
+        blocks = [random.RandomState([self.seed, block]).uniform(
+                      0, 1, (_SEED_BLOCK, self.num_parameters))
+                  for block in range(first, last+1)]
+        offset = start - first*_SEED_BLOCK
+        return vstack(blocks)[offset:offset+stop-start]
             
@@ -13,7 +13,7 @@ import threading
 import traceback
 from uuid import uuid1, getnode
 
-from numpy import array
+from numpy import array, ndarray
 
 from openmdao.main.api import Driver
 from openmdao.main.datatypes.api import Bool, Dict, Enum, Int
@@ -22,13 +22,15 @@ from openmdao.main.expreval import ExprEvaluator
 from openmdao.main.hasparameters import HasVarTreeParameters
 from openmdao.main.hasresponses import HasVarTreeResponses
 from openmdao.main.interfaces import IHasParameters, IHasResponses, implements
+from openmdao.main.mp_support import CallBatch
 from openmdao.main.rbac import get_credentials, set_credentials
 from openmdao.main.resource import ResourceAllocationManager as RAM
 from openmdao.main.resource import LocalAllocator
 from openmdao.main.variable import is_legal_name, make_legal_path
 
 from openmdao.util.decorators import add_delegate
-from openmdao.util.filexfer import filexfer
+from openmdao.util.filexfer import filexfer, select_zipfile, \
+                                   zipfile_manifest
 
 
 _EMPTY     = 'empty'
@@ -87,18 +89,19 @@ class _Case(object):
 
     def apply_inputs(self, scope):
         """Take the values of all of the inputs in this case and apply them
-        to the specified scope.
+        to the specified scope. If `scope` is a proxy, the calls are pipelined.
         """
-        if self._exprs:
-            for name, value in self._inputs.items():
-                expr = self._exprs.get(name)
-                if expr:
-                    expr.set(value, scope)
-                else:
-                    scope.set(name, value)
-        else:
-            for name, value in self._inputs.items():
-                scope.set(name, value)
+        with CallBatch() as batch:
+            if self._exprs:
+                for name, value in self._inputs.items():
+                    expr = self._exprs.get(name)
+                    if expr:
+                        expr.set(value, scope)
+                    else:
+                        batch.call(scope, 'set', name, value)
+            else:
+                for name, value in self._inputs.items():
+                    batch.call(scope, 'set', name, value)
 
     def fetch_outputs(self, scope):
         """ Return list of ``(name, value)`` of outputs from `scope`. """
@@ -214,9 +217,14 @@ class CaseIteratorDriver(Driver):
         self._egg_file = None
         self._egg_required_distributions = None
         self._egg_orphan_modules = None
+        self._egg_manifest = None  # Member digests for server caches.
+        self._egg_partials = {}  # Partial eggs keyed by missing members.
 
         self._reply_q = None  # Replies from server threads.
         self._server_lock = None  # Lock for server data.
+        self._egg_lock = None  # Lock for partial egg creation.
+        self._allocations = None  # Servers from RAM.allocate_many().
+        self._n_cases = 0
 
         # Various per-server data keyed by server name.
         self._servers = {}
@@ -230,8 +238,14 @@ class CaseIteratorDriver(Driver):
         self.error_policy = 'ABORT'
 
     def set_inputs(self, generator):
-        """ Set case inputs from generator values. """
-        inputs = array([vals for vals in generator])
+        """
+        Set case inputs from generator values. `generator` may also be
+        a 2D array with one row per case, which is used without copying.
+        """
+        if isinstance(generator, ndarray) and generator.ndim == 2:
+            inputs = generator
+        else:
+            inputs = array([vals for vals in generator])
         start = 0
         for path, param in self.get_parameters().items():
             size = param.size
@@ -315,6 +329,7 @@ class CaseIteratorDriver(Driver):
             self._egg_file = egg_info[0]
             self._egg_required_distributions = egg_info[1]
             self._egg_orphan_modules = [name for name, path in egg_info[2]]
+            self._egg_manifest = zipfile_manifest(self._egg_file)
 
         inp_paths = []
         inp_values = []
@@ -328,6 +343,7 @@ class CaseIteratorDriver(Driver):
         outputs = self.get_responses().keys()
 
         length = len(inp_values[0])
+        self._n_cases = length
         cases = []
         for i in range(length):
             inputs = []
@@ -359,7 +375,12 @@ class CaseIteratorDriver(Driver):
 
         # Kick off initial wave of cases.
         self._server_lock = threading.Lock()
+        self._egg_lock = threading.Lock()
         self._reply_q = Queue.Queue()
+
+        # Deploy servers concurrently, workers take them as they are ready.
+        self._allocations = RAM.allocate_many(resources,
+                                              min(max_servers, self._n_cases))
         self._generation += 1
         n_servers = 0
         while n_servers < max_servers:
@@ -383,8 +404,8 @@ class CaseIteratorDriver(Driver):
             server = self._servers[name] = _ServerData(name)
             server.in_use = True
             server_thread = threading.Thread(target=self._service_loop,
-                                             args=(name, resources,
-                                                   credentials, self._reply_q))
+                                             args=(name, credentials,
+                                                   self._reply_q))
             server_thread.daemon = True
             try:
                 server_thread.start()
@@ -495,6 +516,10 @@ class CaseIteratorDriver(Driver):
         self._iter = None
         self._reply_q = None
         self._server_lock = None
+        self._egg_lock = None
+        if self._allocations is not None:
+            self._allocations.cancel()  # Releases unused servers.
+            self._allocations = None
         self._servers = {}
         self._seq_server.top = None  # Avoid leak.
         self._todo = []
@@ -503,6 +528,11 @@ class CaseIteratorDriver(Driver):
         if self._egg_file and os.path.exists(self._egg_file):
             os.remove(self._egg_file)
             self._egg_file = None
+        for partial in self._egg_partials.values():
+            if os.path.exists(partial):
+                os.remove(partial)
+        self._egg_partials = {}
+        self._egg_manifest = None
 
     def _server_ready(self, server, stepping=False):
         """
@@ -695,11 +725,15 @@ class CaseIteratorDriver(Driver):
         for recorder in self.recorders:
             recorder.record(recorded)
 
-    def _service_loop(self, name, resource_desc, credentials, reply_q):
+    def _service_loop(self, name, credentials, reply_q):
         """ Each server has an associated thread executing this. """
         set_credentials(credentials)
 
-        server, server_info = RAM.allocate(resource_desc)
+        allocations = self._allocations
+        if allocations is None:  # Already cleaned up.
+            server, server_info = (None, None)
+        else:
+            server, server_info = next(allocations, (None, None))
         # Just being defensive, this should never happen.
         if server is None:  #pragma no cover
             self._logger.error('Server allocation for %r failed :-(', name)
@@ -761,8 +795,7 @@ class CaseIteratorDriver(Driver):
         if egg_file is None or egg_file is not self._egg_file:
             # Only transfer if changed.
             try:
-                filexfer(None, self._egg_file,
-                         server.server, self._egg_file, 'b')
+                self._transfer_egg(server)
             # Difficult to force model file transfer error.
             except Exception as exc:  #pragma nocover
                 self._logger.error('server %r filexfer of %r failed: %r',
@@ -783,6 +816,50 @@ class CaseIteratorDriver(Driver):
         else:
             server.top = tlo
 
+    def _transfer_egg(self, server):
+        """
+        Transfer model egg to `server`. Only members not already in the
+        server host's zipfile cache are sent, so unchanged model files are
+        shared across runs, drivers, and servers on the same host.
+        """
+        manifest = self._egg_manifest
+        missing = server.server.missing_zipfile_members(manifest)
+        if missing:
+            if len(missing) == len(manifest):
+                filexfer(None, self._egg_file,
+                         server.server, self._egg_file, 'b')
+                server.server.cache_zipfile(self._egg_file, manifest)
+                return
+            partial = self._partial_egg(missing)
+            filexfer(None, partial, server.server, partial, 'b')
+            try:
+                server.server.cache_zipfile(partial, manifest)
+            finally:
+                server.server.remove(partial)
+        self._logger.debug('server %r restoring %r from cache (%d of %d'
+                           ' members sent)', server.name, self._egg_file,
+                           len(missing), len(manifest))
+        try:
+            server.server.restore_zipfile(self._egg_file, manifest)
+        except Exception as exc:
+            # Cache pruned by another process, send everything.
+            self._logger.warning('server %r restore of %r failed: %r',
+                                 server.name, self._egg_file, exc)
+            filexfer(None, self._egg_file,
+                     server.server, self._egg_file, 'b')
+
+    def _partial_egg(self, missing):
+        """ Returns name of an egg containing just the `missing` members. """
+        key = frozenset(missing)
+        with self._egg_lock:
+            partial = self._egg_partials.get(key)
+            if partial is None:
+                partial = '%s.part%d' % (self._egg_file,
+                                         len(self._egg_partials))
+                select_zipfile(self._egg_file, partial, missing)
+                self._egg_partials[key] = partial
+        return partial
+
     def _model_execute(self, server):
         """ Execute model in server. """
         server.exception = None
@@ -8,8 +8,11 @@
 import csv
 
 # pylint: disable-msg=E0611,F0401
-from openmdao.main.datatypes.api import Bool, Slot, Float, Str
-from openmdao.main.interfaces import IDOEgenerator
+from numpy import empty, savetxt, vstack
+
+from openmdao.main.datatypes.api import Bool, Slot, Float, Int, Str
+from openmdao.main.interfaces import IDOEgenerator, IChunkedDOEgenerator, \
+                                     obj_has_interface
 from openmdao.lib.drivers.caseiterdriver import CaseIteratorDriver
 
 
@@ -27,10 +30,25 @@ class DOEdriver(CaseIteratorDriver):
                        desc='Name of CSV file to record to'
                             ' (default is <driver-name>.csv).')
 
+    shard = Int(0, low=0, iotype='in',
+                desc='Index of the portion of the DOE to evaluate when it is'
+                     ' split into num_shards portions.')
+
+    num_shards = Int(1, low=1, iotype='in',
+                     desc='Number of portions to split the DOE into. Requires'
+                          ' a DOEgenerator which supports chunked access.')
+
     def execute(self):
         """Generate and evaluate cases."""
-        self.set_inputs(self._get_cases())
         self._csv_file = None
+        if obj_has_interface(self.DOEgenerator, IChunkedDOEgenerator):
+            self.set_inputs(self._get_case_array())
+        elif self.num_shards > 1:
+            self.raise_exception('DOEgenerator %s does not support sharding'
+                                 % type(self.DOEgenerator).__name__,
+                                 ValueError)
+        else:
+            self.set_inputs(self._get_cases())
         try:
             super(DOEdriver, self).execute()
         finally:
@@ -60,6 +78,35 @@ class DOEdriver(CaseIteratorDriver):
             self._csv_file.close()
             self._csv_file = None
 
+    def _get_case_array(self):
+        """Generate all cases for our shard as one array, building it a
+        block at a time from a chunked DOEgenerator."""
+        self.DOEgenerator.num_parameters = self.total_parameters()
+        record_doe = self.record_doe
+        if record_doe:
+            if not self.doe_filename:
+                self.doe_filename = '%s.csv' % self.name
+            self._csv_file = open(self.doe_filename, 'wb')
+
+        lower = self.get_lower_bounds()
+        delta = self.get_upper_bounds() - lower
+
+        blocks = []
+        for block in self.DOEgenerator.iter_chunks(shard=self.shard,
+                                                   num_shards=self.num_shards):
+            if record_doe:
+                savetxt(self._csv_file, block, fmt='%.16g', delimiter=',',
+                        newline='\r\n')
+            blocks.append(lower + delta*block)
+
+        if record_doe:
+            self._csv_file.close()
+            self._csv_file = None
+
+        if blocks:
+            return vstack(blocks)
+        return empty((0, len(lower)))
+
 
 class NeighborhoodDOEdriver(CaseIteratorDriver):
     """Driver for Design of Experiments within a specified neighborhood
@@ -156,6 +156,22 @@ class TestCaseDOE(unittest.TestCase):
         for case in self.model.driver._get_cases():
             print case
 
+    def test_shards(self):
+        doe = self.model.driver
+        doe.DOEgenerator = FullFactorial(num_levels=2)
+        doe.record_doe = False
+        self.model.run()
+        expected = doe.case_inputs.driven.x1
+        inputs = []
+        doe.num_shards = 3
+        for shard in range(3):
+            doe.shard = shard
+            self.model.run()
+            inputs.extend(doe.case_inputs.driven.x1)
+            self.verify_results()
+        self.assertEqual(len(inputs), 16)
+        self.assertEqual(inputs, expected)
+
     def verify_results(self, forced_errors=False):
         # Verify recorded results match expectations.
 
@@ -1,14 +1,19 @@
 import cPickle
 import os.path
 
-from numpy import linspace, hstack, dstack, less ,less_equal, logical_and, \
-    array, empty, matrix, dot
-    
-from scipy.optimize import fsolve, newton
-from scipy.sparse import csr_matrix
+from numpy import linspace, hstack, arange, asarray, atleast_1d, clip, \
+    empty, ones, zeros, where, abs, isfinite, searchsorted, logical_and, \
+    less, less_equal, finfo
 
-class Bspline(object): 
-    def __init__(self,controls,points,order=3): #controls and points are 2-d arrays of points 
+from scipy.sparse import csr_matrix, issparse
+
+#Newton/bisection iteration limit for inverting x->t. Bisection alone
+#reaches machine precision in about 55 iterations.
+_MAX_FIND_ITER = 100
+
+
+class Bspline(object):
+    def __init__(self,controls,points,order=3): #controls and points are 2-d arrays of points
 
         self.controls = controls
         self.order = order
@@ -17,99 +22,163 @@ class Bspline(object):
         self.knots =  hstack(([0,]*(self.degree),
                               hstack((linspace(0,1,self.n-self.order+2),[1,]*(self.degree)))
                              ))
-        self.__b_cache = {} #uses for memoizing the b_jn function
-        self.max_x = max(points[:,0]) 
+        self.max_x = max(points[:,0])
 
-        #see if we can 
+        #see if we can
         h1 = str(hash(tuple(points.flatten()))).replace("-","n")
         h2 = str(hash(tuple(controls.flatten()))).replace("-","n")
         pkl_file_name = "%s__%s.bspline_pkl"%(h1,h2)
         pkl_folder = "pyBspline_pkl"
         pkl_file_name = os.path.join(pkl_folder,pkl_file_name)
-        if not os.path.exists(pkl_folder): 
+        if not os.path.exists(pkl_folder):
             os.mkdir(pkl_folder)
-        if os.path.exists(pkl_file_name): 
+        if os.path.exists(pkl_file_name):
 
-            self.B = cPickle.load(open(pkl_file_name))
-        else: 
+            self.B = cPickle.load(open(pkl_file_name,'rb'))
+            if not issparse(self.B): #written by an older version
+                self.B = csr_matrix(self.B)
+        else:
             self.B = self._calc_jacobian(points)
-            cPickle.dump(self.B,open(pkl_file_name,'w'))
+            cPickle.dump(self.B,open(pkl_file_name,'wb'),cPickle.HIGHEST_PROTOCOL)
+
 
-   
-    def _calc_jacobian(self,points):                       
+    def _calc_jacobian(self,points):
         #pre-calculate the B matrix
-        n_p = points.shape[0]
-        B = matrix(empty((n_p,self.n))) #1 row per point, one column per control_point
-        
-        r = range(0,self.n)
-        for i,p in enumerate(points): 
-            t = self.find(p[0])
-            for j in r: 
-                B[i,j] = self.b_jn_wrapper(j,self.degree,t)    
-                
-        #self.B = csr_matrix(B)
-        self.B = B
+        #1 row per point, one column per control_point, order non-zeros per row
+        t = self.find(points[:,0])
+        self.B = self.basis(t)
         return self.B
-                    
+
     def calc(self,C,points=None):
         self.controls = C
-        if points: 
+        if points is not None:
             self.B = self._calc_jacobian(points)
-            
-        return array(self.B.dot(C))     
-                    
-     
+
+        return asarray(self.B.dot(C))
+
+    def _span(self,t):
+        """returns the index of the knot span containing each of `t`,
+        limited to the non-empty spans so that t=1 falls in the last one"""
+
+        span = searchsorted(self.knots,t,side='right')-1
+        return clip(span,self.degree,self.n-1)
+
+    def _basis_funs(self,t,span,degree):
+        """returns an (len(t), degree+1) array of the basis functions of the
+        given degree which are non-zero in each knot span, evaluated with
+        the triangular Cox-de Boor scheme. Column r holds N[span-degree+r]."""
+
+        knots = self.knots
+        n_t = len(t)
+        N = empty((n_t,degree+1))
+        N[:,0] = 1.
+        left = empty((n_t,degree+1))
+        right = empty((n_t,degree+1))
+        for j in range(1,degree+1):
+            left[:,j] = t-knots[span+1-j]
+            right[:,j] = knots[span+j]-t
+            saved = zeros(n_t)
+            for r in range(j):
+                temp = N[:,r]/(right[:,r+1]+left[:,j-r])
+                N[:,r] = saved+right[:,r+1]*temp
+                saved = left[:,j-r]*temp
+            N[:,j] = saved
+        return N
+
+    def basis(self,t):
+        """returns a sparse (len(t), n) matrix of the basis functions for
+        each control point evaluated at the parametric coordinates `t`.
+        Each row has order non-zero entries. Rows for t outside [0,1] are
+        zero."""
+
+        t = atleast_1d(asarray(t,dtype=float)).ravel()
+        span = self._span(t)
+        N = self._basis_funs(t,span,self.degree)
+        N[(t < 0) | (t > 1)] = 0.
+
+        cols = span[:,None]-self.degree+arange(self.order)
+        indptr = arange(0,len(t)*self.order+1,self.order)
+        return csr_matrix((N.ravel(),cols.ravel(),indptr),shape=(len(t),self.n))
+
+    def _x_and_slope(self,t):
+        """returns x(t) and dx/dt for the current controls"""
+
+        cx = asarray(self.controls[:,0],dtype=float)
+        p = self.degree
+        span = self._span(t)
+        cols = span[:,None]-p+arange(p+1)
+        x = (self._basis_funs(t,span,p)*cx[cols]).sum(axis=1)
+        if p == 0:
+            return x, zeros(len(t))
+
+        #derivative from the degree-1 basis and differenced controls
+        cols = cols[:,1:]
+        knots = self.knots
+        Q = p*(cx[cols]-cx[cols-1])/(knots[cols+p]-knots[cols])
+        dx = (self._basis_funs(t,span,p-1)*Q).sum(axis=1)
+        return x, dx
+
     def find(self,X):
-        """returns the parametric coordinate that matches the given x location""" 
-        
-        try:     
-            return array([fsolve(lambda f: self(f)[:,0][0] - x,[x/self.max_x,],xtol=1e-5) for x in X])[:,0]
-        except TypeError:
-            return fsolve(lambda f: self(f)[:,0] - X,[X/self.max_x,],xtol=1e-5)
-                 
-        
-    def b_jn(self,j,n,t):         
+        """returns the parametric coordinate that matches the given x location"""
+
+        X = atleast_1d(asarray(X,dtype=float)).ravel()
+        cx = asarray(self.controls[:,0],dtype=float)
+        increasing = cx[-1] >= cx[0]
+        tol = 4*finfo(float).eps*max(abs(cx).max(),1.)
+
+        #initial guess from the end points, then safeguarded Newton steps,
+        #falling back to bisection of the bracket [lo,hi]
+        span = cx[-1]-cx[0]
+        t = clip((X-cx[0])/span if span else zeros(len(X)),0.,1.)
+        lo = zeros(len(X))
+        hi = ones(len(X))
+        active = arange(len(X))
+        for i in range(_MAX_FIND_ITER):
+            ta = t[active]
+            x, dx = self._x_and_slope(ta)
+            f = x-X[active]
+            done = abs(f) <= tol
+            high = (f > 0) if increasing else (f < 0)
+            hi[active] = where(high,ta,hi[active])
+            lo[active] = where(high,lo[active],ta)
+            done |= hi[active]-lo[active] <= tol
+
+            step = ta-f/where(dx,dx,1.)
+            bad = (dx == 0) | ~isfinite(step) | \
+                  (step <= lo[active]) | (step >= hi[active])
+            t[active] = where(bad,0.5*(lo[active]+hi[active]),step)
+            t[active[done]] = ta[done]
+
+            active = active[~done]
+            if not len(active):
+                break
+        return t
+
+
+    def b_jn(self,j,n,t):
+        """recursive Cox-de Boor evaluation of basis function j of degree n.
+        Much slower than basis(), but useful as a reference."""
         t_j   = self.knots[j]
         t_j1  = self.knots[j+1]
         t_jn  = self.knots[j+n]
         t_jn1 = self.knots[j+n+1]
-        
-        if n==0:       
-            return logical_and(less_equal(t_j,t),less(t,t_j1))                
-        
-        if t_jn-t_j:     
+
+        if n==0:
+            return logical_and(less_equal(t_j,t),less(t,t_j1))
+
+        if t_jn-t_j:
             q1 = (t-t_j)/(t_jn-t_j)
-        else: 
-            q1 = 0    
-            
-        if t_jn1-t_j1: 
+        else:
+            q1 = 0
+
+        if t_jn1-t_j1:
             q2 = (t_jn1-t)/(t_jn1-t_j1)
-        else: 
+        else:
             q2 = 0
-                
-        B = q1*self.b_jn(j,n-1,t) + q2*self.b_jn(j+1,n-1,t)   
-        
+
+        B = q1*self.b_jn(j,n-1,t) + q2*self.b_jn(j+1,n-1,t)
+
         return B
-        
-    #dirty hack to fix some weird corner case that shows up    
-    def b_jn_wrapper(self,j,n,t): 
-        tuple_t = tuple(t)
-        try: 
-            return self.__b_cache[(j,n,tuple_t)]
-        except KeyError:     
-            B = self.b_jn(j,n,t)
-            if j == self.n-1: 
-                try: 
-                    B[t==1]=1 #anywhere t=1, set B = 1
-                except TypeError: 
-                    B = 1   
-            self.__b_cache[(j,n,tuple_t)] = B         
-            return B 
-        
-    def __call__(self,t): 
-        rng = range(0,self.n)
-        b = [self.b_jn_wrapper(i,self.degree,t) for i in rng]
-        X = dot(self.controls[:,0],b)
-        Y = dot(self.controls[:,1],b)
-        return dstack((X,Y))[0]     
-        
\ No newline at end of file
+
+    def __call__(self,t):
+        return asarray(self.basis(t).dot(self.controls[:,:2]))
@@ -1,10 +1,17 @@
 import copy
 
 import numpy as np
+from scipy.sparse import diags
 
 from bspline import Bspline
 
 
+def _scale_rows(J,scale):
+    """returns the sparse matrix `J` with each row multiplied by the
+    matching entry of `scale`"""
+    return diags(scale,0).dot(J).tocsr()
+
+
 class Coordinates(object): 
     """transforms points from Cartesian space to cylindrical space and vice versa"""
 
@@ -81,21 +88,15 @@ class Body(object):
 
         #sgrab the theta values from the points 
         self.Theta = self.P[:,2]
-        #this is too complex. shouldn't need to tile, then flatten later.
-        self.sin_theta = np.tile(np.sin(self.Theta),(self.n_controls,1)).T.flatten()
-        self.cos_theta = np.tile(np.cos(self.Theta),(self.n_controls,1)).T.flatten()
-        # self.sin_theta = np.tile(np.sin(self.Theta),self.n_controls)
-        # self.cos_theta = np.tile(np.cos(self.Theta),self.n_controls)
 
         #calculate derivatives
-        #in polar coordinates
-        self.dP_bar_xqdC = np.array(self.x_mag*self.bs.B.flatten())
-        self.dP_bar_rqdC = np.array(self.r_mag*self.bs.B.flatten())
-
-        #Project Polar derivatives into revolved cartisian coordinates
-        self.dXqdC = self.dP_bar_xqdC.reshape(-1,self.n_controls)
-        self.dYqdC = (self.dP_bar_rqdC*self.sin_theta).reshape(-1,self.n_controls)
-        self.dZqdC = (self.dP_bar_rqdC*self.cos_theta).reshape(-1,self.n_controls)
+        #in polar coordinates, scaled by the b-spline basis, then
+        #projected into revolved cartisian coordinates. Each point only
+        #depends on a few control points, so these are kept sparse.
+        B = self.bs.B
+        self.dXqdC = (self.x_mag*B).tocsr()
+        self.dYqdC = _scale_rows(B,self.r_mag*np.sin(self.Theta))
+        self.dZqdC = _scale_rows(B,self.r_mag*np.cos(self.Theta))
 
     def copy(self): 
         return copy.deepcopy(self)
@@ -208,41 +209,27 @@ class Shell(object):
 
 
         self.outer_theta = self.Po[:,2]
-        self.sin_outer_c_theta = np.tile(np.sin(self.outer_theta),(self.n_c_controls,1)).T.flatten()
-        self.cos_outer_c_theta = np.tile(np.cos(self.outer_theta),(self.n_c_controls,1)).T.flatten()
-        self.sin_outer_t_theta = np.tile(np.sin(self.outer_theta),(self.n_t_controls,1)).T.flatten()
-        self.cos_outer_t_theta = np.tile(np.cos(self.outer_theta),(self.n_t_controls,1)).T.flatten()
-
         self.inner_theta = self.Pi[:,2]
-        self.sin_inner_c_theta = np.tile(np.sin(self.inner_theta),(self.n_c_controls,1)).T.flatten()
-        self.cos_inner_c_theta = np.tile(np.cos(self.inner_theta),(self.n_c_controls,1)).T.flatten()
-        self.sin_inner_t_theta = np.tile(np.sin(self.inner_theta),(self.n_t_controls,1)).T.flatten()
-        self.cos_inner_t_theta = np.tile(np.cos(self.inner_theta),(self.n_t_controls,1)).T.flatten()
+        sin_outer = self.r_mag*np.sin(self.outer_theta)
+        cos_outer = self.r_mag*np.cos(self.outer_theta)
+        sin_inner = self.r_mag*np.sin(self.inner_theta)
+        cos_inner = self.r_mag*np.cos(self.inner_theta)
 
         #calculate derivatives
-        #in polar coordinates
-        self.dPo_bar_xqdCc = np.array(self.x_mag*self.bsc_o.B.flatten())
-        self.dPo_bar_rqdCc = np.array(self.r_mag*self.bsc_o.B.flatten())
-
-        self.dPi_bar_xqdCc = np.array(self.x_mag*self.bsc_i.B.flatten())
-        self.dPi_bar_rqdCc = np.array(self.r_mag*self.bsc_i.B.flatten())
-
-        self.dPo_bar_rqdCt = np.array(self.r_mag*self.bst_o.B.flatten())
-        self.dPi_bar_rqdCt = -1*np.array(self.r_mag*self.bst_i.B.flatten())
-
-        #Project Polar derivatives into revolved cartisian coordinates
-        self.dXoqdCc = self.dPo_bar_xqdCc.reshape(-1,self.n_c_controls)
-        self.dYoqdCc = (self.dPo_bar_rqdCc*self.sin_outer_c_theta).reshape(-1,self.n_c_controls)
-        self.dZoqdCc = (self.dPo_bar_rqdCc*self.cos_outer_c_theta).reshape(-1,self.n_c_controls)
-
-        self.dXiqdCc = self.dPi_bar_xqdCc.reshape(-1,self.n_c_controls)
-        self.dYiqdCc = (self.dPi_bar_rqdCc*self.sin_inner_c_theta).reshape(-1,self.n_c_controls)
-        self.dZiqdCc = (self.dPi_bar_rqdCc*self.cos_inner_c_theta).reshape(-1,self.n_c_controls)
-
-        self.dYoqdCt = (self.dPo_bar_rqdCt*self.sin_outer_t_theta).reshape(-1,self.n_t_controls)
-        self.dZoqdCt = (self.dPo_bar_rqdCt*self.cos_outer_t_theta).reshape(-1,self.n_t_controls)
-        self.dYiqdCt = (self.dPi_bar_rqdCt*self.sin_inner_t_theta).reshape(-1,self.n_t_controls)
-        self.dZiqdCt = (self.dPi_bar_rqdCt*self.cos_inner_t_theta).reshape(-1,self.n_t_controls)
+        #in polar coordinates, scaled by the b-spline bases, then
+        #projected into revolved cartisian coordinates (sparse)
+        self.dXoqdCc = (self.x_mag*self.bsc_o.B).tocsr()
+        self.dYoqdCc = _scale_rows(self.bsc_o.B,sin_outer)
+        self.dZoqdCc = _scale_rows(self.bsc_o.B,cos_outer)
+
+        self.dXiqdCc = (self.x_mag*self.bsc_i.B).tocsr()
+        self.dYiqdCc = _scale_rows(self.bsc_i.B,sin_inner)
+        self.dZiqdCc = _scale_rows(self.bsc_i.B,cos_inner)
+
+        self.dYoqdCt = _scale_rows(self.bst_o.B,sin_outer)
+        self.dZoqdCt = _scale_rows(self.bst_o.B,cos_outer)
+        self.dYiqdCt = _scale_rows(self.bst_i.B,-sin_inner)
+        self.dZiqdCt = _scale_rows(self.bst_i.B,-cos_inner)
 
     def copy(self): 
         return copy.deepcopy(self)
@@ -1,5 +1,6 @@
 import struct
 import copy
+import re
 import time
 import cPickle
 import os
@@ -27,51 +28,103 @@ ASCII_FACET = """  facet normal  {face[0]:e}  {face[1]:e}  {face[2]:e}
     endloop
   endfacet"""
 
+#%-style equivalent of ASCII_FACET, which can format many facets at once
+ASCII_FACET_FMT = re.sub(r'\{face\[\d+\]:e\}', '%e', ASCII_FACET)
+
 BINARY_HEADER ="80sI"
 BINARY_FACET = "12fH"
 
+#layout of one facet record in a binary STL file: normal, 3 vertices, and
+#the unused attribute byte count
+BINARY_DTYPE = np.dtype([('facet', '<f4', (12,)), ('attribute', '<u2')])
+
+#number of facets formatted at a time when writing ascii files
+_ASCII_CHUNK = 10000
+
+#keywords removed from ascii data, leaving just the numbers. 'endfacet'
+#comes first since it contains 'facet'.
+_ASCII_KEYWORDS = ('endfacet', 'endloop', 'facet normal', 'outer loop',
+                   'vertex')
+
+
+def _strip_solid_lines(text):
+    """removes the 'solid' and 'endsolid' lines, which may contain arbitrary
+    names, from ascii STL data"""
+
+    pieces = []
+    start = 0
+    while True:
+        index = text.find('solid', start)
+        if index < 0:
+            break
+        newline = text.rfind('\n', start, index)
+        begin = start if newline < 0 else newline+1
+        end = text.find('\n', index)
+        if end < 0:
+            end = len(text)
+        pieces.append(text[start:begin])
+        start = end
+    pieces.append(text[start:])
+    return ' '.join(pieces)
+
 
 def parse_ascii_stl(f):
     """expects a filelike object, and returns a nx12 array. One row for every facet in the STL file."""
 
-    stack = []
-    facets = []
-    line = f.readline()
-    while line:
+    text = f.read()
+    n_facets = text.count('endfacet')
 
+    #strip out everything but the numbers and parse them all at once
+    text = _strip_solid_lines(text)
+    for keyword in _ASCII_KEYWORDS:
+        text = text.replace(keyword, ' ')
+    values = np.fromstring(text, sep=' ')
 
-        if "facet normal" in line:
+    if values.size != 12*n_facets:
+        raise ValueError("invalid ascii STL data: expected %d values for %d "
+                         "facets, found %d" % (12*n_facets, n_facets,
+                                               values.size))
+    return values.reshape((n_facets, 12))
 
-            stack.extend(map(float,line.strip().split()[2:5]))
-            line = f.readline() #"outer loop"
-            #vertecies
-            line = f.readline()
-            stack.extend(map(float,line.strip().split()[1:4]))
-            line = f.readline()
-            stack.extend(map(float,line.strip().split()[1:4]))
-            line = f.readline()
-            stack.extend(map(float,line.strip().split()[1:4]))
-            line = f.readline() #"end loop"
-            line = f.readline() #'endfacet'
+def parse_binary_stl(f, memory_map=False):
+    """expects a filelike object positioned at the start of a binary STL
+    file, and returns a nx12 array. One row for every facet in the STL file.
+    If `memory_map` is True, the facet records are read through a memory
+    map of the file rather than a temporary copy of the data."""
 
-            facets.append(stack)
-            stack = []
+    header,n_triangles = struct.unpack(BINARY_HEADER,f.read(84))
 
-        line = f.readline()
+    if memory_map:
+        records = np.memmap(f, dtype=BINARY_DTYPE, mode='r', offset=f.tell(),
+                            shape=(n_triangles,))
+    else:
+        data = f.read(BINARY_DTYPE.itemsize*n_triangles)
+        records = np.frombuffer(data, dtype=BINARY_DTYPE, count=n_triangles)
 
-    return np.array(facets)
+    return np.array(records['facet'], dtype=float)
 
-def parse_binary_stl(f):
 
-    header,n_triangles = struct.unpack(BINARY_HEADER,f.read(84))
+def build_ascii_stl(facets):
+    """returns a list of ascii lines for the stl file. Each entry may hold
+    many facets, so the file contents are the entries joined by newlines."""
 
-    facets = []
+    facets = np.asarray(facets, dtype=float).reshape((-1, 12))
+    lines = ['solid ffd_geom',]
+    for start in xrange(0, len(facets), _ASCII_CHUNK):
+        chunk = facets[start:start+_ASCII_CHUNK]
+        fmt = '\n'.join([ASCII_FACET_FMT]*len(chunk))
+        lines.append(fmt % tuple(chunk.ravel().tolist()))
+    lines.append('endsolid ffd_geom')
+    return lines
 
-    for i in xrange(0,n_triangles):
-        facet = struct.unpack(BINARY_FACET,f.read(50))
-        facets.append(facet[:12])
+def build_binary_stl(facets):
+    """returns a list of strings of binary data for the stl file"""
 
-    return np.array(facets)
+    facets = np.asarray(facets, dtype=float).reshape((-1, 12))
+    records = np.zeros(len(facets), dtype=BINARY_DTYPE)
+    records['facet'] = facets
+    return [struct.pack(BINARY_HEADER,b'Binary STL Writer',len(facets)),
+            records.tostring()]
 
 
 class STL(object):
@@ -111,53 +164,38 @@ class STL(object):
         else:
             self.facets = parse_binary_stl(stl_file)
 
-        #list of points and the associated index from the facet array
-        points = []
-        stl_indecies = []
-        point_indecies = [] #same size as stl_indecies, but points to locations in the points data
+        #extract the 9 points from each facet into one 3*n_facets set of (x,y,z)
+        #    points and keep track of the original indcies at the same time so
+        #    I can reconstruct the stl file later
+        n_facets = len(self.facets)
+        vertices = self.facets[:,3:].reshape((-1,3))
+        rows = np.repeat(np.arange(n_facets),9).reshape((-1,3))
+        columns = np.tile(np.arange(3,12).reshape((3,3)),(n_facets,1))
+        self.stl_indecies = np.dstack((rows,columns))
 
         #stl files have duplicate points, which we don't want to compute on
         #so instead we keep a mapping between duplicates and their index in
-        #the point array
-        point_locations = {}
-        triangles = [] #used to track connectivity information
+        #the point array. Points are numbered in order of first appearance.
+        if n_facets:
+            unique, first, inverse = np.unique(vertices, axis=0,
+                                               return_index=True,
+                                               return_inverse=True)
+            order = np.argsort(first)
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            point_indecies = rank[inverse.ravel()]
+            points = vertices[first[order]]
+        else:
+            point_indecies = np.zeros(0,dtype=np.int)
+            points = np.zeros((0,3))
 
-        #extract the 9 points from each facet into one 3*n_facets set of (x,y,z)
-        #    points and keep track of the original indcies at the same time so
-        #    I can reconstruct the stl file later
-        column = np.arange(3,12,dtype=np.int)
-        row_base = np.ones(9,dtype=np.int)
-
-        p_count = 0 #I'm using this to avoid calling len(points) a lot
-        for i,facet in enumerate(self.facets):
-            row = row_base*i
-            ps = facet[3:].reshape((3,3))
-            triangle = []
-            for p in ps:
-                t_p = tuple(p)
-                try:
-                    p_index = point_locations[t_p]
-                    point_indecies.append(p_index) #we already have that point, so just point back to it
-                    triangle.append(p_index)
-                except KeyError:
-                    points.append(p)
-                    point_locations[t_p] = p_count
-                    point_indecies.append(p_count)
-                    triangle.append(p_count)
-                    p_count += 1
-            triangles.append(tuple(triangle))
-
-            index = np.vstack((row_base*i,column)).T.reshape((3,3,2))
-            stl_indecies.extend(index)
-
-        self.p_count = p_count
-        self.stl_indecies = np.array(stl_indecies)
+        self.p_count = len(points)
         #just need to re-shape these for the assignment call later
         self.stl_i0 = self.stl_indecies[:,:,0]
         self.stl_i1 = self.stl_indecies[:,:,1]
-        self.points = np.array(points)
-        self.point_indecies = point_indecies
-        self.triangles = np.array(triangles)
+        self.points = points
+        self.point_indecies = point_indecies #same size as stl_indecies, but points to locations in the points data
+        self.triangles = point_indecies.reshape((-1,3)) #used to track connectivity information
 
         #pickle for efficiency, instead of re-doing the load every time
         pkl_data = (self.facets,
@@ -188,21 +226,12 @@ class STL(object):
     def _build_ascii_stl(self):
         """returns a list of ascii lines for the stl file """
 
-        lines = ['solid ffd_geom',]
-        for facet in self.facets:
-            lines.append(ASCII_FACET.format(face=facet))
-        lines.append('endsolid ffd_geom')
-        return lines
+        return build_ascii_stl(self.facets)
 
     def _build_binary_stl(self):
         """returns a string of binary binary data for the stl file"""
 
-        lines = [struct.pack(BINARY_HEADER,b'Binary STL Writer',len(self.facets)),]
-        for facet in self.facets:
-            facet = list(facet)
-            facet.append(0) #need to pad the end with a unsigned short byte
-            lines.append(struct.pack(BINARY_FACET,*facet))
-        return lines
+        return build_binary_stl(self.facets)
 
     def get_facets(self):
         """returns a n,3 array of facets with the x,y,z coordinates of each vertex"""
@@ -1,9 +1,9 @@
-import struct
 import string
 
 import numpy as np
+from scipy.sparse import block_diag, csr_matrix, vstack
 
-from stl import ASCII_FACET, BINARY_HEADER, BINARY_FACET
+from stl import build_ascii_stl, build_binary_stl
 
 from ffd_axisymetric import Body, Shell
 
@@ -19,18 +19,8 @@ except ImportError:
 
 
 def _block_diag(arrays):
-    """ Create block-diagonal matrix from `arrays`. """
-    result = None
-    for arr in arrays:
-        arr[arr == -0] = 0  # Clean -0 for compatibilty with scipy version.
-        if result is None:
-            result = arr
-        else:
-            r_rows, r_cols = result.shape
-            a_rows, a_cols = arr.shape
-            result = np.vstack((np.hstack((result, np.zeros((r_rows, a_cols)))),
-                                np.hstack((np.zeros((a_rows, r_cols)), arr))))
-    return result
+    """ Create sparse block-diagonal matrix from sparse `arrays`. """
+    return block_diag(arrays, format='csr')
 
 
 class STLGroup(object):
@@ -82,21 +72,12 @@ class STLGroup(object):
     def _build_ascii_stl(self, facets):
         """returns a list of ascii lines for the stl file """
 
-        lines = ['solid ffd_geom',]
-        for facet in facets:
-            lines.append(ASCII_FACET.format(face=facet))
-        lines.append('endsolid ffd_geom')
-        return lines
+        return build_ascii_stl(facets)
 
     def _build_binary_stl(self, facets):
         """returns a string of binary binary data for the stl file"""
 
-        lines = [struct.pack(BINARY_HEADER,b'Binary STL Writer',len(facets)),]
-        for facet in facets:
-            facet = list(facet)
-            facet.append(0) #need to pad the end with a unsigned short byte
-            lines.append(struct.pack(BINARY_FACET,*facet))
-        return lines
+        return build_binary_stl(facets)
 
     def writeSTL(self, file_name, ascii=False):
         """outputs an STL file"""
@@ -104,12 +85,13 @@ class STLGroup(object):
         facets = []
         for comp in self._comps:
             if isinstance(comp,Body):
-                facets.extend(comp.stl.get_facets())
+                facets.append(comp.stl.get_facets())
             else:
-                facets.extend(comp.outer_stl.get_facets())
-                facets.extend(comp.inner_stl.get_facets())
+                facets.append(comp.outer_stl.get_facets())
+                facets.append(comp.inner_stl.get_facets())
+        facets = np.vstack(facets)
 
-        f = open(file_name,'w')
+        f = open(file_name,'w' if ascii else 'wb')
         if ascii:
             lines = self._build_ascii_stl(facets)
             f.write("\n".join(lines))
@@ -168,15 +150,15 @@ class STLGroup(object):
 
             #deriv_values = self.J[i]
             deriv_values = np.zeros((j_cols,))
-            deriv_values[:nx:3] = self.dXqdC[i]
+            deriv_values[:nx:3] = self.dXqdC.getrow(i).toarray().ravel()
 
             #leave x as zero
-            deriv_values[nx+1:nx+nr:3] = self.dYqdCr[i]
-            deriv_values[nx+2:nx+nr:3] = self.dZqdCr[i]
+            deriv_values[nx+1:nx+nr:3] = self.dYqdCr.getrow(i).toarray().ravel()
+            deriv_values[nx+2:nx+nr:3] = self.dZqdCr.getrow(i).toarray().ravel()
 
             #leave x as zero
-            deriv_values[nx+nr+1::3] = self.dYqdCt[i]
-            deriv_values[nx+nr+2::3] = self.dZqdCt[i]
+            deriv_values[nx+nr+1::3] = self.dYqdCt.getrow(i).toarray().ravel()
+            deriv_values[nx+nr+2::3] = self.dZqdCt.getrow(i).toarray().ravel()
 
             line += " ".join(np.char.mod('%.8f',deriv_values))
             lines.append(line)
@@ -271,15 +253,15 @@ class STLGroup(object):
                 #zeros for thickness n_pointsx1
                 shape = comp.dXqdC.shape
                 param_name = "%s.thickness"%comp.name #note: this parameter does not exists, so I'll remove the columns from the jacobian
-                jyt.append(np.zeros((shape[0],1)))
-                jzt.append(np.zeros((shape[0],1)))
+                jyt.append(csr_matrix((shape[0],1)))
+                jzt.append(csr_matrix((shape[0],1)))
                 param_J_offset_map[param_name] = t_offset
                 t_offset += 1
 
             else:
                 #inner and outer jacobians
                 #have to stack the outer and inner jacobians
-                stackX = np.vstack((comp.dXoqdCc, comp.dXiqdCc))
+                stackX = vstack((comp.dXoqdCc, comp.dXiqdCc))
                 jx.append(stackX)
                 param_name = "%s.X"%comp.name
                 param_J_offset_map[param_name] = x_offset
@@ -287,8 +269,8 @@ class STLGroup(object):
                 x_offset += nCx
 
                 #centerline
-                stackY = np.vstack((comp.dYoqdCc, comp.dYiqdCc))
-                stackZ = np.vstack((comp.dZoqdCc, comp.dZiqdCc))
+                stackY = vstack((comp.dYoqdCc, comp.dYiqdCc))
+                stackZ = vstack((comp.dZoqdCc, comp.dZiqdCc))
                 jyr.append(stackY) #constant tip radius
                 jzr.append(stackZ)
                 param_name = "%s.R"%comp.name
@@ -297,8 +279,8 @@ class STLGroup(object):
                 yz_offset += nCr
 
                 #thickness
-                stackY = np.vstack((comp.dYoqdCt, comp.dYiqdCt))
-                stackZ = np.vstack((comp.dZoqdCt, comp.dZiqdCt))
+                stackY = vstack((comp.dYoqdCt, comp.dYiqdCt))
+                stackZ = vstack((comp.dZoqdCt, comp.dZiqdCt))
                 jyt.append(stackY) #constant tip radius
                 jzt.append(stackZ)
                 param_name = "%s.thickness"%comp.name
@@ -333,13 +315,13 @@ class STLGroup(object):
                 self.param_J_map[param_name] = (False, self.dYqdCt[:,offset:offset+nCt], self.dZqdCt[:,offset:offset+nCt])
 
         #go through and remove the extra columns from fake body thicknesses
+        keep = np.ones(self.dYqdCt.shape[1], dtype=bool)
         for comp in self._comps:
             if isinstance(comp, Body):
                 param_name = "%s.thickness"%comp.name
-                offset = param_J_offset_map[param_name]
-
-                self.dYqdCt = np.delete(self.dYqdCt,offset,1)
-                self.dZqdCt = np.delete(self.dZqdCt,offset,1)
+                keep[param_J_offset_map[param_name]] = False
+        self.dYqdCt = self.dYqdCt[:,keep.nonzero()[0]]
+        self.dZqdCt = self.dZqdCt[:,keep.nonzero()[0]]
 
         self._needs_linerize = False
 
@@ -0,0 +1,74 @@
+"""
+Testing B-spline basis evaluation and inversion.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from openmdao.lib.geometry.bspline import Bspline
+
+
+class BsplineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.startdir = os.getcwd()
+        self.tempdir = tempfile.mkdtemp(prefix='test_bspline-')
+        os.chdir(self.tempdir)
+
+        self.points = np.zeros((50, 3))
+        self.points[:, 0] = np.linspace(1., 3., 50)**2
+        x = np.linspace(1., 9., 7)
+        self.controls = np.array(zip(x, np.sin(x)))
+
+    def tearDown(self):
+        os.chdir(self.startdir)
+        shutil.rmtree(self.tempdir)
+
+    def test_basis(self):
+        for order in (1, 2, 3, 4):
+            bs = Bspline(self.controls, self.points, order=order)
+            t = np.hstack((np.linspace(0., 1., 41), [0.333, 0.999999]))
+            B = bs.basis(t)
+            self.assertEqual(B.shape, (len(t), 7))
+            self.assertEqual(B.nnz, len(t)*order)
+
+            expected = np.array([bs.b_jn(j, bs.degree, t) for j in range(7)],
+                                dtype=float).T
+            expected[t == 1, -1] = 1.
+            np.testing.assert_allclose(B.toarray(), expected, atol=1e-14)
+            np.testing.assert_allclose(B.sum(axis=1), 1.)
+
+        self.assertEqual(bs.basis([-0.1, 1.1]).sum(), 0.)
+
+    def test_find(self):
+        bs = Bspline(self.controls, self.points)
+        self.assertEqual(bs.B.shape, (50, 7))
+        self.assertEqual(bs.B.nnz, 150)
+
+        # Parametric coordinates map back to the points.
+        xy = bs.calc(self.controls)
+        np.testing.assert_allclose(xy[:, 0], self.points[:, 0], rtol=1e-14)
+        t = bs.find(self.points[:, 0])
+        np.testing.assert_allclose(bs(t), xy, rtol=1e-14)
+        self.assertEqual(t[0], 0.)
+        self.assertEqual(t[-1], 1.)
+        self.assertTrue((np.diff(t) > 0).all())
+
+        # Deformation is a matrix product with the fixed basis.
+        delta = np.zeros(self.controls.shape)
+        delta[3, 1] = 0.5
+        moved = bs.calc(self.controls+delta)
+        np.testing.assert_allclose(moved-xy,
+                                   bs.B.dot(delta), atol=1e-14)
+
+        # The basis is cached.
+        bs2 = Bspline(self.controls, self.points)
+        np.testing.assert_array_equal(bs2.B.toarray(), bs.B.toarray())
+
+
+if __name__ == "__main__":
+    unittest.main()
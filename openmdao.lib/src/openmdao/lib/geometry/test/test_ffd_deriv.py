@@ -48,7 +48,7 @@ class TestFFDDerivatives(unittest.TestCase):
             f1 = body.stl.points.copy()
 
             dfdx = (f1-f0)/step
-            deriv_checkX = np.all(np.abs(body.dXqdC[:,i] - dfdx[:,0]) < 1e-6)
+            deriv_checkX = np.all(np.abs(body.dXqdC.toarray()[:,i] - dfdx[:,0]) < 1e-6)
 
             self.assertTrue(deriv_checkX)
 
@@ -62,9 +62,9 @@ class TestFFDDerivatives(unittest.TestCase):
             f1 = body.stl.points.copy()
 
             dfdx = (f1-f0)/step
-            #deriv_checkX = np.all(np.abs(body.dXqdC[:,i] - dfdx[:,0]) < 1e-6)
-            deriv_checkY = np.all(np.abs(body.dYqdC[:,i] - dfdx[:,1]) < 1e-6)
-            deriv_checkZ = np.all(np.abs(body.dZqdC[:,i] - dfdx[:,2]) < 1e-6)
+            #deriv_checkX = np.all(np.abs(body.dXqdC.toarray()[:,i] - dfdx[:,0]) < 1e-6)
+            deriv_checkY = np.all(np.abs(body.dYqdC.toarray()[:,i] - dfdx[:,1]) < 1e-6)
+            deriv_checkZ = np.all(np.abs(body.dZqdC.toarray()[:,i] - dfdx[:,2]) < 1e-6)
 
             #self.assertTrue(deriv_checkX)
             self.assertTrue(deriv_checkY)
@@ -92,18 +92,18 @@ class TestFFDDerivatives(unittest.TestCase):
             f1_outer = shell.outer_stl.points.copy()
 
             dfdx_outer = (f1_outer-f0_outer)/step
-            deriv_checkX_outer = np.all(np.abs(shell.dXoqdCc[:,i] - dfdx_outer[:,0]) < 1e-6)
-            #print np.abs(shell.dXoqdCc[:,i] - dfdx_outer[:,0]) 
+            deriv_checkX_outer = np.all(np.abs(shell.dXoqdCc.toarray()[:,i] - dfdx_outer[:,0]) < 1e-6)
+            #print np.abs(shell.dXoqdCc.toarray()[:,i] - dfdx_outer[:,0]) 
 
             self.assertTrue(deriv_checkX_outer)
 
             f1_inner = shell.inner_stl.points.copy()
 
             dfdx_inner = (f1_inner-f0_inner)/step
-            deriv_checkX_inner = np.all(np.abs(shell.dXiqdCc[:,i] - dfdx_inner[:,0]) < 1e-6)
-            #print np.abs(shell.dXiqdCc[:,i] - dfdx_inner[:,0]) 
+            deriv_checkX_inner = np.all(np.abs(shell.dXiqdCc.toarray()[:,i] - dfdx_inner[:,0]) < 1e-6)
+            #print np.abs(shell.dXiqdCc.toarray()[:,i] - dfdx_inner[:,0]) 
 
-            self.assertTrue(np.any(shell.dXiqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dXiqdCc.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkX_inner)
 
         #y,z derivatives centerline
@@ -116,25 +116,25 @@ class TestFFDDerivatives(unittest.TestCase):
             f1_outer = shell.outer_stl.points.copy()
 
             dfdx_outer = (f1_outer-f0_outer)/step
-            deriv_checkY_outer = np.all(np.abs(shell.dYoqdCc[:,i] - dfdx_outer[:,1]) < 1e-6)
-            deriv_checkZ_outer = np.all(np.abs(shell.dZiqdCc[:,i] - dfdx_outer[:,2]) < 1e-6)
-            #print np.abs(shell.dXoqdCc[:,i] - dfdx_outer[:,0]) 
+            deriv_checkY_outer = np.all(np.abs(shell.dYoqdCc.toarray()[:,i] - dfdx_outer[:,1]) < 1e-6)
+            deriv_checkZ_outer = np.all(np.abs(shell.dZiqdCc.toarray()[:,i] - dfdx_outer[:,2]) < 1e-6)
+            #print np.abs(shell.dXoqdCc.toarray()[:,i] - dfdx_outer[:,0]) 
 
-            self.assertTrue(np.any(shell.dYoqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dYoqdCc.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkY_outer)
-            self.assertTrue(np.any(shell.dZoqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dZoqdCc.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkZ_outer)
 
             f1_inner = shell.inner_stl.points.copy()
 
             dfdx_inner = (f1_inner-f0_inner)/step
-            deriv_checkY_inner = np.all(np.abs(shell.dYiqdCc[:,i] - dfdx_inner[:,1]) < 1e-6)
-            deriv_checkZ_inner = np.all(np.abs(shell.dZiqdCc[:,i] - dfdx_inner[:,2]) < 1e-6)
-            #print np.abs(shell.dXiqdCc[:,i] - dfdx_inner[:,0]) 
+            deriv_checkY_inner = np.all(np.abs(shell.dYiqdCc.toarray()[:,i] - dfdx_inner[:,1]) < 1e-6)
+            deriv_checkZ_inner = np.all(np.abs(shell.dZiqdCc.toarray()[:,i] - dfdx_inner[:,2]) < 1e-6)
+            #print np.abs(shell.dXiqdCc.toarray()[:,i] - dfdx_inner[:,0]) 
 
-            self.assertTrue(np.any(shell.dYiqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dYiqdCc.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkY_inner)
-            self.assertTrue(np.any(shell.dZiqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dZiqdCc.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkZ_inner)
 
         #y,z derivatives thickness
@@ -147,25 +147,25 @@ class TestFFDDerivatives(unittest.TestCase):
             f1_outer = shell.outer_stl.points.copy()
 
             dfdx_outer = (f1_outer-f0_outer)/step
-            deriv_checkY_outer = np.all(np.abs(shell.dYoqdCt[:,i] - dfdx_outer[:,1]) < 1e-6)
-            deriv_checkZ_outer = np.all(np.abs(shell.dZoqdCt[:,i] - dfdx_outer[:,2]) < 1e-6)
-            #print np.abs(shell.dXoqdCc[:,i] - dfdx_outer[:,0]) 
+            deriv_checkY_outer = np.all(np.abs(shell.dYoqdCt.toarray()[:,i] - dfdx_outer[:,1]) < 1e-6)
+            deriv_checkZ_outer = np.all(np.abs(shell.dZoqdCt.toarray()[:,i] - dfdx_outer[:,2]) < 1e-6)
+            #print np.abs(shell.dXoqdCc.toarray()[:,i] - dfdx_outer[:,0]) 
 
-            self.assertTrue(np.any(shell.dYoqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dYoqdCc.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkY_outer)
-            self.assertTrue(np.any(shell.dZoqdCc[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dZoqdCc.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkZ_outer)
 
             f1_inner = shell.inner_stl.points.copy()
 
             dfdx_inner = (f1_inner-f0_inner)/step
-            deriv_checkY_inner = np.all(np.abs(shell.dYiqdCt[:,i] - dfdx_inner[:,1]) < 1e-6)
-            deriv_checkZ_inner = np.all(np.abs(shell.dZiqdCt[:,i] - dfdx_inner[:,2]) < 1e-6)
+            deriv_checkY_inner = np.all(np.abs(shell.dYiqdCt.toarray()[:,i] - dfdx_inner[:,1]) < 1e-6)
+            deriv_checkZ_inner = np.all(np.abs(shell.dZiqdCt.toarray()[:,i] - dfdx_inner[:,2]) < 1e-6)
 
 
-            self.assertTrue(np.any(shell.dYiqdCt[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dYiqdCt.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkY_inner)
-            self.assertTrue(np.any(shell.dZiqdCt[:,i] > 0.001))
+            self.assertTrue(np.any(shell.dZiqdCt.toarray()[:,i] > 0.001))
             self.assertTrue(deriv_checkZ_inner)
 
 if __name__ == "__main__": 
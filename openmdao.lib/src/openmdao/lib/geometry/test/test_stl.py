@@ -0,0 +1,100 @@
+"""
+Testing reading and writing of STL files.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+import numpy as np
+
+from openmdao.lib.geometry.stl import STL, ASCII_FACET, parse_ascii_stl, \
+                                     parse_binary_stl, build_ascii_stl, \
+                                     build_binary_stl
+from openmdao.util.testutil import assert_raises
+
+# A tetrahedron, with vertices shared between facets.
+TETRA = np.array([[0., 0., -1.,  0., 0., 0.,  0., 1., 0.,  1., 0., 0.],
+                  [0., -1., 0.,  0., 0., 0.,  1., 0., 0.,  0., 0., 1.],
+                  [-1., 0., 0.,  0., 0., 0.,  0., 0., 1.,  0., 1., 0.],
+                  [.577, .577, .577,  1., 0., 0.,  0., 1., 0.,  0., 0., 1.]])
+
+
+class STLTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.startdir = os.getcwd()
+        self.tempdir = tempfile.mkdtemp(prefix='test_stl-')
+        os.chdir(self.tempdir)
+
+    def tearDown(self):
+        os.chdir(self.startdir)
+        shutil.rmtree(self.tempdir)
+
+    def test_ascii(self):
+        data = '\n'.join(build_ascii_stl(TETRA))
+        expected = ['solid ffd_geom']
+        expected.extend([ASCII_FACET.format(face=facet) for facet in TETRA])
+        expected.append('endsolid ffd_geom')
+        self.assertEqual(data, '\n'.join(expected))
+
+        facets = parse_ascii_stl(StringIO(data))
+        self.assertEqual(facets.shape, (4, 12))
+        np.testing.assert_array_equal(facets, TETRA)
+
+        # Solid names may contain anything.
+        data = data.replace('ffd_geom', 'facet 1.0 vertex')
+        np.testing.assert_array_equal(parse_ascii_stl(StringIO(data)), TETRA)
+
+        data = data.replace('vertex    0.000000e+00', 'vertex    zero', 1)
+        assert_raises(self, 'parse_ascii_stl(StringIO(data))',
+                      globals(), locals(), ValueError,
+                      'invalid ascii STL data: expected 48 values for 4'
+                      ' facets, found 3')
+
+    def test_binary(self):
+        data = ''.join(build_binary_stl(TETRA))
+        self.assertEqual(len(data), 84 + 50*len(TETRA))
+
+        facets = parse_binary_stl(StringIO(data))
+        self.assertEqual(facets.dtype, np.float64)
+        np.testing.assert_array_equal(facets,
+                                      TETRA.astype(np.float32))
+
+        with open('tetra.stl', 'wb') as out:
+            out.write(data)
+        with open('tetra.stl', 'rb') as inp:
+            mapped = parse_binary_stl(inp, memory_map=True)
+        np.testing.assert_array_equal(mapped, facets)
+
+    def test_points(self):
+        with open('tetra.stl', 'w') as out:
+            out.write('\n'.join(build_ascii_stl(TETRA)))
+        stl = STL('tetra.stl')
+
+        self.assertEqual(stl.p_count, 4)
+        np.testing.assert_array_equal(stl.points, [[0., 0., 0.],
+                                                   [0., 1., 0.],
+                                                   [1., 0., 0.],
+                                                   [0., 0., 1.]])
+        np.testing.assert_array_equal(stl.triangles, [[0, 1, 2],
+                                                      [0, 2, 3],
+                                                      [0, 3, 1],
+                                                      [2, 1, 3]])
+        self.assertEqual(stl.stl_indecies.shape, (12, 3, 2))
+        np.testing.assert_array_equal(stl.stl_i0[3:6], [[1, 1, 1]]*3)
+        np.testing.assert_array_equal(stl.stl_i1[3:6], [[3, 4, 5],
+                                                        [6, 7, 8],
+                                                        [9, 10, 11]])
+
+        points = stl.points * 2.
+        stl.update_points(points)
+        facets = stl.get_facets()
+        np.testing.assert_array_equal(facets[:, 3:], TETRA[:, 3:] * 2.)
+        np.testing.assert_array_equal(facets[:, :3], TETRA[:, :3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -251,7 +251,7 @@ class TestcaseDerivSTLGroup(unittest.TestCase):
 
                 FDx = ((p1-p0)/step)[:,0]
 
-                Ax = Jx[:,i]
+                Ax = Jx[:,i].toarray().ravel()
 
                 #print "%s[%d]"%(param,i), not np.any(np.abs(FDx - Ax) > .00001)
                 self.assertTrue(np.all(np.abs(FDx - Ax) < .00001))
@@ -275,8 +275,8 @@ class TestcaseDerivSTLGroup(unittest.TestCase):
                 FDy = ((p1-p0)/step)[:,1]
                 FDz = ((p1-p0)/step)[:,2]
 
-                Ay = Jy[:,i]
-                Az = Jz[:,i]
+                Ay = Jy[:,i].toarray().ravel()
+                Az = Jz[:,i].toarray().ravel()
 
                 #print "%s[%d]"%(param,i), not np.any(np.abs(FDy - Ay) > .00001), not np.any(np.abs(FDz - Az) > .00001)
                 self.assertTrue(np.all(np.abs(FDy - Ay) < .00001))
@@ -301,8 +301,8 @@ class TestcaseDerivSTLGroup(unittest.TestCase):
                 FDy = ((p1-p0)/step)[:,1]
                 FDz = ((p1-p0)/step)[:,2]
 
-                Ay = Jy[:,i]
-                Az = Jz[:,i]
+                Ay = Jy[:,i].toarray().ravel()
+                Az = Jz[:,i].toarray().ravel()
 
                 #print "%s[%d]"%(param,i), not np.any(np.abs(FDy - Ay) > .00001), not np.any(np.abs(FDz - Az) > .00001)
 
@@ -312,6 +312,49 @@ class TestcaseDerivSTLGroup(unittest.TestCase):
             self.top.geom.set(param, np.zeros(shape))
 
 
+class TestcaseSTLGroupJacobian(unittest.TestCase):
+
+    def test_thickness_columns(self):
+        # Body thickness placeholders are removed from dYqdCt and dZqdCt,
+        # leaving the Shell thickness columns in component order.
+        geom = PlugNozzleGeometry()
+        geom.provideJ()
+        p0 = geom.points.copy()
+
+        n_t = sum([geom.comp_param_count[comp][2] for comp in geom._comps
+                   if isinstance(comp, Shell)])
+        self.assertEqual(geom.dYqdCt.shape, (geom.n_points, n_t))
+        self.assertEqual(geom.dZqdCt.shape, (geom.n_points, n_t))
+
+        step = 1
+        col = 0
+        for comp in geom._comps:
+            if isinstance(comp, Body):
+                continue
+            param = "%s.thickness"%comp.name
+            shape = geom.param_name_map[param].shape
+            for i in xrange(shape[0]):
+                tmp = np.zeros(shape)
+                tmp[i] = step
+                geom.set_parameter(param, tmp)
+                geom.regen_model()
+
+                FD = (geom.points-p0)/step
+
+                Ay = geom.dYqdCt[:,col].toarray().ravel()
+                Az = geom.dZqdCt[:,col].toarray().ravel()
+                self.assertTrue(np.any(np.abs(Ay) > 0.0))
+                self.assertTrue(np.all(np.abs(FD[:,0]) < .00001))
+                self.assertTrue(np.all(np.abs(FD[:,1] - Ay) < .00001))
+                self.assertTrue(np.all(np.abs(FD[:,2] - Az) < .00001))
+                col += 1
+
+            geom.set_parameter(param, np.zeros(shape))
+            geom.regen_model()
+
+        self.assertEqual(col, n_t)
+
+
 if __name__ == "__main__":
 
     unittest.main()
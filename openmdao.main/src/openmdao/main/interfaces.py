@@ -470,6 +470,31 @@ class IDOEgenerator(Interface):
         """
 
 
+class IChunkedDOEgenerator(IDOEgenerator):
+    """A DOE generator that can compute any contiguous range of its points
+    directly, as a (num_points, num_parameters) array.
+    """
+
+    def num_points():
+        """Return the total number of points in the DOE."""
+
+    def get_points(start, stop):
+        """Return an array containing points `start` through `stop`-1."""
+
+    def get_point(index):
+        """Return point `index` without generating the points before it."""
+
+    def shard_range(shard, num_shards):
+        """Return the (start, stop) range of points belonging to `shard`
+        when the DOE is split into `num_shards` contiguous pieces.
+        """
+
+    def iter_chunks(chunk_size=None, shard=0, num_shards=1):
+        """Return an iterator over the points of `shard` in blocks of at
+        most `chunk_size` points.
+        """
+
+
 class IUncertainVariable(Interface):
     """A variable which supports uncertainty"""
     def getvalue():
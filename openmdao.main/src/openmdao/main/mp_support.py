@@ -17,6 +17,14 @@ is used between the Proxy and Server:
 If `authkey` is not 'PublicKey', then the above session protocol is not used,
 and channel data is in the clear.
 
+Large arrays in requests and replies are sent out of band, as raw buffer
+frames following the pickled message (see :func:`mp_util.send_message`).
+When the proxy and server are run by the same user on the same host, as with
+servers deployed by a :class:`LocalAllocator`, the arrays are instead placed
+in shared memory segments and only the segment names are sent. The proxy
+proves it can share segments with the server by having it read a probe file
+when the connection is accepted.
+
 Public methods of an object are determined by a role-based access control
 attribute associated with the method. The server will verify that the current
 role is allowed access. The current role is determined by an
@@ -26,6 +34,10 @@ the proxy.
 Assuming the credentials check passes, the server will set its credentials
 to those specified by the :class:`AccessController` during the execution of the
 method.
+
+Credentials are verified once per connection. The first request sends them
+along with a token, and later requests carry just the token. Role checks are
+cached per :class:`AccessController`.
 """
 
 # Unfortunately, there's a lot of multiprocessing package code duplication here.
@@ -46,6 +58,9 @@ import sys
 import threading
 import time
 import traceback
+import weakref
+
+from collections import deque
 
 from Crypto import Random
 
@@ -61,11 +76,13 @@ if sys.platform == 'win32':  #pragma no cover
 from traits.trait_handlers import TraitDictObject
 
 from openmdao.main.interfaces import obj_has_interface
-from openmdao.main.mp_util import decrypt, encrypt, is_legal_connection, \
-                                  keytype, make_typeid, public_methods, \
-                                  tunnel_address, SPECIALS
+from openmdao.main.mp_util import is_legal_connection, keytype, \
+                                  make_typeid, pack_message, public_methods, \
+                                  recv_message, send_message, send_packed, \
+                                  discard_segments, shm_probe, shm_verify, \
+                                  tunnel_address, SentSegments, SPECIALS
 from openmdao.main.rbac import AccessController, RoleError, check_role, \
-                               need_proxy, Credentials, \
+                               need_proxy, Credentials, CredentialsError, \
                                get_credentials, set_credentials
 
 from openmdao.util.log import install_remote_handler, remove_remote_handlers, \
@@ -82,6 +99,11 @@ CLASSES_TO_PROXY = []
 # Cache of proxies created by _make_proxy_type().
 _PROXY_CACHE = {}
 
+# Maximum bytes of pipelined requests sent on a connection without a reply.
+# Keeping this below typical socket buffer sizes avoids the proxy and server
+# both blocking on sends.
+_PIPELINE_BYTES = 64 * 1024
+
 
 def is_instance(obj, type_info):
     """
@@ -229,6 +251,9 @@ class OpenMDAO_Server(Server):
         else:
             self._key_pair = None
         self._id_to_controller = {}
+        # Access decisions keyed by controller, so replacing an object's
+        # controller discards its decisions.
+        self._access_decisions = weakref.WeakKeyDictionary()
         self._access_controller = AccessController()
         for cls in CLASSES_TO_PROXY:
             self._access_controller.class_proxy_required(cls)
@@ -376,21 +401,48 @@ class OpenMDAO_Server(Server):
 
         conn.close()
 
-    def serve_client(self, conn):
+    def accept_connection(self, conn, name, probe=None):
+        """
+        Serve a proxy connection in this thread.
+
+        conn: socket or pipe
+            Connection to process.
+
+        name: string
+            Name for this thread.
+
+        probe: tuple
+            Probe from :func:`shm_probe`. If it can be verified, ndarrays are
+            exchanged via shared memory on this connection.
+
+        The reply tells the proxy whether shared memory will be used.
+        """
+        threading.current_thread().name = name
+        shared = shm_verify(probe)
+        conn.send(('#RETURN', shared))
+        self.serve_client(conn, shared)
+
+    def serve_client(self, conn, shared=False):
         """
         Handle requests from the proxies in a particular process/thread.
 
         conn: socket or pipe
             Connection to process.
 
+        shared: bool
+            If True, send and receive large ndarrays via shared memory.
+
         This version supports dynamic proxy generation and credential checking.
+        Requests are processed in order as they arrive and each reply is sent
+        when ready, so a proxy may pipeline requests without waiting for
+        replies.
         """
         self._logger.log(LOG_DEBUG2, 'starting server thread to service %r, %s',
                          threading.current_thread().name, keytype(self._authkey))
-        recv = conn.recv
-        send = conn.send
         id_to_obj = self.id_to_obj
         id_to_controller = self._id_to_controller
+        tokens = {}  # Credentials for tokens sent on this connection.
+        sent = SentSegments()  # Reply segments the proxy may not have mapped.
 
         if self._authkey == 'PublicKey':
             client_key, session_key = self._init_session(conn)
@@ -403,9 +455,10 @@ class OpenMDAO_Server(Server):
             try:
                 ident = methodname = args = kwds = credentials = None
                 obj = exposed = gettypeid = None
-                data = recv()
                 try:
-                    request = decrypt(data, session_key)
+                    request = recv_message(conn, session_key, shared)
+                except EOFError:
+                    raise
                 except Exception as exc:
                     trace = traceback.format_exc()
                     msg = "Can't decrypt/unpack request. This could be the" \
@@ -422,8 +475,7 @@ class OpenMDAO_Server(Server):
 
                 # Decode and verify valid credentials.
                 try:
-                    credentials = Credentials.verify(credentials,
-                                                     self._allowed_users)
+                    credentials = self._verify_credentials(credentials, tokens)
                 except Exception as exc:
                     self._logger.error('%r' % exc)
                     raise
@@ -512,6 +564,7 @@ class OpenMDAO_Server(Server):
             except EOFError:
                 util.debug('got EOF -- exiting thread serving %r',
                            threading.current_thread().name)
+                sent.discard()
                 sys.exit(0)
 
             # Just being defensive, this should never happen.
@@ -524,9 +577,10 @@ class OpenMDAO_Server(Server):
 
             try:
                 try:
-                    send(encrypt(msg, session_key))
+                    send_message(conn, msg, session_key, shared, sent)
                 except Exception:
-                    send(encrypt(('#UNSERIALIZABLE', repr(msg)), session_key))
+                    send_message(conn, ('#UNSERIALIZABLE', repr(msg)),
+                                 session_key)
             # Just being defensive, this should never happen.
             except Exception as exc: #pragma no cover
                 self._logger.error('exception in thread serving %r',
@@ -534,6 +588,7 @@ class OpenMDAO_Server(Server):
                 self._logger.error(' ... message was %r', msg)
                 self._logger.error(' ... exception was %r', exc)
                 conn.close()
+                sent.discard()
                 sys.exit(1)
 
     def _init_session(self, conn):
@@ -575,6 +630,24 @@ class OpenMDAO_Server(Server):
 
         return (client_key, session_key)
 
+    def _verify_credentials(self, token, tokens):
+        """
+        Return credentials for request `token`. Credentials are verified once
+        per connection, when sent as ``(token, encoded)``. After that, requests
+        only carry the token.
+        """
+        if isinstance(token, tuple):
+            token, encoded = token
+            credentials = Credentials.verify(encoded, self._allowed_users)
+            tokens[token] = (credentials, encoded[2])
+        else:
+            try:
+                credentials, client_creds = tokens[token]
+            except KeyError:
+                raise CredentialsError('Unknown credentials token %r' % token)
+            credentials.client_creds = client_creds
+        return credentials
+
     def _check_access(self, ident, methodname, function, args, credentials):
         """ Check for valid access, return (role, credentials, controller). """
         obj, exposed, gettypeid = self.id_to_obj[ident]
@@ -601,11 +674,26 @@ class OpenMDAO_Server(Server):
             # Check for valid access based on role.
             access_controller.check_access(role, methodname, obj, args[0])
         else:
-            # Check for valid role.
+            # Check for valid role. Decisions only depend on the method's RBAC,
+            # so they're cached per controller by role, method, and class.
+            try:
+                decisions = self._access_decisions[access_controller]
+            except KeyError:
+                decisions = {}
+                self._access_decisions[access_controller] = decisions
+            key = (role, methodname, obj.__class__)
             try:
-                check_role(role, function)
-            except RoleError as exc:
-                raise RoleError('%s(): %s' % (methodname, exc))
+                error = decisions[key]
+            except KeyError:
+                try:
+                    check_role(role, function)
+                except RoleError as exc:
+                    error = '%s(): %s' % (methodname, exc)
+                else:
+                    error = None
+                decisions[key] = error
+            if error is not None:
+                raise RoleError(error)
 
             # Set credentials for execution of function. Typically
             # these are just the credentials of the caller, but
@@ -1222,15 +1310,24 @@ class OpenMDAO_Proxy(BaseProxy):
             self._pubkey = self._manager._pubkey
 
     def _connect(self):
-        """ This version translates tunneled addresses. """
+        """
+        This version translates tunneled addresses and checks if ndarrays
+        can be exchanged via shared memory.
+        """
         util.debug('making connection to manager')
         name = current_process().name
         if threading.current_thread().name != 'MainThread':
             name += '|' + threading.current_thread().name
         address = tunnel_address(self._token.address)
         conn = self._Client(address, authkey=self._authkey)
-        dispatch(conn, None, 'accept_connection', (name,))
+        probe = shm_probe()
+        try:
+            shared = dispatch(conn, None, 'accept_connection', (name, probe))
+        finally:
+            if probe is not None:
+                os.remove(probe[0])
         self._tls.connection = conn
+        self._tls.shared = bool(shared)
 
     def _callmethod(self, methodname, args=None, kwds=None):
         """
@@ -1238,6 +1335,25 @@ class OpenMDAO_Proxy(BaseProxy):
         This version optionally encrypts the channel and sends the current
         thread's credentials with method arguments.
         """
+        return self._send_request(methodname, args, kwds).result()
+
+    def call_async(self, methodname, *args, **kwds):
+        """
+        Send a request to call `methodname` of the referrent and return
+        a :class:`ProxyFuture` for the result without waiting for the reply.
+        Requests from a thread to a server are pipelined on one connection
+        and replies are received in order.
+
+        methodname: string
+            Name of method to call.
+
+        args, kwds:
+            Arguments for the method.
+        """
+        return self._send_request(methodname, args, kwds)
+
+    def _send_request(self, methodname, args, kwds):
+        """ Send request, return :class:`ProxyFuture` for the reply. """
         args = args or ()
         kwds = kwds or {}
 
@@ -1258,8 +1374,10 @@ class OpenMDAO_Proxy(BaseProxy):
                 self._init_session(conn)
             else:
                 self._tls.session_key = ''
+            self._tls.pipeline = _ProxyPipeline(conn, self._tls.session_key,
+                                                self._tls.shared, self._tls)
 
-        session_key = self._tls.session_key
+        pipeline = self._tls.pipeline
 
 # FIXME: Bizarre problem evidenced by test_extcode.py (Python 2.6.1)
 # For some reason pickling the env_vars dictionary causes:
@@ -1275,16 +1393,16 @@ class OpenMDAO_Proxy(BaseProxy):
                 new_args.append(arg)
 
         try:
-            conn.send(encrypt((self._id, methodname, new_args, kwds,
-                               get_credentials().encode()), session_key))
+            return pipeline.send(self, methodname, new_args, kwds,
+                                 get_credentials())
         except IOError as exc:
             msg = "Can't send to server at %r for %r: %r" \
                   % (self._token.address, methodname, exc)
             logging.error(msg)
             raise RuntimeError(msg)
 
-        kind, result = decrypt(conn.recv(), session_key)
-
+    def _handle_reply(self, kind, result):
+        """ Return result for reply message, or raise error. """
         if kind == '#RETURN':
             return result
 
@@ -1458,6 +1576,219 @@ class OpenMDAO_Proxy(BaseProxy):
                 (_auto_proxy, self._token, self._serializer, kwds))
 
 
+class ProxyFuture(object):
+    """
+    Pending result of :meth:`OpenMDAO_Proxy.call_async`.
+    Must be used by the thread which made the call.
+    """
+
+    def __init__(self, pipeline, proxy, methodname, nbytes):
+        self.methodname = methodname
+        # Weak, so the connection is closed when its thread exits even if
+        # replies are pending. The server then removes their segments.
+        self._pipeline = weakref.ref(pipeline)
+        self._proxy = proxy
+        self._nbytes = nbytes
+        self._done = False
+        self._result = None
+        self._exc = None
+
+    def done(self):
+        """ Returns True if the reply has been received. """
+        return self._done
+
+    def result(self):
+        """
+        Return the result of the call, waiting for the reply if necessary.
+        Replies to earlier requests on the same connection are received first.
+        Raises the call's exception if it failed.
+        """
+        while not self._done:
+            pipeline = self._pipeline()
+            if pipeline is None:
+                raise RuntimeError('Connection closed before %r reply'
+                                   % self.methodname)
+            pipeline.receive()
+        if self._exc is not None:
+            raise self._exc
+        return self._result
+
+    def _set_reply(self, kind, result):
+        """ Record result of reply message. """
+        try:
+            self._result = self._proxy._handle_reply(kind, result)
+        except Exception as exc:
+            self._exc = exc
+        self._set_done()
+
+    def _set_exception(self, exc):
+        """ Record failure to receive reply. """
+        self._exc = exc
+        self._set_done()
+
+    def _set_done(self):
+        """ Release references once complete. """
+        self._done = True
+        self._pipeline = None
+        self._proxy = None
+
+
+class _ProxyPipeline(object):
+    """
+    Requests sent on a proxy connection which are waiting for replies.
+    Also tracks credentials tokens for the connection: the first request
+    with given credentials sends them with a new token, later requests
+    send just the token.
+
+    conn: :class:`Connection`
+        Connection to server.
+
+    session_key: string
+        Key used for encryption.
+
+    shared: bool
+        If True, exchange large ndarrays via shared memory.
+
+    tls: thread local
+        Proxy thread local data holding `conn` and this pipeline. If a reply
+        can't be received, they are removed so the next request reconnects.
+    """
+
+    def __init__(self, conn, session_key, shared=False, tls=None):
+        self._conn = conn
+        self._session_key = session_key
+        self._shared = shared
+        self._tls = tls
+        self._pending = deque()
+        self._nbytes = 0
+        self._tokens = {}
+        self._sent = SentSegments()
+
+    def send(self, proxy, methodname, args, kwds, credentials):
+        """ Send request, return :class:`ProxyFuture` for the reply. """
+        key = (credentials, credentials.client_creds)
+        try:
+            token = self._tokens[key]
+        except KeyError:
+            new_token = len(self._tokens)
+            token = (new_token, credentials.encode())
+        else:
+            new_token = None
+
+        header, buffers = pack_message((proxy._id, methodname, args, kwds,
+                                        token), self._shared)
+        nbytes = len(header) + sum([len(data) for data in buffers])
+        try:
+            while self._pending and self._nbytes + nbytes > _PIPELINE_BYTES:
+                self.receive()
+        except Exception:
+            discard_segments(buffers)
+            raise
+        try:
+            send_packed(self._conn, header, buffers, self._session_key,
+                        self._sent)
+        except Exception as exc:
+            self._abort(exc)
+            raise
+        if new_token is not None:
+            self._tokens[key] = new_token
+        future = ProxyFuture(self, proxy, methodname, nbytes)
+        self._pending.append(future)
+        self._nbytes += nbytes
+        return future
+
+    def receive(self):
+        """ Receive reply for the oldest pending request. """
+        future = self._pending.popleft()
+        self._nbytes -= future._nbytes
+        try:
+            kind, result = recv_message(self._conn, self._session_key,
+                                        self._shared)
+        except Exception as exc:
+            future._set_exception(exc)
+            self._abort(exc)
+            raise
+        future._set_reply(kind, result)
+
+    def _abort(self, exc):
+        """
+        The connection is unusable: fail all pending requests with `exc`
+        and close the connection.
+        """
+        pending = self._pending
+        self._pending = deque()
+        self._nbytes = 0
+        for future in pending:
+            future._set_exception(exc)
+        # Requests not yet read by the server won't be.
+        self._sent.discard()
+
+        tls = self._tls
+        if tls is not None and getattr(tls, 'pipeline', None) is self:
+            del tls.pipeline
+            if hasattr(tls, 'connection'):
+                del tls.connection
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+
+class CallBatch(object):
+    """
+    Context manager which pipelines a batch of calls on proxies rather than
+    waiting for each reply. Calls on other objects are made immediately.
+    On exit all replies are received and :attr:`results` holds the results
+    in call order. The first exception from a call is then raised.
+
+    For example::
+
+        with CallBatch() as batch:
+            for name, value in inputs:
+                batch.call(model, 'set', name, value)
+    """
+
+    def __init__(self):
+        self.results = None
+        self._calls = []
+
+    def __enter__(self):
+        return self
+
+    def call(self, obj, methodname, *args, **kwds):
+        """
+        Call `methodname` of `obj` with `args` and `kwds`.
+
+        obj: object
+            Object to call, typically an :class:`OpenMDAO_Proxy`.
+
+        methodname: string
+            Name of method to call.
+        """
+        if isinstance(obj, OpenMDAO_Proxy):
+            self._calls.append((obj.call_async(methodname, *args, **kwds),
+                                None))
+        else:
+            self._calls.append((None,
+                                getattr(obj, methodname)(*args, **kwds)))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        results = []
+        first_exc = None
+        for future, result in self._calls:
+            if future is not None:
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    if first_exc is None:
+                        first_exc = exc
+            results.append(result)
+        self._calls = []
+        self.results = results
+        if first_exc is not None and exc_type is None:
+            raise first_exc
+
+
 def register(cls, manager, module=None):
     """
     Register class `cls` proxy info with `manager`. The class will be
@@ -9,14 +9,19 @@ import errno
 import getpass
 import inspect
 import logging
+import mmap
 import os.path
 import re
 import socket
 import sys
+import tempfile
 import time
+from cStringIO import StringIO
 
 from Crypto.Cipher import AES
 
+from numpy import ascontiguousarray, empty, frombuffer, ndarray, uint8
+
 from multiprocessing import current_process, connection
 from multiprocessing.managers import BaseProxy
 
@@ -30,6 +35,19 @@ from openmdao.util.shellproc import ShellProc, STDOUT, PIPE
 SPECIALS = ('__getattribute__', '__getattr__', '__setattr__', '__delattr__')
 
 
+# ndarrays of at least this many bytes are sent as raw buffer frames
+# following the message header rather than being pickled.
+OOB_THRESHOLD = 64 * 1024
+
+# Maximum size of an ndarray buffer frame (a multiple of AES.block_size).
+_FRAME_SIZE = 1 << 22
+
+# Directory for shared memory segments (a tmpfs), None if not available.
+if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+    SHM_DIR = '/dev/shm'
+else:  #pragma no cover
+    SHM_DIR = None
+
 # Mapping from remote addresses to local tunnel addresses.
 _TUNNEL_MAP = {}
 # Log files that haven't been cleaned up yet due to Windows issue.
@@ -367,6 +385,21 @@ def tunnel_address(remote):
     return _TUNNEL_MAP.get(remote, remote)
 
 
+def _cipher(session_key):
+    """ Return a new AES cipher for `session_key`. """
+    # Just being defensive, this should never happen.
+    if len(session_key) < 16:  #pragma no cover
+        session_key += '!'*16
+    session_key = session_key[:16]
+    return AES.new(session_key, AES.MODE_CBC, '?'*AES.block_size)
+
+def _pad(text):
+    """ Return `text` padded to a multiple of AES.block_size. """
+    pad = len(text) % AES.block_size
+    if pad:
+        text += '-'*(AES.block_size - pad)
+    return text
+
 def encrypt(obj, session_key):
     """
     If `session_key` is specified, returns ``(length, data)`` of encrypted,
@@ -379,19 +412,8 @@ def encrypt(obj, session_key):
         Key used for encryption. Should be at least 16 bytes long.
     """
     if session_key:
-        # Just being defensive, this should never happen.
-        if len(session_key) < 16:  #pragma no cover
-            session_key += '!'*16
-        session_key = session_key[:16]
-        encryptor = AES.new(session_key, AES.MODE_CBC, '?'*AES.block_size)
         text = cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL)
-        length = len(text)
-        pad = length % AES.block_size
-        if pad:
-            pad = AES.block_size - pad
-            text += '-'*pad
-        data = encryptor.encrypt(text)
-        return (length, data)
+        return (len(text), _cipher(session_key).encrypt(_pad(text)))
     else:
         return obj
 
@@ -410,18 +432,355 @@ def decrypt(msg, session_key):
         # Just being defensive, this should never happen.
         if len(msg) != 2:  #pragma no cover
             raise RuntimeError('_decrypt: msg not encrypted?')
-        # Just being defensive, this should never happen.
-        if len(session_key) < 16:  #pragma no cover
-            session_key += '!'*16
-        session_key = session_key[:16]
-        decryptor = AES.new(session_key, AES.MODE_CBC, '?'*AES.block_size)
         length, data = msg
-        text = decryptor.decrypt(data)
+        text = _cipher(session_key).decrypt(data)
         return cPickle.loads(text[:length])
     else:
         return msg
 
 
+def _frames(nbytes, encrypted):
+    """
+    Yields ``(start, stop)`` byte ranges of the frames used to send an ndarray
+    buffer of `nbytes`. If `encrypted`, any partial cipher block at the end
+    is sent in a frame of its own, so only that frame needs padding.
+    """
+    for start in range(0, nbytes, _FRAME_SIZE):
+        stop = min(start + _FRAME_SIZE, nbytes)
+        if encrypted:
+            tail = (stop - start) % AES.block_size
+            if tail and stop - tail > start:
+                yield (start, stop - tail)
+                start = stop - tail
+        yield (start, stop)
+
+class _Segment(object):
+    """
+    Shared memory segment holding the data of an out of band ndarray.
+    It occupies no bytes on the connection.
+
+    data: ndarray
+        Byte view of array memory to copy into the segment.
+    """
+
+    def __init__(self, data):
+        fd, self.path = tempfile.mkstemp(prefix='openmdao-', dir=SHM_DIR)
+        try:
+            # Writing is quicker than copying into a new mapping.
+            start = 0
+            while start < len(data):
+                start += os.write(fd, data[start:])
+        except Exception:
+            self.discard()
+            raise
+        finally:
+            os.close(fd)
+
+    def __len__(self):
+        return 0
+
+    def discard(self):
+        """ Remove a segment which won't be received. """
+        _remove_segment(self.path)
+
+
+def _is_segment(path):
+    """ Returns True if `path` is a legal shared memory segment name. """
+    return isinstance(path, basestring) and \
+           os.path.dirname(path) == SHM_DIR and \
+           os.path.basename(path).startswith('openmdao-')
+
+def _remove_segment(path):
+    """ Remove shared memory segment `path`, ignoring errors. """
+    if _is_segment(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _map_segment(path, dtype, shape, fortran):
+    """
+    Returns ndarray mapped from shared memory segment `path`.
+    The segment is removed once mapped, so its memory is released when the
+    array is.
+    """
+    if not _is_segment(path):
+        raise RuntimeError('Invalid shared memory segment %r' % path)
+    try:
+        fd = os.open(path, os.O_RDWR)
+        try:
+            buf = mmap.mmap(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+    finally:
+        _remove_segment(path)
+    if fortran:
+        return frombuffer(buf, dtype).reshape(shape[::-1]).T
+    return frombuffer(buf, dtype).reshape(shape)
+
+
+def shm_probe():
+    """
+    Returns ``(path, text)`` of a new probe file in :data:`SHM_DIR`,
+    or None if shared memory isn't available. A peer which can verify
+    the probe with :func:`shm_verify` can exchange ndarrays via shared
+    memory segments. The caller is responsible for removing the probe.
+    """
+    if SHM_DIR is None:  #pragma no cover
+        return None
+    text = os.urandom(16).encode('hex')
+    fd, path = tempfile.mkstemp(prefix='openmdao-', dir=SHM_DIR)
+    try:
+        os.write(fd, text)
+    finally:
+        os.close(fd)
+    return (path, text)
+
+def shm_verify(probe):
+    """
+    Returns True if `probe` from :func:`shm_probe` is readable here and
+    owned by this user, implying the prober can share memory segments with
+    this process.
+
+    probe: tuple
+        ``(path, text)`` of probe file, or None.
+    """
+    if probe is None or SHM_DIR is None:
+        return False
+    path, text = probe
+    if not _is_segment(path):
+        return False
+    try:
+        with open(path, 'rb') as inp:
+            if os.fstat(inp.fileno()).st_uid != os.getuid():
+                return False
+            return inp.read() == text
+    except (IOError, OSError):
+        return False
+
+
+def pack_message(obj, shared=False):
+    """
+    Returns ``(header, buffers)`` for sending `obj` with :func:`send_packed`.
+
+    Large ndarrays in `obj` are sent out of band. The header pickle carries
+    their dtype and shape, and `buffers` holds their data as byte views of
+    array memory. If `shared`, their data is instead copied to shared memory
+    segments which the receiver maps, and only the segment names are sent.
+
+    obj: object
+        Object to be sent.
+
+    shared: bool
+        If True, the receiver is on this host and was verified by
+        :func:`shm_verify`.
+    """
+    specs = []
+    buffers = []
+    index = {}
+
+    def persistent_id(obj):
+        """ Return index of out of band ndarray, None if `obj` is pickled. """
+        if type(obj) is not ndarray or obj.nbytes < OOB_THRESHOLD or \
+           obj.dtype.hasobject:
+            return None
+        try:
+            return index[id(obj)]
+        except KeyError:
+            pass
+        if obj.flags.c_contiguous:
+            fortran = False
+            data = obj
+        elif obj.flags.f_contiguous:
+            fortran = True
+            data = obj.T
+        else:
+            fortran = False
+            data = ascontiguousarray(obj)
+        data = data.reshape(-1).view(uint8)
+        if shared:
+            data = _Segment(data)
+            path = data.path
+        else:
+            path = None
+        index[id(obj)] = len(specs)
+        specs.append((obj.dtype, obj.shape, fortran, path))
+        buffers.append(data)
+        return index[id(obj)]
+
+    body = StringIO()
+    pickler = cPickle.Pickler(body, cPickle.HIGHEST_PROTOCOL)
+    pickler.inst_persistent_id = persistent_id
+    try:
+        pickler.dump(obj)
+    except Exception:
+        discard_segments(buffers)
+        raise
+    header = cPickle.dumps(specs, cPickle.HIGHEST_PROTOCOL) + body.getvalue()
+    return (header, buffers)
+
+def discard_segments(buffers):
+    """
+    Remove shared memory segments in `buffers` from :func:`pack_message`.
+    Used when the message won't be sent after all.
+    """
+    for data in buffers:
+        if isinstance(data, _Segment):
+            data.discard()
+
+
+class SentSegments(object):
+    """
+    Shared memory segments sent on a connection which the peer may not have
+    received yet. Once the connection is closed, :meth:`discard` removes
+    those the peer never mapped (mapped segments have already been removed).
+    """
+
+    def __init__(self):
+        self._paths = []
+
+    def add(self, buffers):
+        """ Record segments in `buffers` sent by :func:`send_packed`. """
+        paths = [data.path for data in buffers if isinstance(data, _Segment)]
+        if paths:
+            # Drop those the peer has mapped (and so removed).
+            exists = os.path.exists
+            self._paths = [path for path in self._paths if exists(path)]
+            self._paths.extend(paths)
+
+    def discard(self):
+        """ Remove any segments not yet received. """
+        for path in self._paths:
+            _remove_segment(path)
+        self._paths = []
+
+
+def send_packed(conn, header, buffers, session_key, sent=None):
+    """
+    Send message from :func:`pack_message` on `conn`, encrypting if
+    `session_key` is specified. Buffers are written directly from array
+    memory (encrypted frame by frame if necessary). If the message can't be
+    sent, its shared memory segments are removed.
+
+    conn: :class:`Connection`
+        Connection to send on.
+
+    header: string
+        Message header.
+
+    buffers: list
+        Byte views of out of band ndarrays, or shared memory segments.
+
+    session_key: string
+        Key used for encryption. Should be at least 16 bytes long.
+
+    sent: :class:`SentSegments`
+        If specified, shared memory segments sent are recorded here.
+    """
+    try:
+        if session_key:
+            cipher = _cipher(session_key)
+            conn.send_bytes(cipher.encrypt(_pad(header)))
+            for data in buffers:
+                for start, stop in _frames(len(data), True):
+                    frame = data[start:stop]
+                    if len(frame) % AES.block_size:
+                        frame = _pad(frame.tostring())
+                    conn.send_bytes(cipher.encrypt(frame))
+        else:
+            conn.send_bytes(header)
+            for data in buffers:
+                for start, stop in _frames(len(data), False):
+                    conn.send_bytes(data[start:stop])
+    except Exception:
+        discard_segments(buffers)
+        raise
+    if sent is not None:
+        sent.add(buffers)
+
+def send_message(conn, obj, session_key, shared=False, sent=None):
+    """
+    Send `obj` on `conn`, encrypting if `session_key` is specified.
+    Since `obj` is packed before anything is sent, a pickling error
+    leaves `conn` usable.
+
+    conn: :class:`Connection`
+        Connection to send on.
+
+    obj: object
+        Object to be sent.
+
+    session_key: string
+        Key used for encryption. Should be at least 16 bytes long.
+
+    shared: bool
+        If True, send large ndarrays via shared memory segments.
+
+    sent: :class:`SentSegments`
+        If specified, shared memory segments sent are recorded here.
+    """
+    header, buffers = pack_message(obj, shared)
+    send_packed(conn, header, buffers, session_key, sent)
+
+def recv_message(conn, session_key, shared=False):
+    """
+    Returns object sent by :func:`send_message` on `conn`, decrypting if
+    `session_key` is specified. Out of band ndarray data is received
+    directly into the memory of the reconstructed arrays, or mapped from
+    shared memory segments.
+
+    conn: :class:`Connection`
+        Connection to receive on.
+
+    session_key: string
+        Key used for encryption. Should be at least 16 bytes long.
+
+    shared: bool
+        If True, the sender was verified by :func:`shm_verify` and may send
+        shared memory segments.
+    """
+    header = conn.recv_bytes()
+    if session_key:
+        cipher = _cipher(session_key)
+        header = cipher.decrypt(header)  # Pad is ignored by the unpickler.
+    else:
+        cipher = None
+    stream = StringIO(header)
+
+    arrays = []
+    specs = cPickle.load(stream)
+    for i, (dtype, shape, fortran, path) in enumerate(specs):
+        if path is not None:
+            if not shared:
+                raise RuntimeError('Unexpected shared memory segment %r'
+                                   % path)
+            try:
+                arrays.append(_map_segment(path, dtype, shape, fortran))
+            except Exception:
+                for spec in specs[i+1:]:
+                    if spec[3] is not None:
+                        _remove_segment(spec[3])
+                raise
+            continue
+        arr = empty(shape, dtype, 'F' if fortran else 'C')
+        data = (arr.T if fortran else arr).reshape(-1).view(uint8)
+        for start, stop in _frames(len(data), cipher is not None):
+            if cipher is None:
+                nbytes = conn.recv_bytes_into(data[start:stop])
+                # Just being defensive, this should never happen.
+                if nbytes != stop - start:  #pragma no cover
+                    raise RuntimeError('Expected %d byte frame, got %d'
+                                       % (stop - start, nbytes))
+            else:
+                text = cipher.decrypt(conn.recv_bytes())
+                data[start:stop] = frombuffer(text, uint8, stop - start)
+        arrays.append(arr)
+
+    unpickler = cPickle.Unpickler(stream)
+    unpickler.persistent_load = arrays.__getitem__
+    return unpickler.load()
+
+
 def public_methods(obj):
     """
     Returns a list of names of the methods of `obj` to be exposed.
@@ -5,6 +5,7 @@ egg files, remote execution, and remote file access.
 """
 
 import atexit
+import errno
 import logging
 import optparse
 import os.path
@@ -31,9 +32,11 @@ from openmdao.main.rbac import get_credentials, set_credentials, \
                                rbac, RoleError
 from openmdao.main.releaseinfo import __version__
 
-from openmdao.util.filexfer import pack_zipfile, unpack_zipfile
+from openmdao.util.filexfer import pack_zipfile, unpack_zipfile, ZipCache, \
+                                   chunk_digests, read_chunk, write_chunk, \
+                                   zipfile_manifest
 from openmdao.util.log import install_remote_handler, remove_remote_handlers, \
-                              logging_port, LOG_DEBUG2
+                              rename_remote_handlers, logging_port, LOG_DEBUG2
 from openmdao.util.publickey import make_private, read_authorized_keys, \
                                     write_authorized_keys, HAVE_PYWIN32
 from openmdao.util.shellproc import ShellProc, STDOUT, DEV_NULL
@@ -262,12 +265,19 @@ class ObjServerFactory(Factory):
 
             manager = self.manager_class(address, self._authkey, name=name,
                                          allowed_users=allowed_users)
+            # mkdir() is atomic, so concurrent creates get distinct dirs.
             root_dir = name
             count = 1
-            while os.path.exists(root_dir):
-                count += 1
-                root_dir = '%s_%d' % (name, count)
-            os.mkdir(root_dir)
+            while True:
+                try:
+                    os.mkdir(root_dir)
+                except OSError as exc:
+                    if exc.errno != errno.EEXIST:
+                        raise
+                    count += 1
+                    root_dir = '%s_%d' % (name, count)
+                else:
+                    break
 
             # On Windows, when running the full test suite under Nose,
             # starting the process starts a new Nose test session, which
@@ -364,6 +374,10 @@ class ObjServer(object):
 
         SimulationRoot.chroot(self._root_dir)
         self.tlo = None
+        self._egg_file = None
+        self._preloaded = None  # (path, manifest, tlo) loaded by reset().
+        self._initial_files = set(os.listdir(self._root_dir))
+        self._zip_cache = None
 
         # Ensure Traits Array support is initialized. The code contains
         # globals for numpy symbols that are initialized within
@@ -377,6 +391,22 @@ class ObjServer(object):
             from traits.trait_numeric import AbstractArray
             dummy = AbstractArray()
 
+    @rbac('owner')
+    def rename(self, name):
+        """
+        Change name used in log messages, for example when a pooled server
+        is handed out under a new name.
+
+        name: string
+            New name for server.
+        """
+        self._logger.info('renamed to %r', name)
+        self.name = name
+        level = self._logger.level
+        self._logger = logging.getLogger(name)
+        self._logger.setLevel(level)
+        rename_remote_handlers(name)
+
     @rbac(('owner', 'user'))
     def set_log_level(self, level):
         """ Set logging level to `level`. """
@@ -518,11 +548,67 @@ class ObjServer(object):
                                get_credentials().user)
             raise RuntimeError('shell access is not allowed by this server')
         self._check_path(egg_filename, 'load_model')
+        if self._preloaded is not None:
+            path, manifest, tlo = self._preloaded
+            self._preloaded = None
+            if path == os.path.abspath(egg_filename) and \
+               manifest == zipfile_manifest(egg_filename):
+                self._logger.debug('    using preloaded model')
+                self.tlo = tlo
+                self._egg_file = egg_filename
+                return self.tlo
+            tlo.pre_delete()
         if self.tlo:
             self.tlo.pre_delete()
         self.tlo = Container.load_from_eggfile(egg_filename, log=self._logger)
+        self._egg_file = egg_filename
         return self.tlo
 
+    @rbac('owner')
+    def reset(self):
+        """
+        Return to the startup state so this server may be reused.
+        Any loaded model is deleted and files created since startup are
+        removed, except for the last egg loaded. That egg is then loaded
+        again, so a later :meth:`load_model` of the same egg contents can
+        use the fresh model without loading it.
+        """
+        self._logger.debug('reset')
+        for tlo in (self.tlo, self._preloaded and self._preloaded[2]):
+            if tlo:
+                tlo.pre_delete()
+        self.tlo = None
+        self._preloaded = None
+        os.chdir(self._root_dir)
+        keep = set(self._initial_files)
+        egg_file = self._egg_file
+        self._egg_file = None
+        if egg_file:
+            # Keep the top-level entry containing the egg.
+            rel = os.path.relpath(os.path.abspath(egg_file), self._root_dir)
+            if rel.split(os.sep)[0] != os.pardir:
+                keep.add(rel.split(os.sep)[0])
+            else:
+                egg_file = None
+        for name in os.listdir(self._root_dir):
+            if name in keep:
+                continue
+            path = os.path.join(self._root_dir, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, onerror=onerror)
+            else:
+                os.remove(path)
+
+        if egg_file and os.path.exists(egg_file):
+            try:
+                tlo = Container.load_from_eggfile(egg_file, log=self._logger)
+            except Exception as exc:
+                self._logger.warning("Can't preload %r: %r", egg_file, exc)
+            else:
+                self._preloaded = (os.path.abspath(egg_file),
+                                   zipfile_manifest(egg_file), tlo)
+                self._egg_file = egg_file
+
     @rbac('owner')
     def pack_zipfile(self, patterns, filename):
         """
@@ -556,6 +642,125 @@ class ObjServer(object):
         self._check_path(filename, 'unpack_zipfile')
         return unpack_zipfile(filename, self._logger, textfiles)
 
+    @rbac('owner')
+    def chunk_digests(self, path, chunk_size):
+        """
+        Returns MD5 digests of each `chunk_size` block of `path`
+        if `path` is legal.
+
+        path: string
+            Path to file to scan.
+
+        chunk_size: int
+            Size of blocks.
+        """
+        self._logger.debug('chunk_digests %r %d', path, chunk_size)
+        self._check_path(path, 'chunk_digests')
+        return chunk_digests(path, chunk_size)
+
+    @rbac('owner')
+    def read_chunk(self, path, offset, size, compress=False):
+        """
+        Returns ``(data, compressed, checksum)`` for a block of `path`
+        if `path` is legal.
+
+        path: string
+            Path to file to read.
+
+        offset: int
+            Starting position.
+
+        size: int
+            Maximum number of bytes to read.
+
+        compress: bool
+            If True, try compressing the data.
+        """
+        self._logger.log(LOG_DEBUG2, 'read_chunk %r %d %d', path, offset, size)
+        self._check_path(path, 'read_chunk')
+        return read_chunk(path, offset, size, compress)
+
+    @rbac('owner')
+    def write_chunk(self, path, offset, data, compressed, checksum, size):
+        """
+        Write a block from :meth:`read_chunk` to `path` if `path` is legal.
+
+        path: string
+            Path to file to write.
+
+        offset: int
+            Starting position.
+
+        data: string
+            Data to write.
+
+        compressed: bool
+            If True, `data` is compressed.
+
+        checksum: int
+            CRC-32 of uncompressed data.
+
+        size: int
+            Final size of file.
+        """
+        self._logger.log(LOG_DEBUG2, 'write_chunk %r %d', path, offset)
+        self._check_path(path, 'write_chunk')
+        return write_chunk(path, offset, data, compressed, checksum, size)
+
+    def _get_zip_cache(self):
+        """ Returns host :class:`ZipCache`, created on first use. """
+        if self._zip_cache is None:
+            self._zip_cache = ZipCache()
+        return self._zip_cache
+
+    @rbac('owner')
+    def missing_zipfile_members(self, manifest):
+        """
+        Returns names of members in `manifest` not in the host's zipfile
+        cache, so a caller need only transfer those.
+
+        manifest: list
+            As returned by :func:`filexfer.zipfile_manifest`.
+        """
+        missing = self._get_zip_cache().missing(manifest)
+        self._logger.debug('missing_zipfile_members %d of %d',
+                           len(missing), len(manifest))
+        return missing
+
+    @rbac('owner')
+    def cache_zipfile(self, filename, manifest):
+        """
+        Add members of ZipFile `filename` to the host's zipfile cache
+        if `filename` is legal.
+
+        filename: string
+            Name of ZipFile to read.
+
+        manifest: list
+            As returned by :func:`filexfer.zipfile_manifest`.
+        """
+        self._logger.debug('cache_zipfile %r', filename)
+        self._check_path(filename, 'cache_zipfile')
+        cache = self._get_zip_cache()
+        return cache.add_zipfile(filename, manifest, self._logger)
+
+    @rbac('owner')
+    def restore_zipfile(self, filename, manifest):
+        """
+        Create ZipFile `filename` from the host's zipfile cache
+        if `filename` is legal.
+
+        filename: string
+            Name of ZipFile to create.
+
+        manifest: list
+            As returned by :func:`filexfer.zipfile_manifest`.
+        """
+        self._logger.debug('restore_zipfile %r', filename)
+        self._check_path(filename, 'restore_zipfile')
+        cache = self._get_zip_cache()
+        return cache.build_zipfile(filename, manifest, self._logger)
+
     @rbac('owner')
     def chmod(self, path, mode):
         """
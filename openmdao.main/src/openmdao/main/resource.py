@@ -93,6 +93,77 @@ _LEGAL_NAME = re.compile(r'^[a-zA-Z][_a-zA-Z0-9]*$')
 _IPV4_HOST = re.compile(r'[0-9]+\.[0-9]+\.[0-9]+\.[0-9]+$')
 
 
+class ServerBatch(object):
+    """
+    Iterator over servers deployed by
+    :meth:`ResourceAllocationManager.allocate_many`. Yields
+    ``(proxy-object, server-dict)`` for each server as it becomes ready.
+    May be shared by multiple threads.
+
+    ram: :class:`ResourceAllocationManager`
+        Manager performing the deployments.
+
+    count: int
+        Number of servers being deployed.
+    """
+
+    def __init__(self, ram, count):
+        self._ram = ram
+        self._remaining = count
+        self._ready_q = Queue.Queue()
+        self._lock = threading.Lock()
+        self.cancelled = False
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        """
+        Returns the next deployment result, waiting for it if necessary.
+        Raises :class:`StopIteration` once all results have been returned
+        or the batch is cancelled.
+        """
+        with self._lock:
+            if self.cancelled or self._remaining <= 0:
+                raise StopIteration()
+            self._remaining -= 1
+        retval = self._ready_q.get()
+        if retval is None:  # Cancelled while waiting.
+            self._ready_q.put(None)  # Wake any other waiters.
+            raise StopIteration()
+        return retval
+
+    def cancel(self):
+        """
+        Stop starting deployments and release servers which have been
+        deployed but not retrieved, now or when their deployment completes.
+        Threads waiting in :meth:`next` get :class:`StopIteration`.
+        """
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            unused = []
+            while True:
+                try:
+                    unused.append(self._ready_q.get_nowait())
+                except Queue.Empty:
+                    break
+            self._ready_q.put(None)
+        for server, server_info in unused:
+            if server is not None:
+                self._ram._release(server)
+
+    def _put(self, retval):
+        """ Record deployment result, releasing the server if cancelled. """
+        with self._lock:
+            if not self.cancelled:
+                self._ready_q.put(retval)
+                return
+        if retval[0] is not None:  # Nobody wants it.
+            self._ram._release(retval[0])
+
+
 class ResourceAllocationManager(object):
     """
     The allocation manager maintains a list of :class:`ResourceAllocator`
@@ -110,6 +181,7 @@ class ResourceAllocationManager(object):
     _lock = threading.Lock()
     _lock_pid = os.getpid()  # For detecting copy from fork.
     _RAM = None              # Singleton.
+    _max_deploys = 10        # Concurrent deployments in allocate_many().
 
     def __init__(self, config_filename=None):
         self._logger = logging.getLogger('RAM')
@@ -307,13 +379,12 @@ class ResourceAllocationManager(object):
         """
         ResourceAllocationManager.validate_resources(resource_desc)
         ram = ResourceAllocationManager._get_instance()
-        with ResourceAllocationManager._lock:
-            return ram._max_servers(resource_desc)
+        return ram._max_servers(resource_desc)
 
     def _max_servers(self, resource_desc):
         """ Return total of each allocator's max servers. """
         total = 0
-        for allocator in self._allocators:
+        for allocator in self._get_allocators():
             count, criteria = allocator.max_servers(resource_desc)
             if count <= 0:
                 keys = criteria.keys()
@@ -339,8 +410,7 @@ class ResourceAllocationManager(object):
         """
         ResourceAllocationManager.validate_resources(resource_desc)
         ram = ResourceAllocationManager._get_instance()
-        with ResourceAllocationManager._lock:
-            return ram._allocate(resource_desc)
+        return ram._allocate(resource_desc)
 
     def _allocate(self, resource_desc):
         """ Do the allocation. """
@@ -350,23 +420,12 @@ class ResourceAllocationManager(object):
             best_estimate, best_criteria, best_allocator = \
                 self._get_estimates(resource_desc)
             if best_estimate >= 0:
-                self._allocations += 1
-                name = 'Sim-%d' % self._allocations
+                name = self._next_name()
                 self._logger.debug('deploying on %r', best_allocator._name)
                 server = best_allocator.deploy(name, resource_desc,
                                                best_criteria)
                 if server is not None:
-                    server_info = {
-                        'name': name,
-                        'pid':  server.pid,
-                        'host': server.host
-                    }
-                    self._logger.info('allocated %r pid %d on %s',
-                                      name, server_info['pid'],
-                                      server_info['host'])
-                    self._deployed_servers[id(server)] = \
-                        (best_allocator, server, server_info)
-                    return (server, server_info)
+                    return self._register(best_allocator, server, name)
                 # Difficult to generate deployable request that won't deploy...
                 else:  #pragma no cover
                     deployment_retries += 1
@@ -381,6 +440,129 @@ class ResourceAllocationManager(object):
             else:  #pragma no cover
                 time.sleep(1)  # Wait a bit between retries.
 
+    def _next_name(self):
+        """ Return name for next server. """
+        with ResourceAllocationManager._lock:
+            self._allocations += 1
+            return 'Sim-%d' % self._allocations
+
+    def _register(self, allocator, server, name):
+        """ Record deployed `server`, returns ``(server, server_info)``. """
+        server_info = {
+            'name': name,
+            'pid':  server.pid,
+            'host': server.host
+        }
+        self._logger.info('allocated %r pid %d on %s',
+                          name, server_info['pid'], server_info['host'])
+        with ResourceAllocationManager._lock:
+            self._deployed_servers[id(server)] = \
+                (allocator, server, server_info)
+        return (server, server_info)
+
+    @staticmethod
+    def allocate_many(resource_desc, count):
+        """
+        Determine placement of `count` servers for `resource_desc` and deploy
+        them concurrently. Returns a :class:`ServerBatch` which yields
+        ``(proxy-object, server-dict)`` for each server as it becomes ready,
+        or ``(None, None)`` if a deployment failed. Cancelling the batch
+        stops further deployments and releases servers not yet retrieved.
+
+        Placement is computed once: allocators are ranked as for
+        :meth:`allocate`, and each receives up to its :meth:`max_servers`
+        (which accounts for `min_cpus`). Servers which can't be placed, or
+        whose planned allocator is no longer available, are allocated
+        individually.
+
+        resource_desc: dict
+            Description of required resources.
+
+        count: int
+            Number of servers to deploy.
+        """
+        ResourceAllocationManager.validate_resources(resource_desc)
+        ram = ResourceAllocationManager._get_instance()
+        return ram._allocate_many(resource_desc, count)
+
+    def _allocate_many(self, resource_desc, count):
+        """ Start deployments, return :class:`ServerBatch` for results. """
+        plan = self._plan_allocations(resource_desc, count)
+        batch = ServerBatch(self, count)
+        dispatcher = threading.Thread(target=self._deploy_many,
+                                      args=(plan, resource_desc,
+                                            get_credentials(), batch))
+        dispatcher.daemon = True
+        dispatcher.start()
+        return batch
+
+    def _plan_allocations(self, resource_desc, count):
+        """ Returns list of allocators, one per server (None if unplaced). """
+        candidates = []
+        for index, allocator in enumerate(self._get_allocators()):
+            estimate, criteria = allocator.time_estimate(resource_desc)
+            if estimate < 0:
+                continue
+            nservers, criteria = allocator.max_servers(resource_desc)
+            if nservers <= 0:
+                continue
+            self._logger.debug('%r can take %d', allocator.name, nservers)
+            # Same preference as _get_estimates(): smallest real estimate,
+            # then no estimate, ties to earlier allocators.
+            rank = (0, estimate) if estimate > 0 else (1, 0)
+            candidates.append((rank, index, allocator, nservers))
+        candidates.sort()
+
+        plan = []
+        for rank, index, allocator, nservers in candidates:
+            plan.extend([allocator] * min(nservers, count - len(plan)))
+        plan.extend([None] * (count - len(plan)))
+        return plan
+
+    def _deploy_many(self, plan, resource_desc, credentials, batch):
+        """
+        Runs in a separate thread to deploy `plan` via worker threads.
+        Stops starting deployments once `batch` is cancelled.
+        """
+        reply_q = Queue.Queue()
+        todo = list(plan)
+        pending = 0
+        for i in range(min(len(todo), self._max_deploys)):
+            worker_q = WorkerPool.get()
+            worker_q.put((self._deploy_one,
+                          (todo.pop(0), resource_desc, credentials),
+                          {}, reply_q))
+            pending += 1
+        while pending:
+            worker_q, retval, exc, trace = reply_q.get()
+            pending -= 1
+            if todo and not batch.cancelled:
+                worker_q.put((self._deploy_one,
+                              (todo.pop(0), resource_desc, credentials),
+                              {}, reply_q))
+                pending += 1
+            else:
+                WorkerPool.release(worker_q)
+            if exc:
+                self._logger.error('deployment failed: %s', trace)
+                retval = (None, None)
+            batch._put(retval)
+
+    def _deploy_one(self, allocator, resource_desc, credentials):
+        """ Deploy on `allocator`, or wherever best if that fails. """
+        set_credentials(credentials)
+        if allocator is not None:
+            estimate, criteria = allocator.time_estimate(resource_desc)
+            if estimate >= 0:
+                name = self._next_name()
+                self._logger.debug('deploying on %r', allocator.name)
+                server = allocator.deploy(name, resource_desc, criteria)
+                if server is not None:
+                    return self._register(allocator, server, name)
+            self._logger.debug('%r unavailable, allocating individually',
+                               allocator.name)
+        return self._allocate(resource_desc)
+
     @staticmethod
     def get_hostnames(resource_desc):
         """
@@ -394,8 +576,7 @@ class ResourceAllocationManager(object):
         """
         ResourceAllocationManager.validate_resources(resource_desc)
         ram = ResourceAllocationManager._get_instance()
-        with ResourceAllocationManager._lock:
-            return ram._get_hostnames(resource_desc)
+        return ram._get_hostnames(resource_desc)
 
     def _get_hostnames(self, resource_desc):
         """ Get the hostnames. """
@@ -418,7 +599,7 @@ class ResourceAllocationManager(object):
         best_criteria = None
         best_allocator = None
 
-        for allocator in self._allocators:
+        for allocator in self._get_allocators():
             estimate, criteria = allocator.time_estimate(resource_desc)
             if estimate == -2:
                 key = criteria.keys()[0]
@@ -444,6 +625,14 @@ class ResourceAllocationManager(object):
 
         return (best_estimate, best_criteria, best_allocator)
 
+    def _get_allocators(self):
+        """
+        Returns a copy of the allocator list. Allocators are queried without
+        holding the lock so that allocations may proceed concurrently.
+        """
+        with ResourceAllocationManager._lock:
+            return list(self._allocators)
+
     @staticmethod
     def release(server):
         """
@@ -963,8 +1152,17 @@ class FactoryAllocator(ResourceAllocator):
     allow_shell: bool
         If True, :meth:`execute_command` and :meth:`load_model` are allowed
         in created servers. Use with caution!
+
+    pool_size: int
+        If >0, the number of idle servers to keep ready for each user.
+        Deployments are then satisfied from the pool when possible, and
+        released servers are reset and returned to the pool.
+
+    pool_timeout: float
+        Seconds an idle pooled server is kept before being shut down.
     """
-    def __init__(self, name, authkey=None, allow_shell=False):
+    def __init__(self, name, authkey=None, allow_shell=False, pool_size=0,
+                 pool_timeout=300.):
         super(FactoryAllocator, self).__init__(name)
         self._deployed_servers = []
 
@@ -975,6 +1173,24 @@ class FactoryAllocator(ResourceAllocator):
                 multiprocessing.current_process().authkey = authkey
         self.factory = ObjServerFactory(name, authkey, allow_shell)
 
+        if pool_size >= 0:
+            self.pool_size = pool_size
+        else:
+            raise ValueError('%s: pool_size must be >= 0, got %d'
+                             % (name, pool_size))
+        if pool_timeout > 0.:
+            self.pool_timeout = pool_timeout
+        else:
+            raise ValueError('%s: pool_timeout must be > 0, got %g'
+                             % (name, pool_timeout))
+        self._pool_lock = threading.Lock()
+        self._pool = {}            # Idle (server, credentials, time) by user.
+        self._pool_owners = {}     # Owner credentials of deployed servers.
+        self._pool_filling = set()
+        self._pool_monitor = None
+        self._pool_hits = 0
+        self._pool_misses = 0
+
     def configure(self, cfg):
         """
         Configure allocator from :class:`ConfigParser` instance.
@@ -984,7 +1200,8 @@ class FactoryAllocator(ResourceAllocator):
             Configuration data is located under the section matching
             this allocator's `name`.
 
-        Allows modifying `auth_key` and `allow_shell`.
+        Allows modifying `auth_key`, `allow_shell`, `pool_size`, and
+        `pool_timeout`.
         """
         if cfg.has_option(self.name, 'authkey'):
             value = cfg.get(self.name, 'authkey')
@@ -996,6 +1213,32 @@ class FactoryAllocator(ResourceAllocator):
             self._logger.debug('    allow_shell: %s', value)
             self.factory._allow_shell = value
 
+        if cfg.has_option(self.name, 'pool_size'):
+            value = cfg.getint(self.name, 'pool_size')
+            self._logger.debug('    pool_size: %s', value)
+            if value >= 0:
+                self.pool_size = value
+            else:
+                raise ValueError('%s: pool_size must be >= 0, got %d'
+                                 % (self.name, value))
+
+        if cfg.has_option(self.name, 'pool_timeout'):
+            value = cfg.getfloat(self.name, 'pool_timeout')
+            self._logger.debug('    pool_timeout: %s', value)
+            if value > 0.:
+                self.pool_timeout = value
+            else:
+                raise ValueError('%s: pool_timeout must be > 0, got %g'
+                                 % (self.name, value))
+
+    def invalidate(self):
+        """
+        Invalidate this allocator. Pooled servers belong to the original
+        process, so they are forgotten rather than shut down.
+        """
+        self._pool = {}
+        self._pool_owners = {}
+
     @rbac('*')
     def deploy(self, name, resource_desc, criteria):
         """
@@ -1012,29 +1255,207 @@ class FactoryAllocator(ResourceAllocator):
             The dictionary returned by :meth:`time_estimate`.
         """
         credentials = get_credentials()
-        allowed_users = {credentials.user: credentials.public_key}
-        try:
-            server = self.factory.create(typname='', name=name,
-                                         allowed_users=allowed_users)
-        # Shouldn't happen...
-        except Exception:  #pragma no cover
-            self._logger.exception('create failed:')
-            return None
+        server = None
+        if self.pool_size > 0:
+            server = self._get_pooled(credentials)
+            if server is not None:
+                try:
+                    server.rename(name)
+                except Exception as exc:
+                    self._logger.warning("Can't rename pooled server to %r:"
+                                         " %r", name, exc)
+
+        if server is None:
+            try:
+                server = self._create_server(name, credentials)
+            # Shouldn't happen...
+            except Exception:  #pragma no cover
+                self._logger.exception('create failed:')
+                return None
 
         self._deployed_servers.append(server)
+        if self.pool_size > 0:
+            self._pool_owners[server] = credentials
+            self._fill_pool(credentials)
         return server
 
+    def _create_server(self, name, credentials):
+        """ Create a new server for the user with `credentials`. """
+        allowed_users = {credentials.user: credentials.public_key}
+        return self.factory.create(typname='', name=name,
+                                   allowed_users=allowed_users)
+
     @rbac(('owner', 'user'))
     def release(self, server):
         """
-        Release `server`.
+        Release `server`. If it was taken from the pool and the pool isn't
+        full, the server is reset and returned to the pool rather than
+        shut down.
 
         server: typically :class:`ObjServer`
             Previously deployed server to be shut down.
         """
-        self.factory.release(server)
+        credentials = self._pool_owners.pop(server, None)
+        if credentials is None or not self._return_to_pool(server, credentials):
+            self.factory.release(server)
         self._deployed_servers.remove(server)
 
+    @rbac('*')
+    def pool_info(self):
+        """
+        Returns a dictionary describing the server pool: configured `size`
+        and `timeout`, number of `idle` servers, `filling` if servers are
+        being started, and the `hits`, `misses`, and `hit_rate` of
+        deployments.
+        """
+        with self._pool_lock:
+            idle = sum([len(entries) for entries in self._pool.values()])
+            total = self._pool_hits + self._pool_misses
+            return {
+                'size': self.pool_size,
+                'timeout': self.pool_timeout,
+                'idle': idle,
+                'filling': bool(self._pool_filling),
+                'hits': self._pool_hits,
+                'misses': self._pool_misses,
+                'hit_rate': float(self._pool_hits) / total if total else 0.
+            }
+
+    @rbac(('owner', 'user'))
+    def clear_pool(self):
+        """ Shut down all idle pooled servers. """
+        with self._pool_lock:
+            entries = []
+            for idle in self._pool.values():
+                entries.extend(idle)
+            self._pool = {}
+        for server, credentials, idle_since in entries:
+            self._release_pooled(server, credentials)
+
+    @staticmethod
+    def _pool_key(credentials):
+        """ Returns pool key for `credentials`. """
+        return (credentials.user, credentials.signature)
+
+    def _get_pooled(self, credentials):
+        """ Returns idle server for `credentials`, or None. """
+        with self._pool_lock:
+            try:
+                idle = self._pool[self._pool_key(credentials)]
+            except KeyError:
+                idle = None
+            if idle:
+                self._pool_hits += 1
+                return idle.pop()[0]  # Most recently used.
+            self._pool_misses += 1
+            return None
+
+    def _return_to_pool(self, server, credentials):
+        """ Returns True if `server` was reset and returned to the pool. """
+        key = self._pool_key(credentials)
+        with self._pool_lock:
+            if len(self._pool.get(key, ())) >= self.pool_size:
+                return False
+        try:
+            server.reset()
+        except Exception as exc:
+            self._logger.warning("Can't reset %r for pool: %r", server, exc)
+            return False
+        with self._pool_lock:
+            self._pool.setdefault(key, []).append((server, credentials,
+                                                   time.time()))
+        self._start_pool_monitor()
+        return True
+
+    def _fill_pool(self, credentials):
+        """ Start servers until `pool_size` are idle for `credentials`. """
+        key = self._pool_key(credentials)
+        with self._pool_lock:
+            if key in self._pool_filling or \
+               len(self._pool.get(key, ())) >= self.pool_size:
+                return
+            self._pool_filling.add(key)
+        filler = threading.Thread(target=self._pool_filler,
+                                  args=(key, credentials))
+        filler.daemon = True
+        filler.start()
+
+    def _pool_filler(self, key, credentials):
+        """ Runs in a separate thread to start servers for the pool. """
+        set_credentials(credentials)
+        try:
+            while True:
+                with self._pool_lock:
+                    if len(self._pool.get(key, ())) >= self.pool_size:
+                        break
+                try:
+                    server = self._create_server('%s_pool' % self.name,
+                                                 credentials)
+                # Shouldn't happen...
+                except Exception:  #pragma no cover
+                    self._logger.exception('pool create failed:')
+                    break
+                with self._pool_lock:
+                    idle = self._pool.setdefault(key, [])
+                    full = len(idle) >= self.pool_size  # Releases refilled.
+                    if not full:
+                        idle.append((server, credentials, time.time()))
+                if full:
+                    self._release_pooled(server, credentials)
+                    break
+        finally:
+            with self._pool_lock:
+                self._pool_filling.discard(key)
+        self._start_pool_monitor()
+
+    def _start_pool_monitor(self):
+        """ Start thread to shut down expired idle servers. """
+        with self._pool_lock:
+            if self._pool_monitor is not None:
+                return
+            self._pool_monitor = threading.Thread(target=self._monitor_pool)
+            self._pool_monitor.daemon = True
+            self._pool_monitor.start()
+
+    def _monitor_pool(self):
+        """ Shut down idle servers after `pool_timeout`. Exits when idle. """
+        while True:
+            time.sleep(min(self.pool_timeout, 1.))
+            now = time.time()
+            expired = []
+            with self._pool_lock:
+                for key, idle in self._pool.items():
+                    keep = []
+                    for entry in idle:
+                        if now - entry[2] >= self.pool_timeout:
+                            expired.append(entry)
+                        else:
+                            keep.append(entry)
+                    if keep:
+                        self._pool[key] = keep
+                    else:
+                        del self._pool[key]
+                done = not self._pool and not self._pool_filling
+                if done:
+                    self._pool_monitor = None
+            for server, credentials, idle_since in expired:
+                self._logger.debug('pooled server %r expired', server)
+                self._release_pooled(server, credentials)
+            if done:
+                return
+
+    def _release_pooled(self, server, credentials):
+        """ Shut down pooled `server` owned by `credentials`. """
+        orig = get_credentials()
+        set_credentials(credentials)
+        try:
+            self.factory.release(server)
+        except Exception as exc:
+            self._logger.error("Can't release pooled server %r: %r",
+                               server, exc)
+        finally:
+            set_credentials(orig)
+
 
 class LocalAllocator(FactoryAllocator):
     """
@@ -1060,6 +1481,12 @@ class LocalAllocator(FactoryAllocator):
         If True, :meth:`execute_command` and :meth:`load_model` are allowed
         in created servers. Use with caution!
 
+    pool_size: int
+        If >0, the number of idle servers to keep ready for each user.
+
+    pool_timeout: float
+        Seconds an idle pooled server is kept before being shut down.
+
     Resource configuration file entry equivalent to the default
     `LocalHost` allocator::
 
@@ -1073,8 +1500,10 @@ class LocalAllocator(FactoryAllocator):
     """
 
     def __init__(self, name='LocalAllocator', total_cpus=0, max_load=1.0,
-                 authkey=None, allow_shell=False):
-        super(LocalAllocator, self).__init__(name, authkey, allow_shell)
+                 authkey=None, allow_shell=False, pool_size=0,
+                 pool_timeout=300.):
+        super(LocalAllocator, self).__init__(name, authkey, allow_shell,
+                                             pool_size, pool_timeout)
         if total_cpus > 0:
             self.total_cpus = total_cpus
         else:
@@ -1336,6 +1765,10 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
     method: string
         Must be one of ``load-average``, ``greedy``, or ``round-robin``.
 
+    monitor_interval: float
+        Seconds between background updates of each machine's load estimate.
+        If zero, machines are polled during each allocation.
+
     ``load-average`` uses the load averages reported by each machine's
     local allocator to determine the least-loaded machine(s) and allocates
     on those. We assume that machines in the cluster are similar enough that
@@ -1353,12 +1786,20 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
     allocate a server on a mchine that is already overloaded based on other
     user's activity. They do however avoid problems where load averages don't
     reflect loads added by previous allocations quickly enough.
+
+    With ``load-average``, each machine's estimate is kept up to date by a
+    background monitor, so allocations normally make no remote calls.
+    Machines are only polled directly the first time a particular resource
+    description is seen (to check compatibility), or if the monitor's
+    estimate is stale. Each deployment adds one to the cached load of its
+    machine until the next update.
     """
 
     _methods = {}  # Selection methods.
+    _max_workers = 10  # Concurrent remote queries.
 
     def __init__(self, name, machines=None, authkey=None, allow_shell=False,
-                 method='load-average'):
+                 method='load-average', monitor_interval=10.):
         if method not in self._methods:
             raise ValueError('method argument %r not one of %s'
                              % (method, self._methods.keys()))
@@ -1375,10 +1816,11 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
         self._authkey = authkey
         self._allow_shell = allow_shell
         self._method = method
-        self._lock = threading.Lock()
+        self.monitor_interval = monitor_interval
+        self._lock = threading.Lock()  # For selection state.
         self._last_deployed = None
-        self._reply_q = Queue.Queue()
         self._deployed_servers = {}
+        self._monitor = None
 
         if machines is not None:
             self._initialize(machines)
@@ -1420,6 +1862,9 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
                 host.allocator = allocator
                 self._logger.debug('allocator %r pid %s', la_name, allocator.pid)
 
+        if self._method == 'load-average':
+            self._start_monitor()
+
     def __getitem__(self, i):
         return self.cluster[i]
 
@@ -1449,6 +1894,7 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
             authkey: PublicKey
             allow_shell: True
             method: load-average
+            monitor_interval: 10
             tunnel_incoming: False
             tunnel_outgoing: False
             identity_filename: ~/.ssh/example.pem
@@ -1489,6 +1935,11 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
                 self._method = method
             self._logger.debug('    method: %s', self._method)
 
+        if cfg.has_option(self.name, 'monitor_interval'):
+            self.monitor_interval = cfg.getfloat(self.name, 'monitor_interval')
+            self._logger.debug('    monitor_interval: %s',
+                               self.monitor_interval)
+
         # ClusterHost arguments.
 
         if cfg.has_option(self.name, 'python'):
@@ -1594,60 +2045,52 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
         if rdesc is None:
             return (0, info[1])
 
-        with self._lock:
-            # Drain _reply_q.
-            while True:
-                try:
-                    self._reply_q.get_nowait()
-                except Queue.Empty:
-                    break
-
-            # Get counts via worker threads.
-            todo = []
-            max_workers = 10
-            for i, host in enumerate(self.cluster):
-                allocator = host.allocator
-                if i < max_workers:
-                    worker_q = WorkerPool.get()
-                    worker_q.put((self._get_count,
-                                  (allocator, rdesc, credentials),
-                                  {}, self._reply_q))
-                else:
-                    todo.append(allocator)
-
-            # Process counts.
-            total = 0
-            for i in range(len(self.cluster)):
-                worker_q, retval, exc, trace = self._reply_q.get()
-                if exc:
-                    self._logger.error(trace)
-                    raise exc
+        total = 0
+        for count in self._query_hosts(self._get_count, list(self.cluster),
+                                       rdesc, credentials):
+            total += count
 
-                try:
-                    next_allocator = todo.pop(0)
-                except IndexError:
-                    WorkerPool.release(worker_q)
-                else:
-                    worker_q.put((self._get_count,
-                                  (next_allocator, rdesc, credentials),
-                                  {}, self._reply_q))
-                count = retval
-                if count:
-                    total += count
-
-            if 'min_cpus' in resource_desc:
-                req_cpus = resource_desc['min_cpus']
-                if req_cpus > total:
-                    return (0, {'min_cpus': 'want %s, total %s'
-                                            % (req_cpus, total)})
-                else:
-                    return (total / req_cpus, {})
+        if 'min_cpus' in resource_desc:
+            req_cpus = resource_desc['min_cpus']
+            if req_cpus > total:
+                return (0, {'min_cpus': 'want %s, total %s'
+                                        % (req_cpus, total)})
             else:
-                return (total, {})
+                return (total / req_cpus, {})
+        else:
+            return (total, {})
+
+    def _query_hosts(self, func, hosts, resource_desc, credentials):
+        """
+        Returns results of ``func(host, resource_desc, credentials)`` for
+        each of `hosts`, using up to `_max_workers` worker threads.
+        Each call has its own reply queue, so concurrent queries don't
+        interfere.
+        """
+        reply_q = Queue.Queue()
+        todo = list(hosts)
+        for i in range(min(len(todo), self._max_workers)):
+            worker_q = WorkerPool.get()
+            worker_q.put((func, (todo.pop(0), resource_desc, credentials),
+                          {}, reply_q))
+        results = []
+        for i in range(len(hosts)):
+            worker_q, retval, exc, trace = reply_q.get()
+            if exc:
+                self._logger.error(trace)
+            else:
+                results.append(retval)
+            if todo:
+                worker_q.put((func, (todo.pop(0), resource_desc, credentials),
+                              {}, reply_q))
+            else:
+                WorkerPool.release(worker_q)
+        return results
 
-    def _get_count(self, allocator, resource_desc, credentials):
-        """ Get `max_servers` from an allocator. """
+    def _get_count(self, host, resource_desc, credentials):
+        """ Get `max_servers` from a host's allocator. """
         set_credentials(credentials)
+        allocator = host.allocator
         count = 0
         adjusted = (self._method == 'load-average')
         try:
@@ -1688,7 +2131,11 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
         if rdesc is None:
             return info
 
-        return self._methods[self._method](self, rdesc)
+        if self._method == 'load-average':
+            return self._load_average(rdesc)
+
+        with self._lock:
+            return self._methods[self._method](self, rdesc)
 
     def _check_local(self, resource_desc):
         """ Check locally-relevant resources. """
@@ -1715,6 +2162,17 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
             # Spread across LocalAllocators.
             rdesc['min_cpus'] = 1
 
+        # Poll hosts not yet checked for this kind of request, or whose
+        # monitored estimate is stale.
+        key = repr(sorted(rdesc.items()))
+        hosts = [host for host in self.cluster
+                 if key not in host.incompatible or not self._is_fresh(host)]
+        if hosts:
+            for host, estimate, criteria in \
+                    self._query_hosts(self._get_estimate, hosts, rdesc,
+                                      credentials):
+                self._update_host(host, key, estimate, criteria)
+
         avail_cpus = 0
         with self._lock:
             best_host = None
@@ -1727,46 +2185,13 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
             prev_criteria = None
             self._last_deployed = None
 
-            # Drain _reply_q.
-            while True:
-                try:
-                    self._reply_q.get_nowait()
-                except Queue.Empty:
-                    break
-
-            # Get estimates via worker threads.
-            todo = []
-            max_workers = 10
-            for i, host in enumerate(self.cluster):
-                if i < max_workers:
-                    worker_q = WorkerPool.get()
-                    worker_q.put((self._get_estimate,
-                                  (host, rdesc, credentials),
-                                  {}, self._reply_q))
-                else:
-                    todo.append(host)
-
-            # Process estimates.
             host_loads = []  # Sorted list of (load, criteria)
-            for i in range(len(self.cluster)):
-                worker_q, retval, exc, trace = self._reply_q.get()
-                if exc:
-                    self._logger.error(trace)
-                    retval = None
-
-                try:
-                    next_host = todo.pop(0)
-                except IndexError:
-                    WorkerPool.release(worker_q)
-                else:
-                    worker_q.put((self._get_estimate,
-                                  (next_host, rdesc, credentials),
-                                  {}, self._reply_q))
-
-                if retval is None:
+            for host in self.cluster:
+                # Skip if incompatible or the query failed.
+                if host.incompatible.get(key, True) or host.estimate is None:
                     continue
-                host, estimate, criteria = retval
-                if estimate is None or estimate < -1:
+                estimate, criteria, timestamp = host.estimate
+                if estimate < -1:
                     continue
 
                 # Accumulate available cpus in cluster.
@@ -1825,6 +2250,7 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
 
             # Save best host in criteria in case we're asked to deploy.
             if best_host is not None:
+                best_criteria = best_criteria.copy()  # Cached by host.
                 best_criteria['host'] = best_host
                 if min_cpus:
                     # Save min_cpus hostnames in criteria.
@@ -1853,6 +2279,67 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
 
     _methods['load-average'] = _load_average
 
+    def _is_fresh(self, host):
+        """ Returns True if `host` has a recent monitored estimate. """
+        if host.estimate is None or self._monitor is None:
+            return False
+        return time.time() - host.estimate[2] < 2 * self.monitor_interval
+
+    def _update_host(self, host, key, estimate, criteria):
+        """ Record results of :meth:`time_estimate` for `host`. """
+        if estimate is None:  # Query failed.
+            return
+        if estimate == -2:
+            if key is not None:
+                host.incompatible[key] = criteria
+        else:
+            if key is not None:
+                host.incompatible[key] = None
+            host.estimate = (estimate, criteria, time.time())
+
+    def _add_load(self, host):
+        """ Account for a deployment on `host` until its next update. """
+        if host.estimate is None:
+            return
+        estimate, criteria, timestamp = host.estimate
+        if 'loadavgs' in criteria:
+            criteria = criteria.copy()
+            loadavgs = list(criteria['loadavgs'])
+            loadavgs[0] += 1
+            criteria['loadavgs'] = tuple(loadavgs)
+            if loadavgs[0] / criteria['total_cpus'] >= \
+               criteria.get('max_load', 1):
+                estimate = -1
+            host.estimate = (estimate, criteria, timestamp)
+
+    def _start_monitor(self):
+        """ Start background updates of host estimates. """
+        if self.monitor_interval > 0 and self._monitor is None:
+            self._monitor = threading.Thread(target=self._monitor_loads,
+                                             args=(get_credentials(),),
+                                             name='%s_monitor' % self.name)
+            self._monitor.daemon = True
+            self._monitor.start()
+
+    def _monitor_loads(self, credentials):
+        """ Periodically update estimates of all hosts. """
+        set_credentials(credentials)
+        while True:
+            cluster = self.cluster
+            if cluster is None:  # Shut down.
+                self._monitor = None
+                return
+            start = time.time()
+            try:
+                for host, estimate, criteria in \
+                        self._query_hosts(self._get_estimate, list(cluster),
+                                          {}, credentials):
+                    self._update_host(host, None, estimate, criteria)
+            except Exception as exc:
+                self._logger.error('load monitor: %r', exc)
+            time.sleep(max(self.monitor_interval - (time.time() - start),
+                           0.1))
+
     def _get_estimate(self, host, resource_desc, credentials):
         """ Get (estimate, criteria) from an allocator. """
         set_credentials(credentials)
@@ -1985,6 +2472,7 @@ class ClusterAllocator(ResourceAllocator):  #pragma no cover
             host.allocated_cpus += 1
             self._last_deployed = host
             del criteria['host']  # Don't pass a proxy without a server!
+            self._add_load(host)
         self._logger.debug('deploying on %r as %r', host.allocator.name, name)
         try:
             server = host.allocator.deploy(name, resource_desc, criteria)
@@ -2061,4 +2549,6 @@ class ClusterHost(mp_distributing.Host):  #pragma no cover
         self.allocator = None
         self.total_cpus = 0
         self.allocated_cpus = 0
+        self.estimate = None     # (estimate, criteria, time) of last update.
+        self.incompatible = {}   # Criteria (or None if OK) by request.
 
@@ -0,0 +1,183 @@
+"""
+Test mp_support.py
+"""
+
+import glob
+import logging
+import mmap
+import sys
+import threading
+import time
+import unittest
+import nose
+
+import numpy as np
+
+from multiprocessing.managers import RemoteError
+
+from openmdao.main.mp_support import CallBatch, ObjectManager
+from openmdao.main.rbac import Credentials, get_credentials, rbac
+
+
+class Store(object):
+    """ Object to be accessed via a proxy. """
+
+    def __init__(self):
+        self.values = {}
+
+    @rbac('*')
+    def set(self, name, value):
+        if name.startswith('bad'):
+            raise ValueError('bad name %r' % name)
+        self.values[name] = value
+
+    @rbac('*')
+    def get(self, name):
+        return self.values[name]
+
+    @rbac('*')
+    def names(self):
+        return sorted(self.values.keys())
+
+    @rbac('nobody')
+    def secret(self):
+        return 42
+
+
+class TestCase(unittest.TestCase):
+    """ Test mp_support.py """
+
+    def setUp(self):
+        self.store = Store()
+        self.manager = ObjectManager(self.store, address=('127.0.0.1', 0),
+                                     allowed_hosts=['127.0.0.1'])
+        self.proxy = self.manager.proxy
+
+    def test_call_async(self):
+        logging.debug('')
+        logging.debug('test_call_async')
+
+        futures = [self.proxy.call_async('set', 'x%d' % i, i)
+                   for i in range(1000)]
+        last = self.proxy.call_async('get', 'x999')
+        self.assertEqual(self.proxy.get('x998'), 998)
+        self.assertTrue(all([future.done() for future in futures]))
+        self.assertEqual(last.result(), 999)
+        self.assertEqual(len(self.store.values), 1000)
+
+        # Large arrays are limited by pipelined bytes, not request count.
+        big = np.arange(100000.)
+        futures = [self.proxy.call_async('set', 'big', big * i)
+                   for i in range(10)]
+        future = self.proxy.call_async('get', 'big')
+        np.testing.assert_array_equal(future.result(), big * 9)
+
+        future = self.proxy.call_async('set', 'bad', 0)
+        self.assertEqual(future.methodname, 'set')
+        self.assertRaises(RemoteError, future.result)
+        self.assertEqual(self.proxy.get('x1'), 1)
+
+        # A failed receive fails all pending calls and drops the connection.
+        futures = [self.proxy.call_async('get', 'x%d' % i) for i in range(3)]
+        pipeline = self.proxy._tls.pipeline
+        pipeline._conn.close()
+        self.assertRaises(IOError, futures[1].result)
+        self.assertTrue(all([future.done() for future in futures]))
+        self.assertRaises(IOError, futures[2].result)
+        self.assertFalse(hasattr(self.proxy._tls, 'pipeline'))
+        self.assertFalse(hasattr(self.proxy._tls, 'connection'))
+        self.assertEqual(self.proxy.get('x1'), 1)
+
+    def test_batch(self):
+        logging.debug('')
+        logging.debug('test_batch')
+
+        local = Store()
+        local.set('y', 5)
+        with CallBatch() as batch:
+            for i in range(10):
+                batch.call(self.proxy, 'set', 'x%d' % i, i)
+            batch.call(self.proxy, 'names')
+            batch.call(local, 'get', 'y')
+        self.assertEqual(batch.results[:10], [None]*10)
+        self.assertEqual(len(batch.results[10]), 10)
+        self.assertEqual(batch.results[11], 5)
+
+        # First error is raised after all replies are received.
+        try:
+            with CallBatch() as batch:
+                batch.call(self.proxy, 'set', 'bad1', 1)
+                batch.call(self.proxy, 'set', 'bad2', 2)
+                batch.call(self.proxy, 'set', 'good', 3)
+        except RemoteError as exc:
+            self.assertTrue("bad name 'bad1'" in str(exc))
+        else:
+            self.fail('Expected RemoteError')
+        self.assertEqual(batch.results, [None]*3)
+        self.assertEqual(self.proxy.get('good'), 3)
+
+    def test_shared_memory(self):
+        logging.debug('')
+        logging.debug('test_shared_memory')
+
+        # Local connections exchange large arrays via shared memory.
+        segments = glob.glob('/dev/shm/openmdao-*')
+        big = np.arange(100000.)
+        self.proxy.set('big', big)
+        self.assertTrue(self.proxy._tls.shared)
+        self.assertTrue(isinstance(self.store.values['big'].base.base,
+                                   mmap.mmap))
+        np.testing.assert_array_equal(self.store.values['big'], big)
+        np.testing.assert_array_equal(self.proxy.get('big'), big)
+        self.assertEqual(glob.glob('/dev/shm/openmdao-*'), segments)
+
+        # Replies never received are removed once the thread's connection
+        # is closed.
+        def abandon():
+            self.proxy.call_async('get', 'big')
+            time.sleep(0.5)  # Let the reply be sent.
+        thread = threading.Thread(target=abandon)
+        thread.start()
+        thread.join()
+        for retry in range(50):
+            if glob.glob('/dev/shm/openmdao-*') == segments:
+                break
+            time.sleep(0.1)
+        self.assertEqual(glob.glob('/dev/shm/openmdao-*'), segments)
+
+    def test_credentials(self):
+        logging.debug('')
+        logging.debug('test_credentials')
+
+        # Credentials are sent once per connection, then by token.
+        self.proxy.set('x', 1)
+        self.proxy.get('x')
+        pipeline = self.proxy._tls.pipeline
+        self.assertEqual(len(pipeline._tokens), 1)
+
+        credentials = get_credentials()
+        credentials.client_creds = Credentials()
+        try:
+            self.proxy.get('x')
+            self.assertEqual(len(pipeline._tokens), 2)
+        finally:
+            credentials.client_creds = None
+        self.proxy.get('x')
+        self.assertEqual(len(pipeline._tokens), 2)
+
+        # Denied access is cached, and still denied.
+        for i in range(2):
+            try:
+                self.proxy.secret()
+            except RemoteError as exc:
+                self.assertTrue("secret(): No access for role 'owner'"
+                                in str(exc))
+            else:
+                self.fail('Expected RemoteError')
+        self.assertEqual(self.proxy.names(), ['x'])
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=openmdao.main')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()
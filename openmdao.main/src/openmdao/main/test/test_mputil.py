@@ -2,6 +2,8 @@
 Test mp_util.py
 """
 
+import cPickle
+import glob
 import logging
 import os.path
 import socket
@@ -9,8 +11,15 @@ import sys
 import unittest
 import nose
 
+from multiprocessing import Pipe
+
+import numpy as np
+
+from openmdao.main import mp_util
 from openmdao.main.mp_util import read_server_config, read_allowed_hosts, \
-                                  is_legal_connection
+                                  is_legal_connection, recv_message, \
+                                  send_message, shm_probe, shm_verify, \
+                                  SentSegments
 
 from openmdao.util.publickey import make_private, HAVE_PYWIN32
 from openmdao.util.testutil import assert_raises
@@ -125,6 +134,101 @@ class TestCase(unittest.TestCase):
             finally:
                 os.remove('hosts.allow')
 
+    def test_messages(self):
+        logging.debug('')
+        logging.debug('test_messages')
+
+        # Use small limits to exercise multiple frames and padding.
+        saved = (mp_util.OOB_THRESHOLD, mp_util._FRAME_SIZE)
+        mp_util.OOB_THRESHOLD = 1024
+        mp_util._FRAME_SIZE = 512
+        reader, writer = Pipe(duplex=False)
+        try:
+            big = np.arange(1001.)
+            fortran = np.asfortranarray(np.arange(600).reshape((20, 30)))
+            strided = big[::2]
+            small = np.arange(5)
+            record = np.zeros(100, dtype=[('a', 'i4'), ('b', 'S7')])
+            record['b'] = 'hello'
+            obj = ('#RETURN', [big, fortran, strided, small, record,
+                               {'again': big}, 'text'])
+
+            for session_key in ('', 'a session key long enough'):
+                send_message(writer, obj, session_key)
+                kind, result = recv_message(reader, session_key)
+                self.assertEqual(kind, '#RETURN')
+                for expected, received in zip(obj[1][:5], result[:5]):
+                    self.assertEqual(received.dtype, expected.dtype)
+                    np.testing.assert_array_equal(received, expected)
+                self.assertTrue(result[1].flags.f_contiguous)
+                self.assertTrue(result[5]['again'] is result[0])
+                self.assertEqual(result[6], 'text')
+
+            # Unpicklable objects fail before anything is sent.
+            self.assertRaises(cPickle.PicklingError, send_message, writer,
+                              (big, lambda x: x), '')
+            self.assertFalse(reader.poll())
+        finally:
+            mp_util.OOB_THRESHOLD, mp_util._FRAME_SIZE = saved
+            reader.close()
+            writer.close()
+
+    def test_shared(self):
+        logging.debug('')
+        logging.debug('test_shared')
+
+        if mp_util.SHM_DIR is None:
+            raise nose.SkipTest('No shared memory directory')
+
+        probe = shm_probe()
+        try:
+            self.assertTrue(shm_verify(probe))
+            self.assertFalse(shm_verify((probe[0], 'wrong')))
+            self.assertFalse(shm_verify((__file__, '')))
+            self.assertFalse(shm_verify(None))
+        finally:
+            os.remove(probe[0])
+        self.assertFalse(shm_verify(probe))
+
+        segments = glob.glob(os.path.join(mp_util.SHM_DIR, 'openmdao-*'))
+        reader, writer = Pipe(duplex=False)
+        try:
+            big = np.arange(100000.)
+            fortran = np.asfortranarray(big.reshape((200, 500)))
+            obj = ('#RETURN', [big, fortran, {'again': big}])
+            send_message(writer, obj, '', True)
+            kind, result = recv_message(reader, '', True)
+            np.testing.assert_array_equal(result[0], big)
+            np.testing.assert_array_equal(result[1], fortran)
+            self.assertTrue(result[1].flags.f_contiguous)
+            self.assertTrue(result[2]['again'] is result[0])
+            result[0][0] = 42.  # Mapped arrays are writable.
+
+            # Segments are only accepted on shared connections.
+            sent = SentSegments()
+            send_message(writer, big, '', True, sent)
+            try:
+                recv_message(reader, '')
+            except RuntimeError as exc:
+                self.assertTrue(str(exc).startswith(
+                                'Unexpected shared memory segment'))
+            else:
+                self.fail('Expected RuntimeError')
+            self.assertEqual(len(sent._paths), 1)
+            self.assertTrue(os.path.exists(sent._paths[0]))
+            sent.discard()
+            self.assertEqual(sent._paths, [])
+
+            # Unpicklable objects don't leave segments behind.
+            self.assertRaises(cPickle.PicklingError, send_message, writer,
+                              (big, lambda x: x), '', True)
+            self.assertFalse(reader.poll())
+        finally:
+            reader.close()
+            writer.close()
+        remaining = glob.glob(os.path.join(mp_util.SHM_DIR, 'openmdao-*'))
+        self.assertEqual(set(remaining) - set(segments), set())
+
 
 if __name__ == '__main__':
     sys.argv.append('--cover-package=openmdao.main')
@@ -265,7 +265,18 @@ class TestCase(unittest.TestCase):
             exec_comp = server.create('openmdao.test.execcomp.ExecComp')
             exec_comp.run()
             egg_info = exec_comp.save_to_egg('exec_comp', '0')
+            obj = server.load_model(os.path.abspath(egg_info[0]))
+            obj.run()
+
+            # Reset keeps the egg and preloads it for the next load_model.
+            with open('junk.dat', 'w') as out:
+                out.write('junk\n')
+            server.reset()
+            self.assertTrue(egg_info[0] in os.listdir('.'))
+            self.assertFalse('junk.dat' in os.listdir('.'))
+            preloaded = server._preloaded[2]
             obj = server.load_model(egg_info[0])
+            self.assertTrue(obj is preloaded)
             obj.run()
 
             assert_raises(self, "server.load_model('no-such-egg')",
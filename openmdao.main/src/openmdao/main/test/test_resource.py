@@ -14,6 +14,8 @@ import shutil
 import socket
 import sys
 import tempfile
+import threading
+import time
 import unittest
 
 from openmdao.main.api import Assembly, Component
@@ -36,6 +38,38 @@ class ExtCode(Component):
                      desc='Resources required to run this component.')
 
 
+class FakeAllocator(object):
+    """ Stands in for a cluster host's :class:`LocalAllocator`. """
+
+    def __init__(self, name, load):
+        self.name = name
+        self.load = load
+        self.queries = 0
+
+    def time_estimate(self, resource_desc):
+        self.queries += 1
+        if resource_desc.get('python_version') == '2.999' and \
+           self.name == 'hostB':
+            return (-2, {'python_version': 'want 2.999'})
+        return (0, {'hostnames': [self.name], 'loadavgs': (self.load, 0, 0),
+                    'total_cpus': 1, 'max_load': 2})
+
+    def deploy(self, name, resource_desc, criteria):
+        return name
+
+
+class FakeHost(object):
+    """ Stands in for a :class:`ClusterHost`. """
+
+    def __init__(self, name, load):
+        self.netname = name
+        self.allocator = FakeAllocator(name, load)
+        self.total_cpus = 1
+        self.allocated_cpus = 0
+        self.estimate = None
+        self.incompatible = {}
+
+
 class TestCase(unittest.TestCase):
     """ Test resource allocation. """
 
@@ -111,6 +145,51 @@ class TestCase(unittest.TestCase):
             self.cluster.max_servers({'python_version': '2.999'})
         self.assertEqual(n_servers, 0)
 
+    def test_cluster_estimates(self):
+        logging.debug('')
+        logging.debug('test_cluster_estimates')
+
+        cluster = ClusterAllocator('FakeCluster', monitor_interval=60)
+        host_a = FakeHost('hostA', 0.5)
+        host_b = FakeHost('hostB', 1.)
+        cluster.cluster = [host_a, host_b]
+        try:
+            # Without the monitor each request polls every host.
+            estimate, criteria = cluster.time_estimate({})
+            self.assertEqual((estimate, criteria['host']), (0, host_a))
+            cluster.time_estimate({})
+            self.assertEqual(host_a.allocator.queries, 2)
+
+            cluster._start_monitor()
+            for retry in range(100):
+                if host_b.allocator.queries == 3:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(host_b.allocator.queries, 3)
+
+            # Requests use the monitored estimates, polling only to check
+            # compatibility of new kinds of requests.
+            for retry in range(3):
+                estimate, criteria = \
+                    cluster.time_estimate({'python_version': '2.999'})
+                self.assertEqual((estimate, criteria['host']), (0, host_a))
+            self.assertEqual(host_a.allocator.queries, 4)
+            self.assertEqual(host_b.allocator.queries, 4)
+
+            # Deployments are reflected in the cached loads.
+            estimate, criteria = cluster.time_estimate({})
+            self.assertEqual(cluster.deploy('s1', {}, criteria), 's1')
+            self.assertEqual(host_a.estimate[1]['loadavgs'][0], 1.5)
+            estimate, criteria = cluster.time_estimate({})
+            self.assertEqual(criteria['host'], host_b)
+            cluster.deploy('s2', {}, criteria)
+            self.assertEqual(host_b.estimate[0], -1)
+            estimate, criteria = cluster.time_estimate({})
+            self.assertEqual((estimate, criteria['host']), (0, host_a))
+            self.assertEqual(host_a.allocator.queries, 4)
+        finally:
+            cluster.cluster = None
+
     def test_max_servers(self):
         logging.debug('')
         logging.debug('test_max_servers')
@@ -618,6 +697,113 @@ max_load: 100
                       "Incompatible settings for 'accounting_id':"
                       " 'xyzzy' vs. 'frobozz'")
 
+    def test_allocate_many(self):
+        logging.debug('')
+        logging.debug('test_allocate_many')
+
+        allocator = LocalAllocator('Batch', total_cpus=2, max_load=2,
+                                   authkey='BatchKey', allow_shell=True)
+        RAM.insert_allocator(0, allocator)
+        ram = RAM._get_instance()
+        try:
+            resource_desc = {'allocator': 'Batch'}
+            servers = list(RAM.allocate_many(resource_desc, 2))
+            self.assertEqual(len(set([info['pid'] for server, info
+                                                   in servers])), 2)
+            for server, info in servers:
+                self.assertEqual(server.echo(info['name']), (info['name'],))
+                RAM.release(server)
+
+            # Allocators get no more than max_servers() for min_cpus.
+            plan = ram._plan_allocations({'allocator': 'Batch',
+                                          'min_cpus': 2}, 5)
+            self.assertEqual(plan, [allocator, allocator, None, None, None])
+
+            # Servers not taken are released.
+            allocations = RAM.allocate_many(resource_desc, 2)
+            server, info = allocations.next()
+            for retry in range(100):
+                if len(ram._deployed_servers) == 2:
+                    break
+                time.sleep(0.1)
+            allocations.cancel()
+            self.assertEqual(ram._deployed_servers.keys(), [id(server)])
+            self.assertEqual(list(allocations), [])
+            RAM.release(server)
+
+            # Cancelling wakes waiting threads, and servers deployed
+            # afterwards are released.
+            allocations = RAM.allocate_many(resource_desc, 2)
+            results = []
+            waiter = threading.Thread(target=lambda: results.append(
+                                         next(allocations, (None, None))))
+            waiter.start()
+            allocations.cancel()
+            waiter.join(10)
+            self.assertFalse(waiter.is_alive())
+            if results != [(None, None)]:  # Deployed before cancel.
+                RAM.release(results[0][0])
+            for retry in range(100):
+                if not ram._deployed_servers:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(ram._deployed_servers, {})
+        finally:
+            RAM.remove_allocator('Batch')
+
+    def test_pool(self):
+        logging.debug('')
+        logging.debug('test_pool')
+
+        assert_raises(self, "LocalAllocator('BadPool', pool_size=-1)",
+                      globals(), locals(), ValueError,
+                      "BadPool: pool_size must be >= 0, got -1")
+
+        allocator = LocalAllocator('PoolTest', authkey='PoolKey',
+                                   allow_shell=True, pool_size=1,
+                                   pool_timeout=60)
+        try:
+            # First deployment starts a server and begins filling the pool.
+            server1 = allocator.deploy('server1', {}, {})
+            info = self.wait_for_pool(allocator)
+            self.assertEqual(info['idle'], 1)
+            self.assertEqual(info['misses'], 1)
+
+            # Second deployment is taken from the pool.
+            server2 = allocator.deploy('server2', {}, {})
+            info = allocator.pool_info()
+            self.assertEqual(info['hits'], 1)
+            self.assertEqual(info['hit_rate'], 0.5)
+            self.assertEqual(server2.echo('hello'), ('hello',))
+            self.assertEqual(server2.name, 'server2')
+
+            # Released server is reset and returned to the pool.
+            server2.execute_command(dict(remote_command='touch',
+                                         args=['junk.dat']))
+            self.assertTrue('junk.dat' in server2.listdir('.'))
+            allocator.release(server2)
+            allocator.release(server1)
+            info = self.wait_for_pool(allocator)
+            self.assertEqual(info['idle'], 1)
+
+            server3 = allocator.deploy('server3', {}, {})
+            self.assertFalse('junk.dat' in server3.listdir('.'))
+            allocator.release(server3)
+            self.wait_for_pool(allocator)
+        finally:
+            allocator.clear_pool()
+        self.assertEqual(allocator.pool_info()['idle'], 0)
+
+    @staticmethod
+    def wait_for_pool(allocator):
+        """ Wait for `allocator` to stop filling its pool. """
+        for retry in range(100):
+            info = allocator.pool_info()
+            if not info['filling']:
+                return info
+            time.sleep(0.1)
+        return info
+
 
 if __name__ == '__main__':
     sys.argv.append('--cover-package=openmdao.main')
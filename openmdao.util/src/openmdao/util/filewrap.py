@@ -4,8 +4,12 @@ A collection of utilities for file wrapping.
 Note: This is a work in progress.
 """
 
+import os.path
 import re
 import logging
+from bisect import bisect_right
+from collections import OrderedDict
+from cStringIO import StringIO
 
 from pyparsing import CaselessLiteral, Combine, OneOrMore, Optional, \
                       TokenConverter, Word, nums, oneOf, printables, \
@@ -15,7 +19,8 @@ from openmdao.util.decorators import stub_if_missing_deps
 
 # pylint: disable-msg=E0611,F0401
 try:
-    from numpy import append, array, zeros
+    from numpy import array, asarray, can_cast, concatenate, ravel, \
+                      vstack, zeros
 except ImportError as err:
     logging.warn("In %s: %r" % (__file__, err))
 
@@ -31,71 +36,120 @@ def _getformat(val):
         return "%.16g"
 
 
-class _SubHelper(object):
-    """Replaces file text at the correct word location in a line. This
-    class contains the Helper Function that is passed to re.sub, etc."""
-    
-    def __init__(self):
-        
-        self.newtext = ""
-        self.replace_location = 0
-        self.current_location = 0
-        self.counter = 0
-        self.start_location = 0
-        self.end_location = 0
-        
-    def set(self, newtext, location):
-        """Sets a new word location and value for replacement."""
-        
-        self.newtext = newtext
-        self.replace_location = location
-        self.current_location = 0
-        
-    def set_array(self, newtext, start_location, end_location):
-        """For an array, sets a new starting location, ending location, and
-        value for replacement."""
-        
-        self.newtext = newtext
-        self.start_location = start_location
-        self.end_location = end_location
-        self.current_location = 0
-        
-    def replace(self, text):
-        """This function should be passed to re.sub.
-        Outputs newtext if current_location = replace_location
-        Otherwise, outputs the input text."""
-        
-        self.current_location += 1
-        
-        if self.current_location == self.replace_location:
-            if isinstance(self.newtext, float):
-                return _getformat(self.newtext) % self.newtext
-            else:
-                return str(self.newtext)
-        else:
-            return text.group()
-        
-    def replace_array(self, text):
-        """This function should be passed to re.sub.
-        Outputs newtext if current_location = replace_location
-        Otherwise, outputs the input text."""
-        
-        self.current_location += 1
-        end = len(self.newtext)
-        
-        if self.current_location >= self.start_location and \
-           self.current_location <= self.end_location and \
-           self.counter < end:
-            if isinstance(self.newtext[self.counter], float):
-                val = self.newtext[self.counter]
-                newval = _getformat(val) % val
-            else:
-                newval = str(self.newtext[self.counter])
-            self.counter += 1
-            return newval
-        else:
-            return text.group()
+def _format(val):
+    # Returns the text to insert in a template for a value.
 
+    if isinstance(val, float):
+        return _getformat(val) % val
+    else:
+        return str(val)
+
+
+class _Template(object):
+    """The lines of a template file, along with the fields of each line as
+    split by each delimiter pattern used so far. Templates are shared by
+    all generators using the same template file with the same contents, so
+    a template is only split once no matter how many times it's used."""
+
+    def __init__(self, text):
+
+        self.text = text
+        self.lines = tuple(StringIO(text).readlines())
+        self._splits = {}
+
+    def split(self, splitter, row):
+        """Returns the alternating delimiter and field text of line `row`,
+        as split by the compiled regular expression `splitter`."""
+
+        rows = self._splits.get(splitter.pattern)
+        if rows is None:
+            rows = self._splits[splitter.pattern] = [None]*len(self.lines)
+        tokens = rows[row]
+        if tokens is None:
+            tokens = rows[row] = tuple(splitter.split(self.lines[row]))
+        return tokens
+
+
+_MAX_TEMPLATES = 32
+_TEMPLATES = OrderedDict()  # _Templates by path, least recently used first.
+
+def _read_template(filename):
+    # Returns the _Template for a file, reusing the last one read from the
+    # same path if the contents haven't changed. Only the _MAX_TEMPLATES
+    # most recently used templates are kept.
+
+    infile = open(filename, 'r')
+    text = infile.read()
+    infile.close()
+
+    path = os.path.abspath(filename)
+    template = _TEMPLATES.pop(path, None)
+    if template is None or template.text != text:
+        template = _Template(text)
+
+    _TEMPLATES[path] = template
+    if len(_TEMPLATES) > _MAX_TEMPLATES:
+        _TEMPLATES.popitem(last=False)
+    return template
+
+
+# Literals recognized as inf and nan by FileParser.
+_INF = ['Inf', '-Inf']
+_NAN = ['NaN', 'nan', 'NaN%', 'NaNQ', 'NaNS', 'qNaN', 'sNaN', '1.#SNAN',
+        '1.#QNAN', '-1.#IND']
+
+def _token_regex(textchars, whitechars):
+    # Returns a regular expression that matches the next token of a line the
+    # same way FileParser's pyparsing grammar does. The groups are leading
+    # whitespace, inf, nan, float, integer, and text.
+
+    def literals(words):
+        # Longest first, so no literal masks another that it prefixes.
+        words = sorted(words, key=len, reverse=True)
+        return '|'.join([re.escape(word) for word in words])
+
+    # Like pyparsing, never backtrack into the whitespace (which may
+    # include text characters).
+    white = '[%s]*' % re.escape(whitechars) if whitechars else ''
+    return re.compile(r'(?=(%s))\1' % white +
+                      '(?:(%s)|(%s)' % (literals(_INF), literals(_NAN)) +
+                      r'|([+-]?(?:\d+\.\d*|\.\d+)(?:[eEdD][+-]?\d+)?'
+                      r'|\d+[eEdD][+-]?\d+)'
+                      r'|([+-]?\d+)'
+                      '|([%s]+))' % re.escape(textchars))
+
+_CONVERTERS = (None,
+               None,
+               lambda text: float('inf'),
+               lambda text: float('nan'),
+               lambda text: float(text.upper().replace('D', 'E')),
+               int,
+               str)
+
+
+def _join_all(data, pieces, stack=False):
+    # Returns the same result as joining each of `pieces` in turn onto `data`
+    # with append(), or vstack() if `stack` is True, but without copying the
+    # result for each piece.
+
+    if not pieces:
+        return data
+    if stack:
+        join = vstack
+        data = asarray(data)
+    else:
+        join = concatenate
+        data = ravel(data)
+        pieces = [ravel(piece) for piece in pieces]
+
+    pending = [data]
+    for piece in pieces:
+        if not can_cast(piece.dtype, data.dtype):
+            data = join([join(pending), piece])
+            pending = [data]
+        else:
+            pending.append(piece)
+    return join(pending) if len(pending) > 1 else data
 
 class ToInteger(TokenConverter):
     """Converter for PyParsing that is used to turn a token into an int."""
@@ -126,7 +180,13 @@ class ToInf(TokenConverter):
 class InputFileGenerator(object):
     """Utility to generate an input file from a template.
     Substitution of values is supported. Data is located with
-    a simple API."""
+    a simple API.
+
+    Each line that values are transferred into is split into its fields
+    once, and the fields are reused for later transfers as long as the line
+    isn't replaced. The split template is kept between runs, so
+    regenerating a file from the same template only splits the lines that
+    are used."""
     
     def __init__(self):
         
@@ -135,10 +195,50 @@ class InputFileGenerator(object):
         
         self.delimiter = " "
         self.reg = re.compile('[^ \n]+')
+        self._splitter = re.compile('(' + self.reg.pattern + ')')
         
         self.data = []
         self.current_row = 0
         self.anchored = False
+
+        self._template = None
+        self._fields = {}  # (fields, line) of lines edited, by row.
+
+    def _edit(self, j):
+        # Returns the non-negative index of row `j` and its alternating
+        # delimiter and field text, to be written back with _store().
+        # Fields are reused only while the row still holds the line they
+        # formed, so lines replaced via `data` are split again.
+        line = self.data[j]
+        if j < 0:
+            j += len(self.data)
+        cached = self._fields.get(j)
+        if cached is not None and cached[1] is line:
+            return j, cached[0]
+        template = self._template
+        if template is not None and j < len(template.lines) and \
+           template.lines[j] is line:
+            return j, list(template.split(self._splitter, j))
+        return j, self._splitter.split(line)
+
+    def _store(self, j, fields):
+        # Writes the edited `fields` of row `j` back to the line.
+        line = ''.join(fields)
+        self.data[j] = line
+        self._fields[j] = (fields, line)
+
+    def _replace_fields(self, fields, values, start, end, counter=0):
+        # Replaces fields `start` through `end` (1-based) with `values`,
+        # starting at values[counter]. Returns the new counter.
+        nvalues = len(values)
+        start = max(start, 1)
+        end = min(end, len(fields) // 2)
+        for index in xrange(2*start-1, 2*end, 2):
+            if counter >= nvalues:
+                break
+            fields[index] = _format(values[counter])
+            counter += 1
+        return counter
     
     def set_template_file(self, filename):
         """Set the name of the template file to be used The template
@@ -149,9 +249,10 @@ class InputFileGenerator(object):
         
         self.template_filename = filename
         
-        templatefile = open(filename, 'r')
-        self.data = templatefile.readlines()
-        templatefile.close()
+        template = _read_template(filename)
+        self.data = list(template.lines)
+        self._template = template
+        self._fields = {}
 
     def set_generated_file(self, filename):
         """Set the name of the file that will be generated.
@@ -168,8 +269,10 @@ class InputFileGenerator(object):
         delimiter: str
             A string containing characters to be used as delimiters."""
         
+        self._fields.clear()
         self.delimiter = delimiter
         self.reg = re.compile('[^' + delimiter + '\n]+')
+        self._splitter = re.compile('(' + self.reg.pattern + ')')
         
     def mark_anchor(self, anchor, occurrence=1):
         """Marks the location of a landmark, which lets you describe data by
@@ -188,12 +291,13 @@ class InputFileGenerator(object):
         if not isinstance(occurrence, int):
             raise ValueError("The value for occurrence must be an integer")
         
+        data = self.data
         instance = 0
         if occurrence > 0:
             count = 0
-            max_lines = len(self.data)
+            max_lines = len(data)
             for index in xrange(self.current_row, max_lines):
-                line = self.data[index]
+                line = data[index]
                 
                 # If we are marking a new anchor from an existing anchor, and
                 # the anchor is mid-line, then we still search the line, but
@@ -212,10 +316,10 @@ class InputFileGenerator(object):
                 count += 1
                 
         elif occurrence < 0:
-            max_lines = len(self.data)-1
+            max_lines = len(data)-1
             count = max_lines
             for index in xrange(max_lines, -1, -1):
-                line = self.data[index]
+                line = data[index]
                 
                 # If we are marking a new anchor from an existing anchor, and
                 # the anchor is mid-line, then we still search the line, but
@@ -252,14 +356,10 @@ class InputFileGenerator(object):
         
         field - which word in line to replace, as denoted by delimiter(s)"""
 
-        j = self.current_row + row
-        line = self.data[j]
-        
-        sub = _SubHelper()
-        sub.set(value, field)
-        newline = re.sub(self.reg, sub.replace, line)
-        
-        self.data[j] = newline
+        j, fields = self._edit(self.current_row + row)
+        if field >= 1 and 2*field-1 < len(fields):
+            fields[2*field-1] = _format(value)
+            self._store(j, fields)
         
     def transfer_array(self, value, row_start, field_start, field_end,
                        row_end=None, sep=", "):
@@ -292,39 +392,37 @@ class InputFileGenerator(object):
         if row_end == None:
             row_end = row_start
             
-        sub = _SubHelper()
+        counter = 0
         for row in range(row_start, row_end+1):
             
-            j = self.current_row + row
-            line = self.data[j]
+            j, fields = self._edit(self.current_row + row)
 
             if row == row_end:
                 f_end = field_end
             else:
                 f_end = 99999
-            sub.set_array(value, field_start, f_end)
+            counter = self._replace_fields(fields, value, field_start, f_end,
+                                           counter)
             field_start = 0
+            self._store(j, fields)
             
-            newline = re.sub(self.reg, sub.replace_array, line)
-            self.data[j] = newline
-            
+        newline = self.data[j]
+
         # Sometimes an array is too large for the example in the template
         # This is resolved by adding more fields at the end
-        if sub.counter < len(value):
-            for val in value[sub.counter:]:
+        if counter < len(value):
+            for val in value[counter:]:
                 newline = newline.rstrip() + sep + str(val)
-        
-            self.data[j] = newline
             
         # Sometimes an array is too small for the template
         # This is resolved by removing fields
-        elif sub.counter > len(value):
+        elif counter > len(value):
             
             # TODO - Figure out how to handle this.
             # Ideally, we'd remove the extra field placeholders
             raise ValueError("Array is too small for the template.")
         
-        self.data[j] += "\n"
+        self.data[j] = newline + "\n"
         
     def transfer_2Darray(self, value, row_start, row_end, field_start,
                        field_end, sep=", "):
@@ -353,20 +451,12 @@ class InputFileGenerator(object):
         sep: str (optional) (currently unsupported)
             Separator to append between values if we go beyond the template."""
 
-        sub = _SubHelper()
         i = 0
         for row in range(row_start, row_end+1):
             
-            j = self.current_row + row
-            line = self.data[j]
-
-            sub.set_array(value[i, :], field_start, field_end)
-            
-            newline = re.sub(self.reg, sub.replace_array, line)
-            self.data[j] = newline
-            
-            sub.current_location = 0
-            sub.counter = 0
+            j, fields = self._edit(self.current_row + row)
+            self._replace_fields(fields, value[i, :], field_start, field_end)
+            self._store(j, fields)
             i += 1
             
         # TODO - Note, we currently can't handle going beyond the end of
@@ -390,7 +480,13 @@ class InputFileGenerator(object):
 
 @stub_if_missing_deps('numpy')
 class FileParser(object):
-    """Utility to locate and read data from a file."""
+    """Utility to locate and read data from a file.
+
+    Lines are tokenized with a regular expression equivalent to the
+    pyparsing grammar returned by ``_parse_line()``, and each line is
+    tokenized at most once unless it is replaced. Anchors are found by
+    searching the whole file text, so locating and reading data is linear
+    in the size of the file."""
     
     def __init__(self, end_of_line_comment_char=None, full_line_comment_char=None):
         
@@ -404,6 +500,10 @@ class FileParser(object):
         self.current_row = 0
         self.anchored = False
         self._reset_tokens()
+
+        self._joined = None  # Lines joined into _text.
+        self._text = None    # All lines joined, for anchor searches.
+        self._starts = None  # Offset of each line in _text.
         
     def set_file(self, filename):
         """Set the name of the file that will be generated.
@@ -457,55 +557,72 @@ class FileParser(object):
         if not isinstance(occurrence, int):
             raise ValueError("The value for occurrence must be an integer")
         
-        instance = 0
         if occurrence > 0:
-            count = 0
-            max_lines = len(self.data)
-            for index in xrange(self.current_row, max_lines):
-                line = self.data[index]
-            
-                # If we are marking a new anchor from an existing anchor, and
-                # the anchor is mid-line, then we still search the line, but
-                # only after the anchor.
-                if count == 0 and self.anchored:
-                    line = line.split(anchor)[-1]
-                
-                if anchor in line:
-                    
-                    instance += 1
-                    if instance == occurrence:
-                        self.current_row += count
-                        self.anchored = True
-                        return
-            
-                count += 1
-                
+            # The anchor row itself is excluded when searching from an anchor.
+            first = self.current_row + 1 if self.anchored else self.current_row
+            row = self._find_anchor(anchor, first, len(self.data), occurrence)
         elif occurrence < 0:
-            max_lines = len(self.data)-1
-            count = max_lines
-            for index in xrange(max_lines, -1, -1):
-                line = self.data[index]
-                
-                # If we are marking a new anchor from an existing anchor, and
-                # the anchor is mid-line, then we still search the line, but
-                # only before the anchor.
-                if count == max_lines and self.anchored:
-                    line = line.split(anchor)[0]
-
-                if anchor in line:
-                    instance += -1
-                    if instance == occurrence:
-                        self.current_row = count
-                        self.anchored = True
-                        return
-            
-                count -= 1
+            # The last row is excluded when searching from an anchor.
+            end = len(self.data)-1 if self.anchored else len(self.data)
+            row = self._find_anchor(anchor, 0, end, occurrence)
         else:
             raise ValueError("0 is not valid for an anchor occurrence.")
+
+        if row is not None:
+            self.current_row = row
+            self.anchored = True
+            return
             
         raise RuntimeError("Could not find pattern %s in output file %s" % \
                            (anchor, self.filename))
         
+    def _find_anchor(self, anchor, first, end, occurrence):
+        # Returns the row containing the `occurrence` instance of `anchor`
+        # in rows `first` up to `end`, counting each row once. Negative
+        # occurrences count back from `end`. Returns None if not found.
+        # Comparing lists checks identity first, so this is quick unless
+        # lines have been replaced.
+        if self._joined != self.data:
+            self._joined = list(self.data)
+            self._text = ''.join(self.data)
+            starts = [0]*(len(self.data)+1)
+            offset = 0
+            for i, line in enumerate(self.data):
+                offset += len(line)
+                starts[i+1] = offset
+            self._starts = starts
+
+        text = self._text
+        starts = self._starts
+        size = len(anchor)
+        if first >= end:
+            return None
+        low = starts[first]
+        high = starts[end]
+        while True:
+            if occurrence > 0:
+                pos = text.find(anchor, low, high)
+            else:
+                pos = text.rfind(anchor, low, high)
+            if pos < 0:
+                return None
+            row = bisect_right(starts, pos, first, end+1) - 1
+            if pos + size > starts[row+1]:
+                # Match spans lines, keep looking.
+                if occurrence > 0:
+                    low = pos + 1
+                else:
+                    high = pos + size - 1
+                continue
+            if occurrence > 0:
+                occurrence -= 1
+                low = starts[row+1]
+            else:
+                occurrence += 1
+                high = starts[row]
+            if occurrence == 0:
+                return row
+
     def reset_anchor(self):
         """Resets anchor to the beginning of the file."""
         
@@ -560,7 +677,7 @@ class FileParser(object):
             
             # Let pyparsing figure out if this is a number, and return it
             # as a float or int as appropriate
-            data = self._parse_line().parseString(line)
+            data = self._parse(line)
             
             # data might have been split if it contains whitespace. If so,
             # just return the whole string
@@ -569,7 +686,7 @@ class FileParser(object):
             else:
                 return data[0]
         else:
-            data = self._parse_line().parseString(line)
+            data = self._parse_row(j)
             return data[field-1]
 
     def transfer_keyvar(self, key, field, occurrence=1, rowoffset=0):
@@ -619,7 +736,7 @@ class FileParser(object):
         j = self.current_row + row + rowoffset
         line = self.data[j]
         
-        fields = self._parse_line().parseString(line.replace(key,"KeyField"))
+        fields = self._parse(line.replace(key,"KeyField"))
         
         return fields[field]
 
@@ -654,20 +771,20 @@ class FileParser(object):
         if not fieldend:
             raise ValueError("fieldend is missing, currently required")
             
-        lines = self.data[j1:j2]
+        rows = range(*slice(j1, j2).indices(len(self.data)))
 
-        data = zeros(shape=(0, 0))
+        pieces = []
 
-        for i, line in enumerate(lines):
+        for i, j in enumerate(rows):
             if self.delimiter == "columns":
-                line = line[(fieldstart-1):fieldend]
+                line = self.data[j][(fieldstart-1):fieldend]
                 
                 # Stripping whitespace may be controversial.
                 line = line.strip()
                 
                 # Let pyparsing figure out if this is a number, and return it
                 # as a float or int as appropriate
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse(line)
                 
                 newdata = array(parsed[:])
                 # data might have been split if it contains whitespace. If the
@@ -675,17 +792,17 @@ class FileParser(object):
                 if '|S' in str(newdata.dtype):
                     newdata = array(line)
                     
-                data = append(data, newdata)
+                pieces.append(newdata)
                 
             else:
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse_row(j)
                 if i == j2-j1-1:
-                    data = append(data, array(parsed[(fieldstart-1):fieldend]))
+                    pieces.append(array(parsed[(fieldstart-1):fieldend]))
                 else:
-                    data = append(data, array(parsed[(fieldstart-1):]))
+                    pieces.append(array(parsed[(fieldstart-1):]))
                 fieldstart = 1
                 
-        return data
+        return _join_all(zeros(shape=(0, 0)), pieces)
         
     def transfer_2Darray(self, rowstart, fieldstart, rowend, fieldend=None):
         """Grabs a 2D array of variables relative to the current anchor. Each
@@ -719,7 +836,8 @@ class FileParser(object):
             
         j1 = self.current_row + rowstart
         j2 = self.current_row + rowend + 1
-        lines = list(self.data[j1:j2])
+        rows = range(*slice(j1, j2).indices(len(self.data)))
+        lines = [self.data[j] for j in rows]
         
         if self.delimiter == "columns":
             
@@ -728,7 +846,7 @@ class FileParser(object):
             else:
                 line = lines[0][(fieldstart-1):]
                 
-            parsed = self._parse_line().parseString(line)
+            parsed = self._parse(line)
             row = array(parsed[:])
             data = zeros(shape=(abs(j2-j1), len(row)))
             data[0, :] = row
@@ -739,11 +857,11 @@ class FileParser(object):
                 else:
                     line = line[(fieldstart-1):]
                 
-                parsed = self._parse_line().parseString(line)
+                parsed = self._parse(line)
                 data[i+1, :] = array(parsed[:])
                 
         else:
-            parsed = self._parse_line().parseString(lines[0])
+            parsed = self._parse_row(rows[0])
             if fieldend:
                 row = array(parsed[(fieldstart-1):fieldend])
             else:
@@ -752,8 +870,8 @@ class FileParser(object):
             data = zeros(shape=(abs(j2-j1), len(row)))
             data[0, :] = row
     
-            for i, line in enumerate(list(lines[1:])):
-                parsed = self._parse_line().parseString(line)
+            for i, j in enumerate(rows[1:]):
+                parsed = self._parse_row(j)
                 
                 if fieldend:
                     try:
@@ -765,6 +883,38 @@ class FileParser(object):
         
         return data
     
+    def _parse(self, line):
+        """Returns the tokens of a line, the same as
+        ``self._parse_line().parseString(line)`` but without the overhead
+        of pyparsing."""
+
+        tokens = []
+        match = self._token_regex.scanner(line.expandtabs()).match
+        found = match()
+        while found is not None:
+            kind = found.lastindex
+            tokens.append(_CONVERTERS[kind](found.group(kind)))
+            found = match()
+
+        if not tokens:
+            # Let pyparsing report the error.
+            return self._parse_line().parseString(line)
+        return tokens
+
+    def _parse_row(self, j):
+        """Returns the tokens of row `j`, parsing it only once unless the
+        line is replaced."""
+
+        line = self.data[j]
+        if j < 0:
+            j += len(self.data)
+        cached = self._parsed.get(j)
+        if cached is not None and cached[0] is line:
+            return cached[1]
+        tokens = self._parse(line)
+        self._parsed[j] = (line, tokens)
+        return tokens
+
     def _parse_line(self):
         """Parse a single data line that may contain string or numerical data.
         Float and Int 'words' are converted to their appropriate type. 
@@ -817,5 +967,11 @@ class FileParser(object):
             
         self.line_parse_token = ( OneOrMore( (nan | num_float | mixed_exp | num_int |
                                               string_text) ) )
+
+        # Equivalent regular expression for _parse(). The whitespace is
+        # whatever pyparsing used for the elements above.
+        self._token_regex = _token_regex(textchars,
+                                         ParserElement.DEFAULT_WHITE_CHARS)
+        self._parsed = {}  # (line, tokens) of lines parsed so far, by row.
          
 
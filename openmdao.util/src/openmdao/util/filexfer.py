@@ -1,13 +1,19 @@
 import fnmatch
 import glob
+import hashlib
 import os
+import Queue
 import sys
+import tempfile
+import threading
 import zipfile
+import zlib
 
 from openmdao.util.log import NullLogger
 
 
-def filexfer(src_server, src_path, dst_server, dst_path, mode=''):
+def filexfer(src_server, src_path, dst_server, dst_path, mode='',
+             parallel=4, compress=False, chunk_size=1 << 20):
     """
     Transfer a file from one place to another.
 
@@ -16,6 +22,13 @@ def filexfer(src_server, src_path, dst_server, dst_path, mode=''):
     respective object must support :meth:`open`, :meth:`stat`, and
     :meth:`chmod`.
 
+    If both ends also support :meth:`read_chunk`, :meth:`write_chunk`, and
+    :meth:`chunk_digests` (as :class:`ObjServer` does) and `mode` is binary,
+    the file is sent in `chunk_size` blocks over up to `parallel` connections,
+    with each block verified by its CRC-32. Blocks whose MD5 digest already
+    matches at the destination are not sent, so an interrupted transfer
+    resumes where it left off and a modified file only sends changed blocks.
+
     After the copy has completed, permission bits from :meth:`stat` are set
     via :meth:`chmod`.
 
@@ -33,7 +46,46 @@ def filexfer(src_server, src_path, dst_server, dst_path, mode=''):
 
     mode: string
         Mode settings for :func:`open`, not including 'r' or 'w'.
+
+    parallel: int
+        Maximum number of concurrent block transfers.
+
+    compress: bool
+        If True, blocks are compressed (when that makes them smaller).
+
+    chunk_size: int
+        Size of blocks for block transfers.
     """
+    if 'b' in mode and _has_chunks(src_server) and _has_chunks(dst_server):
+        _chunk_xfer(src_server, src_path, dst_server, dst_path,
+                    parallel, compress, chunk_size)
+    else:
+        _stream_xfer(src_server, src_path, dst_server, dst_path, mode)
+
+    if src_server is None:
+        mode = os.stat(src_path).st_mode
+    else:
+        mode = src_server.stat(src_path).st_mode
+    if dst_server is None:
+        os.chmod(dst_path, mode)
+    else:
+        dst_server.chmod(dst_path, mode)
+
+
+def _has_chunks(server):
+    """ Returns True if `server` supports block transfers. """
+    if server is None:
+        return True
+    try:
+        for name in ('read_chunk', 'write_chunk', 'chunk_digests'):
+            getattr(server, name)
+    except AttributeError:
+        return False
+    return True
+
+
+def _stream_xfer(src_server, src_path, dst_server, dst_path, mode):
+    """ Copy via :meth:`open` handles. """
     if src_server is None:
         src_file = open(src_path, 'r'+mode)
     else:
@@ -60,14 +112,199 @@ def filexfer(src_server, src_path, dst_server, dst_path, mode=''):
     finally:
         src_file.close()
 
-    if src_server is None:
-        mode = os.stat(src_path).st_mode
-    else:
-        mode = src_server.stat(src_path).st_mode
-    if dst_server is None:
-        os.chmod(dst_path, mode)
-    else:
-        dst_server.chmod(dst_path, mode)
+
+def _chunk_xfer(src_server, src_path, dst_server, dst_path,
+                parallel, compress, chunk_size):
+    """ Copy changed blocks, possibly concurrently. """
+    src = _ChunkAccess(src_server)
+    dst = _ChunkAccess(dst_server)
+
+    size = src.stat(src_path).st_size
+    nchunks = (size + chunk_size - 1) // chunk_size
+    offsets = [i*chunk_size for i in range(nchunks)]
+
+    # Skip blocks already at the destination.
+    dst_digests = dst.chunk_digests(dst_path, chunk_size)
+    if dst_digests:
+        src_digests = src.chunk_digests(src_path, chunk_size)
+        offsets = [offset for offset, digest in zip(offsets, src_digests)
+                   if offset//chunk_size >= len(dst_digests) or
+                      dst_digests[offset//chunk_size] != digest]
+        if not offsets and len(dst_digests) != nchunks:
+            # Just need to truncate.
+            offsets = [(nchunks-1)*chunk_size] if nchunks else [0]
+    elif not offsets:
+        offsets = [0]  # Create empty file.
+
+    def copy_chunk(offset):
+        """ Copy one block. """
+        data, compressed, checksum = \
+            src.read_chunk(src_path, offset, chunk_size, compress)
+        dst.write_chunk(dst_path, offset, data, compressed, checksum, size)
+
+    nthreads = min(parallel, len(offsets))
+    if nthreads <= 1:
+        for offset in offsets:
+            copy_chunk(offset)
+        return
+
+    # Each thread has its own connection to a remote server.
+    todo = Queue.Queue()
+    for offset in offsets:
+        todo.put(offset)
+    errors = []
+
+    def worker():
+        """ Copy blocks until done or some thread fails. """
+        while not errors:
+            try:
+                offset = todo.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                copy_chunk(offset)
+            except Exception as exc:
+                errors.append(exc)
+
+    # Remote access credentials are kept on the thread (see rbac).
+    credentials = getattr(threading.current_thread(), 'credentials', None)
+    threads = []
+    for i in range(nthreads):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        if credentials is not None:
+            thread.credentials = credentials
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+class _ChunkAccess(object):
+    """ Block access to local files or via a server. """
+
+    def __init__(self, server):
+        self.server = server
+
+    def stat(self, path):
+        """ Returns file status. """
+        if self.server is None:
+            return os.stat(path)
+        return self.server.stat(path)
+
+    def chunk_digests(self, path, chunk_size):
+        """ Returns block digests. """
+        if self.server is None:
+            return chunk_digests(path, chunk_size)
+        return self.server.chunk_digests(path, chunk_size)
+
+    def read_chunk(self, path, offset, size, compress):
+        """ Returns ``(data, compressed, checksum)``. """
+        if self.server is None:
+            return read_chunk(path, offset, size, compress)
+        return self.server.read_chunk(path, offset, size, compress)
+
+    def write_chunk(self, path, offset, data, compressed, checksum, size):
+        """ Writes a block. """
+        if self.server is None:
+            return write_chunk(path, offset, data, compressed, checksum, size)
+        return self.server.write_chunk(path, offset, data, compressed,
+                                       checksum, size)
+
+
+def chunk_digests(path, chunk_size):
+    """
+    Returns a list of MD5 digests for each `chunk_size` block of
+    file `path`, or an empty list if `path` does not exist.
+
+    path: string
+        Name of file to scan.
+
+    chunk_size: int
+        Size of blocks.
+    """
+    if not os.path.exists(path):
+        return []
+    digests = []
+    with open(path, 'rb') as inp:
+        data = inp.read(chunk_size)
+        while data:
+            digests.append(hashlib.md5(data).digest())
+            data = inp.read(chunk_size)
+    return digests
+
+
+def read_chunk(path, offset, size, compress=False):
+    """
+    Returns ``(data, compressed, checksum)`` for up to `size` bytes of file
+    `path` starting at `offset`. `checksum` is the CRC-32 of the
+    uncompressed data. If `compress` is True, `data` is compressed with
+    :mod:`zlib` if that makes it smaller, as indicated by `compressed`.
+
+    path: string
+        Name of file to read.
+
+    offset: int
+        Starting position.
+
+    size: int
+        Maximum number of bytes to read.
+
+    compress: bool
+        If True, try compressing the data.
+    """
+    with open(path, 'rb') as inp:
+        inp.seek(offset)
+        data = inp.read(size)
+    checksum = zlib.crc32(data) & 0xffffffff
+    if compress:
+        packed = zlib.compress(data, 1)  # Fast.
+        if len(packed) < len(data):
+            return (packed, True, checksum)
+    return (data, False, checksum)
+
+
+def write_chunk(path, offset, data, compressed, checksum, size):
+    """
+    Write `data` from :func:`read_chunk` to file `path` at `offset`,
+    creating the file if necessary, and set the file's length to `size`.
+    Raises :class:`ValueError` if the data doesn't match `checksum`.
+    Safe to call concurrently for different blocks.
+
+    path: string
+        Name of file to write.
+
+    offset: int
+        Starting position.
+
+    data: string
+        Data to write.
+
+    compressed: bool
+        If True, `data` is compressed.
+
+    checksum: int
+        CRC-32 of uncompressed data.
+
+    size: int
+        Final size of file.
+    """
+    if compressed:
+        data = zlib.decompress(data)
+    if zlib.crc32(data) & 0xffffffff != checksum:
+        raise ValueError('%r: checksum mismatch at offset %d'
+                         % (path, offset))
+    # Create without truncating, other blocks may be written concurrently.
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0),
+                 0666)
+    with os.fdopen(fd, 'r+b') as out:
+        out.seek(0, os.SEEK_END)
+        if out.tell() != size:
+            out.truncate(size)
+        out.seek(offset)
+        out.write(data)
 
 
 def pack_zipfile(patterns, filename, logger=None):
@@ -168,6 +405,217 @@ def unpack_zipfile(filename, logger=None, textfiles=None):
     return (nfiles, nbytes)
 
 
+def zipfile_manifest(filename):
+    """
+    Returns a list of ``(name, digest, size, external_attr)`` for each member
+    of 'zip' file `filename`, where `digest` is the SHA-1 hex digest of the
+    uncompressed member data. Used to find which members are already in a
+    :class:`ZipCache`.
+
+    filename: string
+        Name of zip file to scan.
+    """
+    manifest = []
+    with zipfile.ZipFile(filename, 'r', allowZip64=True) as zipped:
+        for info in zipped.infolist():
+            sha1 = hashlib.sha1()
+            inp = zipped.open(info)
+            try:
+                data = inp.read(1 << 20)
+                while data:
+                    sha1.update(data)
+                    data = inp.read(1 << 20)
+            finally:
+                inp.close()
+            manifest.append((info.filename, sha1.hexdigest(), info.file_size,
+                             info.external_attr))
+    return manifest
+
+
+def select_zipfile(src, dst, names):
+    """
+    Create 'zip' file `dst` containing just the members of `src` in `names`.
+    Returns ``(nfiles, nbytes)``.
+
+    src: string
+        Name of zip file to copy from.
+
+    dst: string
+        Name of zip file to create.
+
+    names: list
+        Names of members to copy.
+    """
+    names = set(names)
+    nfiles = 0
+    nbytes = 0
+    with zipfile.ZipFile(src, 'r', allowZip64=True) as inp:
+        with zipfile.ZipFile(dst, 'w', zipfile.ZIP_DEFLATED, True) as out:
+            for info in inp.infolist():
+                if info.filename in names:
+                    out.writestr(info, inp.read(info))
+                    nfiles += 1
+                    nbytes += info.file_size
+    return (nfiles, nbytes)
+
+
+class ZipCache(object):
+    """
+    Content-addressed store of 'zip' file members, shared by all processes
+    of a user on a host. Members are kept uncompressed, named by the SHA-1
+    digest of their data, so unchanged members of successive eggs need only
+    be transferred once.
+
+    path: string
+        Directory for the cache. If None, ``~/.openmdao/zipcache`` is used.
+
+    max_size: int
+        Total bytes to keep. Least recently used members are removed
+        when this is exceeded.
+    """
+
+    def __init__(self, path=None, max_size=4 << 30):
+        if path is None:
+            path = os.path.join('~', '.openmdao', 'zipcache')
+        self.path = os.path.expanduser(path)
+        self.max_size = max_size
+        if not os.path.exists(self.path):
+            try:
+                os.makedirs(self.path)
+            except OSError:  # Another process created it.
+                if not os.path.isdir(self.path):
+                    raise
+
+    def _member_path(self, digest):
+        """ Returns path to cached data for `digest`. """
+        return os.path.join(self.path, digest)
+
+    def missing(self, manifest):
+        """
+        Returns names of members in `manifest` which are not cached.
+
+        manifest: list
+            As returned by :func:`zipfile_manifest`.
+        """
+        return [entry[0] for entry in manifest
+                if not os.path.exists(self._member_path(entry[1]))]
+
+    def add_zipfile(self, filename, manifest, logger=None):
+        """
+        Add those members of 'zip' file `filename` listed in `manifest`
+        to the cache. Each member's digest is checked against `manifest`.
+        Returns ``(nfiles, nbytes)`` added.
+
+        filename: string
+            Name of zip file to read.
+
+        manifest: list
+            As returned by :func:`zipfile_manifest`.
+
+        logger: Logger
+            Used for recording progress.
+        """
+        logger = logger or NullLogger()
+        digests = dict([(entry[0], entry[1]) for entry in manifest])
+        nfiles = 0
+        nbytes = 0
+        with zipfile.ZipFile(filename, 'r', allowZip64=True) as zipped:
+            for info in zipped.infolist():
+                digest = digests.get(info.filename)
+                if digest is None or \
+                   os.path.exists(self._member_path(digest)):
+                    continue
+                logger.debug('caching %r (%d)...', info.filename,
+                             info.file_size)
+                # Write to a temporary name so other processes never see
+                # partial data.
+                fd, tmp = tempfile.mkstemp(dir=self.path, prefix='.tmp-')
+                try:
+                    sha1 = hashlib.sha1()
+                    with os.fdopen(fd, 'wb') as out:
+                        inp = zipped.open(info)
+                        try:
+                            data = inp.read(1 << 20)
+                            while data:
+                                sha1.update(data)
+                                out.write(data)
+                                data = inp.read(1 << 20)
+                        finally:
+                            inp.close()
+                    if sha1.hexdigest() != digest:
+                        raise ValueError('%r: digest mismatch for %r'
+                                         % (filename, info.filename))
+                    os.rename(tmp, self._member_path(digest))
+                except Exception:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    raise
+                nfiles += 1
+                nbytes += info.file_size
+        if nfiles:
+            self.prune()
+        return (nfiles, nbytes)
+
+    def build_zipfile(self, filename, manifest, logger=None):
+        """
+        Create 'zip' file `filename` from cached members in `manifest`.
+        Members are stored uncompressed since the file is local.
+        Returns ``(nfiles, nbytes)``.
+
+        filename: string
+            Name of zip file to create.
+
+        manifest: list
+            As returned by :func:`zipfile_manifest`.
+
+        logger: Logger
+            Used for recording progress.
+        """
+        logger = logger or NullLogger()
+        missing = self.missing(manifest)
+        if missing:
+            raise ValueError('%d members not cached, first is %r'
+                             % (len(missing), missing[0]))
+        nfiles = 0
+        nbytes = 0
+        with zipfile.ZipFile(filename, 'w', zipfile.ZIP_STORED, True) as out:
+            for name, digest, size, external_attr in manifest:
+                logger.debug('restoring %r (%d)...', name, size)
+                path = self._member_path(digest)
+                os.utime(path, None)  # Mark as recently used.
+                out.write(path, name)
+                # write() takes attributes from the cache file, but only
+                # the central directory records them, so fix them here.
+                out.getinfo(name).external_attr = external_attr
+                nfiles += 1
+                nbytes += size
+        return (nfiles, nbytes)
+
+    def prune(self):
+        """ Remove least recently used members until within `max_size`. """
+        entries = []
+        total = 0
+        for name in os.listdir(self.path):
+            if name.startswith('.tmp-'):
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                info = os.stat(path)
+            except OSError:  # Removed by another process.
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+            total += info.st_size
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:  # Removed by another process.
+                pass
+            total -= size
+
+
 def translate_newlines(filename):
     """
     Translate the newlines of `filename` to the local standard.
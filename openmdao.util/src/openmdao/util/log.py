@@ -48,8 +48,12 @@ import SocketServer
 import struct
 import sys
 import threading
+import time
+import zlib
 import datetime
 
+from collections import deque
+
 LOG_DEBUG    = logging.DEBUG
 LOG_INFO     = logging.INFO
 LOG_WARNING  = logging.WARNING
@@ -297,9 +301,28 @@ class NullLogger(object):
 
 _REMOTE_HANDLERS = {}  # Logging handler(s) installed by the process.
 
+# What a remote handler does with records when its queue is full:
+# 'aggregate' drops them but reports how many were dropped,
+# 'drop' just drops them, and 'block' waits for room in the queue.
+REMOTE_LOG_POLICY = os.environ.get('OPENMDAO_REMOTE_LOG_POLICY', 'aggregate')
+
+# Maximum number of records queued by a remote handler.
+REMOTE_LOG_QUEUE = int(os.environ.get('OPENMDAO_REMOTE_LOG_QUEUE', '10000'))
+
+# Flag in the length word of a remote logging frame marking a compressed batch.
+_BATCH_FLAG = 0x80000000
+
+# Standard record attributes, which can be pickled once msg, args, and
+# exc_info are replaced. Others come from `extra` and are sent as is only
+# if they have one of the plain types.
+_RECORD_ATTRS = frozenset(logging.LogRecord('', 0, '', 0, '', (), None)
+                          .__dict__.keys() + ['message', 'asctime', 'prefix'])
+_PLAIN_TYPES = (basestring, int, long, float, bool, type(None))
+
 
 # Called by the remote process.
-def install_remote_handler(host, port, prefix=None):  # pragma no cover
+def install_remote_handler(host, port, prefix=None, policy=None,
+                           max_queued=None):  # pragma no cover
     """
     Installs a handler for logging to `host` on `port` with `prefix`.
     Returns True if connecting to the remote host was successful.
@@ -313,9 +336,21 @@ def install_remote_handler(host, port, prefix=None):  # pragma no cover
     prefix: string
         Added to the log record for use on `host`.
         The default prefix is ``pid@hostname``.
+
+    policy: string
+        What to do with records when the queue is full, one of
+        'aggregate', 'drop', or 'block'. Default :data:`REMOTE_LOG_POLICY`.
+
+    max_queued: int
+        Maximum number of records waiting to be sent.
+        Default :data:`REMOTE_LOG_QUEUE`.
     """
     if prefix is None:
         prefix = '%s@%s' % (os.getpid(), socket.gethostname())
+    if policy is None:
+        policy = REMOTE_LOG_POLICY
+    if max_queued is None:
+        max_queued = REMOTE_LOG_QUEUE
 
     try:
         sock = socket.create_connection((host, port))
@@ -325,7 +360,7 @@ def install_remote_handler(host, port, prefix=None):  # pragma no cover
         return False
     sock.close()
 
-    handler = _RemoteHandler(host, port, prefix)
+    handler = _RemoteHandler(host, port, prefix, policy, max_queued)
     root = logging.getLogger()
     root.addHandler(handler)
 
@@ -361,24 +396,197 @@ def remove_remote_handlers():  # pragma no cover
         del _REMOTE_HANDLERS[pid]
 
 
+# Called by the remote process.
+def rename_remote_handlers(prefix):  # pragma no cover
+    """
+    Change the prefix added by installed remote handlers to `prefix`.
+
+    prefix: string
+        Added to the log record for use on the receiving host.
+    """
+    for handler in _REMOTE_HANDLERS.get(os.getpid(), ()):
+        handler.prefix = prefix
+
+
 # Used by the remote process.
-class _RemoteHandler(logging.handlers.SocketHandler):  # pragma no cover
-    """ Handler which adds a ``prefix`` attribute to the log record. """
+class _RemoteHandler(logging.Handler):
+    """
+    Handler which adds a ``prefix`` attribute to the log record and sends
+    records to `host` on `port`. Records are queued and sent by a background
+    thread in compressed batches, so logging doesn't wait on the network.
+
+    host: string
+        Host to send log requests to.
+
+    port: int
+        Port on `host` to send log requests to.
+
+    prefix: string
+        Added to the log record for use on `host`.
+
+    policy: string
+        What to do with records when the queue is full. 'aggregate' drops
+        them and later sends a warning with the number dropped per logger
+        and level, 'drop' just drops them, and 'block' waits for room.
 
-    def __init__(self, host, port, prefix):
+    max_queued: int
+        Maximum number of records waiting to be sent.
+
+    batch_size: int
+        Number of queued records which triggers sending a batch.
+
+    interval: float
+        Maximum seconds a record waits before being sent.
+    """
+
+    _policies = ('aggregate', 'drop', 'block')
+
+    def __init__(self, host, port, prefix, policy='aggregate', max_queued=10000,
+                 batch_size=500, interval=0.1):
+        if policy not in self._policies:
+            raise ValueError('Invalid remote logging policy %r, expecting'
+                             ' one of %s' % (policy, self._policies))
+        logging.Handler.__init__(self)
+        self.host = host
+        self.port = port
         self.prefix = prefix
-        logging.handlers.SocketHandler.__init__(self, host, port)
+        self.policy = policy
+        self.max_queued = max_queued
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0  # Total records dropped.
+
+        self._queue = deque()
+        self._aggregated = {}  # Dropped counts keyed by (name, levelno).
+        self._aggregated_lock = threading.Lock()
+        self._room = threading.Condition()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._sock = None
+        self._retry_time = 0
+        self._thread = threading.Thread(name='remote-log-sender',
+                                        target=self._send_loop)
+        self._thread.daemon = True
+        self._thread.start()
 
-    def handle(self, record):
+    def emit(self, record):
         """
-        Add ``prefix`` attribute to `record` and format locally
-        to avoid problems with object types which may not be handled
-        well at the remote end.
+        Queue `record` for sending. It is formatted here to avoid problems
+        with object types which may not be handled well at the remote end.
+        Extra attributes which aren't plain values are sent as their repr().
         """
-        record.prefix = self.prefix
-        record.msg = record.getMessage()
-        record.args = None
-        logging.handlers.SocketHandler.handle(self, record)
+        if len(self._queue) >= self.max_queued:
+            if self.policy == 'block':
+                with self._room:
+                    while len(self._queue) >= self.max_queued and \
+                          self._thread.is_alive():
+                        self._wakeup.set()
+                        self._room.wait(1)
+            else:
+                self.dropped += 1
+                if self.policy == 'aggregate':
+                    key = (record.name, record.levelno)
+                    with self._aggregated_lock:
+                        self._aggregated[key] = \
+                            self._aggregated.get(key, 0) + 1
+                return
+        try:
+            if record.exc_info:
+                self.format(record)  # Just to get exc_text filled in.
+            data = dict(record.__dict__)
+            data['msg'] = record.getMessage()
+            data['args'] = None
+            data['exc_info'] = None
+            data['prefix'] = self.prefix
+            for key, value in data.items():
+                if key not in _RECORD_ATTRS and \
+                   not isinstance(value, _PLAIN_TYPES):
+                    data[key] = repr(value)
+        except Exception:
+            self.handleError(record)
+        else:
+            self._queue.append(data)
+            if len(self._queue) >= self.batch_size:
+                self._wakeup.set()
+
+    def flush(self):
+        """ Have queued records sent soon. """
+        self._wakeup.set()
+
+    def close(self):
+        """ Send remaining queued records, then close the connection. """
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(5)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        logging.Handler.close(self)
+
+    def _send_loop(self):
+        """
+        Send batches of queued records until closed. A batch which can't be
+        sent for any reason is dropped, rather than ending the thread.
+        """
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            closed = self._closed
+            while self._queue or self._aggregated:
+                batch = []
+                try:
+                    while self._queue and len(batch) < self.batch_size:
+                        batch.append(self._queue.popleft())
+                    with self._room:
+                        self._room.notify_all()
+                    if self._aggregated:
+                        batch.extend(self._dropped_records())
+                    self._send(batch)
+                except Exception:
+                    self.dropped += len(batch)
+                    # The connection may be part way through a frame.
+                    if self._sock is not None:
+                        self._sock.close()
+                        self._sock = None
+            if closed:
+                break
+
+    def _dropped_records(self):
+        """ Return records reporting records dropped since the last call. """
+        with self._aggregated_lock:
+            aggregated, self._aggregated = self._aggregated, {}
+        records = []
+        for (name, levelno), count in sorted(aggregated.items()):
+            record = logging.LogRecord(name, logging.WARNING, __file__, 0,
+                                       '%d %s records dropped, queue full',
+                                       (count, logging.getLevelName(levelno)),
+                                       None)
+            data = record.__dict__
+            data['msg'] = record.getMessage()
+            data['args'] = None
+            data['prefix'] = self.prefix
+            records.append(data)
+        return records
+
+    def _send(self, batch):
+        """ Send compressed `batch`, dropping it if the connection fails. """
+        if self._sock is None:
+            if time.time() < self._retry_time:
+                self.dropped += len(batch)
+                return
+            try:
+                self._sock = socket.create_connection((self.host, self.port))
+            except socket.error:
+                self._retry_time = time.time() + 1
+                self.dropped += len(batch)
+                return
+        data = zlib.compress(cPickle.dumps(batch, cPickle.HIGHEST_PROTOCOL), 1)
+        try:
+            self._sock.sendall(struct.pack('>L', len(data) | _BATCH_FLAG) + data)
+        except socket.error:
+            self._sock.close()
+            self._sock = None
+            self.dropped += len(batch)
 
 
 def logging_port(server_host, client_host):
@@ -507,15 +715,19 @@ class _LogHandler(SocketServer.StreamRequestHandler):
     """ Handler for a stream of logging requests. """
 
     def handle(self):
-        """ Handle log requests until connection closed. """
+        """
+        Handle batches of log records from a :class:`_RemoteHandler`,
+        or single records, until connection closed.
+        """
         # An initial 'unused' connection will be made by the client to see
         # if it can connect. We reduce logging noise by ignoring these.
         conn = self.connection
         peer = None
+        logger = None
 
         while True:
             try:
-                data = conn.recv(4)
+                data = self.rfile.read(4)
             except Exception:
                 return  # Typically [Errno 10054] on Windows.
             if len(data) < 4:
@@ -532,24 +744,31 @@ class _LogHandler(SocketServer.StreamRequestHandler):
                 logging.info('New logging connection from %s', peer)
 
             slen = struct.unpack('>L', data)[0]
-            data = conn.recv(slen)
-            slen -= len(data)
-            msg = data
-            while slen:
-                data = conn.recv(slen)
-                slen -= len(data)
-                msg = ''.join((msg, data))
+            batched = slen & _BATCH_FLAG
+            slen &= ~_BATCH_FLAG
+            data = self.rfile.read(slen)
+            if len(data) < slen:
+                break
 
+            # Unflagged frames hold a single record, as sent by a
+            # :class:`logging.handlers.SocketHandler`.
             try:
-                obj = cPickle.loads(msg)
-                record = logging.makeLogRecord(obj)
+                if batched:
+                    batch = cPickle.loads(zlib.decompress(data))
+                else:
+                    batch = [cPickle.loads(data)]
             except Exception as exc:
                 logging.exception("Can't process log request from %s: %s",
                                   peer, exc)
-            else:
-                prefix = record.prefix
+                continue
+
+            for obj in batch:
+                record = logging.makeLogRecord(obj)
+                prefix = getattr(record, 'prefix', peer)
                 record.name = '[%s] %s' % (prefix, record.name)
-                logging.getLogger(prefix).handle(record)
+                if logger is None or logger.name != prefix:
+                    logger = logging.getLogger(prefix)
+                logger.handle(record)
 
         conn.close()
         if peer is not None:
@@ -3,13 +3,15 @@ Utilities for reading and writing Fortran namelists.
 """
 
 import logging
+import re
 
 # pylint: disable-msg=E0611,F0401
 import ordereddict
 
 try:
-    from numpy import ndarray, array, append, vstack, zeros, \
-         int32, int64, float32, float64
+    from numpy import ndarray, array, asarray, atleast_2d, errstate, \
+         floor, fromstring, iinfo, signbit, where, zeros, int32, int64, \
+         float32, float64
 except ImportError as err:
     logging.warn("In %s: %r", __file__, err)
 
@@ -17,9 +19,9 @@ from traits.trait_handlers import TraitListObject
 
 from pyparsing import CaselessLiteral, Combine, ZeroOrMore, Literal, \
                       Optional, QuotedString, Suppress, Word, alphanums, \
-                      oneOf, nums, TokenConverter, Group
+                      oneOf, nums, TokenConverter, Group, ParserElement
 
-from openmdao.util.filewrap import ToFloat, ToInteger
+from openmdao.util.filewrap import ToFloat, ToInteger, _join_all
 from openmdao.util.decorators import stub_if_missing_deps
 
 def _floatfmt(val):
@@ -52,6 +54,37 @@ def _boolfmt(val):
         return 'F%.0s'
     
     
+def _format_array(values, sep):
+    """ Returns the text for the values in a 1D array, formatted like the
+    individual values and separated by `sep`."""
+    
+    if values.dtype == bool:
+        return sep.join(where(values, 'T', 'F'))
+    elif values.dtype in (int, int32, int64):
+        return sep.join([str(val) for val in values.tolist()])
+    elif values.dtype in (float, float32, float64):
+        formats = where(values == floor(values), '%.1f', '%.16g')
+        return sep.join(formats) % tuple(values.tolist())
+    else:
+        return sep.join([_strfmt(val) % val for val in values])
+    
+def _indexed_value(index, val):
+    """ Returns the value of a 1D array declared by element, starting at
+    (1-based) `index`."""
+    
+    index = index-1
+    
+    # Strings go into lists, not arrays
+    if isinstance(val[0], str):
+        value = ['']*(index+len(val))
+        value[index:] = val
+    else:
+        val = array(val)
+        value = zeros(index+len(val))
+        value[index:] = val
+        
+    return value
+    
 def _process_card_info(card):
     """ Function to extract info from a card as returned from PyParsing a
     namelist file. """
@@ -60,17 +93,7 @@ def _process_card_info(card):
 
     # Sometimes we have a 1D array declared by element
     if card.index:
-        index = card.index[0]-1
-        
-        # Strings go into lists, not arrays
-        if isinstance(card[2], str):
-            val = card[2:]
-            value = ['']*(index+len(val))
-            value[index:] = val
-        else:
-            val = array(card[2:])
-            value = zeros(index+len(val))
-            value[index:] = val
+        value = _indexed_value(card.index[0], card[2:])
         
     # Alternate array specification
     elif card.dimension:
@@ -85,6 +108,279 @@ def _process_card_info(card):
         value = card.value
         
     return name, value
+
+# The scanner below reads the namelist syntax described by the pyparsing
+# grammar in _NamelistGrammar, a whole line at a time. Like pyparsing, it
+# skips whitespace before each token, but not within numbers, and takes the
+# first alternative that matches. Lines that it can't handle exactly the
+# same way raise _Unsupported and are left to the grammar.
+
+_WHITE = r'[ \n\t\r]*'
+_NUMBER = r'(?:[+-]?(?:\d+\.\d*|\.\d+)(?:[eEdD][+-]?\d+)?' \
+          r'|\d+[eEdD][+-]?\d+|[+-]?\d+|NaN|Inf|-Inf)'
+_INTEGER = r'([+-]?\d+)'
+
+_BOOLS = {'T': True, 'TRUE': True, 'True': True, 'true': True,
+          '.TRUE.': True, '.T.': True,
+          'F': False, 'FALSE': False, 'False': False, 'false': False,
+          '.FALSE.': False, '.F.': False}
+
+_NUMBERS = re.compile(_WHITE + '(%s(?:%s,%s%s)*)' % (_NUMBER, _WHITE, _WHITE,
+                                                     _NUMBER))
+_STRING = re.compile(_WHITE + r'''(?:"([^"\n\r]*)"|'([^'\n\r]*)')''')
+_BOOL = re.compile(_WHITE + '(%s)' % '|'.join([re.escape(name) for name in
+                              sorted(_BOOLS, key=len, reverse=True)]))
+_NAME = re.compile(_WHITE + '([A-Za-z0-9]+)')
+_INDEX = re.compile(_WHITE + r'\(' + _WHITE + _INTEGER + _WHITE + r'\)')
+_INDEX_2D = re.compile(_WHITE + r'\(' + _WHITE + r'[+-]?\d+' + _WHITE + ',' +
+                       _WHITE + _INTEGER + _WHITE + r'\)')
+_EQUALS = re.compile(_WHITE + '=')
+_REPEAT = re.compile(_WHITE + _INTEGER + _WHITE + r'\*')
+_TIMES = re.compile(_WHITE + r'\*' + _WHITE + _INTEGER)
+_COMMA = re.compile(_WHITE + ',')
+_GROUP = re.compile(_WHITE + '[$&]' + _WHITE + '([A-Za-z0-9]+)')
+_GROUP_END = re.compile(_WHITE + r'(?:/|\$END|\$end|&END|&end)')
+_GROUP_ENDS = ('/', '$END', '$end', '&END', '&end')
+_DEFAULT_WHITE = ' \n\t\r'
+
+# A card, 2D array row, or value can only be found somewhere in a line if
+# these match somewhere in it.
+_MAYBE_CARD = re.compile('[A-Za-z0-9]' + _WHITE + r'(?:\(' + _WHITE +
+                         r'[+-]?\d+' + _WHITE + r'\)' + _WHITE + ')?=')
+_MAYBE_ROW = re.compile('[A-Za-z0-9]' + _INDEX_2D.pattern + _WHITE + '=')
+_MAYBE_VALUE = re.compile(r'''\d|NaN|Inf|["']''')
+
+_NOT_INTEGER = re.compile('[.EIN]')
+
+
+class _Unsupported(Exception):
+    """Raised by the scanner for lines it leaves to the pyparsing grammar."""
+    pass
+
+
+def _convert_numbers(text):
+    """ Returns the value of the comma-separated numbers in `text`: a single
+    int or float, or an array of them all."""
+    
+    text = text.replace('d', 'E').replace('e', 'E').replace('D', 'E')
+    if ',' not in text:
+        if _NOT_INTEGER.search(text):
+            return float(text)
+        return int(text)
+    
+    if _NOT_INTEGER.search(text):
+        values = fromstring(text, sep=',')
+        with errstate(invalid='ignore'):
+            convert_each = (abs(values) >= 2.0**63).any() or \
+                           (signbit(values) & (values == 0)).any()
+    else:
+        values = fromstring(text, dtype=int64, sep=',')
+        convert_each = (values == iinfo(int64).max).any() or \
+                       (values == iinfo(int64).min).any()
+    if len(values) != text.count(',')+1:
+        raise _Unsupported()
+        
+    # Integers too long for int64 are Python longs, and an integer -0 among
+    # floats is 0.0, so these values must be converted one at a time.
+    if convert_each:
+        values = array([_convert_numbers(val.strip())
+                        for val in text.split(',')])
+    return values
+
+def _scan_value(text, pos, bools=True):
+    """ Returns the value (or array of values) starting at `pos` in `text`
+    and the position after it, or None if there isn't one."""
+    
+    match = _NUMBERS.match(text, pos)
+    if match:
+        return _convert_numbers(match.group(1)), match.end()
+    
+    match = _STRING.match(text, pos)
+    if match:
+        if match.group(1) is None:
+            return match.group(2), match.end()
+        return match.group(1), match.end()
+    
+    if bools:
+        match = _BOOL.match(text, pos)
+        if match:
+            return _BOOLS[match.group(1)], match.end()
+        
+    return None
+
+def _scan_card(text, pos):
+    """ Returns the name and value of the card starting at `pos` in `text`
+    and the position after it, or None if there isn't one."""
+    
+    match = _NAME.match(text, pos)
+    if not match:
+        return None
+    name = match.group(1)
+    pos = match.end()
+    
+    index = _INDEX.match(text, pos)
+    if index:
+        pos = index.end()
+    
+    match = _EQUALS.match(text, pos)
+    if not match:
+        return None
+    pos = match.end()
+    
+    repeat = _REPEAT.match(text, pos)
+    if repeat:
+        pos = repeat.end()
+        
+    result = _scan_value(text, pos)
+    if result is None:
+        return None
+    value, pos = result
+    
+    times = _TIMES.match(text, pos)
+    if times:
+        pos = times.end()
+    
+    if repeat or times:
+        # Only the plain 'dim*value' and 'value*dim' forms are supported.
+        if (repeat and times) or index or isinstance(value, ndarray):
+            raise _Unsupported()
+        dim = int((repeat or times).group(1))
+        if not dim:
+            raise _Unsupported()
+        # Same as _process_card_info.
+        val = value
+        value = zeros(dim)
+        value.fill(val)
+        
+    elif index:
+        if not isinstance(value, ndarray):
+            value = [value]
+        value = _indexed_value(int(index.group(1)), value)
+        
+    return name, value, pos
+
+def _scan_cards(text, pos):
+    """ Returns a list of the (name, value) of the comma-separated cards
+    starting at `pos` in `text` and the position after them, or None if
+    there aren't any."""
+    
+    result = _scan_card(text, pos)
+    if result is None:
+        return None
+    
+    cards = []
+    while result is not None:
+        name, value, pos = result
+        cards.append((name, value))
+        
+        match = _COMMA.match(text, pos)
+        if not match:
+            break
+        result = _scan_card(text, match.end())
+        
+    return cards, pos
+
+def _scan_row(text):
+    """ Returns the name, column index and values of the 2D array row in
+    `text`, or None if there isn't one."""
+    
+    match = _NAME.match(text)
+    if not match:
+        return None
+    name = match.group(1)
+    
+    index = _INDEX_2D.match(text, match.end())
+    if not index:
+        return None
+    
+    match = _EQUALS.match(text, index.end())
+    if not match:
+        return None
+    
+    match = _NUMBERS.match(text, match.end())
+    if not match:
+        return None
+    
+    value = _convert_numbers(match.group(1))
+    if not isinstance(value, ndarray):
+        value = array([value])
+    return name, int(index.group(1)), value
+
+def _scan_header(text):
+    """ Returns the name, cards, and whether the group is ended for the
+    group header in `text`, or None if there isn't one."""
+    
+    match = _GROUP.match(text)
+    if not match:
+        return None
+    name = match.group(1)
+    pos = match.end()
+    
+    # A card holding a string that looks like a group end is taken as one.
+    if '"' in text or "'" in text:
+        raise _Unsupported()
+    
+    cards = []
+    result = _scan_cards(text, pos)
+    if result is not None:
+        cards, pos = result
+    
+    return name, cards, _GROUP_END.match(text, pos) is not None
+
+class _NamelistScanner(object):
+    """Classifies the lines of a namelist file with the scanner, for
+    ``Namelist._read_line()``. Each method returns None if the (stripped)
+    line isn't of its kind, or raises _Unsupported if it can't tell."""
+
+    def is_comment(self, line):
+        """ Returns True if `line` is a comment card. """
+        return '!' in line
+
+    def cards(self, line):
+        """ Returns a list of (name, value) for the cards in `line`. """
+        text = line.expandtabs()  # pyparsing expands tabs before parsing.
+        if not _MAYBE_CARD.search(text):
+            return None
+        result = _scan_cards(text, 0)
+        if result is None:
+            raise _Unsupported()
+        return result[0]
+
+    def row(self, line):
+        """ Returns the name, column index and values of a 2D array row. """
+        text = line.expandtabs()
+        if not _MAYBE_ROW.search(text):
+            return None
+        result = _scan_row(text)
+        if result is None:
+            raise _Unsupported()
+        return result
+
+    def continuation(self, line):
+        """ Returns (value,) for a line continuing an array. """
+        text = line.expandtabs()
+        result = _scan_value(text, 0, bools=False)
+        if result is not None:
+            return (result[0],)
+        if _MAYBE_VALUE.search(text):
+            raise _Unsupported()
+        return None
+
+    def is_group_end(self, line):
+        """ Returns True if `line` holds a group footer. """
+        return any([end in line for end in _GROUP_ENDS])
+
+    def header(self, line):
+        """ Returns the name, list of (name, value) for the cards, and
+        whether the group is ended for a group header. """
+        if '$' not in line and '&' not in line:
+            return None
+        result = _scan_header(line.expandtabs())
+        if result is None:
+            raise _Unsupported()
+        return result
+
+_SCANNER = _NamelistScanner()
         
 class Card(object):
     """ Data object that stores the value of a single card for a namelist."""
@@ -108,10 +404,130 @@ class ToBool(TokenConverter):
             raise RuntimeError('Unexpected error while trying to identify a'
                                ' Boolean value in the namelist.')
 
+class _NamelistGrammar(object):
+    """PyParsing grammar for the lines of a namelist file."""
+    
+    def __init__(self):
+        
+        # Lots of numerical tokens for recognizing various kinds of numbers
+        digits = Word(nums)
+        dot = "."
+        sign = oneOf("+ -")
+        ee = CaselessLiteral('E') | CaselessLiteral('D')
+    
+        num_int = ToInteger(Combine( Optional(sign) + digits ))
+        
+        num_float = ToFloat(Combine( Optional(sign) + 
+                            ((digits + dot + Optional(digits)) |
+                             (dot + digits)) +
+                             Optional(ee + Optional(sign) + digits)
+                            ))
+        
+        # special case for a float written like "3e5"
+        mixed_exp = ToFloat(Combine( digits + ee + Optional(sign) + digits ))
+        
+        # I don't suppose we need these, but just in case (plus it's easy)
+        nan = ToFloat(oneOf("NaN Inf -Inf"))
+        
+        numval = num_float | mixed_exp | num_int | nan
+        strval =  QuotedString(quoteChar='"') | QuotedString(quoteChar="'")
+        b_list = "T TRUE True true F FALSE False false .TRUE. .FALSE. .T. .F."
+        boolval = ToBool(oneOf(b_list))
+        fieldval = Word(alphanums)
+        
+        # Tokens for parsing a line of data
+        numstr_token = numval + ZeroOrMore(Suppress(',') + numval) \
+                   | strval
+        data_token = numstr_token | boolval
+        index_token = Suppress('(') + num_int + Suppress(')')
+        
+        card_token = Group(fieldval("name") +
+                           Optional(index_token("index")) +
+                           Suppress('=') +
+                           Optional(num_int("dimension") + Suppress('*')) +
+                           data_token("value") +
+                           Optional(Suppress('*') + num_int("dimension")))
+        self.multi_card_token = (card_token +
+                                 ZeroOrMore(Suppress(',') + card_token))
+        self.array_continuation_token = numstr_token.setResultsName("value")
+        self.array2D_token = fieldval("name") + Suppress("(") + \
+                             Suppress(num_int) + Suppress(',') + \
+                             num_int("index") + Suppress(')') + \
+                             Suppress('=') + numval + \
+                             ZeroOrMore(Suppress(',') + numval)
+        
+        # Tokens for parsing the group head and tai
+        self.group_end_token = Literal("/") | \
+                               Literal("$END") | Literal("$end") | \
+                               Literal("&END") | Literal("&end")
+        self.group_name_token = (Literal("$") | Literal("&")) + \
+                                Word(alphanums).setResultsName("name") + \
+                                Optional(self.multi_card_token) + \
+                                Optional(self.group_end_token)
+        
+        # Comment Token
+        self.comment_token = Literal("!")
+
+    # Line classification for Namelist._read_line(), the same as
+    # _NamelistScanner but with the grammar.
+
+    def is_comment(self, line):
+        """ Returns True if `line` is a comment card. """
+        return bool(self.comment_token.searchString(line))
+
+    def cards(self, line):
+        """ Returns a list of (name, value) for the cards in `line`. """
+        if not self.multi_card_token.searchString(line):
+            return None
+        return [_process_card_info(card)
+                for card in self.multi_card_token.parseString(line)]
+
+    def row(self, line):
+        """ Returns the name, column index and values of a 2D array row. """
+        if not self.array2D_token.searchString(line):
+            return None
+        card = self.array2D_token.parseString(line)
+        return card[0], card[1], array(card[2:])
+
+    def continuation(self, line):
+        """ Returns (value,) for a line continuing an array. """
+        if not self.array_continuation_token.searchString(line):
+            return None
+        card = self.array_continuation_token.parseString(line)
+        if len(card) > 1:
+            return (array(card[0:]),)
+        return (card.value,)
+
+    def is_group_end(self, line):
+        """ Returns True if `line` holds a group footer. """
+        return bool(self.group_end_token.searchString(line))
+
+    def header(self, line):
+        """ Returns the name, list of (name, value) for the cards, and
+        whether the group is ended for a group header. """
+        if not self.group_name_token.searchString(line):
+            return None
+        group_name = self.group_name_token.parseString(line)
+
+        # Sometimes, variable definitions are included on the
+        # same line as the namelist header
+        cards = []
+        ended = False
+        for card in group_name[2:]:
+            # Sometimes an end card is on the same line.
+            if self.group_end_token.searchString(card):
+                ended = True
+            else:
+                cards.append(_process_card_info(card))
+        return group_name.name, cards, ended
+
 @stub_if_missing_deps('numpy')
 class Namelist(object):
     """Utility to ease the task of constructing a formatted output file."""
     
+    # Set to False to parse every line with the pyparsing grammar.
+    _fast_scan = True
+    
     def __init__(self, comp):
         
         self.filename = None
@@ -124,6 +540,8 @@ class Namelist(object):
         self.cards = []
         
         self.currentgroup = 0
+        
+        self._pending = None
     
     def set_filename(self, filename):
         """Set the name of the file that will be generated or parsed.
@@ -266,38 +684,26 @@ class Namelist(object):
 
                 elif isinstance(card.value, (ndarray)):
                     
-                    # We can have integer, real, or string arrays
-                    if card.value.dtype == bool:
-                        fmt = _boolfmt
-                    elif card.value.dtype in (int, int32, int64):
-                        fmt = _intfmt
-                    elif card.value.dtype in (float, float32, float64):
-                        fmt = _floatfmt
-                    else:
-                        fmt = _strfmt
-                    
                     # We don't need to output 0D arrays
                     if len(card.value) == 0:
                         continue
                     
+                    # Integer, real, or string arrays are formatted all at
+                    # once, the same as their individual values.
                     elif len(card.value.shape) == 1:
-                        line = "  %s = " % (card.name)
-                        sep = ""
-                        for val in card.value:
-                            fstring = "%s" + fmt(val)
-                            line += fstring % (sep, val)
-                            sep = self.delimiter
-                        line += "\n"
+                        line = "  %s = %s\n" % (card.name,
+                                   _format_array(card.value, self.delimiter))
                             
                     elif len(card.value.shape) == 2:
                         
                         line = "  "
+                        sep = self.delimiter + " "
                         for row in range(0, card.value.shape[0]):
                             line += card.name + "(1," + str(row+1) + ") ="
-                            for col in range(0, card.value.shape[1]):
-                                val = card.value[row, col]
-                                fstring = " " + fmt(val) + "%s"
-                                line += fstring % (val, self.delimiter)
+                            if card.value.shape[1]:
+                                line += " %s%s" % (
+                                    _format_array(card.value[row], sep),
+                                    self.delimiter)
                             line += "\n"
                         
                     else:
@@ -326,174 +732,157 @@ class Namelist(object):
         """Parses an existing namelist file and creates a deck of cards to
         hold the data. After this is executed, you need to call the ``load_model()``
         method to extract the variables from this data structure."""
-        
+
         infile = open(self.filename, 'r')
         data = infile.readlines()
         infile.close()
-        
-        # Lots of numerical tokens for recognizing various kinds of numbers
-        digits = Word(nums)
-        dot = "."
-        sign = oneOf("+ -")
-        ee = CaselessLiteral('E') | CaselessLiteral('D')
-    
-        num_int = ToInteger(Combine( Optional(sign) + digits ))
-        
-        num_float = ToFloat(Combine( Optional(sign) + 
-                            ((digits + dot + Optional(digits)) |
-                             (dot + digits)) +
-                             Optional(ee + Optional(sign) + digits)
-                            ))
-        
-        # special case for a float written like "3e5"
-        mixed_exp = ToFloat(Combine( digits + ee + Optional(sign) + digits ))
-        
-        # I don't suppose we need these, but just in case (plus it's easy)
-        nan = ToFloat(oneOf("NaN Inf -Inf"))
-        
-        numval = num_float | mixed_exp | num_int | nan
-        strval =  QuotedString(quoteChar='"') | QuotedString(quoteChar="'")
-        b_list = "T TRUE True true F FALSE False false .TRUE. .FALSE. .T. .F."
-        boolval = ToBool(oneOf(b_list))
-        fieldval = Word(alphanums)
-        
-        # Tokens for parsing a line of data
-        numstr_token = numval + ZeroOrMore(Suppress(',') + numval) \
-                   | strval
-        data_token = numstr_token | boolval
-        index_token = Suppress('(') + num_int + Suppress(')')
-        
-        card_token = Group(fieldval("name") +
-                           Optional(index_token("index")) +
-                           Suppress('=') +
-                           Optional(num_int("dimension") + Suppress('*')) +
-                           data_token("value") +
-                           Optional(Suppress('*') + num_int("dimension")))
-        multi_card_token = (card_token + ZeroOrMore(Suppress(',') + card_token))
-        array_continuation_token = numstr_token.setResultsName("value")
-        array2D_token = fieldval("name") + Suppress("(") + \
-                        Suppress(num_int) + Suppress(',') + \
-                        num_int("index") + Suppress(')') + \
-                        Suppress('=') + numval + \
-                        ZeroOrMore(Suppress(',') + numval)
-        
-        # Tokens for parsing the group head and tai
-        group_end_token = Literal("/") | \
-                          Literal("$END") | Literal("$end") | \
-                          Literal("&END") | Literal("&end")
-        group_name_token = (Literal("$") | Literal("&")) + \
-                           Word(alphanums).setResultsName("name") + \
-                           Optional(multi_card_token) + \
-                           Optional(group_end_token)
-        
-        # Comment Token
-        comment_token = Literal("!")
-        
+
+        # Most lines are read by the scanner, which assumes that pyparsing's
+        # whitespace characters haven't been changed. The grammar is only
+        # built if it's needed for the rest.
+        scan = self._fast_scan and \
+               ParserElement.DEFAULT_WHITE_CHARS == _DEFAULT_WHITE
+        grammar = None
+
         # Loop through each line and parse.
-        
+
         current_group = None
         for line in data:
             line_base = line
             line = line.strip()
-            
+
             # blank line: do nothing
             if not line:
                 continue
-                
-            if current_group:
-                
-                # Skip comment cards
-                if comment_token.searchString(line):
+
+            if scan:
+                try:
+                    current_group = self._read_line(_SCANNER, line,
+                                                    line_base, current_group)
+                    continue
+                except _Unsupported:
                     pass
-                
-                # Process orindary cards
-                elif multi_card_token.searchString(line):
-                    cards = multi_card_token.parseString(line)
 
-                    for card in cards:
-                        name, value = _process_card_info(card)
-                        self.cards[-1].append(Card(name, value))
-                        
-                # Catch 2D arrays like -> X(1,1) = 3,4,5
-                elif array2D_token.searchString(line):
-                    card = array2D_token.parseString(line)
-                    
-                    name = card[0]
-                    index = card[1]
-                    value = array(card[2:])
-                    
-                    if index > 1:
-                        old_value = self.cards[-1][-1].value
-                        new_value = vstack((old_value, value))
-                        self.cards[-1][-1].value = new_value
-                    else:
-                        self.cards[-1].append(Card(name, value))
-                    
-                # Arrays can be continued on subsequent lines
-                # The value of the most recent card must be turned into an
-                # array and appended
-                elif array_continuation_token.searchString(line):
-                    card = array_continuation_token.parseString(line)
-                    
-                    if len(card) > 1:
-                        element = array(card[0:])
-                    else:
-                        element = card.value
-                        
-                    if isinstance(self.cards[-1][-1].value, ndarray):
-                        new_value = append(self.cards[-1][-1].value, element)
-                    else:
-                        new_value = array([self.cards[-1][-1].value, element])
-                    
-                    self.cards[-1][-1].value = new_value
-                    
-                # Lastly, look for the group footer
-                elif group_end_token.searchString(line):
-                    current_group = None
-                    
-                # Everything else must be a pure comment
-                else:
-                    print "Comment ignored: %s" % line.rstrip('\n')
+            self._join_pending()
+            if grammar is None:
+                grammar = _NamelistGrammar()
+            current_group = self._read_line(grammar, line, line_base,
+                                            current_group)
+
+        self._join_pending()
+
+    def _read_line(self, reader, line, line_base, current_group):
+        """Processes one (stripped) line of a namelist file, classified by
+        `reader` (the scanner or the pyparsing grammar), and returns the new
+        current group. The scanner raises _Unsupported before anything is
+        changed if the line must be read with the grammar."""
+
+        if current_group:
+
+            # Skip comment cards
+            if not reader.is_comment(line):
+                current_group = self._read_data(reader, line, current_group)
+
+            # Group ending '/' can also conclude a data line.
+            if line[-1] == '/':
+                current_group = None
 
-                # Group ending '/' can also conclude a data line.
-                if line[-1] == '/':
+        else:
+            header = reader.header(line)
+
+            # Group Header
+            if header is not None:
+                current_group, cards, ended = header
+                self.add_group(current_group)
+                for name, value in cards:
+                    self.cards[-1].append(Card(name, value))
+                if ended:
                     current_group = None
-                    
-                #print self.cards[-1][-1].name, self.cards[-1][-1].value
+
+            # If there is an ungrouped card at the start, take it as the
+            # title for the analysis
+            elif len(self.cards) == 0 and self.title == '':
+                self.title = line
+
+            # All other ungrouped cards are saved as free-form (card-less)
+            # groups.
+            # Note that we can't lstrip because column spacing might be
+            # important.
             else:
-                group_name = group_name_token.searchString(line)
-                
-                # Group Header
-                if group_name:
-                    group_name = group_name_token.parseString(line)
-                    current_group = group_name.name
-                    self.add_group(current_group)
-                    
-                    # Sometimes, variable definitions are included on the
-                    # same line as the namelist header
-                    if len(group_name) > 2:
-                        cards = group_name[2:]
-                        
-                        for card in cards:
-                            # Sometimes an end card is on the same line.
-                            if group_end_token.searchString(card):
-                                current_group = None
-                            else:
-                                name, value = _process_card_info(card)
-                                self.cards[-1].append(Card(name, value))
-
-                # If there is an ungrouped card at the start, take it as the
-                # title for the analysis
-                elif len(self.cards) == 0 and self.title == '':
-                    self.title = line
-                    
-                # All other ungrouped cards are saved as free-form (card-less)
-                # groups.
-                # Note that we can't lstrip because column spacing might be
-                # important.
-                else:
-                    self.add_group(line_base.rstrip())
-                    
+                self.add_group(line_base.rstrip())
+
+        return current_group
+
+    def _read_data(self, reader, line, current_group):
+        """Processes a data line within a group and returns the new current
+        group."""
+
+        # Process ordinary cards
+        cards = reader.cards(line)
+        if cards is not None:
+            for name, value in cards:
+                self.cards[-1].append(Card(name, value))
+            return current_group
+
+        # Catch 2D arrays like -> X(1,1) = 3,4,5
+        row = reader.row(line)
+        if row is not None:
+            name, index, value = row
+            if index > 1:
+                self._add_pending(value, stack=True)
+            else:
+                self.cards[-1].append(Card(name, value))
+            return current_group
+
+        # Arrays can be continued on subsequent lines
+        # The value of the most recent card must be turned into an
+        # array and appended
+        value = reader.continuation(line)
+        if value is not None:
+            self._add_pending(value[0])
+            return current_group
+
+        # Lastly, look for the group footer
+        if reader.is_group_end(line):
+            return None
+
+        # Everything else must be a pure comment
+        print "Comment ignored: %s" % line.rstrip('\n')
+        return current_group
+
+    def _add_pending(self, value, stack=False):
+        """Joins `value` onto the value of the last card, as a new row if
+        `stack` is True. Values joined onto an array are kept until
+        ``_join_pending()`` is called, so that each array is only copied
+        once no matter how many lines it's continued on."""
+
+        card = self.cards[-1][-1]
+        if self._pending is not None and \
+           (self._pending[0] is not card or self._pending[1] != stack):
+            self._join_pending()
+
+        if self._pending is None:
+            if not stack and not isinstance(card.value, ndarray):
+                card.value = array([card.value, value])
+                return
+            self._pending = (card, stack, [],
+                             atleast_2d(card.value).shape[1:])
+
+        value = asarray(value)
+        self._pending[2].append(value)
+
+        # A row that doesn't fit fails right away, as it would if it were
+        # stacked by itself.
+        if stack and atleast_2d(value).shape[1:] != self._pending[3]:
+            self._join_pending()
+
+    def _join_pending(self):
+        """Joins any values kept by ``_add_pending()`` onto their card."""
+
+        if self._pending is not None:
+            card, stack, pieces, _ = self._pending
+            self._pending = None
+            card.value = _join_all(card.value, pieces, stack)
 
     def load_model(self, rules=None, ignore=None, single_group=-1):
         """Loads the current deck into an OpenMDAO component.
@@ -550,6 +939,10 @@ class Namelist(object):
         unlisted_groups = ordereddict.OrderedDict()
         unlinked_vars = []
         used_groups = []
+        
+        # The component's variables are only listed once for all the cards.
+        comp_vars = None
+        
         for i, group_name in use_group:
             
             # Report all groups with no cards
@@ -596,8 +989,10 @@ class Namelist(object):
                                 break
                         
                 else:
+                    if comp_vars is None:
+                        comp_vars = set(self.comp.list_vars())
                     for item in [name, name.lower()]:
-                        if item in self.comp.list_vars():
+                        if item in comp_vars:
                             found = True
                             varpath = item
                             break
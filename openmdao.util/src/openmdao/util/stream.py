@@ -12,6 +12,13 @@ _SZ_LONG = 8
 _SZ_FLOAT = 4
 _SZ_DOUBLE = 8
 
+# Number of values formatted per write when writing text.
+_TEXT_CHUNK = 10000
+
+# Names of the recordmark fields in record layouts.
+_RECORDMARK_HEAD = '_recordmark_head'
+_RECORDMARK_TAIL = '_recordmark_tail'
+
 from openmdao.util.decorators import stub_if_missing_deps
 
 @stub_if_missing_deps('numpy')
@@ -101,6 +108,42 @@ class Stream(object):
         else:
             return _SZ_DOUBLE * count
 
+    def record_dtype(self, fields):
+        """
+        Returns a structured :class:`numpy.dtype` for records with the
+        layout described by `fields`. If `unformatted`, the record is
+        surrounded by recordmark fields named '_recordmark_head' and
+        '_recordmark_tail'.
+
+        fields: list
+            List of ``(name, dtype, shape)`` tuples, in file order.
+            `dtype` may be 'int' or 'float' for this stream's integer or
+            floating-point type, or any :mod:`numpy` dtype specification.
+            `shape` may be ``()`` for a scalar field.
+            If `binary`, fields use the byte order of the stream.
+        """
+        order = '>' if self.big_endian else '<'
+        layout = []
+        for name, dtype, shape in fields:
+            # Note that numpy.dtype('i8') == 'int' is True.
+            if isinstance(dtype, basestring) and dtype == 'int':
+                dtype = numpy.int64 if self.integer_8 else numpy.int32
+            elif isinstance(dtype, basestring) and dtype == 'float':
+                dtype = numpy.float32 if self.single_precision \
+                                      else numpy.float64
+            dtype = numpy.dtype(dtype)
+            if self.binary:
+                dtype = dtype.newbyteorder(order)
+            layout.append((name, dtype, shape))
+
+        if self.unformatted:
+            mark = numpy.dtype(numpy.int64 if self.recordmark_8
+                                           else numpy.int32)
+            mark = mark.newbyteorder(order)
+            layout.insert(0, (_RECORDMARK_HEAD, mark))
+            layout.append((_RECORDMARK_TAIL, mark))
+        return numpy.dtype(layout)
+
 
     ######## Input Operations ########
 
@@ -235,6 +278,107 @@ class Stream(object):
 
         return data.reshape(shape, order=order) if reshape else data
 
+    def map_floats(self, shape, order='C'):
+        """
+        Returns floats as a copy-on-write :class:`numpy.memmap` of `shape`
+        referencing the data at the current file position, and advances
+        past the data.  Nothing is read until the array is accessed, and
+        modifications to the array are not written to the file.
+        The array's dtype has the byte order of the file, which must not be
+        truncated or rewritten while the array is in use.
+        Only valid if `binary`.
+
+        shape: tuple(int)
+            Dimensions of returned array.
+
+        order: string
+            If 'C', the data is in row-major order.
+            If 'Fortran', the data is in column-major order.
+        """
+        if not self.binary:
+            raise RuntimeError('map_floats() requires binary data')
+
+        dtype = numpy.float32 if self.single_precision else numpy.float64
+        dtype = numpy.dtype(dtype).newbyteorder('>' if self.big_endian
+                                                    else '<')
+        order = 'F' if order == 'Fortran' else order
+        offset = self.file.tell()
+        data = numpy.memmap(self.file, dtype=dtype, mode='c', offset=offset,
+                            shape=shape, order=order)
+        self.file.seek(offset + data.nbytes)
+        return data
+
+    def read_records(self, fields, count, memory_map=False):
+        """
+        Returns `count` records with the layout described by `fields` as a
+        :mod:`numpy` structured array (see :meth:`record_dtype`).
+        The records are read in a single operation, and each field is
+        available as a view, e.g. ``records['x']``.
+        If binary, the array's dtype has the byte order of the file.
+        If `unformatted`, the recordmarks of every record are checked.
+
+        fields: list
+            List of ``(name, dtype, shape)`` tuples, in file order.
+
+        count: int
+            Number of records to read.
+
+        memory_map: bool
+            If True, return a copy-on-write :class:`numpy.memmap` rather
+            than reading the data (see :meth:`map_floats`).
+            Only valid if `binary`.
+        """
+        dtype = self.record_dtype(fields)
+
+        if not self.binary:
+            if memory_map:
+                raise RuntimeError('memory_map requires binary data')
+            return self._read_text_records(dtype, count)
+
+        if memory_map:
+            offset = self.file.tell()
+            data = numpy.memmap(self.file, dtype=dtype, mode='c',
+                                offset=offset, shape=(count,))
+            self.file.seek(offset + data.nbytes)
+        else:
+            data = numpy.fromfile(self.file, dtype=dtype, count=count)
+            if len(data) != count:
+                raise RuntimeError('expected %d records, read %d'
+                                   % (count, len(data)))
+
+        if self.unformatted and count:
+            reclen = dtype.itemsize - 2*dtype[_RECORDMARK_HEAD].itemsize
+            head = data[_RECORDMARK_HEAD]
+            bad = (head != reclen).nonzero()[0]
+            if len(bad):
+                raise RuntimeError('unexpected recordlength %d'
+                                   % head[bad[0]])
+            tail = data[_RECORDMARK_TAIL]
+            bad = (tail != head).nonzero()[0]
+            if len(bad):
+                raise RuntimeError('mismatched recordlength %d vs. %d'
+                                   % (tail[bad[0]], reclen))
+        return data
+
+    def _read_text_records(self, dtype, count):
+        """ Returns `count` text records of structured `dtype`. """
+        sizes = [max(dtype[name].itemsize // dtype[name].base.itemsize, 1)
+                 for name in dtype.names]
+        values = numpy.fromfile(self.file, dtype=numpy.float64,
+                                count=count*sum(sizes), sep=' ')
+        if len(values) != count*sum(sizes):
+            raise RuntimeError('expected %d records, read %d'
+                               % (count, len(values) // sum(sizes)))
+        values = values.reshape((count, sum(sizes)))
+
+        data = numpy.empty(count, dtype=dtype)
+        start = 0
+        for name, size in zip(dtype.names, sizes):
+            field = data[name]
+            field[...] = values[:, start:start+size].reshape(field.shape)
+            start += size
+        return data
+
     def read_recordmark(self):
         """ Returns value of next recordmark. """
         fmt = '>' if self.big_endian else '<'
@@ -312,11 +456,13 @@ class Stream(object):
             if full_record and self.unformatted:
                 self.write_recordmark(self.reclen_ints(data.size))
 
+            # Arrays in non-native byte order (i.e. mapped from a file)
+            # are converted so the byteswap logic below applies.
             arr = data
             if self.integer_8:
-                if data.itemsize != _SZ_LONG:
+                if data.itemsize != _SZ_LONG or not data.dtype.isnative:
                     arr = numpy.array(data, dtype=numpy.int64)
-            elif data.itemsize != _SZ_INT:
+            elif data.itemsize != _SZ_INT or not data.dtype.isnative:
                 arr = numpy.array(data, dtype=numpy.int32)
 
             if self.need_byteswap:
@@ -398,11 +544,13 @@ class Stream(object):
             if full_record and self.unformatted:
                 self.write_recordmark(self.reclen_floats(data.size))
 
+            # Arrays in non-native byte order (i.e. mapped from a file)
+            # are converted so the byteswap logic below applies.
             arr = data
             if self.single_precision:
-                if data.itemsize != _SZ_FLOAT:
+                if data.itemsize != _SZ_FLOAT or not data.dtype.isnative:
                     arr = numpy.array(data, dtype=numpy.float32)
-            elif data.itemsize != _SZ_DOUBLE:
+            elif data.itemsize != _SZ_DOUBLE or not data.dtype.isnative:
                 arr = numpy.array(data, dtype=numpy.float64)
 
             if self.need_byteswap:
@@ -418,6 +566,68 @@ class Stream(object):
         else:
             self.write_array(data, order, fmt, sep, linecount)
 
+    def write_records(self, data, fields, fmt=None, sep=' '):
+        """
+        Writes records with the layout described by `fields` in a single
+        operation. If `unformatted`, recordmarks are written around each
+        record. Text is written one record per line.
+
+        data: :class:`numpy.ndarray` or dict
+            Structured array, or dictionary of arrays, with an entry for
+            each field, indexed by record first.
+
+        fields: list
+            List of ``(name, dtype, shape)`` tuples, in file order
+            (see :meth:`record_dtype`).
+
+        fmt: dict
+            Format specifier for the items of each field when writing as
+            text. The default is '%d' for integer fields and '%.16g'
+            otherwise.
+
+        sep: string
+            Separator between items when writing as text.
+        """
+        dtype = self.record_dtype(fields)
+        name = fields[0][0]
+        count = numpy.asarray(data[name]).size // \
+                max(dtype[name].itemsize // dtype[name].base.itemsize, 1)
+
+        records = numpy.zeros(count, dtype=dtype)
+        for name, _, _ in fields:
+            records[name] = numpy.asarray(data[name]).reshape(
+                                                    records[name].shape)
+        if self.binary:
+            if self.unformatted:
+                reclen = dtype.itemsize - 2*dtype[_RECORDMARK_HEAD].itemsize
+                records[_RECORDMARK_HEAD] = reclen
+                records[_RECORDMARK_TAIL] = reclen
+            self.file.write(records.tostring())
+        else:
+            self._write_text_records(records, fmt or {}, sep)
+
+    def _write_text_records(self, records, fmt, sep):
+        """ Writes `records` as text, one record per line. """
+        columns = []
+        line = []
+        for name in records.dtype.names:
+            field = records[name].reshape((len(records), -1))
+            if name in fmt:
+                item_fmt = fmt[name]
+            elif field.dtype.kind in 'iu':
+                item_fmt = '%d'
+            else:
+                item_fmt = '%.16g'
+            line.extend([item_fmt]*field.shape[1])
+            columns.append(field)
+        line = sep.join(line)+'\n'
+
+        table = numpy.hstack([column.astype(object) for column in columns])
+        rows = max(_TEXT_CHUNK // max(table.shape[1], 1), 1)
+        for start in range(0, len(table), rows):
+            chunk = table[start:start+rows]
+            self.file.write(line*len(chunk) % tuple(chunk.ravel().tolist()))
+
     def write_array(self, data, order='C', fmt='%s', sep=' ', linecount=0):
         """
         Writes array as text.
@@ -438,42 +648,33 @@ class Stream(object):
         linecount: int
             If > zero, then at most `linecount` values are written per line.
         """
-        shape = data.shape
-        indices = [0 for i in shape]
-        _item = data.item
-        _write = self.file.write
-
         if order == 'C':
             # Row-major order.
-            sequence = range(len(shape))
-            sequence.reverse()
+            values = data.ravel(order='C')
         elif order == 'Fortran':
             # Column-major order.
-            sequence = range(len(shape))
+            values = data.ravel(order='F')
         else:
             raise ValueError("order must be 'C' or 'Fortran'")
 
-        count = 0
-        while True:
-            _write(fmt % _item(*indices))
-            count += 1
+        # Format whole lines (or chunks of items) at a time.
+        _write = self.file.write
+        if linecount > 0:
+            line_fmt = sep.join([fmt]*linecount)+'\n'
+            step = max(_TEXT_CHUNK // linecount, 1) * linecount
+        else:
+            step = _TEXT_CHUNK
+        for start in range(0, values.size, step):
+            chunk = values[start:start+step].tolist()
             if linecount > 0:
-                if count >= linecount:
-                    _write('\n')
-                    count = 0
-            if count:
-                _write(sep)
-
-            for i in sequence:
-                indices[i] += 1
-                if indices[i] >= shape[i]:
-                    indices[i] = 0
-                else:
-                    break
+                lines, extra = divmod(len(chunk), linecount)
+                text = line_fmt*lines + (fmt+sep)*extra
             else:
-                break
+                text = (fmt+sep)*len(chunk)
+            _write(text % tuple(chunk))
 
-        if count:
+        if (linecount <= 0 and values.size) or \
+           (linecount > 0 and values.size % linecount):
             _write('\n')
 
     def write_recordmark(self, length):
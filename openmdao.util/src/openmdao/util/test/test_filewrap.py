@@ -5,6 +5,7 @@ Testing the file wrapping utilities.
 import unittest, os
 
 from numpy import array, isnan, isinf
+from pyparsing import ParseException
 
 from openmdao.util.filewrap import InputFileGenerator, FileParser
 
@@ -585,6 +586,107 @@ class TestCase(unittest.TestCase):
         val = op.transfer_var(4, 4)
         self.assertEqual(val, '#$%')
         
+    def test_template_reuse(self):
+
+        template = "Anchor\n" + \
+                   "0 0 0\n" + \
+                   "Anchor\n" + \
+                   "0 0 0\n"
+
+        outfile = open(self.templatename, 'w')
+        outfile.write(template)
+        outfile.close()
+        os.utime(self.templatename, (1000000000, 1000000000))
+
+        # The split template is shared, so edits must not leak between runs.
+        for val in (1, 2):
+            gen = InputFileGenerator()
+            gen.set_template_file(self.templatename)
+            gen.set_generated_file(self.filename)
+            gen.mark_anchor('Anchor', 2)
+            gen.transfer_var(val, 1, 2)
+            self.assertEqual(gen.data[3], "0 %d 0\n" % val)
+            gen.set_delimiters(' ')
+            gen.transfer_var(val, 1, 3)
+            gen.generate()
+
+            infile = open(self.filename, 'r')
+            result = infile.read()
+            infile.close()
+            self.assertEqual(result, "Anchor\n0 0 0\nAnchor\n0 %d %d\n"
+                                     % (val, val))
+
+        # A changed template is read again, even with the same size and
+        # modification time.
+        outfile = open(self.templatename, 'w')
+        outfile.write(template.replace('0 0 0', '9 9 9'))
+        outfile.close()
+        os.utime(self.templatename, (1000000000, 1000000000))
+        gen = InputFileGenerator()
+        gen.set_template_file(self.templatename)
+        gen.mark_anchor('Anchor')
+        gen.transfer_var(3.0, 1, 1)
+        self.assertEqual(gen.data[:2], ["Anchor\n", "3.0 9 9\n"])
+
+        # Lines replaced via data are split again.
+        gen.data[1] = "5 5 5\n"
+        gen.transfer_var(7, 1, 2)
+        self.assertEqual(gen.data[1], "5 7 5\n")
+
+    def test_parse_equivalence(self):
+
+        # The fast tokenizer must match the pyparsing grammar.
+        lines = [" A 1, 2 34, Test 1e65\n",
+                 " C 77 False NaN 333.444 -Inf NaNQ Info\n",
+                 "1.5d3 -3e5 3e-2 .5 5. 1.#QNAN -1.#IND +7 12abc\n",
+                 "a^33 1.#QNAN^#$%^ d=C:/abc/def,a+b*c^2,(%#%),!true\n",
+                 "tab\tseparated\tvalues 1\t2\n",
+                 "stops at a quote \" 1 2\n"]
+        for delims in (' \t', ' \t,=', ' \t^', ','):
+            op = FileParser()
+            op.set_delimiters(delims)
+            for line in lines:
+                try:
+                    expected = list(op._parse_line().parseString(line))
+                except ParseException:
+                    self.assertRaises(ParseException, op._parse, line)
+                    continue
+                tokens = op._parse(line)
+                self.assertEqual(len(tokens), len(expected))
+                for token, value in zip(tokens, expected):
+                    self.assertEqual(type(token), type(value))
+                    if not (isinstance(value, float) and isnan(value)):
+                        self.assertEqual(token, value)
+        op.set_delimiters(' \t')
+
+        # Anchors only match within a line.
+        outfile = open(self.filename, 'w')
+        outfile.write("xx Anch\nor\n\n Anchor 1\nAnchor 2\nAnchor 3\n")
+        outfile.close()
+        op = FileParser()
+        op.set_file(self.filename)
+        op.mark_anchor('Anchor')
+        self.assertEqual(op.transfer_var(0, 2), 1)
+        op.mark_anchor('Anchor', 2)
+        self.assertEqual(op.transfer_var(0, 2), 3)
+        op.mark_anchor('Anchor', -2)
+        self.assertEqual(op.transfer_var(0, 2), 1)
+
+        # Lines replaced via data are parsed again.
+        op.data[3] = " Anchor 5\n"
+        op.data[4] = "Other 2\n"
+        self.assertEqual(op.transfer_var(0, 2), 5)
+        op.reset_anchor()
+        op.mark_anchor('Anchor', 2)
+        self.assertEqual(op.transfer_var(0, 2), 3)
+        try:
+            op.mark_anchor('Anch\nor')
+        except RuntimeError, err:
+            self.assertEqual(str(err), "Could not find pattern Anch\nor in"
+                                       " output file %s" % self.filename)
+        else:
+            self.fail('RuntimeError expected')
+
 
             
 if __name__ == '__main__':
@@ -0,0 +1,194 @@
+"""
+Test file transfers, zipfile manifests, and the zipfile member cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from openmdao.util.filexfer import ZipCache, select_zipfile, \
+                                   zipfile_manifest, filexfer, \
+                                   chunk_digests, read_chunk, write_chunk
+from openmdao.util.testutil import assert_raises
+
+
+class Server(object):
+    """ Block access with a log of blocks written. """
+
+    def __init__(self):
+        self.written = []
+
+    def stat(self, path):
+        return os.stat(path)
+
+    def chmod(self, path, mode):
+        return os.chmod(path, mode)
+
+    def chunk_digests(self, path, chunk_size):
+        return chunk_digests(path, chunk_size)
+
+    def read_chunk(self, path, offset, size, compress=False):
+        return read_chunk(path, offset, size, compress)
+
+    def write_chunk(self, path, offset, data, compressed, checksum, size):
+        self.written.append(offset)
+        return write_chunk(path, offset, data, compressed, checksum, size)
+
+
+class FilexferTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.startdir = os.getcwd()
+        self.tempdir = tempfile.mkdtemp(prefix='test_filexfer-')
+        os.chdir(self.tempdir)
+
+        self.data = os.urandom(10000) + '\0'*10000 + os.urandom(5000)
+        with open('src.dat', 'wb') as out:
+            out.write(self.data)
+        os.chmod('src.dat', 0640)
+
+    def tearDown(self):
+        os.chdir(self.startdir)
+        shutil.rmtree(self.tempdir)
+
+    def check(self, data=None):
+        with open('dst.dat', 'rb') as inp:
+            self.assertEqual(inp.read(), self.data if data is None else data)
+        self.assertEqual(os.stat('dst.dat').st_mode & 0777, 0640)
+
+    def test_blocks(self):
+        server = Server()
+        filexfer(None, 'src.dat', server, 'dst.dat', 'b',
+                 compress=True, chunk_size=1000)
+        self.check()
+        self.assertEqual(sorted(server.written), range(0, 25000, 1000))
+
+        # Only changed blocks are sent.
+        self.data = self.data[:12345] + 'x' + self.data[12346:]
+        with open('src.dat', 'wb') as out:
+            out.write(self.data)
+        server.written = []
+        filexfer(None, 'src.dat', server, 'dst.dat', 'b', chunk_size=1000)
+        self.check()
+        self.assertEqual(server.written, [12000])
+
+        # Interrupted transfer resumes with the missing blocks.
+        with open('dst.dat', 'r+b') as out:
+            out.truncate(17500)
+        server.written = []
+        filexfer(None, 'src.dat', server, 'dst.dat', 'b', chunk_size=1000)
+        self.check()
+        self.assertEqual(sorted(server.written), range(17000, 25000, 1000))
+
+        # Shorter source just truncates.
+        self.data = self.data[:20000]
+        with open('src.dat', 'wb') as out:
+            out.write(self.data)
+        server.written = []
+        filexfer(None, 'src.dat', server, 'dst.dat', 'b', chunk_size=1000)
+        self.check()
+        self.assertEqual(server.written, [19000])
+
+        # Empty file.
+        os.remove('dst.dat')
+        self.data = ''
+        with open('src.dat', 'wb') as out:
+            pass
+        filexfer(server, 'src.dat', None, 'dst.dat', 'b')
+        self.check()
+
+        # Corruption is detected.
+        data, compressed, checksum = read_chunk('src.dat', 0, 1000)
+        assert_raises(self,
+                      "write_chunk('dst.dat', 0, 'x', False, checksum, 1)",
+                      globals(), locals(), ValueError,
+                      "'dst.dat': checksum mismatch at offset 0")
+
+    def test_stream(self):
+        # Text mode and servers without block access use open().
+        class OpenServer(object):
+            stat = staticmethod(os.stat)
+            chmod = staticmethod(os.chmod)
+            open = staticmethod(open)
+
+        filexfer(OpenServer(), 'src.dat', None, 'dst.dat', 'b')
+        self.check()
+        os.remove('dst.dat')
+        filexfer(None, 'src.dat', None, 'dst.dat')
+        self.check()
+
+
+class ZipCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.startdir = os.getcwd()
+        self.tempdir = tempfile.mkdtemp(prefix='test_filexfer-')
+        os.chdir(self.tempdir)
+
+        self.data = {'model/__init__.py': 'x = 1\n',
+                     'model/big.dat': os.urandom(100000),
+                     'EGG-INFO/PKG-INFO': 'Version: 1\n'}
+        self.write_egg('model-1.egg')
+
+    def tearDown(self):
+        os.chdir(self.startdir)
+        shutil.rmtree(self.tempdir)
+
+    def write_egg(self, filename):
+        with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as zipped:
+            for name in sorted(self.data):
+                info = zipfile.ZipInfo(name)
+                info.external_attr = 0750 << 16
+                zipped.writestr(info, self.data[name])
+
+    def test_cache(self):
+        cache = ZipCache('cache')
+        manifest = zipfile_manifest('model-1.egg')
+        self.assertEqual([entry[0] for entry in manifest],
+                         sorted(self.data))
+        self.assertEqual(sorted(cache.missing(manifest)), sorted(self.data))
+
+        assert_raises(self, "cache.build_zipfile('copy.egg', manifest)",
+                      globals(), locals(), ValueError,
+                      "3 members not cached, first is 'EGG-INFO/PKG-INFO'")
+
+        self.assertEqual(cache.add_zipfile('model-1.egg', manifest),
+                         (3, sum([len(val) for val in self.data.values()])))
+        self.assertEqual(cache.missing(manifest), [])
+
+        # Only the changed member is needed for the next version.
+        self.data['EGG-INFO/PKG-INFO'] = 'Version: 2\n'
+        self.write_egg('model-2.egg')
+        manifest = zipfile_manifest('model-2.egg')
+        missing = cache.missing(manifest)
+        self.assertEqual(missing, ['EGG-INFO/PKG-INFO'])
+
+        self.assertEqual(select_zipfile('model-2.egg', 'partial.egg',
+                                        missing), (1, 11))
+        cache.add_zipfile('partial.egg', manifest)
+        cache.build_zipfile('copy.egg', manifest)
+        with zipfile.ZipFile('copy.egg') as zipped:
+            for info in zipped.infolist():
+                self.assertEqual(zipped.read(info), self.data[info.filename])
+                self.assertEqual(info.external_attr, 0750 << 16)
+
+        # Corrupted transfers aren't cached.
+        bad = [(name, '0'*40, size, attr)
+               for name, digest, size, attr in manifest]
+        assert_raises(self, "ZipCache('cache2').add_zipfile('model-2.egg', bad)",
+                      globals(), locals(), ValueError,
+                      "'model-2.egg': digest mismatch for 'EGG-INFO/PKG-INFO'")
+        self.assertEqual(os.listdir('cache2'), [])
+
+        # Least recently used members are pruned first.
+        cache.build_zipfile('copy.egg', manifest)
+        cache.max_size = 100020
+        cache.prune()
+        self.assertEqual(cache.missing(manifest), [])
+        self.assertEqual(len(os.listdir('cache')), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,26 @@ Exercise logging functions.
 """
 
 import logging
+import logging.handlers
 import sys
+import threading
+import time
+import traceback
 import unittest
 
 from openmdao.util.log import enable_console, disable_console, \
-                              Logger, NullLogger
+                              Logger, NullLogger, logging_port, _RemoteHandler
+
+
+class _Collector(logging.Handler):
+    """ Saves records received. """
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
 
 
 class TestCase(unittest.TestCase):
@@ -44,6 +59,110 @@ class TestCase(unittest.TestCase):
         logger.critical('critical message')
         logger.log(1, 'logged at level 1')
 
+    def test_remote(self):
+        logging.debug('')
+        logging.debug('test_remote')
+
+        port = logging_port('localhost', 'localhost')
+        collector = _Collector()
+        received = logging.getLogger('lut_remote')
+        received.propagate = False
+        received.addHandler(collector)
+
+        sender = logging.getLogger('lut_sender')
+        sender.propagate = False
+        sender.setLevel(logging.DEBUG)
+        try:
+            # Records are sent in batches by a background thread.
+            handler = _RemoteHandler('localhost', port, 'lut_remote',
+                                     batch_size=10)
+            sender.addHandler(handler)
+            for i in range(25):
+                sender.debug('message %d of %s', i, [1, 2])
+            try:
+                raise ValueError('oops')
+            except ValueError:
+                trace = traceback.format_exc().rstrip('\n')
+                sender.exception('failed %d', 7)
+            self.wait_for(collector, 26)
+            self.assertEqual(collector.records[3].getMessage(),
+                             'message 3 of [1, 2]')
+            self.assertEqual(collector.records[3].name,
+                             '[lut_remote] lut_sender')
+            formatter = logging.Formatter('%(message)s')
+            self.assertEqual(formatter.format(collector.records[25]),
+                             'failed 7\n' + trace)
+
+            # Unpicklable extra attributes are sent as their repr().
+            del collector.records[:]
+            lock = threading.Lock()
+            sender.info('locked', extra={'obj': lock, 'count': 3})
+            sender.info('after lock')
+            handler.flush()
+            self.wait_for(collector, 2)
+            self.assertEqual([rec.getMessage() for rec in collector.records],
+                             ['locked', 'after lock'])
+            self.assertEqual(collector.records[0].obj, repr(lock))
+            self.assertEqual(collector.records[0].count, 3)
+
+            # A batch which can't be sent is dropped, later ones still are.
+            del collector.records[:]
+            handler._queue.append({'obj': lock})
+            handler.flush()
+            for retry in range(100):
+                if handler.dropped:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(handler.dropped, 1)
+            self.assertTrue(handler._thread.is_alive())
+            sender.info('still sending')
+            handler.flush()
+            self.wait_for(collector, 1)
+            self.assertEqual([rec.getMessage() for rec in collector.records],
+                             ['still sending'])
+            sender.removeHandler(handler)
+            handler.close()
+
+            # When the queue is full, records are dropped and counted.
+            del collector.records[:]
+            handler = _RemoteHandler('localhost', port, 'lut_remote',
+                                     max_queued=5, interval=60)
+            sender.addHandler(handler)
+            for i in range(20):
+                sender.debug('message %d', i)
+            sender.removeHandler(handler)
+            handler.close()
+            self.wait_for(collector, 6)
+            self.assertEqual([rec.getMessage() for rec in collector.records],
+                             ['message %d' % i for i in range(5)]
+                             + ['15 D records dropped, queue full'])
+            self.assertEqual(handler.dropped, 15)
+
+            self.assertRaises(ValueError, _RemoteHandler, 'localhost', port,
+                              'lut_remote', 'lose')
+
+            # Single records from a plain SocketHandler are accepted.
+            del collector.records[:]
+            handler = logging.handlers.SocketHandler('localhost', port)
+            sender.addHandler(handler)
+            sender.info('plain %s', 'record', extra={'prefix': 'lut_remote'})
+            sender.removeHandler(handler)
+            handler.close()
+            self.wait_for(collector, 1)
+            self.assertEqual([rec.getMessage() for rec in collector.records],
+                             ['plain record'])
+        finally:
+            received.removeHandler(collector)
+
+    @staticmethod
+    def wait_for(collector, count):
+        """ Wait for `count` records to be received. """
+        for retry in range(100):
+            if len(collector.records) >= count:
+                break
+            time.sleep(0.1)
+        time.sleep(0.1)  # Allow for extras.
+
 
 if __name__ == '__main__':
     import nose
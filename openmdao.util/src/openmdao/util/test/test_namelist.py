@@ -8,7 +8,8 @@ import unittest
 
 from numpy import float32 as numpy_float32
 from numpy import int32 as numpy_int32
-from numpy import array, zeros
+from numpy import arange, array, int64, zeros
+from numpy.testing import assert_array_equal
 
 from openmdao.main.datatypes.api import Float, Bool, Int, Str, File, List, \
                                         Enum, Array, VarTree
@@ -442,6 +443,62 @@ class TestCase(unittest.TestCase):
 
         self.assertEqual(contents, compare)
 
+    def test_large_arrays(self):
+
+        my_comp = VarComponent()
+        sb = Namelist(my_comp)
+
+        values = arange(1000.0)/8.0
+        my_comp.arrayvar = values
+        my_comp.singleint = arange(1000)
+        my_comp.arrayvartwod = values.reshape((100, 10))
+
+        sb.set_filename(self.filename)
+        sb.add_group('Test')
+        sb.add_var("arrayvar")
+        sb.add_var("singleint")
+        sb.add_var("arrayvartwod")
+        sb.generate()
+
+        # Arrays continued on several lines, with mixed types.
+        f = open(self.filename, 'a')
+        f.write("&Cont\n"
+                "  arrayvarsplit = 1, 2\n"
+                "  3, 4\n"
+                "  ! Comment\n"
+                "  5.5, 6d0\n"
+                "  arrayvarsplit2 = 1.0, 2.0\n")
+        for i in range(100):
+            f.write("  %d, %d.5\n" % (i, i))
+        f.write("/\n")
+        f.close()
+
+        decks = []
+        for fast_scan in (True, False):
+            sb = Namelist(my_comp)
+            sb._fast_scan = fast_scan
+            sb.set_filename(self.filename)
+            sb.parse_file()
+            decks.append(sb)
+
+        for sb in decks:
+            self.assertEqual(sb.groups, ['Test', 'Cont'])
+            assert_array_equal(sb.find_card('Test', 'arrayvar'), values)
+            self.assertEqual(sb.find_card('Test', 'singleint').dtype, int64)
+            assert_array_equal(sb.find_card('Test', 'singleint'),
+                               arange(1000))
+            assert_array_equal(
+                sb.find_card('Test', 'arrayvartwod'),
+                values.reshape((100, 10)))
+            assert_array_equal(
+                sb.find_card('Cont', 'arrayvarsplit'),
+                [1.0, 2.0, 3.0, 4.0, 5.5, 6.0])
+            self.assertEqual(len(sb.find_card('Cont', 'arrayvarsplit2')),
+                             202)
+
+        sb.load_model()
+        assert_array_equal(my_comp.arrayvarsplit2[-2:], [99.0, 99.5])
+
     def test_unsupported_array(self):
         
         my_comp = VarComponent()
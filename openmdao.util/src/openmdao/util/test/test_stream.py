@@ -4,6 +4,7 @@ Test Stream functions.
 
 import logging
 import os.path
+import struct
 import sys
 import unittest
 
@@ -560,6 +561,150 @@ class TestCase(unittest.TestCase):
             new_data = stream.read_floats((5, 2), order='Fortran')
         numpy.testing.assert_array_equal(new_data, arr2d)
 
+    def test_map_floats(self):
+        logging.debug('')
+        logging.debug('test_map_floats')
+
+        # Unformatted big-endian Fortran-order array.
+        data = numpy.arange(0, 24, dtype=numpy.float64).reshape((2, 3, 4))
+        with open(self.filename, 'wb') as out:
+            stream = Stream(out, binary=True, big_endian=True,
+                            unformatted=True)
+            stream.write_floats(data, order='Fortran', full_record=True)
+            stream.write_int(42, full_record=True)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, big_endian=True,
+                            unformatted=True)
+            reclen = stream.read_recordmark()
+            self.assertEqual(reclen, stream.reclen_floats(data.size))
+            new_data = stream.map_floats(data.shape, order='Fortran')
+            self.assertEqual(stream.read_recordmark(), reclen)
+            self.assertEqual(stream.read_int(full_record=True), 42)
+        self.assertTrue(isinstance(new_data, numpy.memmap))
+        self.assertEqual(new_data.dtype, numpy.dtype('>f8'))
+        numpy.testing.assert_array_equal(new_data, data)
+
+        # Modifications are not written to the file.
+        new_data[0, 0, 0] = 666.
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, big_endian=True,
+                            unformatted=True)
+            check = stream.read_floats(data.shape, order='Fortran',
+                                       full_record=True)
+        numpy.testing.assert_array_equal(check, data)
+
+        # Mapped data can be written in either byte order.
+        # (The mapped file must not be truncated while in use.)
+        filename = self.filename+'.copy'
+        try:
+            for big_endian in (False, True):
+                with open(filename, 'wb') as out:
+                    stream = Stream(out, binary=True, big_endian=big_endian)
+                    stream.write_floats(new_data)
+                with open(filename, 'rb') as inp:
+                    stream = Stream(inp, binary=True, big_endian=big_endian)
+                    check = stream.read_floats(data.shape)
+                numpy.testing.assert_array_equal(check, new_data)
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
+        del new_data
+
+        with open(self.filename, 'r') as inp:
+            stream = Stream(inp)
+            assert_raises(self, 'stream.map_floats(2)',
+                          globals(), locals(), RuntimeError,
+                          'map_floats() requires binary data')
+
+    def test_records(self):
+        logging.debug('')
+        logging.debug('test_records')
+
+        fields = [('id', 'int', ()), ('xyz', 'float', (3,)),
+                  ('flag', numpy.int8, ())]
+        count = 5
+        data = {'id': numpy.arange(count),
+                'xyz': numpy.arange(count*3.).reshape((count, 3)),
+                'flag': numpy.ones(count)}
+
+        # Unformatted big-endian, compared with record-at-a-time output.
+        with open(self.filename, 'wb') as out:
+            stream = Stream(out, binary=True, big_endian=True,
+                            unformatted=True)
+            stream.write_records(data, fields)
+        with open(self.filename, 'rb') as inp:
+            records = inp.read()
+        expected = ''
+        for i in range(count):
+            expected += struct.pack('>ii3dbi', 29, i, *(list(data['xyz'][i])
+                                                         + [1, 29]))
+        self.assertEqual(records, expected)
+
+        for memory_map in (False, True):
+            with open(self.filename, 'rb') as inp:
+                stream = Stream(inp, binary=True, big_endian=True,
+                                unformatted=True)
+                records = stream.read_records(fields, count, memory_map)
+                self.assertEqual(inp.tell(), len(expected))
+            self.assertEqual(isinstance(records, numpy.memmap), memory_map)
+            self.assertEqual(records['xyz'].dtype, numpy.dtype('>f8'))
+            for name, _, _ in fields:
+                numpy.testing.assert_array_equal(records[name], data[name])
+        del records
+
+        # Structured array input, native order, no recordmarks.
+        with open(self.filename, 'wb') as out:
+            stream = Stream(out, binary=True, single_precision=True)
+            dtype = stream.record_dtype(fields)
+            self.assertEqual(dtype.itemsize, 4+12+1)
+            self.assertEqual(stream.record_dtype([('i', numpy.dtype('i8'),
+                                                   ())]).itemsize, 8)
+            records = numpy.zeros(count, dtype=dtype)
+            for name, _, _ in fields:
+                records[name] = data[name]
+            stream.write_records(records, fields)
+        self.assertEqual(os.path.getsize(self.filename), count*17)
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, single_precision=True)
+            new_records = stream.read_records(fields, count)
+        numpy.testing.assert_array_equal(new_records, records)
+
+        # Text, one record per line.
+        with open(self.filename, 'w') as out:
+            stream = Stream(out)
+            stream.write_records(data, fields, fmt={'xyz': '%.1f'})
+        with open(self.filename, 'r') as inp:
+            self.assertEqual(inp.readline(), '0 0.0 1.0 2.0 1\n')
+        with open(self.filename, 'r') as inp:
+            stream = Stream(inp)
+            records = stream.read_records(fields, count)
+            assert_raises(self, 'stream.read_records(fields, 1)',
+                          globals(), locals(), RuntimeError,
+                          'expected 1 records, read 0')
+            assert_raises(self, 'stream.read_records(fields, 1, True)',
+                          globals(), locals(), RuntimeError,
+                          'memory_map requires binary data')
+        for name, _, _ in fields:
+            numpy.testing.assert_array_equal(records[name], data[name])
+
+        # Recordlength errors.
+        with open(self.filename, 'wb') as out:
+            out.write(expected[:36]+'\x42'+expected[37:])
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, big_endian=True,
+                            unformatted=True)
+            assert_raises(self, 'stream.read_records(fields, count)',
+                          globals(), locals(), RuntimeError,
+                          'mismatched recordlength 66 vs. 29')
+        with open(self.filename, 'wb') as out:
+            out.write(expected[:-1])
+        with open(self.filename, 'rb') as inp:
+            stream = Stream(inp, binary=True, big_endian=True,
+                            unformatted=True)
+            assert_raises(self, 'stream.read_records(fields, count)',
+                          globals(), locals(), RuntimeError,
+                          'expected 5 records, read 4')
+
     def test_misc(self):
         logging.debug('')
         logging.debug('test_misc')